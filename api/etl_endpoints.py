@@ -20,7 +20,14 @@ from etl.test_completion_handler import (
     JobTracker,
     JobStatus
 )
-# Note: Background task management will be handled by BackgroundTaskManager in task 12.2
+from etl.background_task_manager import BackgroundTaskManager
+from etl.job_lanes import JobPriority, FairShareLimiter
+from etl.job_events import JobEventListener
+from etl.cpu_pool import CPUWorkPool
+from etl.embedding_store import EmbeddingStore
+from etl.rate_limiter import AdaptiveRateLimiter
+from etl import telemetry
+from etl.config import BACKGROUND_PROCESSING_CONFIG
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +53,28 @@ class TestCompletionNotification(BaseModel):
             raise ValueError('user_id cannot be empty')
         return v.strip()
 
+class BulkTestCompletionNotification(BaseModel):
+    """Bulk test completion notification request model"""
+    notifications: List[TestCompletionNotification] = Field(..., description="Test completion notifications")
+    priority: JobPriority = Field(
+        default=JobPriority.INTERACTIVE,
+        description="Priority lane of the queued jobs; use 'backfill' for admin re-processing runs"
+    )
+
+class BulkETLJobItem(BaseModel):
+    """Job queued (or reused) for one notification of a bulk request"""
+    anp_seq: int
+    job_id: str
+    status: str
+    coalesced: bool
+    progress_url: str
+
+class BulkETLJobResponse(BaseModel):
+    """Bulk ETL job creation response model"""
+    jobs_created: int
+    jobs_coalesced: int
+    jobs: List[BulkETLJobItem]
+
 class JobStatusResponse(BaseModel):
     """Job status response model"""
     job_id: str
@@ -65,6 +94,7 @@ class JobStatusResponse(BaseModel):
     retry_count: int = 0
     query_results_summary: Optional[Dict[str, Any]] = None
     documents_created: Optional[List[str]] = None
+    priority: Optional[str] = None
 
 class JobHistoryResponse(BaseModel):
     """Job history response model"""
@@ -156,6 +186,58 @@ async def handle_test_completion(
             detail=f"Failed to start ETL processing: {str(e)}"
         )
 
+@router.post(
+    "/test-completion/bulk",
+    response_model=BulkETLJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Handle Test Completions in Bulk",
+    description="Receive many test completion notifications (e.g. an institution-wide result release) and queue ETL jobs for them at once"
+)
+async def handle_bulk_test_completion(
+    bulk: BulkTestCompletionNotification,
+    handler: TestCompletionHandler = Depends(get_test_completion_handler)
+) -> BulkETLJobResponse:
+    """
+    Handle a batch of test completion notifications
+    
+    Users and jobs are created with a few set-based statements and the
+    worker pool is woken once. Notifications for a test that already has an
+    in-flight job reuse that job.
+    
+    Args:
+        bulk: Test completion notifications
+        handler: Test completion handler instance
+        
+    Returns:
+        Created / coalesced counts and the job of every notification
+        
+    Raises:
+        HTTPException: If the batch is empty or too large, or jobs cannot be queued
+    """
+    max_notifications = BACKGROUND_PROCESSING_CONFIG['bulk_ingest_max_notifications']
+    if not bulk.notifications:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No notifications given")
+    if len(bulk.notifications) > max_notifications:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {max_notifications} notifications per request"
+        )
+    
+    logger.info(f"Received {len(bulk.notifications)} test completion notifications in bulk")
+    requests = [
+        TestCompletionRequest(
+            user_id=notification.user_id,
+            anp_seq=notification.anp_seq,
+            test_type=notification.test_type,
+            completed_at=notification.completed_at,
+            notification_source=notification.notification_source,
+            priority=bulk.priority
+        )
+        for notification in bulk.notifications
+    ]
+    result = await handler.handle_bulk_test_completion(requests)
+    return BulkETLJobResponse(**result)
+
 @router.get(
     "/jobs/{job_id}/status",
     response_model=JobStatusResponse,
@@ -227,28 +309,41 @@ async def get_job_progress_stream(
     
     async def event_stream():
         """Generate Server-Sent Events for job progress"""
+        listener = JobEventListener.instance()
+        resync_seconds = BACKGROUND_PROCESSING_CONFIG['progress_stream_resync_seconds']
         try:
-            last_status = None
-            
-            while True:
-                # Get current job status
+            # Subscribe before the first read so no change between the two is missed
+            async with listener.subscribe(job_id) as events:
+                last_status = None
                 job_status = await handler.get_job_status(job_id)
                 
-                if not job_status:
-                    yield f"data: {json.dumps({'error': 'Job not found'})}\n\n"
-                    break
-                
-                # Only send updates if status changed
-                if job_status != last_status:
-                    yield f"data: {json.dumps(job_status)}\n\n"
-                    last_status = job_status
-                
-                # Stop streaming if job is completed
-                if job_status.get('status') in ['success', 'failure']:
-                    break
-                
-                # Wait before next check
-                await asyncio.sleep(2)
+                while True:
+                    if not job_status:
+                        yield f"data: {json.dumps({'error': 'Job not found'})}\n\n"
+                        break
+                    
+                    # Only send updates if status changed
+                    if job_status != last_status:
+                        yield f"data: {json.dumps(job_status)}\n\n"
+                        last_status = job_status
+                    
+                    # Stop streaming if job is completed. A failure is final only
+                    # once the worker let go of the job: until then the queue may
+                    # still put it back to pending for another attempt
+                    if job_status.get('status') == 'success' or (
+                        job_status.get('status') == 'failure' and not job_status.get('leased')
+                    ):
+                        break
+                    
+                    # Wait for a pushed change; re-read the job now and then as a
+                    # fallback for missed events or without LISTEN
+                    try:
+                        event = await asyncio.wait_for(
+                            events.get(), timeout=resync_seconds if listener.connected else 2
+                        )
+                        job_status = {**job_status, **event, 'progress_percentage': float(event['progress_percentage'] or 0)}
+                    except asyncio.TimeoutError:
+                        job_status = await handler.get_job_status(job_id)
                 
         except Exception as e:
             logger.error(f"Error in job progress stream for {job_id}: {e}")
@@ -369,7 +464,7 @@ async def retry_failed_job(
         handler: Test completion handler instance
         
     Returns:
-        New job information for the retry
+        Job information for the retry (same job_id)
         
     Raises:
         HTTPException: If job cannot be retried
@@ -415,7 +510,8 @@ async def reprocess_user_data(
     Args:
         user_id: User identifier
         anp_seq: Test sequence number
-        force: Whether to force reprocessing even if data exists
+        force: Re-embed and store every document, even those whose content is
+            unchanged (e.g. after an embedding model change)
         handler: Test completion handler instance
         
     Returns:
@@ -428,7 +524,9 @@ async def reprocess_user_data(
             anp_seq=anp_seq,
             test_type="reprocess",
             completed_at=datetime.now(),
-            notification_source="manual_reprocess"
+            notification_source="manual_reprocess",
+            priority=JobPriority.REPROCESS,
+            force=force
         )
         
         # Trigger reprocessing
@@ -464,14 +562,29 @@ async def health_check() -> Dict[str, Any]:
     # Note: Redis health check removed - using database-based job tracking
     
     try:
-        # Check background task manager status
-        # Note: This will be implemented with BackgroundTaskManager in task 12.2
-        health_status["components"]["background_tasks"] = "placeholder"
+        # Check background task manager status (ETL worker pool in this process)
+        workers = BackgroundTaskManager.instance()
+        health_status["components"]["background_tasks"] = (
+            workers.get_stats() if workers.running else "not running in this process"
+        )
             
     except Exception as e:
         health_status["components"]["background_tasks"] = f"unhealthy: {str(e)}"
         health_status["status"] = "degraded"
     
+    listener = JobEventListener.instance()
+    health_status["components"]["progress_stream"] = {
+        "listening": listener.connected,
+        "subscribers": listener.subscriber_count,
+        "events_received": listener.events_received,
+    }
+    health_status["components"]["lanes"] = {
+        resource: FairShareLimiter.instance(resource).get_stats() for resource in ("legacy_db", "embedding")
+    }
+    health_status["components"]["process_pool"] = CPUWorkPool.instance().get_stats()
+    health_status["components"]["embedding_store"] = EmbeddingStore.instance().get_stats()
+    health_status["components"]["embedding_rate_limit"] = AdaptiveRateLimiter.instance("embedding").get_stats()
+    
     # Check database connection (placeholder)
     try:
         # This would check actual database connection
@@ -495,27 +608,28 @@ async def get_etl_stats() -> Dict[str, Any]:
         Service statistics and metrics
     """
     try:
-        # Get background task statistics
-        # Note: This will be implemented with BackgroundTaskManager in task 12.2
-        total_active = 0
-        total_scheduled = 0
-        total_reserved = 0
+        workers = BackgroundTaskManager.instance()
+        try:
+            # Cluster-wide queue depth, per lane
+            queue_stats = await workers.queue.get_stats()
+        except Exception as e:
+            # 큐 조회가 안 돼도 프로세스 내 지표는 보여준다
+            queue_stats = f"unavailable: {str(e)}"
+        try:
+            # Job outcomes of every worker process, from chat_etl_jobs
+            job_outcomes = await workers.queue.get_job_outcomes()
+        except Exception as e:
+            job_outcomes = f"unavailable: {str(e)}"
         
         return {
             "timestamp": datetime.now().isoformat(),
-            "background_tasks": {
-                "active_tasks": total_active,
-                "scheduled_tasks": total_scheduled,
-                "reserved_tasks": total_reserved,
-                "workers": 0  # Will be implemented in task 12.2
-            },
-            "jobs": {
-                # This would include job statistics from our tracking
-                "total_jobs_tracked": "unknown",  # Would query Redis for actual count
-                "jobs_in_progress": "unknown",
-                "jobs_completed_today": "unknown",
-                "jobs_failed_today": "unknown"
-            }
+            # ETL worker pool in this process
+            "background_tasks": workers.get_stats(),
+            "queue": queue_stats,
+            "jobs": job_outcomes,
+            # Jobs, stages, legacy queries and embedding cache of this API process since start;
+            # standalone workers (python -m etl.worker) serve theirs on ETL_WORKER_METRICS_PORT
+            "telemetry": await telemetry.summarize()
         }
         
     except Exception as e:
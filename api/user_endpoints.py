@@ -19,6 +19,7 @@ from sqlalchemy.orm import selectinload
 from database.connection import get_async_session
 from database.models import ChatUser, ChatDocument, ChatConversation, DocumentType
 from etl.test_completion_handler import TestCompletionHandler, TestCompletionRequest
+from etl.job_lanes import JobPriority
 # Note: Background task management will be handled by BackgroundTaskManager in task 12.2
 
 logger = logging.getLogger(__name__)
@@ -449,7 +450,8 @@ async def reprocess_user_data(
             anp_seq=user.anp_seq,
             test_type="reprocess",
             completed_at=datetime.now(),
-            notification_source=f"manual_reprocess_{request.reason}"
+            notification_source=f"manual_reprocess_{request.reason}",
+            priority=JobPriority.REPROCESS
         )
         
         # Trigger ETL processing
@@ -0,0 +1,19 @@
+-- Durable ETL job queue on chat_etl_jobs
+-- Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED; workers refresh
+-- heartbeat_at while processing and stale jobs are reclaimed.
+
+ALTER TABLE chat_etl_jobs
+    ADD COLUMN IF NOT EXISTS available_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS locked_by VARCHAR(100),
+    ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS attempts INTEGER DEFAULT 0;
+
+-- Claim order: oldest available pending job first
+CREATE INDEX IF NOT EXISTS idx_chat_etl_jobs_queue
+    ON chat_etl_jobs (available_at)
+    WHERE status = 'pending';
+
+-- Reclaim scan: jobs held by a worker
+CREATE INDEX IF NOT EXISTS idx_chat_etl_jobs_locked
+    ON chat_etl_jobs (heartbeat_at)
+    WHERE locked_by IS NOT NULL;
@@ -0,0 +1,12 @@
+-- Persisted ETL stage outputs for resume-on-retry
+-- One row per job holding the output of the last finished stage
+-- (zlib-compressed JSON; embeddings packed as float32). Rows are deleted
+-- when the job succeeds and cascade with the job row.
+
+CREATE TABLE IF NOT EXISTS chat_etl_stage_outputs (
+    job_id UUID PRIMARY KEY REFERENCES chat_etl_jobs(job_id) ON DELETE CASCADE,
+    stage VARCHAR(50) NOT NULL,
+    payload BYTEA NOT NULL,
+    raw_bytes INTEGER,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,8 @@
+-- In-flight job lookup per test (anp_seq)
+-- Used to coalesce duplicate test-completion notifications and to keep a
+-- follow-up job from starting while the previous run of the same test holds
+-- its lease.
+
+CREATE INDEX IF NOT EXISTS idx_chat_etl_jobs_inflight
+    ON chat_etl_jobs (anp_seq, started_at)
+    WHERE status NOT IN ('success', 'failure', 'partial');
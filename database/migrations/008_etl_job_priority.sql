@@ -0,0 +1,12 @@
+-- Priority lanes for ETL jobs (etl.job_lanes)
+-- interactive: fresh test completion, reprocess: user-triggered reprocess,
+-- backfill: admin backfill / bulk re-embedding. Workers claim each lane
+-- separately, so the queue index leads with the lane.
+
+ALTER TABLE chat_etl_jobs
+    ADD COLUMN IF NOT EXISTS priority VARCHAR(20) NOT NULL DEFAULT 'interactive';
+
+DROP INDEX IF EXISTS idx_chat_etl_jobs_queue;
+CREATE INDEX IF NOT EXISTS idx_chat_etl_jobs_queue
+    ON chat_etl_jobs (priority, available_at)
+    WHERE status = 'pending';
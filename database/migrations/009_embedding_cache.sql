@@ -0,0 +1,12 @@
+-- Persistent embedding cache (etl.embedding_store)
+-- Shared by ETL workers and API processes and kept across restarts, so
+-- identical summary texts and repeated questions are embedded once per
+-- model. Vectors are stored as little-endian float32 blobs.
+
+CREATE TABLE IF NOT EXISTS chat_embedding_cache (
+    model VARCHAR(100) NOT NULL,
+    text_hash CHAR(64) NOT NULL,  -- sha256 of the preprocessed text
+    embedding BYTEA NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (model, text_hash)
+);
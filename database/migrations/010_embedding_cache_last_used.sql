@@ -0,0 +1,14 @@
+-- Last use of persistent embedding cache rows (etl.embedding_store)
+-- Lookups refresh last_used_at (at most once a day per row), and the
+-- prune-embedding-cache periodic task deletes rows idle for longer than
+-- EMBEDDING_PERSISTENT_CACHE_TTL_DAYS. Rows of retired models are never
+-- read again, so they age out the same way.
+
+ALTER TABLE chat_embedding_cache
+    ADD COLUMN IF NOT EXISTS last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
+UPDATE chat_embedding_cache SET last_used_at = created_at
+WHERE created_at IS NOT NULL AND last_used_at > created_at;
+
+CREATE INDEX IF NOT EXISTS idx_chat_embedding_cache_last_used
+    ON chat_embedding_cache (last_used_at);
@@ -0,0 +1,6 @@
+-- Forced reprocessing (POST /users/{user_id}/reprocess?force=true)
+-- A forced job re-embeds and stores every document even if its content
+-- hash is unchanged (e.g. to move documents to a new embedding model).
+
+ALTER TABLE chat_etl_jobs
+    ADD COLUMN IF NOT EXISTS force_reprocess BOOLEAN NOT NULL DEFAULT FALSE;
@@ -6,7 +6,7 @@ Defines database models for chat_users, chat_documents, chat_jobs, chat_majors,
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from enum import Enum
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, ARRAY
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, ARRAY, Boolean
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.sql import func
@@ -43,6 +43,16 @@ class ChatETLJob(Base):
     query_results_summary: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB, nullable=True)
     documents_created: Mapped[Optional[List[str]]] = mapped_column(ARRAY(String(100)), nullable=True)
 
+    # Durable queue (005_etl_job_queue.sql)
+    available_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=func.current_timestamp())
+    locked_by: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    # Priority lane (008_etl_job_priority.sql): interactive / reprocess / backfill
+    priority: Mapped[str] = mapped_column(String(20), nullable=False, default='interactive')
+    # Re-embed unchanged documents too (011_etl_job_force_reprocess.sql)
+    force_reprocess: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
     # Relationship back to user
     user: Mapped["ChatUser"] = relationship("ChatUser")
 
@@ -293,6 +293,23 @@ class DocumentRepository:
             logger.error(f"Failed to delete document {doc_id}: {e}")
             raise
 
+    async def get_content_hashes(self, user_id: UUID, embedding_model: Optional[str] = None) -> Dict[str, str]:
+        """
+        Return {doc_type: doc_metadata.content_hash} of the user's stored documents (used by incremental ETL).
+        With `embedding_model`, only documents embedded with that model (doc_metadata.embedding_model) are returned.
+        """
+        try:
+            stmt = select(
+                ChatDocument.doc_type, ChatDocument.doc_metadata["content_hash"].astext
+            ).where(ChatDocument.user_id == user_id)
+            if embedding_model is not None:
+                stmt = stmt.where(ChatDocument.doc_metadata["embedding_model"].astext == embedding_model)
+            result = await self.session.execute(stmt)
+            return {doc_type: content_hash for doc_type, content_hash in result.all() if content_hash}
+        except SQLAlchemyError as e:
+            logger.error(f"Error loading content hashes for user {user_id}: {e}")
+            raise DocumentRepositoryError(f"Error loading content hashes: {str(e)}")
+
     async def get_by_user_id(self, user_id: UUID) -> List[ChatDocument]:
         """Alias to get documents by user (used in tasks)."""
         return await self.get_documents_by_user(user_id)
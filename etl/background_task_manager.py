@@ -0,0 +1,299 @@
+"""
+Background Task Manager
+Bounded ETL worker pool fed by the durable chat_etl_jobs queue
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Set
+
+from etl.config import BACKGROUND_PROCESSING_CONFIG, QUERY_CONFIG
+from etl.job_queue import ETLJobQueue, ClaimedJob
+from etl.job_lanes import LANES, current_lane
+
+logger = logging.getLogger(__name__)
+
+class BackgroundTaskManager:
+    """
+    Runs queued ETL jobs with at most `concurrency` jobs in flight per process.
+
+    - claims jobs from ETLJobQueue when a slot is free (polling every
+      `poll_interval` seconds, or immediately after notify()); the slots are
+      shared between the priority lanes (etl.job_lanes) and each job runs
+      with its lane in `current_lane`
+    - refreshes the lease of running jobs every `heartbeat_interval` seconds
+      and stops a job whose lease was reclaimed by another worker
+    - reclaims jobs of dead workers every `reclaim_interval` seconds
+    - a job that raises, exceeds `job_timeout` or returns a failure marked
+      `retryable` is retried after `retry_delay` seconds until the queue's
+      max_attempts is reached
+    - when one claim returns several jobs of a `prefetch_lanes` lane
+      (reprocess / backfill by default), their legacy queries are extracted
+      in one multi-user bulk pass before those jobs start
+    """
+
+    _singleton_instance = None
+
+    def __init__(
+        self,
+        queue: Optional[ETLJobQueue] = None,
+        concurrency: int = BACKGROUND_PROCESSING_CONFIG['worker_pool_size'],
+        poll_interval: float = BACKGROUND_PROCESSING_CONFIG['job_poll_interval_seconds'],
+        heartbeat_interval: float = BACKGROUND_PROCESSING_CONFIG['job_heartbeat_interval_seconds'],
+        reclaim_interval: Optional[float] = None,
+        job_timeout: float = BACKGROUND_PROCESSING_CONFIG['job_timeout_minutes'] * 60,
+        retry_delay: float = BACKGROUND_PROCESSING_CONFIG['retry_delay_seconds'],
+        process_job: Optional[Callable[..., Awaitable[Dict[str, Any]]]] = None,
+        prefetch_lanes: Optional[Set[str]] = None,
+        prefetch_job_data: Optional[Callable[[List[int]], Awaitable[Any]]] = None,
+    ):
+        self.queue = queue or ETLJobQueue()
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.reclaim_interval = reclaim_interval if reclaim_interval is not None else heartbeat_interval
+        self.job_timeout = job_timeout
+        self.retry_delay = retry_delay
+        self._process_job = process_job
+        self.prefetch_lanes = prefetch_lanes if prefetch_lanes is not None else {
+            lane.strip() for lane in QUERY_CONFIG['bulk_prefetch_lanes'].split(',') if lane.strip()
+        }
+        self._prefetch_job_data = prefetch_job_data
+        self._prefetches: Set[asyncio.Task] = set()
+
+        self._active: Dict[str, asyncio.Task] = {}
+        self._active_lanes: Dict[str, str] = {}
+        self._lost_leases: Set[str] = set()
+        self._wakeup = asyncio.Event()
+        self._loops = []
+        self._stopping = False
+
+        self.jobs_claimed = 0
+        self.jobs_succeeded = 0
+        self.jobs_failed = 0
+        self.jobs_retried = 0
+        self.jobs_reclaimed = 0
+        self.bulk_prefetches = 0
+
+    @classmethod
+    def instance(cls) -> "BackgroundTaskManager":
+        """Return the process-wide worker pool."""
+        if cls._singleton_instance is None:
+            cls._singleton_instance = cls()
+        return cls._singleton_instance
+
+    @classmethod
+    def notify_local(cls) -> None:
+        """Wake this process's worker pool, if one is running"""
+        if cls._singleton_instance is not None and cls._singleton_instance.running:
+            cls._singleton_instance.notify()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._loops) and not self._stopping
+
+    @property
+    def active_jobs(self) -> int:
+        return len(self._active)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        self._loops = [
+            asyncio.create_task(self._claim_loop()),
+            asyncio.create_task(self._heartbeat_loop()),
+        ]
+        logger.info(f"ETL worker pool {self.queue.worker_id} started (concurrency={self.concurrency})")
+
+    def notify(self) -> None:
+        """Wake the claim loop, e.g. right after a job was enqueued in this process"""
+        self._wakeup.set()
+
+    async def stop(self, drain_timeout: float = 30.0) -> None:
+        """Stop claiming, give running jobs `drain_timeout` seconds, then hand the rest back"""
+        if not self._loops:
+            return
+        self._stopping = True
+        self._wakeup.set()
+
+        if self._active:
+            _done, pending = await asyncio.wait(list(self._active.values()), timeout=drain_timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        for prefetch in list(self._prefetches):
+            prefetch.cancel()
+        for loop_task in self._loops:
+            loop_task.cancel()
+        await asyncio.gather(*self._loops, return_exceptions=True)
+        self._loops = []
+        logger.info(f"ETL worker pool {self.queue.worker_id} stopped")
+
+    async def _claim_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        last_reclaim = float("-inf")
+
+        while not self._stopping:
+            # 알림이 claim 도중에 와도 놓치지 않도록 먼저 지운다
+            self._wakeup.clear()
+            claimed = []
+            try:
+                if loop.time() - last_reclaim >= self.reclaim_interval:
+                    last_reclaim = loop.time()
+                    self.jobs_reclaimed += await self.queue.reclaim_expired()
+
+                free_slots = self.concurrency - len(self._active)
+                if free_slots > 0:
+                    claimed = await self.queue.claim(
+                        free_slots, running=self._running_by_lane(), capacity=self.concurrency
+                    )
+                prefetches = self._start_prefetches(claimed)
+                for job in claimed:
+                    self.jobs_claimed += 1
+                    self._active_lanes[job.job_id] = job.priority
+                    self._active[job.job_id] = asyncio.create_task(
+                        self._run_job(job, prefetches.get(job.job_id))
+                    )
+            except Exception as e:
+                logger.error(f"ETL job claim failed: {e}")
+
+            if claimed and len(self._active) < self.concurrency:
+                continue  # 큐에 더 남아 있을 수 있다
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _heartbeat_loop(self) -> None:
+        while not self._stopping:
+            await asyncio.sleep(self.heartbeat_interval)
+            job_ids = list(self._active)
+            if not job_ids:
+                continue
+            try:
+                held = await self.queue.heartbeat(job_ids)
+            except Exception as e:
+                logger.error(f"ETL job heartbeat failed: {e}")
+                continue
+            for job_id in set(job_ids) - held:
+                task = self._active.get(job_id)
+                if task is not None:
+                    # 다른 워커가 이미 가져간 작업은 여기서 중단한다
+                    logger.warning(f"Lost lease on ETL job {job_id}; stopping local processing")
+                    self._lost_leases.add(job_id)
+                    task.cancel()
+
+    def _running_by_lane(self) -> Dict[str, int]:
+        running = {lane: 0 for lane in LANES}
+        for lane in self._active_lanes.values():
+            running[lane] = running.get(lane, 0) + 1
+        return running
+
+    def _start_prefetches(self, jobs: List[ClaimedJob]) -> Dict[str, asyncio.Task]:
+        """Start one bulk extraction per prefetch lane that got several jobs; job_id -> its prefetch"""
+        by_lane: Dict[str, List[ClaimedJob]] = {}
+        for job in jobs:
+            if job.priority in self.prefetch_lanes:
+                by_lane.setdefault(job.priority, []).append(job)
+
+        prefetches: Dict[str, asyncio.Task] = {}
+        for lane, lane_jobs in by_lane.items():
+            if len(lane_jobs) < 2:
+                continue
+            prefetch = asyncio.create_task(self._prefetch(lane, [job.anp_seq for job in lane_jobs]))
+            self._prefetches.add(prefetch)
+            prefetch.add_done_callback(self._prefetches.discard)
+            for job in lane_jobs:
+                prefetches[job.job_id] = prefetch
+        return prefetches
+
+    async def _prefetch(self, lane: str, anp_seqs: List[int]) -> None:
+        # 다중 사용자 추출도 작업들의 레인으로 레거시 DB 공정 분배를 받는다
+        current_lane.set(lane)
+        try:
+            if self._prefetch_job_data is None:
+                from etl.tasks import prefetch_legacy_query_results
+                self._prefetch_job_data = prefetch_legacy_query_results
+            await self._prefetch_job_data(anp_seqs)
+            self.bulk_prefetches += 1
+        except Exception as e:
+            # 미리 추출하지 못한 작업은 평소대로 자기 쿼리를 실행한다
+            logger.warning(f"Bulk prefetch of {len(anp_seqs)} {lane} job(s) failed: {e}")
+
+    async def _run_claimed(self, job: ClaimedJob, prefetch: Optional[asyncio.Task]) -> Dict[str, Any]:
+        if prefetch is not None:
+            # 같은 추출을 기다리는 다른 작업이 있으므로 이 작업이 취소되어도 추출은 계속한다
+            await asyncio.shield(prefetch)
+        return await self._run_pipeline(job.user_id, job.anp_seq, job.job_id, force=job.force)
+
+    async def _run_job(self, job: ClaimedJob, prefetch: Optional[asyncio.Task] = None) -> None:
+        # 작업 태스크의 컨텍스트에만 설정되어 하위 태스크로 전달된다
+        current_lane.set(job.priority)
+        try:
+            result = await asyncio.wait_for(self._run_claimed(job, prefetch), timeout=self.job_timeout)
+            failed = isinstance(result, dict) and result.get("status") == "failure"
+            if failed and result.get("retryable"):
+                # 일시적 오류(레거시 DB, 임베딩 API 등)는 예외와 같은 재시도 정책을 따른다
+                error = result.get("error_message") or "ETL pipeline failed"
+                logger.error(f"ETL job {job.job_id} (attempt {job.attempts}) failed: {error}")
+                await self._retry_or_fail(job, error)
+            else:
+                if failed:
+                    self.jobs_failed += 1
+                else:
+                    self.jobs_succeeded += 1
+                await self.queue.release(job.job_id)
+        except asyncio.CancelledError:
+            if job.job_id not in self._lost_leases:
+                # 종료 중: 다른 워커가 바로 이어받도록 되돌린다
+                await asyncio.shield(self._requeue_quietly(job.job_id))
+            raise
+        except Exception as e:
+            error = f"timeout after {self.job_timeout:.0f}s" if isinstance(e, asyncio.TimeoutError) else str(e)
+            logger.error(f"ETL job {job.job_id} (attempt {job.attempts}) failed: {error}")
+            await self._retry_or_fail(job, error)
+        finally:
+            self._active.pop(job.job_id, None)
+            self._active_lanes.pop(job.job_id, None)
+            self._lost_leases.discard(job.job_id)
+            self._wakeup.set()
+
+    async def _retry_or_fail(self, job: ClaimedJob, error: str) -> None:
+        try:
+            status = await self.queue.retry_or_fail(job.job_id, error, self.retry_delay)
+            if status == "failure":
+                self.jobs_failed += 1
+            else:
+                self.jobs_retried += 1
+        except Exception as queue_err:
+            # 하트비트가 멈추면 reclaim 이 처리한다
+            logger.error(f"Could not reschedule ETL job {job.job_id}: {queue_err}")
+
+    async def _requeue_quietly(self, job_id: str) -> None:
+        try:
+            await self.queue.requeue(job_id)
+        except Exception as e:
+            logger.error(f"Could not requeue ETL job {job_id}: {e}")
+
+    async def _run_pipeline(self, user_id: str, anp_seq: int, job_id: str, force: bool = False) -> Dict[str, Any]:
+        if self._process_job is None:
+            from etl.tasks import process_test_completion
+            self._process_job = process_test_completion
+        return await self._process_job(user_id=user_id, anp_seq=anp_seq, job_id=job_id, force=force)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.queue.worker_id,
+            "running": self.running,
+            "concurrency": self.concurrency,
+            "active_jobs": len(self._active),
+            "active_by_lane": self._running_by_lane(),
+            "jobs_claimed": self.jobs_claimed,
+            "jobs_succeeded": self.jobs_succeeded,
+            "jobs_failed": self.jobs_failed,
+            "jobs_retried": self.jobs_retried,
+            "jobs_reclaimed": self.jobs_reclaimed,
+            "bulk_prefetches": self.bulk_prefetches,
+        }
@@ -23,8 +23,30 @@ BACKGROUND_PROCESSING_CONFIG = {
     'notification_channels': os.getenv('ETL_NOTIFICATION_CHANNELS', 'log,email').split(','),
     'worker_pool_size': int(os.getenv('ETL_WORKER_POOL_SIZE', '4')),
     'job_cleanup_interval_hours': int(os.getenv('ETL_JOB_CLEANUP_INTERVAL_HOURS', '24')),
+    # cleanup_failed_jobs only reports old failed jobs unless this is on. When on it DELETEs
+    # them, i.e. their job history and (ON DELETE CASCADE) their saved chat_etl_stage_outputs
+    'purge_failed_jobs': os.getenv('ETL_PURGE_FAILED_JOBS', 'false').lower() == 'true',
     'health_check_interval_minutes': int(os.getenv('ETL_HEALTH_CHECK_INTERVAL_MINUTES', '5')),
     'enable_partial_completion': os.getenv('ETL_ENABLE_PARTIAL_COMPLETION', 'true').lower() == 'true',
+    # Durable job queue (chat_etl_jobs)
+    'job_poll_interval_seconds': float(os.getenv('ETL_JOB_POLL_INTERVAL_SECONDS', '2.0')),
+    'job_heartbeat_interval_seconds': float(os.getenv('ETL_JOB_HEARTBEAT_INTERVAL_SECONDS', '30')),
+    'job_visibility_timeout_seconds': float(os.getenv('ETL_JOB_VISIBILITY_TIMEOUT_SECONDS', '300')),
+    # false: the API only enqueues, `python -m etl.worker` processes the queue
+    'run_workers_in_api': os.getenv('ETL_RUN_WORKERS_IN_API', 'false').lower() == 'true',
+    # Progress updates are coalesced per job and flushed together (0 = write through)
+    'progress_flush_interval_ms': int(os.getenv('ETL_PROGRESS_FLUSH_INTERVAL_MS', '500')),
+    # Progress push (LISTEN/NOTIFY) for the SSE progress stream
+    'progress_notify_channel': os.getenv('ETL_PROGRESS_CHANNEL', 'etl_job_progress'),
+    'progress_stream_resync_seconds': float(os.getenv('ETL_PROGRESS_STREAM_RESYNC_SECONDS', '30')),
+    # POST /api/etl/test-completion/bulk
+    'bulk_ingest_max_notifications': int(os.getenv('ETL_BULK_INGEST_MAX_NOTIFICATIONS', '5000')),
+    # Priority lanes (etl.job_lanes): interactive / reprocess / backfill
+    'lane_weights': os.getenv('ETL_LANE_WEIGHTS', 'interactive:6,reprocess:3,backfill:1'),
+    'interactive_reserved_slots': int(os.getenv('ETL_INTERACTIVE_RESERVED_SLOTS', '1')),  # worker slots backfill cannot use
+    'legacy_db_lane_slots': int(os.getenv('ETL_LEGACY_DB_LANE_SLOTS', '16')),  # concurrent legacy statements per process (0 = unlimited)
+    # `python -m etl.worker` serves its own /metrics and /stats on this port (0 = off)
+    'worker_metrics_port': int(os.getenv('ETL_WORKER_METRICS_PORT', '0')),
 }
 
 # ETL processing configuration
@@ -38,16 +60,29 @@ ETL_CONFIG = {
     'enable_admin_notifications': os.getenv('ETL_ENABLE_ADMIN_NOTIFICATIONS', 'true').lower() == 'true',
     'notification_channels': os.getenv('ETL_NOTIFICATION_CHANNELS', 'log,email').split(','),
     'enable_partial_completion': os.getenv('ETL_ENABLE_PARTIAL_COMPLETION', 'true').lower() == 'true',
+    'dataflow_mode': os.getenv('ETL_DATAFLOW_MODE', 'false').lower() == 'true',  # per-document streaming pipeline
+    'skip_unchanged_documents': os.getenv('ETL_SKIP_UNCHANGED_DOCUMENTS', 'true').lower() == 'true',  # content-hash incremental ETL
+    'persist_stage_outputs': os.getenv('ETL_PERSIST_STAGE_OUTPUTS', 'true').lower() == 'true',  # resume retries after the last finished stage
+    'stage_output_compression_level': int(os.getenv('ETL_STAGE_OUTPUT_COMPRESSION_LEVEL', '6')),
+    'process_pool_lanes': os.getenv('ETL_PROCESS_POOL_LANES', 'backfill'),  # lanes whose transform/validation run in etl.cpu_pool ('' = none)
+    'process_pool_workers': int(os.getenv('ETL_PROCESS_POOL_WORKERS', '0')),  # 0 = one per CPU
 }
 
 # Vector embedding configuration
 EMBEDDING_CONFIG = {
+    'model': os.getenv('EMBEDDING_MODEL', 'models/embedding-001'),  # stored with each document; a change re-embeds them on reprocess
     'batch_size': int(os.getenv('EMBEDDING_BATCH_SIZE', '5')),
     'max_retries': int(os.getenv('EMBEDDING_MAX_RETRIES', '3')),
     'retry_delay': float(os.getenv('EMBEDDING_RETRY_DELAY', '1.0')),
-    'rate_limit_per_minute': int(os.getenv('EMBEDDING_RATE_LIMIT_PER_MINUTE', '60')),
+    'rate_limit_per_minute': int(os.getenv('EMBEDDING_RATE_LIMIT_PER_MINUTE', '60')),  # quota of the API key, shared by all embedders
+    'rate_limit_min_per_minute': float(os.getenv('EMBEDDING_RATE_LIMIT_MIN_PER_MINUTE', '6')),  # floor after repeated 429s
+    'rate_limit_burst': float(os.getenv('EMBEDDING_RATE_LIMIT_BURST', '5')),
+    'rate_limit_state_file': os.getenv('EMBEDDING_RATE_LIMIT_STATE_FILE', ''),  # share the limit across processes on a host ('' = per process)
     'enable_cache': os.getenv('EMBEDDING_ENABLE_CACHE', 'true').lower() == 'true',
     'cache_ttl_hours': int(os.getenv('EMBEDDING_CACHE_TTL_HOURS', '24')),
+    'memory_cache_size': int(os.getenv('EMBEDDING_MEMORY_CACHE_SIZE', '2000')),  # in-process cache shared by the embedders of a process
+    'persistent_cache': os.getenv('EMBEDDING_PERSISTENT_CACHE', 'true').lower() == 'true',  # chat_embedding_cache (etl.embedding_store)
+    'persistent_cache_ttl_days': int(os.getenv('EMBEDDING_PERSISTENT_CACHE_TTL_DAYS', '30')),  # rows not read for this long are pruned
 }
 
 # Query execution configuration
@@ -56,6 +91,9 @@ QUERY_CONFIG = {
     'retry_delay': float(os.getenv('QUERY_RETRY_DELAY', '1.0')),
     'max_workers': int(os.getenv('QUERY_MAX_WORKERS', '4')),
     'timeout_seconds': int(os.getenv('QUERY_TIMEOUT_SECONDS', '300')),
+    'backend': os.getenv('LEGACY_QUERY_BACKEND', 'thread'),  # 'thread' or 'async'
+    'bulk_chunk_size': int(os.getenv('LEGACY_QUERY_BULK_CHUNK_SIZE', '500')),  # anp_seqs per bulk statement
+    'bulk_prefetch_lanes': os.getenv('LEGACY_QUERY_BULK_PREFETCH_LANES', 'reprocess,backfill'),  # lanes whose jobs claimed together are extracted in one bulk pass ('' = none)
 }
 
 # Document transformation configuration
@@ -0,0 +1,103 @@
+"""
+CPU Work Pool
+Optional process pool for the CPU-bound ETL steps (document transformation
+and validation), so backfill jobs use all cores without stalling the event
+loop. Tasks must be module-level functions taking and returning plain
+dicts / lists, which keeps pickling cheap.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Callable, Optional, Set
+
+from etl.config import ETL_CONFIG
+from etl.job_lanes import current_lane
+
+logger = logging.getLogger(__name__)
+
+def _parse_lanes(spec: str) -> Set[str]:
+    return {lane.strip() for lane in spec.split(',') if lane.strip()}
+
+class CPUWorkPool:
+    """
+    Runs CPU-bound ETL tasks in worker processes. Callers offload only for
+    the jobs of `lanes` (applies(); by default only backfill) and keep
+    running them inline for the other jobs.
+
+    The processes are started lazily with the 'spawn' method (forking a
+    process with a running event loop and DB connections is unsafe). If the
+    pool breaks, the task runs inline and the pool is recreated on next use.
+    """
+
+    _singleton_instance = None
+
+    def __init__(
+        self,
+        max_workers: int = ETL_CONFIG['process_pool_workers'],
+        lanes: Optional[Set[str]] = None,
+    ):
+        self.max_workers = max_workers if max_workers > 0 else (os.cpu_count() or 1)
+        self.lanes = lanes if lanes is not None else _parse_lanes(ETL_CONFIG['process_pool_lanes'])
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        self.tasks_offloaded = 0
+        self.tasks_inline = 0
+        self.pool_failures = 0
+
+    @classmethod
+    def instance(cls) -> "CPUWorkPool":
+        """Return the process-wide pool, so all jobs share the worker processes."""
+        if cls._singleton_instance is None:
+            cls._singleton_instance = cls()
+        return cls._singleton_instance
+
+    def applies(self, lane: Optional[str] = None) -> bool:
+        """True if tasks of the current job (or of `lane`) go to the process pool"""
+        return (lane or current_lane.get()) in self.lanes
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Started ETL process pool with {self.max_workers} workers for lanes {sorted(self.lanes)}")
+        return self._executor
+
+    async def run(self, task: Callable[..., Any], *args: Any) -> Any:
+        """Run `task(*args)` in a worker process"""
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._get_executor(), task, *args)
+        except BrokenProcessPool as e:
+            # 워커 프로세스가 죽었으면 이번 작업은 직접 처리하고 다음에 풀을 새로 만든다
+            self.pool_failures += 1
+            logger.error(f"ETL process pool broke, running {task.__name__} inline: {e}")
+            self._shutdown_executor(wait=False)
+            self.tasks_inline += 1
+            return task(*args)
+        self.tasks_offloaded += 1
+        return result
+
+    def _shutdown_executor(self, wait: bool) -> None:
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    async def close(self) -> None:
+        """Stop the worker processes (worker shutdown)"""
+        if self._executor is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._shutdown_executor, True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "lanes": sorted(self.lanes),
+            "max_workers": self.max_workers,
+            "started": self._executor is not None,
+            "tasks_offloaded": self.tasks_offloaded,
+            "tasks_inline": self.tasks_inline,
+            "pool_failures": self.pool_failures,
+        }
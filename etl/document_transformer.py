@@ -4,9 +4,10 @@ Converts query results into thematic documents for RAG system
 """
 
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 from datetime import datetime
+import hashlib
 import json
 from collections import defaultdict
 
@@ -21,6 +22,18 @@ class DocumentTransformationError(Exception):
         self.error_message = error_message
         super().__init__(f"Document transformation failed for {doc_type}: {error_message}")
 
+# 변환 결과(content/summary_text)의 형식이 바뀌면 올린다. 저장된 content_hash 가 모두
+# 달라지므로 다음 처리에서 모든 문서가 다시 임베딩된다
+TRANSFORM_VERSION = 1
+
+def compute_content_hash(content: Dict[str, Any], summary_text: str) -> str:
+    """Stable SHA-256 of a document's content, summary_text and TRANSFORM_VERSION (independent of key order)"""
+    payload = json.dumps(
+        {"content": content, "summary_text": summary_text, "transform_version": TRANSFORM_VERSION},
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
 @dataclass
 class TransformedDocument:
     """Container for transformed document data"""
@@ -29,10 +42,34 @@ class TransformedDocument:
     summary_text: str
     metadata: Dict[str, Any]
 
+    def __post_init__(self):
+        # 재처리 시 변경되지 않은 문서를 건너뛰기 위해 doc_metadata 에 함께 저장된다
+        self.metadata["content_hash"] = compute_content_hash(self.content, self.summary_text)
+
+    @property
+    def content_hash(self) -> str:
+        return self.metadata["content_hash"]
+
 class DocumentTransformer:
     """
     Transforms raw query results into semantic documents optimized for RAG
     """
+
+    # 문서 유형별로 변환에 필요한 레거시 쿼리 (각 문서 metadata 의 data_sources 와 동일)
+    DOCUMENT_DEPENDENCIES: Dict[str, List[str]] = {
+        DocumentType.USER_PROFILE: ["personalInfoQuery"],
+        DocumentType.PERSONALITY_PROFILE: [
+            "tendencyQuery", "topTendencyQuery", "bottomTendencyQuery",
+            "tendencyStatsQuery", "personalityDetailQuery", "strengthsWeaknessesQuery",
+        ],
+        DocumentType.THINKING_SKILLS: ["thinkingSkillComparisonQuery", "thinkingSkillsQuery"],
+        DocumentType.CAREER_RECOMMENDATIONS: [
+            "careerRecommendationQuery", "competencyJobsQuery", "preferenceJobsQuery", "dutiesQuery",
+        ],
+        DocumentType.LEARNING_STYLE: ["learningStyleQuery", "learningStyleChartQuery", "subjectRanksQuery"],
+        DocumentType.COMPETENCY_ANALYSIS: ["competencyAnalysisQuery", "competencySubjectsQuery"],
+        DocumentType.PREFERENCE_ANALYSIS: ["imagePreferenceStatsQuery", "preferenceDataQuery"],
+    }
     
     def __init__(self):
         self.transformation_methods = {
@@ -390,28 +427,41 @@ class DocumentTransformer:
             logger.error(f"Error creating preference analysis document: {e}", exc_info=True)
             raise DocumentTransformationError(DocumentType.PREFERENCE_ANALYSIS, str(e))
     
+    def transform_document(
+        self,
+        doc_type: str,
+        query_results: Dict[str, List[Dict[str, Any]]]
+    ) -> Optional[TransformedDocument]:
+        """Transform a single document type; returns None when it cannot be built"""
+        doc_type_name = doc_type.name if hasattr(doc_type, 'name') else str(doc_type)
+        try:
+            logger.info(f"Attempting to transform document type: {doc_type_name}")
+            document = self.transformation_methods[doc_type](query_results)
+            logger.info(f"Successfully transformed {doc_type_name} document")
+            return document
+        except DocumentTransformationError as e:
+            logger.warning(f"Could not transform {doc_type_name}: {e.error_message}")
+        except Exception as e:
+            logger.error(f"Unexpected error while transforming {doc_type_name}: {e}", exc_info=True)
+        return None
+
     async def transform_all_documents(
         self, 
         query_results: Dict[str, List[Dict[str, Any]]]
     ) -> List[TransformedDocument]:
+        return self.transform_documents(query_results)
+
+    def transform_documents(
+        self,
+        query_results: Dict[str, List[Dict[str, Any]]]
+    ) -> List[TransformedDocument]:
+        """Synchronous transform_all_documents (for etl.cpu_pool worker processes)"""
         documents = []
         
-        for doc_type, transform_method in self.transformation_methods.items():
-            try:
-                # Use doc_type.name to get the string representation for logging
-                doc_type_name = doc_type.name if hasattr(doc_type, 'name') else str(doc_type)
-                logger.info(f"Attempting to transform document type: {doc_type_name}")
-                document = transform_method(query_results)
+        for doc_type in self.transformation_methods:
+            document = self.transform_document(doc_type, query_results)
+            if document is not None:
                 documents.append(document)
-                logger.info(f"Successfully transformed {doc_type_name} document")
-            except DocumentTransformationError as e:
-                doc_type_name = e.doc_type.name if hasattr(e.doc_type, 'name') else str(e.doc_type)
-                logger.warning(f"Could not transform {doc_type_name}: {e.error_message}")
-                continue
-            except Exception as e:
-                doc_type_name = doc_type.name if hasattr(doc_type, 'name') else str(doc_type)
-                logger.error(f"Unexpected error while transforming {doc_type_name}: {e}", exc_info=True)
-                continue
         
         logger.info(f"Document transformation completed. Created {len(documents)} documents.")
-        return documents
\ No newline at end of file
+        return documents
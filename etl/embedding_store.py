@@ -0,0 +1,136 @@
+"""
+Persistent Embedding Store
+Embeddings keyed by (model, sha256(text)) in chat_embedding_cache, shared by
+all ETL workers and API processes and kept across restarts. VectorEmbedder
+consults it after its in-process cache and before calling the API. Rows not
+read for a while are removed by prune() (the prune-embedding-cache task).
+"""
+
+import hashlib
+import logging
+import sys
+from array import array
+from typing import Dict, Any, List, Sequence
+
+from sqlalchemy import text
+
+from database.connection import db_manager
+
+logger = logging.getLogger(__name__)
+
+# 조회된 행의 last_used_at 을 갱신한다 (행마다 하루에 한 번까지만 쓴다)
+LOAD_SQL = """
+WITH found AS (
+    SELECT text_hash, embedding, last_used_at FROM chat_embedding_cache
+    WHERE model = :model AND text_hash = ANY(CAST(:hashes AS CHAR(64)[]))
+), touched AS (
+    UPDATE chat_embedding_cache c SET last_used_at = CURRENT_TIMESTAMP
+    FROM found
+    WHERE c.model = :model AND c.text_hash = found.text_hash
+      AND (found.last_used_at IS NULL OR found.last_used_at < CURRENT_TIMESTAMP - INTERVAL '1 day')
+)
+SELECT text_hash, embedding FROM found
+"""
+
+SAVE_SQL = """
+INSERT INTO chat_embedding_cache (model, text_hash, embedding)
+SELECT :model, v.text_hash, v.embedding
+FROM unnest(CAST(:hashes AS CHAR(64)[]), CAST(:embeddings AS BYTEA[])) AS v(text_hash, embedding)
+ON CONFLICT (model, text_hash) DO NOTHING
+"""
+
+PRUNE_SQL = """
+DELETE FROM chat_embedding_cache
+WHERE COALESCE(last_used_at, created_at) < CURRENT_TIMESTAMP - make_interval(days => :max_idle_days)
+"""
+
+def text_hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+def encode_vector(vector: Sequence[float]) -> bytes:
+    """float32, little-endian (the precision pgvector stores anyway)"""
+    values = array("f", vector)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+def decode_vector(blob: bytes) -> List[float]:
+    values = array("f")
+    values.frombytes(blob)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tolist()
+
+class EmbeddingStore:
+    """
+    chat_embedding_cache access. The store is a cache: a failed lookup or
+    write is logged and treated as a miss, never as an embedding failure.
+    """
+
+    _singleton_instance = None
+
+    def __init__(self, session_factory=None):
+        self._session_factory = session_factory or db_manager.get_async_session
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+    @classmethod
+    def instance(cls) -> "EmbeddingStore":
+        """Return the process-wide store."""
+        if cls._singleton_instance is None:
+            cls._singleton_instance = cls()
+        return cls._singleton_instance
+
+    async def get_many(self, model: str, texts: List[str]) -> Dict[str, List[float]]:
+        """Stored embeddings of `texts` (preprocessed), by text"""
+        if not texts:
+            return {}
+        by_hash = {text_hash(t): t for t in texts}
+        try:
+            async with self._session_factory() as session:
+                rows = (await session.execute(
+                    text(LOAD_SQL), {"model": model, "hashes": list(by_hash)}
+                )).mappings().all()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Embedding store lookup failed, treating {len(texts)} texts as misses: {e}")
+            return {}
+        found = {by_hash[row["text_hash"]]: decode_vector(bytes(row["embedding"])) for row in rows}
+        self.hits += len(found)
+        self.misses += len(by_hash) - len(found)
+        return found
+
+    async def put_many(self, model: str, embeddings: Dict[str, List[float]]) -> None:
+        """Store embeddings by (preprocessed) text; existing rows are kept"""
+        if not embeddings:
+            return
+        try:
+            async with self._session_factory() as session:
+                await session.execute(text(SAVE_SQL), {
+                    "model": model,
+                    "hashes": [text_hash(t) for t in embeddings],
+                    "embeddings": [encode_vector(v) for v in embeddings.values()],
+                })
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Could not store {len(embeddings)} embeddings: {e}")
+            return
+        self.writes += len(embeddings)
+
+    async def prune(self, max_idle_days: int) -> int:
+        """Delete rows not read for `max_idle_days` days; returns the number deleted"""
+        async with self._session_factory() as session:
+            result = await session.execute(text(PRUNE_SQL), {"max_idle_days": max_idle_days})
+        return result.rowcount or 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "errors": self.errors,
+        }
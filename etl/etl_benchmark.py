@@ -0,0 +1,279 @@
+"""
+ETL Throughput Benchmark
+Pushes jobs for synthetic testers (etl.synthetic_legacy_db) through
+ETLOrchestrator with a stubbed embedder and reports jobs/sec, per-stage
+latency percentiles, peak RSS and DB statement counts, for sizing ETL
+workers before a release season.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: 최대 RSS 를 보고하지 않는다 (peak_rss_mb 가 None)
+    resource = None
+
+from sqlalchemy import event
+
+from database.connection import db_manager
+from etl.config import ETL_CONFIG
+from etl.etl_orchestrator import ETLOrchestrator, ValidationLevel
+from etl.job_lanes import JobPriority, current_lane
+from etl.progress_tracker import CoalescingJobTracker
+from etl.query_latency import percentile
+from etl.test_completion_handler import JobTracker, TestCompletionRequest
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMENSIONS = 768
+
+class StubEmbedder:
+    """
+    Stand-in for VectorEmbedder: deterministic unit vectors derived from the
+    summary text, returned after `latency` seconds per call to emulate the
+    embedding API round trip.
+    """
+
+    model = "benchmark-stub"
+
+    def __init__(self, latency: float = 0.0, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.latency = latency
+        self.dimensions = dimensions
+        self.calls = 0
+        self.texts = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def embed(self, text: str) -> List[float]:
+        rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+        vector = [rng.gauss(0.0, 1.0) for _ in range(self.dimensions)]
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    async def generate_document_embeddings(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        self.calls += 1
+        self.texts += len(documents)
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        return [
+            {
+                **doc,
+                'embedding_vector': self.embed(doc.get('summary_text') or str(doc.get('content', ''))[:500]),
+                'embedding_metadata': {
+                    'model': self.model,
+                    'dimensions': self.dimensions,
+                    'processing_time': self.latency,
+                    'cached': False,
+                    'generated_at': datetime.now().isoformat()
+                }
+            }
+            for doc in documents
+        ]
+
+def classify_statement(sql: str) -> str:
+    """'legacy' for mwd_* reads, otherwise app_<verb> (app_select, app_insert, ...)"""
+    if "mwd_" in sql:
+        return "legacy"
+    words = sql.lstrip().split(None, 1)
+    verb = words[0].lower() if words else "other"
+    if verb == "with":
+        # CTE 로 감싼 UPDATE (etl.job_events.publishing) 등
+        verb = next((v for v in ("update", "insert", "delete") if v in sql.lower()), "select")
+    return f"app_{verb}" if verb in ("select", "insert", "update", "delete") else "app_other"
+
+class StatementCounter:
+    """Counts the statements sent through SQLAlchemy engines, by classify_statement()"""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self._engines = []
+
+    def attach(self, engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        self._engines.append(engine)
+
+    def detach(self) -> None:
+        for engine in self._engines:
+            event.remove(engine, "before_cursor_execute", self._on_execute)
+        self._engines = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.counts[classify_statement(statement)] += 1
+
+def _peak_rss_mb(children: bool = False) -> Optional[float]:
+    """Peak RSS of this process (or of its finished child processes); None where `resource` is unavailable"""
+    if resource is None:
+        return None
+    # ru_maxrss 는 Linux 에서 KB, macOS 에서 바이트 단위
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+def latency_summary(values: List[float]) -> Dict[str, Any]:
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4),
+        "max": round(max(values), 4) if values else 0.0,
+        "total": round(sum(values), 4),
+    }
+
+@dataclass
+class BenchmarkSettings:
+    """Benchmark run parameters"""
+    jobs: int = 100
+    concurrency: int = 4
+    first_anp_seq: int = 1
+    embed_latency_ms: float = 0.0
+    lane: str = JobPriority.INTERACTIVE.value
+    dataflow_mode: bool = ETL_CONFIG['dataflow_mode']
+    validation_level: str = ValidationLevel.STANDARD.value
+
+class _TimedOrchestrator(ETLOrchestrator):
+    """ETLOrchestrator that records the wall time of every stage it runs"""
+
+    def __init__(self, stage_times: Dict[str, List[float]], **kwargs):
+        super().__init__(**kwargs)
+        self.stage_times = stage_times
+
+    async def _execute_stage(self, context, stage, stage_func, progress_message):
+        started = time.perf_counter()
+        try:
+            return await super()._execute_stage(context, stage, stage_func, progress_message)
+        finally:
+            self.stage_times.setdefault(stage.value, []).append(time.perf_counter() - started)
+
+class ETLBenchmark:
+    """
+    Runs `settings.jobs` ETL jobs for the synthetic testers
+    first_anp_seq .. first_anp_seq + jobs - 1 with at most
+    `settings.concurrency` in flight, the way ETL workers run them (one
+    session per job, the process-wide coalescing job tracker), and
+    measures the run.
+
+    The application database (DB_* settings) must hold both the chat_*
+    schema and the synthetic mwd_* tables; never point it at production.
+    """
+
+    def __init__(self, settings: BenchmarkSettings, session_factory=None):
+        self.settings = settings
+        self._session_factory = session_factory or db_manager.get_async_session
+        self.embedder = StubEmbedder(latency=settings.embed_latency_ms / 1000.0)
+        self.statements = StatementCounter()
+        self.stage_times: Dict[str, List[float]] = {}
+        self.job_times: List[float] = []
+        self.results: List[Dict[str, Any]] = []
+        self.errors: Counter = Counter()
+
+    def _create_orchestrator(self) -> ETLOrchestrator:
+        return _TimedOrchestrator(
+            self.stage_times,
+            validation_level=ValidationLevel(self.settings.validation_level),
+            # 벤치마크에서는 단계 재시도 대기(최대 5분)로 결과가 왜곡되지 않게 한다
+            max_retries_per_stage=0,
+            dataflow_mode=self.settings.dataflow_mode,
+            persist_stage_outputs=False,
+            embedder_factory=lambda: self.embedder,
+            embedding_model=self.embedder.model,
+        )
+
+    async def _enqueue(self) -> List[Any]:
+        anp_seqs = range(self.settings.first_anp_seq, self.settings.first_anp_seq + self.settings.jobs)
+        requests = [
+            TestCompletionRequest(
+                user_id=str(uuid.uuid4()), anp_seq=anp_seq, test_type="benchmark",
+                completed_at=datetime.now(), notification_source="etl_benchmark",
+                priority=JobPriority(self.settings.lane),
+            )
+            for anp_seq in anp_seqs
+        ]
+        return [job for job, _created in await JobTracker().create_jobs_bulk(requests)]
+
+    async def _run_job(self, orchestrator: ETLOrchestrator, job, tracker, slots: asyncio.Semaphore) -> None:
+        async with slots:
+            current_lane.set(self.settings.lane)
+            started = time.perf_counter()
+            try:
+                async with self._session_factory() as session:
+                    result = await orchestrator.process_test_completion(
+                        user_id=job.user_id, anp_seq=job.anp_seq, job_id=job.job_id,
+                        session=session, job_tracker=tracker,
+                    )
+                self.results.append(result)
+            except Exception as e:
+                self.errors[f"{type(e).__name__}: {str(e)[:200]}"] += 1
+            finally:
+                self.job_times.append(time.perf_counter() - started)
+
+    async def run(self) -> Dict[str, Any]:
+        """Run the benchmark and return the report"""
+        self.statements.attach(db_manager.get_async_engine().sync_engine)
+        self.statements.attach(db_manager.get_sync_engine())
+        tracker = CoalescingJobTracker.instance()
+        rss_before = _peak_rss_mb()
+        try:
+            jobs = await self._enqueue()
+            enqueue_statements = sum(self.statements.counts.values())
+            self.statements.counts.clear()
+
+            orchestrator = self._create_orchestrator()
+            slots = asyncio.Semaphore(self.settings.concurrency)
+            started = time.perf_counter()
+            await asyncio.gather(*(self._run_job(orchestrator, job, tracker, slots) for job in jobs))
+            await tracker.close()
+            wall_time = time.perf_counter() - started
+        finally:
+            self.statements.detach()
+
+        succeeded = sum(1 for r in self.results if r.get("status") == "success")
+        total_statements = sum(self.statements.counts.values())
+        report = {
+            "generated_at": datetime.now().isoformat(),
+            "settings": asdict(self.settings),
+            "jobs": {
+                "total": len(jobs),
+                "succeeded": succeeded,
+                "failed": len(jobs) - succeeded,
+                "errors": dict(self.errors.most_common(5)),
+            },
+            "wall_time_seconds": round(wall_time, 3),
+            "jobs_per_second": round(len(jobs) / wall_time, 3) if wall_time > 0 else 0.0,
+            "job_latency_seconds": latency_summary(self.job_times),
+            "stages": {stage: latency_summary(times) for stage, times in self.stage_times.items()},
+            "peak_rss_mb": {
+                "before_run": rss_before,
+                "self": _peak_rss_mb(),
+                "children": _peak_rss_mb(children=True),  # etl.cpu_pool 워커 프로세스
+            },
+            "db_statements": {
+                "enqueue": enqueue_statements,
+                "total": total_statements,
+                "per_job": round(total_statements / len(jobs), 1) if jobs else 0.0,
+                "by_kind": dict(sorted(self.statements.counts.items())),
+                # 오케스트레이터가 센 레거시 조회 수 (배치 조회가 잘 묶이는지 확인용)
+                "legacy_issued_per_job": round(
+                    sum(r.get("legacy_statements_issued", 0) for r in self.results) / len(self.results), 1
+                ) if self.results else 0.0,
+            },
+            "embedding_calls": {"requests": self.embedder.calls, "texts": self.embedder.texts},
+        }
+        logger.info(
+            f"ETL benchmark: {len(jobs)} jobs in {wall_time:.1f}s ({report['jobs_per_second']} jobs/s), "
+            f"{succeeded} succeeded, {report['db_statements']['per_job']} statements/job"
+        )
+        return report
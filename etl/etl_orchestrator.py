@@ -8,8 +8,9 @@ import asyncio
 import logging
 import json
 import traceback
+from contextlib import AsyncExitStack
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Callable, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 import uuid
@@ -21,12 +22,19 @@ from database.models import ChatUser, ChatDocument
 from database.repositories import UserRepository, DocumentRepository
 from etl.legacy_query_executor import LegacyQueryExecutor, QueryResult
 from etl.document_transformer import DocumentTransformer, TransformedDocument
-from etl.vector_embedder import VectorEmbedder
+from etl.vector_embedder import VectorEmbedder, EmbeddingCache
+from etl.stage_store import StageOutput, StageOutputStore
+from etl.cpu_pool import CPUWorkPool
+from etl import telemetry
 from etl.test_completion_handler import JobTracker, JobStatus
 from etl.error_handling import classify_error, Severity
+from etl.config import QUERY_CONFIG, ETL_CONFIG, EMBEDDING_CONFIG
 
 logger = logging.getLogger(__name__)
 
+# rollback_data keys restored when a retried job resumes from a stored stage output
+RESUMABLE_STATE_KEYS = ("legacy_statements_issued", "documents_unchanged")
+
 class ETLStage(Enum):
     """ETL processing stages"""
     INITIALIZATION = "initialization"
@@ -37,6 +45,15 @@ class ETLStage(Enum):
     DOCUMENT_STORAGE = "document_storage"
     COMPLETION = "completion"
 
+# Stages whose output is persisted so a retry can resume after them
+RESUMABLE_STAGES = [
+    ETLStage.QUERY_EXECUTION,
+    ETLStage.DATA_VALIDATION,
+    ETLStage.DOCUMENT_TRANSFORMATION,
+    ETLStage.EMBEDDING_GENERATION,
+    ETLStage.DOCUMENT_STORAGE,
+]
+
 class ValidationLevel(Enum):
     """Data validation levels"""
     BASIC = "basic"
@@ -421,8 +438,8 @@ class DataValidator:
                 )
                 continue
             
-            # Check for dummy embeddings (all zeros)
-            if all(x == 0.0 for x in embedding):
+            # Check for dummy embeddings (all zeros); any() stops at the first non-zero in C
+            if not any(embedding):
                 validation_results["warnings"].append(
                     f"Document {i} has dummy embedding (all zeros)"
                 )
@@ -449,6 +466,27 @@ class DataValidator:
         
         return validation_results
 
+# etl.cpu_pool tasks: plain dicts / lists in and out so pickling stays cheap
+
+def validate_query_results_task(query_results: Dict[str, Dict[str, Any]], validation_level: str) -> Dict[str, Any]:
+    """DataValidator.validate_query_results on QueryResult dicts"""
+    return DataValidator.validate_query_results(
+        {name: QueryResult(**result) for name, result in query_results.items()},
+        ValidationLevel(validation_level)
+    )
+
+def transform_documents_task(query_data: Dict[str, List[Dict[str, Any]]], validation_level: str) -> Dict[str, Any]:
+    """Transform and validate the documents of one user; documents are returned as dicts"""
+    documents = DocumentTransformer().transform_documents(query_data)
+    return {
+        "documents": [asdict(doc) for doc in documents],
+        "validation": DataValidator.validate_transformed_documents(documents, ValidationLevel(validation_level)),
+    }
+
+def validate_embeddings_task(embeddings: List[Dict[str, Any]], validation_level: str) -> Dict[str, Any]:
+    """DataValidator.validate_embeddings on {"embedding_vector": ...} dicts"""
+    return DataValidator.validate_embeddings(embeddings, ValidationLevel(validation_level))
+
 class ETLOrchestrator:
     """
     Orchestrates complete ETL flow with validation checkpoints and rollback mechanisms
@@ -461,6 +499,13 @@ class ETLOrchestrator:
         max_retries_per_stage: int = 2,
         checkpoint_interval: int = 1,  # Save checkpoint after each stage
         allow_partial_completion: bool = True,
+        dataflow_mode: bool = ETL_CONFIG['dataflow_mode'],
+        skip_unchanged_documents: bool = ETL_CONFIG['skip_unchanged_documents'],
+        persist_stage_outputs: bool = ETL_CONFIG['persist_stage_outputs'],
+        stage_store: Optional[StageOutputStore] = None,
+        cpu_pool: Optional[CPUWorkPool] = None,
+        embedder_factory: Optional[Callable[[], VectorEmbedder]] = None,
+        embedding_model: str = EMBEDDING_CONFIG['model'],
     ):
         self.validation_level = validation_level
         self.enable_rollback = enable_rollback
@@ -468,6 +513,18 @@ class ETLOrchestrator:
         self.checkpoint_interval = checkpoint_interval
         self.validator = DataValidator()
         self.allow_partial_completion = allow_partial_completion
+        # 문서별 쿼리 의존성에 따라 변환/임베딩/저장을 쿼리 실행과 겹쳐 처리
+        self.dataflow_mode = dataflow_mode
+        # 저장된 content_hash 와 같은 문서는 임베딩/저장을 건너뛴다
+        self.skip_unchanged_documents = skip_unchanged_documents
+        # 다른 모델로 임베딩된 문서는 내용이 같아도 다시 임베딩한다 (질문 임베딩과 같은 모델이어야 한다)
+        self.embedding_model = embedding_model
+        # 재시도 시 마지막으로 끝난 단계 다음부터 이어서 처리
+        self.stage_store = (stage_store or StageOutputStore()) if persist_stage_outputs else None
+        # backfill 레인 작업의 변환/검증은 프로세스 풀에서 실행해 이벤트 루프를 막지 않는다
+        self.cpu_pool = cpu_pool or CPUWorkPool.instance()
+        # 벤치마크 등에서 임베딩 서비스를 대체할 때 사용 (etl.etl_benchmark)
+        self.embedder_factory = embedder_factory
     
     async def process_test_completion(
         self,
@@ -517,45 +574,63 @@ class ETLOrchestrator:
                 "Initializing ETL processing"
             )
             
-            # Stage 2: Query Execution
-            query_results = await self._execute_stage(
-                context,
-                ETLStage.QUERY_EXECUTION,
-                self._execute_queries,
-                "Executing legacy queries"
-            )
+            resume = await self._load_resume_point(context)
             
-            # Stage 3: Data Validation
-            validated_data = await self._execute_stage(
-                context,
-                ETLStage.DATA_VALIDATION,
-                lambda ctx: self._validate_query_data(ctx, query_results),
-                "Validating query results"
-            )
+            if self.dataflow_mode and not self._resumes_after(resume, ETLStage.DOCUMENT_TRANSFORMATION):
+                # Stages 2-6 overlap: each document is transformed, embedded and
+                # upserted as soon as the queries it depends on have arrived
+                stored_documents = await self._execute_stage(
+                    context,
+                    ETLStage.QUERY_EXECUTION,
+                    self._run_document_dataflow,
+                    "Executing legacy queries and building documents"
+                )
+                await self._save_stage_output(context, ETLStage.DOCUMENT_STORAGE, stored_documents)
+            else:
+                # Stage 2: Query Execution
+                query_results = await self._execute_resumable_stage(
+                    context,
+                    resume,
+                    ETLStage.QUERY_EXECUTION,
+                    self._execute_queries,
+                    "Executing legacy queries"
+                )
             
-            # Stage 4: Document Transformation
-            transformed_documents = await self._execute_stage(
-                context,
-                ETLStage.DOCUMENT_TRANSFORMATION,
-                lambda ctx: self._transform_documents(ctx, validated_data),
-                "Transforming documents"
-            )
+                # Stage 3: Data Validation
+                validated_data = await self._execute_resumable_stage(
+                    context,
+                    resume,
+                    ETLStage.DATA_VALIDATION,
+                    lambda ctx: self._validate_query_data(ctx, query_results),
+                    "Validating query results"
+                )
             
-            # Stage 5: Embedding Generation
-            embedded_documents = await self._execute_stage(
-                context,
-                ETLStage.EMBEDDING_GENERATION,
-                lambda ctx: self._generate_embeddings(ctx, transformed_documents),
-                "Generating embeddings"
-            )
+                # Stage 4: Document Transformation
+                transformed_documents = await self._execute_resumable_stage(
+                    context,
+                    resume,
+                    ETLStage.DOCUMENT_TRANSFORMATION,
+                    lambda ctx: self._transform_documents(ctx, validated_data),
+                    "Transforming documents"
+                )
             
-            # Stage 6: Document Storage
-            stored_documents = await self._execute_stage(
-                context,
-                ETLStage.DOCUMENT_STORAGE,
-                lambda ctx: self._store_documents(ctx, embedded_documents),
-                "Storing documents"
-            )
+                # Stage 5: Embedding Generation
+                embedded_documents = await self._execute_resumable_stage(
+                    context,
+                    resume,
+                    ETLStage.EMBEDDING_GENERATION,
+                    lambda ctx: self._generate_embeddings(ctx, transformed_documents),
+                    "Generating embeddings"
+                )
+            
+                # Stage 6: Document Storage
+                stored_documents = await self._execute_resumable_stage(
+                    context,
+                    resume,
+                    ETLStage.DOCUMENT_STORAGE,
+                    lambda ctx: self._store_documents(ctx, embedded_documents),
+                    "Storing documents"
+                )
             
             # Stage 7: Completion
             final_result = await self._execute_stage(
@@ -565,8 +640,11 @@ class ETLOrchestrator:
                 "Completing ETL processing"
             )
             
+            await self._discard_stage_outputs(context)
+            
             # Log success
             processing_time = (datetime.now() - context.started_at).total_seconds()
+            await telemetry.record_job("success", processing_time)
             logger.info(
                 f"ETL processing completed successfully for job {job_id}. "
                 f"Processing time: {processing_time:.2f}s, "
@@ -580,6 +658,72 @@ class ETLOrchestrator:
             await self._handle_processing_failure(context, e)
             raise
     
+    async def _load_resume_point(self, context: ETLContext) -> Optional[StageOutput]:
+        """Stored output of the last stage this job finished on a previous attempt"""
+        if self.stage_store is None:
+            return None
+        try:
+            resume = await self.stage_store.load(context.job_id)
+        except Exception as e:
+            logger.warning(f"Could not load stored stage output for job {context.job_id}, starting over: {e}")
+            return None
+        if resume is not None:
+            context.rollback_data.update(resume.state)
+            logger.info(f"Resuming job {context.job_id} after stage {resume.stage}")
+        return resume
+    
+    @staticmethod
+    def _resumes_after(resume: Optional[StageOutput], stage: ETLStage) -> bool:
+        """Whether the stored output covers `stage`"""
+        if resume is None:
+            return False
+        finished = RESUMABLE_STAGES.index(ETLStage(resume.stage))
+        return finished >= RESUMABLE_STAGES.index(stage)
+    
+    async def _execute_resumable_stage(
+        self,
+        context: ETLContext,
+        resume: Optional[StageOutput],
+        stage: ETLStage,
+        stage_func,
+        progress_message: str
+    ) -> Any:
+        """
+        Run a stage and persist its output, or skip it when a previous attempt
+        already finished it. Only the output of the last finished stage is
+        needed (and returned); earlier skipped stages return None.
+        """
+        if self._resumes_after(resume, stage):
+            if resume.stage != stage.value:
+                return None
+            context.checkpoints.append(await self._create_checkpoint(
+                context, stage, resume.output, datetime.now(), success=True
+            ))
+            logger.info(f"Stage {stage.value} restored from stored output")
+            return resume.output
+        
+        result = await self._execute_stage(context, stage, stage_func, progress_message)
+        await self._save_stage_output(context, stage, result)
+        return result
+    
+    async def _save_stage_output(self, context: ETLContext, stage: ETLStage, output: Any) -> None:
+        if self.stage_store is None:
+            return
+        state = {key: context.rollback_data[key] for key in RESUMABLE_STATE_KEYS if key in context.rollback_data}
+        try:
+            await self.stage_store.save(context.job_id, stage.value, output, state)
+        except Exception as e:
+            # 저장 실패는 재시도 비용만 늘리므로 작업은 계속한다
+            logger.warning(f"Could not persist {stage.value} output for job {context.job_id}: {e}")
+    
+    async def _discard_stage_outputs(self, context: ETLContext) -> None:
+        if self.stage_store is None:
+            return
+        try:
+            await self.stage_store.delete(context.job_id)
+        except Exception as e:
+            logger.warning(f"Could not delete stored stage output for job {context.job_id}: {e}")
+    
     async def _execute_stage(
         self,
         context: ETLContext,
@@ -682,15 +826,30 @@ class ETLOrchestrator:
             "initialization_time": datetime.now().isoformat()
         }
     
-    async def _execute_queries(self, context: ETLContext) -> Dict[str, QueryResult]:
-        """Execute legacy queries"""
-        
-        query_executor = LegacyQueryExecutor(
+    def _create_embedder(self) -> VectorEmbedder:
+        if self.embedder_factory is not None:
+            return self.embedder_factory()
+        return VectorEmbedder(
+            batch_size=10,  # 한 사용자의 문서 전체를 batchEmbedContents 한 번으로 보낸다
+            enable_cache=True,
+            max_retries=3,
+            # 작업마다 새 임베더를 만들어도 캐시는 프로세스 전체가 같이 쓴다
+            cache=EmbeddingCache.shared()
+        )
+    
+    def _create_query_executor(self) -> LegacyQueryExecutor:
+        return LegacyQueryExecutor(
             max_retries=2,
             retry_delay=1.0,
             max_workers=4,
-            query_timeout=300.0  # 5분으로 타임아웃 증가
+            query_timeout=300.0,  # 5분으로 타임아웃 증가
+            backend=QUERY_CONFIG['backend']
         )
+    
+    async def _execute_queries(self, context: ETLContext) -> Dict[str, QueryResult]:
+        """Execute legacy queries"""
+        
+        query_executor = self._create_query_executor()
         
         try:
             query_results = await query_executor.execute_all_queries_async(
@@ -699,6 +858,8 @@ class ETLOrchestrator:
             
             # Store rollback data
             context.rollback_data["query_execution_completed"] = True
+            context.rollback_data["legacy_statements_issued"] = query_executor.get_statement_count(context.anp_seq)
+            await telemetry.record_query_results(query_results.values())
             
             return query_results
             
@@ -713,9 +874,16 @@ class ETLOrchestrator:
         """Validate query results"""
         
         # Perform validation
-        validation_results = self.validator.validate_query_results(
-            query_results, context.validation_level
-        )
+        if self.cpu_pool.applies():
+            validation_results = await self.cpu_pool.run(
+                validate_query_results_task,
+                {name: asdict(result) for name, result in query_results.items()},
+                context.validation_level.value
+            )
+        else:
+            validation_results = self.validator.validate_query_results(
+                query_results, context.validation_level
+            )
         
         # Log validation results
         logger.info(
@@ -750,13 +918,18 @@ class ETLOrchestrator:
     ) -> List[TransformedDocument]:
         """Transform query data into documents"""
         
-        transformer = DocumentTransformer()
-        transformed_documents = await transformer.transform_all_documents(query_data)
-        
-        # Validate transformed documents
-        validation_results = self.validator.validate_transformed_documents(
-            transformed_documents, context.validation_level
-        )
+        if self.cpu_pool.applies():
+            output = await self.cpu_pool.run(transform_documents_task, query_data, context.validation_level.value)
+            transformed_documents = [TransformedDocument(**doc) for doc in output["documents"]]
+            validation_results = output["validation"]
+        else:
+            transformer = DocumentTransformer()
+            transformed_documents = await transformer.transform_all_documents(query_data)
+            
+            # Validate transformed documents
+            validation_results = self.validator.validate_transformed_documents(
+                transformed_documents, context.validation_level
+            )
         
         logger.info(
             f"Document transformation completed: "
@@ -779,6 +952,12 @@ class ETLOrchestrator:
     ) -> List[Dict[str, Any]]:
         """Generate embeddings for documents"""
         
+        # Incremental ETL: documents identical to the stored rows need no new embedding
+        transformed_documents = await self._skip_unchanged_documents(context, transformed_documents)
+        if not transformed_documents:
+            logger.info("All documents unchanged; skipping embedding generation")
+            return []
+        
         # Convert to format expected by VectorEmbedder
         documents_for_embedding = []
         for doc in transformed_documents:
@@ -791,28 +970,30 @@ class ETLOrchestrator:
         
         # Generate embeddings
         try:
-            async with VectorEmbedder(
-                batch_size=3,  # Smaller batches for reliability
-                enable_cache=True,
-                max_retries=3
-            ) as embedder:
+            async with self._create_embedder() as embedder:
                 embedded_documents = await embedder.generate_document_embeddings(
                     documents_for_embedding
                 )
         except Exception as embed_err:
             # Fallback: generate dummy embeddings to allow pipeline to proceed in dev
             logger.error(f"Embedding service unavailable, using dummy embeddings: {embed_err}")
-            dummy = [0.0] * 768
-            embedded_documents = []
-            for doc in documents_for_embedding:
-                tmp = doc.copy()
-                tmp['embedding_vector'] = dummy
-                embedded_documents.append(tmp)
+            embedded_documents = [self._with_dummy_embedding(doc) for doc in documents_for_embedding]
+        # 개별 텍스트 임베딩 실패도 0 벡터로 돌아온다
+        embedded_documents = [self._with_embedding_model(self._without_hash_if_dummy(doc)) for doc in embedded_documents]
+        await telemetry.record_embeddings(embedded_documents)
         
         # Validate embeddings
-        validation_results = self.validator.validate_embeddings(
-            embedded_documents, context.validation_level
-        )
+        if self.cpu_pool.applies():
+            # 벡터만 보낸다
+            validation_results = await self.cpu_pool.run(
+                validate_embeddings_task,
+                [{k: doc[k] for k in ("embedding_vector",) if k in doc} for doc in embedded_documents],
+                context.validation_level.value
+            )
+        else:
+            validation_results = self.validator.validate_embeddings(
+                embedded_documents, context.validation_level
+            )
         
         logger.info(
             f"Embedding generation completed: "
@@ -828,6 +1009,53 @@ class ETLOrchestrator:
         
         return embedded_documents
     
+    async def _load_stored_hashes(self, context: ETLContext) -> Dict[str, str]:
+        if not self.skip_unchanged_documents:
+            return {}
+        return await DocumentRepository(context.session).get_content_hashes(
+            uuid.UUID(context.user_id), embedding_model=self.embedding_model
+        )
+    
+    @staticmethod
+    def _is_unchanged(document: TransformedDocument, stored_hashes: Dict[str, str]) -> bool:
+        """stored_hashes holds only documents embedded with the current model (_load_stored_hashes)"""
+        doc_type = getattr(document.doc_type, 'value', document.doc_type)
+        return stored_hashes.get(doc_type) == document.content_hash
+    
+    async def _skip_unchanged_documents(
+        self,
+        context: ETLContext,
+        documents: List[TransformedDocument]
+    ) -> List[TransformedDocument]:
+        """Drop documents whose content_hash matches the stored row and record them as unchanged"""
+        stored_hashes = await self._load_stored_hashes(context)
+        changed = [doc for doc in documents if not self._is_unchanged(doc, stored_hashes)]
+        unchanged = [doc.doc_type for doc in documents if self._is_unchanged(doc, stored_hashes)]
+        context.rollback_data["documents_unchanged"] = unchanged
+        logger.info(f"Incremental ETL: {len(changed)} changed, {len(unchanged)} unchanged documents")
+        return changed
+    
+    @staticmethod
+    def _without_hash_if_dummy(doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop the content_hash of a zero-vector document so the next run embeds it again"""
+        if any(doc.get('embedding_vector') or ()):
+            return doc
+        metadata = {k: v for k, v in doc.get('metadata', {}).items() if k != 'content_hash'}
+        return dict(doc, metadata=metadata)
+
+    @staticmethod
+    def _with_embedding_model(doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Store the embedding model next to content_hash so a model change re-embeds the document"""
+        model = (doc.get('embedding_metadata') or {}).get('model')
+        if not model or 'content_hash' not in doc.get('metadata', {}):
+            return doc
+        return dict(doc, metadata=dict(doc['metadata'], embedding_model=model))
+
+    @classmethod
+    def _with_dummy_embedding(cls, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Zero-vector fallback, stored without a content_hash"""
+        return cls._without_hash_if_dummy(dict(doc, embedding_vector=[0.0] * 768))
+    
     async def _store_documents(
         self, 
         context: ETLContext, 
@@ -870,6 +1098,214 @@ class ETLOrchestrator:
             logger.error(f"Document storage failed, transaction rolled back: {e}")
             raise
     
+    async def _run_document_dataflow(self, context: ETLContext) -> List[Dict[str, Any]]:
+        """
+        Dataflow mode: stream query results and start a transform -> embed ->
+        upsert chain for each document type as soon as all of its
+        DocumentTransformer.DOCUMENT_DEPENDENCIES have arrived.
+
+        Upserts are flushed as documents finish; the transaction is committed
+        once after the aggregate validation so a failed job still rolls back
+        as a whole.
+        """
+        dependencies = DocumentTransformer.DOCUMENT_DEPENDENCIES
+        transformer = DocumentTransformer()
+        query_executor = self._create_query_executor()
+        
+        # 의존 쿼리가 있는 문서부터 완성되도록 순서를 정한다 (async 백엔드는 순차 실행)
+        query_names: List[str] = []
+        for names in dependencies.values():
+            query_names.extend(name for name in names if name not in query_names)
+        query_names.extend(name for name in query_executor.IMPLEMENTED_QUERIES if name not in query_names)
+        
+        waiting = {doc_type: set(names) for doc_type, names in dependencies.items()}
+        query_results: Dict[str, QueryResult] = {}
+        tasks: List[asyncio.Task] = []
+        progress = {"stored": 0, "total": len(dependencies)}
+        # AsyncSession 은 동시 사용이 안 되므로 upsert 는 한 번에 하나씩
+        storage_lock = asyncio.Lock()
+        context.rollback_data["documents_to_rollback"] = []
+        context.rollback_data["documents_unchanged"] = []
+        context.rollback_data["embedded_documents"] = []
+        stored_hashes = await self._load_stored_hashes(context)
+        
+        resources = AsyncExitStack()
+        embedder = None
+        try:
+            embedder = await resources.enter_async_context(self._create_embedder())
+        except Exception as embed_err:
+            # Fallback: dummy embeddings, as in the staged pipeline
+            logger.error(f"Embedding service unavailable, using dummy embeddings: {embed_err}")
+        
+        stream = query_executor.stream_queries_async(context.session, context.anp_seq, query_names)
+        try:
+            async for result in stream:
+                query_results[result.query_name] = result
+                await telemetry.record_query_results([result])
+                for doc_type in list(waiting):
+                    waiting[doc_type].discard(result.query_name)
+                    if waiting[doc_type]:
+                        continue
+                    del waiting[doc_type]
+                    query_data = {
+                        name: query_results[name].data
+                        for name in dependencies[doc_type]
+                        if query_results[name].success and query_results[name].data is not None
+                    }
+                    tasks.append(asyncio.create_task(self._process_document(
+                        context, transformer, embedder, storage_lock, progress, doc_type, query_data, stored_hashes
+                    )))
+            
+            context.rollback_data["query_execution_completed"] = True
+            context.rollback_data["legacy_statements_issued"] = query_executor.get_statement_count(context.anp_seq)
+            
+            # Same query-level validation and logging as the staged pipeline
+            await self._validate_query_data(context, query_results)
+            
+            processed = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await context.session.rollback()
+            raise
+        finally:
+            await stream.aclose()
+            await query_executor.close()
+            await resources.aclose()
+        
+        transformed_documents = [document for document, _stored in processed if document is not None]
+        stored_documents = [stored for _document, stored in processed if stored is not None]
+        
+        validation_results = self.validator.validate_transformed_documents(
+            transformed_documents, context.validation_level
+        )
+        logger.info(
+            f"Dataflow transformation completed: "
+            f"{validation_results['valid_documents']}/{validation_results['total_documents']} valid, "
+            f"{len(stored_documents)} stored"
+        )
+        if not validation_results["passed"]:
+            await context.session.rollback()
+            raise ETLValidationError(
+                ETLStage.DOCUMENT_TRANSFORMATION,
+                "Document transformation validation failed",
+                validation_results
+            )
+        if not stored_documents and not context.rollback_data["documents_unchanged"]:
+            await context.session.rollback()
+            raise ETLValidationError(ETLStage.EMBEDDING_GENERATION, "No document has a valid embedding")
+        
+        # 커밋이 실패해도 재시도는 임베딩을 다시 만들지 않고 저장 단계부터 시작한다
+        await self._save_stage_output(
+            context, ETLStage.EMBEDDING_GENERATION, context.rollback_data.pop("embedded_documents")
+        )
+        await context.session.commit()
+        logger.info(f"Successfully stored {len(stored_documents)} documents")
+        return stored_documents
+    
+    async def _process_document(
+        self,
+        context: ETLContext,
+        transformer: DocumentTransformer,
+        embedder: Optional[VectorEmbedder],
+        storage_lock: asyncio.Lock,
+        progress: Dict[str, int],
+        doc_type: str,
+        query_data: Dict[str, List[Dict[str, Any]]],
+        stored_hashes: Dict[str, str]
+    ) -> Tuple[Optional[TransformedDocument], Optional[Dict[str, Any]]]:
+        """Transform, embed and upsert one document, checkpointing each step"""
+        
+        started = datetime.now()
+        document = transformer.transform_document(doc_type, query_data)
+        if document is None:
+            context.checkpoints.append(await self._create_checkpoint(
+                context, ETLStage.DOCUMENT_TRANSFORMATION, None, started,
+                success=False, error_message="Document could not be transformed", doc_type=doc_type
+            ))
+            return None, None
+        
+        issues = self.validator._validate_document_structure(document, context.validation_level)
+        for issue in issues:
+            logger.warning(f"Document validation issue ({doc_type}): {issue}")
+        context.checkpoints.append(await self._create_checkpoint(
+            context, ETLStage.DOCUMENT_TRANSFORMATION, document.content, started,
+            success=True, doc_type=doc_type, validation_results={"issues": issues}
+        ))
+        
+        if self._is_unchanged(document, stored_hashes):
+            async with storage_lock:
+                context.rollback_data["documents_unchanged"].append(document.doc_type)
+                progress["stored"] += 1
+                await context.job_tracker.update_job(
+                    context.job_id,
+                    status=JobStatus.PROCESSING_QUERIES.value,
+                    progress_percentage=20.0 + 70.0 * progress["stored"] / progress["total"],
+                    current_step=f"Unchanged {doc_type} document ({progress['stored']}/{progress['total']})",
+                )
+            return document, None
+        
+        started = datetime.now()
+        doc_for_embedding = {
+            'doc_type': document.doc_type,
+            'content': document.content,
+            'summary_text': document.summary_text,
+            'metadata': document.metadata
+        }
+        embedded = None
+        if embedder is not None:
+            try:
+                embedded = (await embedder.generate_document_embeddings([doc_for_embedding]))[0]
+            except Exception as embed_err:
+                logger.error(f"Embedding failed for {doc_type}, using dummy embedding: {embed_err}")
+        if embedded is None:
+            embedded = self._with_dummy_embedding(doc_for_embedding)
+        embedded = self._with_embedding_model(self._without_hash_if_dummy(embedded))
+        await telemetry.record_embeddings([embedded])
+        
+        validation_results = self.validator.validate_embeddings([embedded], context.validation_level)
+        context.checkpoints.append(await self._create_checkpoint(
+            context, ETLStage.EMBEDDING_GENERATION, embedded.get('embedding_vector'), started,
+            success=validation_results["passed"], doc_type=doc_type, validation_results=validation_results,
+            error_message=None if validation_results["passed"] else "Embedding validation failed"
+        ))
+        if not validation_results["passed"]:
+            if context.validation_level == ValidationLevel.STRICT:
+                raise ETLValidationError(
+                    ETLStage.EMBEDDING_GENERATION,
+                    f"Embedding validation failed for {doc_type}",
+                    validation_results
+                )
+            logger.error(f"Skipping {doc_type}: embedding validation failed")
+            return document, None
+        
+        started = datetime.now()
+        payload = {
+            'user_id': uuid.UUID(context.user_id),
+            'doc_type': embedded['doc_type'],
+            'content': embedded['content'],
+            'summary_text': embedded['summary_text'],
+            'embedding_vector': embedded['embedding_vector'],
+            'doc_metadata': embedded.get('metadata', {}),
+        }
+        stored = {'doc_type': embedded['doc_type'], 'user_id': context.user_id}
+        context.rollback_data["embedded_documents"].append(embedded)
+        async with storage_lock:
+            await DocumentRepository(context.session).upsert(payload)
+            progress["stored"] += 1
+            # 진행률이 거꾸로 가지 않도록 잠금 안에서 갱신
+            await context.job_tracker.update_job(
+                context.job_id,
+                status=JobStatus.PROCESSING_QUERIES.value,
+                progress_percentage=20.0 + 70.0 * progress["stored"] / progress["total"],
+                current_step=f"Stored {doc_type} document ({progress['stored']}/{progress['total']})",
+            )
+        context.checkpoints.append(await self._create_checkpoint(
+            context, ETLStage.DOCUMENT_STORAGE, stored, started, success=True, doc_type=doc_type
+        ))
+        return document, stored
+    
     async def _complete_processing(
         self, 
         context: ETLContext, 
@@ -899,7 +1335,10 @@ class ETLOrchestrator:
             "processing_time_seconds": processing_time,
             "documents_created": len(stored_documents),
             "document_types": [doc['doc_type'] for doc in stored_documents],
+            "documents_changed": len(stored_documents),
+            "documents_skipped": len(context.rollback_data.get("documents_unchanged", [])),
             "checkpoints_created": len(context.checkpoints),
+            "legacy_statements_issued": context.rollback_data.get("legacy_statements_issued", 0),
             "validation_level": context.validation_level.value,
             "completed_at": datetime.now().isoformat()
         }
@@ -914,9 +1353,11 @@ class ETLOrchestrator:
         result: Any,
         stage_start_time: datetime,
         success: bool,
-        error_message: Optional[str] = None
+        error_message: Optional[str] = None,
+        doc_type: Optional[str] = None,
+        validation_results: Optional[Dict[str, Any]] = None
     ) -> ETLCheckpoint:
-        """Create processing checkpoint"""
+        """Create processing checkpoint (per document in dataflow mode)"""
         
         stage_duration = (datetime.now() - stage_start_time).total_seconds()
         
@@ -928,6 +1369,8 @@ class ETLOrchestrator:
             "result_type": type(result).__name__ if result else None,
             "result_size": len(result) if isinstance(result, (list, dict)) else None
         }
+        if doc_type is not None:
+            data_snapshot["doc_type"] = doc_type
         
         # Add stage-specific metrics
         metrics = {
@@ -935,12 +1378,15 @@ class ETLOrchestrator:
             "memory_usage_mb": self._get_memory_usage(),
             "timestamp": datetime.now().isoformat()
         }
+        await telemetry.record_stage(
+            stage.value, stage_duration, success, metrics["memory_usage_mb"], doc_type=doc_type
+        )
         
         checkpoint = ETLCheckpoint(
             stage=stage,
             timestamp=datetime.now(),
             data_snapshot=data_snapshot,
-            validation_results={},
+            validation_results=validation_results or {},
             metrics=metrics,
             success=success,
             error_message=error_message
@@ -1008,6 +1454,7 @@ class ETLOrchestrator:
         # Determine partial completion
         created_docs = context.rollback_data.get("documents_to_rollback", [])
         failed_stage = context.rollback_data.get("failed_stage")
+        await telemetry.record_job("failure", processing_time, failed_stage, error_type.value)
 
         # Update job with error details first
         await context.job_tracker.update_job(
@@ -0,0 +1,164 @@
+"""
+Job Progress Events
+Job state changes are published with Postgres NOTIFY by the job trackers
+and fanned out to SSE subscribers by one LISTEN connection per process.
+"""
+
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, Optional, Sequence, Set, Tuple
+
+from database.connection import db_manager
+from etl.config import BACKGROUND_PROCESSING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_CHANNEL = BACKGROUND_PROCESSING_CONFIG['progress_notify_channel']
+
+# NOTIFY payload 는 8000 바이트 제한이 있어 오류 메시지는 잘라서 보낸다
+EVENT_COLUMNS = """
+    'job_id', u.job_id,
+    'status', u.status,
+    'progress_percentage', u.progress_percentage,
+    'current_step', u.current_step,
+    'completed_steps', u.completed_steps,
+    'total_steps', u.total_steps,
+    'error_message', left(u.error_message, 1000),
+    'updated_at', u.updated_at,
+    'completed_at', u.completed_at,
+    'leased', u.locked_by IS NOT NULL
+"""
+
+def publishing(
+    update_sql: str, params: Dict[str, Any], returning: Sequence[str] = ()
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Wrap an `UPDATE chat_etl_jobs AS j ...` so that every updated row is
+    published on PROGRESS_CHANNEL in the same statement (delivered on commit).
+    The channel is passed as the :progress_channel bind parameter; the
+    `returning` columns of the updated rows come back as the result.
+    """
+    columns = "".join(f"u.{column}, " for column in returning)
+    sql = (
+        f"WITH u AS ({update_sql} RETURNING j.*) "
+        f"SELECT {columns}pg_notify(:progress_channel, json_build_object({EVENT_COLUMNS})::text) FROM u"
+    )
+    return sql, {**params, "progress_channel": PROGRESS_CHANNEL}
+
+def progress_event(job) -> Dict[str, Any]:
+    """Event payload for a ChatETLJob row (same keys as `publishing`)"""
+    return {
+        "job_id": str(job.job_id),
+        "status": job.status,
+        "progress_percentage": job.progress_percentage,
+        "current_step": job.current_step,
+        "completed_steps": job.completed_steps,
+        "total_steps": job.total_steps,
+        "error_message": job.error_message[:1000] if job.error_message else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+        "leased": job.locked_by is not None,
+    }
+
+class JobEventListener:
+    """
+    One LISTEN connection per process; events are routed to the queues of
+    the subscribers of their job_id. If the connection cannot be opened,
+    subscribers still work but only receive nothing (callers fall back to
+    re-reading the job).
+    """
+
+    _singleton_instance = None
+
+    def __init__(
+        self,
+        channel: str = PROGRESS_CHANNEL,
+        connect: Optional[Callable[[], Awaitable[Any]]] = None,
+    ):
+        self.channel = channel
+        self._connect = connect or self._connect_asyncpg
+        self._connection = None
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._lock = asyncio.Lock()
+        self.events_received = 0
+
+    @classmethod
+    def instance(cls) -> "JobEventListener":
+        """Return the process-wide listener."""
+        if cls._singleton_instance is None:
+            cls._singleton_instance = cls()
+        return cls._singleton_instance
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    @staticmethod
+    async def _connect_asyncpg():
+        import asyncpg
+        config = db_manager.config
+        return await asyncpg.connect(
+            user=config.username, password=config.password,
+            host=config.host, port=config.port, database=config.database,
+        )
+
+    async def _ensure_listening(self) -> bool:
+        async with self._lock:
+            if self.connected:
+                return True
+            try:
+                connection = await self._connect()
+                await connection.add_listener(self.channel, self._on_notify)
+                connection.add_termination_listener(self._on_terminated)
+                self._connection = connection
+                logger.info(f"Listening for job progress on channel {self.channel}")
+            except Exception as e:
+                logger.warning(f"Job progress LISTEN unavailable, streams fall back to polling: {e}")
+                return False
+        return True
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed job progress event: {payload[:200]}")
+            return
+        self.events_received += 1
+        for queue in self._subscribers.get(str(event.get("job_id")), ()):
+            queue.put_nowait(event)
+
+    def _on_terminated(self, connection) -> None:
+        # 다음 subscribe 에서 다시 연결한다
+        if connection is self._connection:
+            self._connection = None
+            logger.warning("Job progress LISTEN connection closed")
+
+    @asynccontextmanager
+    async def subscribe(self, job_id: str) -> AsyncIterator[asyncio.Queue]:
+        """Queue receiving the progress events of `job_id` while the context is open"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            await self._ensure_listening()
+            yield queue
+        finally:
+            queues = self._subscribers.get(job_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[job_id]
+
+    async def close(self) -> None:
+        async with self._lock:
+            if self._connection is not None:
+                connection, self._connection = self._connection, None
+                try:
+                    await connection.close()
+                except Exception as e:
+                    logger.warning(f"Error closing job progress LISTEN connection: {e}")
@@ -0,0 +1,184 @@
+"""
+ETL Job Lanes
+Priority classes of ETL jobs and weighted fair sharing of the resources they
+compete for: worker slots (etl.job_queue), legacy DB statements
+(etl.legacy_query_executor) and embedding requests (etl.vector_embedder).
+"""
+
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from enum import Enum
+from typing import Dict, Any, AsyncIterator, Deque, Mapping, Optional
+
+from etl.config import BACKGROUND_PROCESSING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+class JobPriority(Enum):
+    """Priority class (lane) of an ETL job, most urgent first"""
+    INTERACTIVE = "interactive"  # fresh test completion: the user is waiting for the chatbot
+    REPROCESS = "reprocess"      # user-triggered reprocess
+    BACKFILL = "backfill"        # admin backfill / bulk re-embedding
+
+LANES = [priority.value for priority in JobPriority]
+
+# Lane of the job the current task works for; set by the worker pool per job
+current_lane: ContextVar[str] = ContextVar("etl_job_lane", default=JobPriority.INTERACTIVE.value)
+
+def lane_rank(lane: str) -> int:
+    """0 for the most urgent lane; unknown lanes sort last"""
+    return LANES.index(lane) if lane in LANES else len(LANES)
+
+def parse_lane_weights(spec: str) -> Dict[str, float]:
+    """'interactive:6,reprocess:3,backfill:1' -> weights; missing lanes get 1"""
+    weights = {lane: 1.0 for lane in LANES}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        lane, _, weight = item.partition(':')
+        lane = lane.strip()
+        if lane not in weights:
+            raise ValueError(f"Unknown ETL lane in weights: {lane}")
+        weights[lane] = max(float(weight), 0.01)
+    return weights
+
+LANE_WEIGHTS = parse_lane_weights(BACKGROUND_PROCESSING_CONFIG['lane_weights'])
+
+def allocate_lane_slots(
+    free_slots: int,
+    capacity: int,
+    running: Mapping[str, int],
+    pending: Mapping[str, int],
+    weights: Mapping[str, float] = LANE_WEIGHTS,
+    reserved_slots: int = BACKGROUND_PROCESSING_CONFIG['interactive_reserved_slots'],
+) -> Dict[str, int]:
+    """
+    Split `free_slots` worker slots among the lanes with pending jobs.
+
+    - each slot goes to the lane with the lowest running/weight share, so
+      busy lanes converge to their weighted share and an idle lane's share
+      is used by the others
+    - backfill never holds more than `capacity - reserved_slots` slots (at
+      least one), keeping that many slots for the interactive lanes
+    """
+    backfill = JobPriority.BACKFILL.value
+    backfill_cap = max(capacity - reserved_slots, 1)
+    held = {lane: running.get(lane, 0) for lane in LANES}
+    slots = {lane: 0 for lane in LANES}
+    for _ in range(max(free_slots, 0)):
+        candidates = [
+            lane for lane in LANES
+            if slots[lane] < pending.get(lane, 0) and not (lane == backfill and held[lane] >= backfill_cap)
+        ]
+        if not candidates:
+            break
+        lane = min(candidates, key=lambda l: (held[l] / weights.get(l, 1.0), lane_rank(l)))
+        slots[lane] += 1
+        held[lane] += 1
+    return slots
+
+class FairShareLimiter:
+    """
+    Admits at most `capacity` concurrent holders. While it is full, waiters
+    are admitted across lanes by weighted fair queuing (each lane's virtual
+    clock advances by 1/weight per admission) and in FIFO order within a
+    lane, so backfill keeps making progress without delaying interactive
+    jobs by more than its weighted share. capacity <= 0 admits everyone.
+    """
+
+    _instances: Dict[str, "FairShareLimiter"] = {}
+
+    def __init__(self, capacity: int, weights: Optional[Mapping[str, float]] = None, name: str = "resource"):
+        self.capacity = capacity
+        self.weights = dict(weights or LANE_WEIGHTS)
+        self.name = name
+        self._holders = {lane: 0 for lane in LANES}
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self._tags = {lane: 0.0 for lane in LANES}
+        self._clock = 0.0
+
+        self.admitted = {lane: 0 for lane in LANES}
+        self.waited = {lane: 0 for lane in LANES}
+
+    @classmethod
+    def instance(cls, resource: str) -> "FairShareLimiter":
+        """Return the process-wide limiter of a resource ('legacy_db' or 'embedding')."""
+        if resource not in cls._instances:
+            capacities = {
+                "legacy_db": BACKGROUND_PROCESSING_CONFIG['legacy_db_lane_slots'],
+                # 임베딩은 요청 한도 대기 순서만 정하면 되므로 한 번에 하나씩 입장시킨다
+                "embedding": 1,
+            }
+            cls._instances[resource] = cls(capacities[resource], name=resource)
+        return cls._instances[resource]
+
+    @property
+    def in_use(self) -> int:
+        return sum(self._holders.values())
+
+    def _admit(self, lane: str) -> None:
+        self._holders[lane] += 1
+        self.admitted[lane] += 1
+        self._clock = self._tags[lane]
+        self._tags[lane] += 1.0 / self.weights.get(lane, 1.0)
+
+    def _admit_waiters(self) -> None:
+        while self.in_use < self.capacity:
+            lanes = [lane for lane in LANES if self._waiters[lane]]
+            if not lanes:
+                return
+            lane = min(lanes, key=lambda l: (self._tags[l], lane_rank(l)))
+            waiter = self._waiters[lane].popleft()
+            if waiter.done():  # 취소된 대기자
+                continue
+            self._admit(lane)
+            waiter.set_result(None)
+
+    async def acquire(self, lane: str) -> None:
+        if lane not in self._holders:
+            lane = JobPriority.INTERACTIVE.value
+        if not any(self._waiters.values()) and self.in_use < self.capacity:
+            self._admit(lane)
+            return
+        if not self._waiters[lane]:
+            # 쉬던 lane 이 밀린 몫을 한꺼번에 쓰지 못하도록 현재 시각부터 센다
+            self._tags[lane] = max(self._tags[lane], self._clock)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(waiter)
+        self.waited[lane] += 1
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 입장 직후 취소되면 자리를 돌려준다
+                self.release(lane)
+            raise
+
+    def release(self, lane: str) -> None:
+        if lane not in self._holders:
+            lane = JobPriority.INTERACTIVE.value
+        self._holders[lane] -= 1
+        self._admit_waiters()
+
+    @asynccontextmanager
+    async def slot(self, lane: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold one unit of the resource for the lane of the current job"""
+        if self.capacity <= 0:
+            yield
+            return
+        lane = lane or current_lane.get()
+        await self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release(lane)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "in_use": dict(self._holders),
+            "waiting": {lane: len(waiters) for lane, waiters in self._waiters.items()},
+            "admitted": dict(self.admitted),
+            "waited": dict(self.waited),
+        }
@@ -0,0 +1,330 @@
+"""
+ETL Job Queue
+Durable job queue on chat_etl_jobs. Pending jobs are claimed with
+SELECT ... FOR UPDATE SKIP LOCKED, claimed jobs are kept alive with
+heartbeats, and jobs whose worker stopped heartbeating are reclaimed.
+Free slots are shared between the priority lanes by etl.job_lanes.
+"""
+
+import logging
+import os
+import socket
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Set
+
+from sqlalchemy import text
+
+from database.connection import db_manager
+from etl.config import BACKGROUND_PROCESSING_CONFIG
+from etl.job_events import publishing
+from etl.job_lanes import LANES, JobPriority, allocate_lane_slots
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_xact_lock key that serializes claims across worker processes, so
+# the cluster-wide max_concurrent_jobs bound holds and two workers never
+# lease jobs of the same test at once
+CLAIM_LOCK_KEY = 73_010_009
+
+CLAIM_SQL = """
+UPDATE chat_etl_jobs j
+SET status = 'started',
+    locked_by = :worker_id,
+    heartbeat_at = CURRENT_TIMESTAMP,
+    attempts = COALESCE(j.attempts, 0) + 1,
+    current_step = 'Claimed by ETL worker',
+    updated_at = CURRENT_TIMESTAMP
+FROM (
+    SELECT job_id
+    FROM chat_etl_jobs
+    WHERE status = 'pending' AND priority = :priority AND available_at <= CURRENT_TIMESTAMP
+      -- 같은 검사의 후속 작업은 실행 중인 작업이 끝난 뒤에 시작한다
+      AND NOT EXISTS (
+          SELECT 1 FROM chat_etl_jobs running
+          WHERE running.anp_seq = chat_etl_jobs.anp_seq AND running.locked_by IS NOT NULL
+      )
+      -- 검사마다 가장 먼저 들어온 대기 작업 하나만 후보가 된다 (재시도 대기 중인 작업과
+      -- 그 후속 작업이 한 번에 같이 잡히지 않도록). DISTINCT ON 은 FOR UPDATE 와 함께 쓸 수 없다
+      AND NOT EXISTS (
+          SELECT 1 FROM chat_etl_jobs earlier
+          WHERE earlier.anp_seq = chat_etl_jobs.anp_seq AND earlier.status = 'pending'
+            AND (earlier.started_at, earlier.job_id) < (chat_etl_jobs.started_at, chat_etl_jobs.job_id)
+      )
+    ORDER BY available_at, started_at
+    LIMIT :limit
+    FOR UPDATE SKIP LOCKED
+) next_jobs
+WHERE j.job_id = next_jobs.job_id
+RETURNING j.job_id, j.user_id, j.anp_seq, j.attempts, j.priority, j.force_reprocess
+"""
+
+# 레인별 대기 작업(queued: 전체, pending: 지금 가져갈 수 있는 것)과 실행 중 작업 수
+LANE_COUNTS_SQL = """
+SELECT priority,
+       COUNT(*) FILTER (WHERE status = 'pending') AS queued,
+       COUNT(*) FILTER (WHERE status = 'pending' AND available_at <= CURRENT_TIMESTAMP) AS pending,
+       COUNT(*) FILTER (WHERE locked_by IS NOT NULL) AS running
+FROM chat_etl_jobs
+WHERE status = 'pending' OR locked_by IS NOT NULL
+GROUP BY priority
+"""
+
+# 최근 작업 결과 (워커 프로세스와 무관하게 큐 테이블에서 집계)
+JOB_OUTCOMES_SQL = """
+SELECT status,
+       failed_stage,
+       COUNT(*) AS jobs,
+       AVG(EXTRACT(EPOCH FROM (completed_at - started_at))) AS avg_seconds
+FROM chat_etl_jobs
+WHERE status IN ('success', 'failure', 'partial')
+  AND completed_at >= CURRENT_TIMESTAMP - make_interval(hours => :hours)
+GROUP BY status, failed_stage
+"""
+
+HEARTBEAT_SQL = """
+UPDATE chat_etl_jobs
+SET heartbeat_at = CURRENT_TIMESTAMP
+WHERE job_id = ANY(CAST(:job_ids AS uuid[])) AND locked_by = :worker_id
+RETURNING job_id
+"""
+
+# 상태를 바꾸는 문장은 publishing() 으로 감싸 진행 상황 구독자에게도 알린다
+RELEASE_SQL = """
+UPDATE chat_etl_jobs AS j
+SET locked_by = NULL, heartbeat_at = NULL
+WHERE job_id = :job_id AND locked_by = :worker_id
+"""
+
+# 종료 시 되돌리는 작업은 시도 횟수를 소모하지 않는다
+REQUEUE_SQL = """
+UPDATE chat_etl_jobs AS j
+SET status = 'pending',
+    locked_by = NULL,
+    heartbeat_at = NULL,
+    attempts = GREATEST(COALESCE(attempts, 1) - 1, 0),
+    available_at = CURRENT_TIMESTAMP,
+    current_step = 'Queued for processing',
+    updated_at = CURRENT_TIMESTAMP
+WHERE job_id = :job_id AND locked_by = :worker_id
+"""
+
+RETRY_OR_FAIL_SQL = """
+UPDATE chat_etl_jobs AS j
+SET status = CASE WHEN attempts >= :max_attempts THEN 'failure' ELSE 'pending' END,
+    locked_by = NULL,
+    heartbeat_at = NULL,
+    available_at = CURRENT_TIMESTAMP + make_interval(secs => :delay_seconds),
+    error_message = :error_message,
+    current_step = CASE WHEN attempts >= :max_attempts THEN 'Failed' ELSE 'Waiting for retry' END,
+    -- 파이프라인이 실패를 기록하며 채운 completed_at 은 재시도 대기 중에는 비운다
+    completed_at = CASE WHEN attempts >= :max_attempts THEN CURRENT_TIMESTAMP ELSE NULL END,
+    updated_at = CURRENT_TIMESTAMP
+WHERE job_id = :job_id AND locked_by = :worker_id
+"""
+
+# 수동 재시도: 같은 job_id 로 되돌려 저장된 단계 출력(etl.stage_store)부터 이어서 처리
+RETRY_FAILED_SQL = """
+UPDATE chat_etl_jobs AS j
+SET status = 'pending',
+    attempts = 0,
+    retry_count = COALESCE(retry_count, 0) + 1,
+    available_at = CURRENT_TIMESTAMP,
+    error_message = NULL,
+    error_type = NULL,
+    completed_at = NULL,
+    current_step = 'Queued for retry',
+    updated_at = CURRENT_TIMESTAMP
+WHERE job_id = :job_id AND status = 'failure' AND locked_by IS NULL
+"""
+
+RECLAIM_SQL = """
+UPDATE chat_etl_jobs AS j
+SET status = CASE WHEN attempts >= :max_attempts THEN 'failure' ELSE 'pending' END,
+    error_message = CASE
+        WHEN attempts >= :max_attempts
+        THEN 'ETL worker ' || locked_by || ' stopped heartbeating after ' || attempts || ' attempts'
+        ELSE error_message
+    END,
+    completed_at = CASE WHEN attempts >= :max_attempts THEN CURRENT_TIMESTAMP ELSE completed_at END,
+    current_step = CASE WHEN attempts >= :max_attempts THEN 'Failed' ELSE 'Queued for processing' END,
+    locked_by = NULL,
+    heartbeat_at = NULL,
+    available_at = CURRENT_TIMESTAMP,
+    updated_at = CURRENT_TIMESTAMP
+WHERE locked_by IS NOT NULL
+  AND heartbeat_at < CURRENT_TIMESTAMP - make_interval(secs => :visibility_timeout)
+"""
+
+@dataclass
+class ClaimedJob:
+    """A job leased to this worker"""
+    job_id: str
+    user_id: str
+    anp_seq: int
+    attempts: int
+    priority: str = JobPriority.INTERACTIVE.value
+    force: bool = False
+
+class ETLJobQueue:
+    """
+    chat_etl_jobs as a work queue.
+
+    - claim(): leases up to `limit` pending jobs to this worker, never letting
+      more than `max_concurrent_jobs` jobs run across all workers (0 = no bound);
+      the slots are split between the priority lanes by allocate_lane_slots
+    - heartbeat(): refreshes the lease of running jobs
+    - reclaim_expired(): puts jobs back whose lease is older than
+      `visibility_timeout` seconds, or fails them after `max_attempts`
+    """
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        max_concurrent_jobs: int = BACKGROUND_PROCESSING_CONFIG['max_concurrent_jobs'],
+        visibility_timeout: float = BACKGROUND_PROCESSING_CONFIG['job_visibility_timeout_seconds'],
+        max_attempts: int = BACKGROUND_PROCESSING_CONFIG['max_retries'],
+        session_factory=None,
+    ):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self._session_factory = session_factory or db_manager.get_async_session
+
+    async def claim(
+        self,
+        limit: int,
+        running: Optional[Dict[str, int]] = None,
+        capacity: Optional[int] = None,
+    ) -> List[ClaimedJob]:
+        """
+        Lease up to `limit` available jobs to this worker.
+
+        Lanes share the slots of the cluster (`max_concurrent_jobs` and the
+        running jobs of all workers) when it is bounded, otherwise those of
+        the caller's pool (`capacity` and its `running` jobs per lane).
+        """
+        if limit <= 0:
+            return []
+        async with self._session_factory() as session:
+            await session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CLAIM_LOCK_KEY})
+            counts = (await session.execute(text(LANE_COUNTS_SQL))).mappings().all()
+            pending = {row["priority"]: row["pending"] for row in counts}
+            if self.max_concurrent_jobs > 0:
+                running = {row["priority"]: row["running"] for row in counts}
+                capacity = self.max_concurrent_jobs
+                limit = min(limit, capacity - sum(running.values()))
+                if limit <= 0:
+                    return []
+            slots = allocate_lane_slots(
+                limit, capacity if capacity is not None else limit, running or {}, pending
+            )
+            rows = []
+            for lane in LANES:
+                if slots[lane] > 0:
+                    rows.extend((await session.execute(
+                        text(CLAIM_SQL), {"worker_id": self.worker_id, "limit": slots[lane], "priority": lane}
+                    )).mappings().all())
+
+        jobs = [
+            ClaimedJob(
+                job_id=str(r["job_id"]), user_id=str(r["user_id"]), anp_seq=r["anp_seq"],
+                attempts=r["attempts"], priority=r["priority"], force=bool(r["force_reprocess"]),
+            )
+            for r in rows
+        ]
+        if jobs:
+            logger.info(f"Worker {self.worker_id} claimed {len(jobs)} ETL job(s): {slots}")
+        return jobs
+
+    async def heartbeat(self, job_ids: List[str]) -> Set[str]:
+        """Refresh the lease of the given jobs; returns the ids this worker still holds"""
+        if not job_ids:
+            return set()
+        async with self._session_factory() as session:
+            rows = (await session.execute(
+                text(HEARTBEAT_SQL), {"job_ids": [uuid.UUID(j) for j in job_ids], "worker_id": self.worker_id}
+            )).scalars().all()
+        return {str(job_id) for job_id in rows}
+
+    async def release(self, job_id: str) -> None:
+        """Drop the lease of a finished job (its status was set by the pipeline)"""
+        async with self._session_factory() as session:
+            sql, params = publishing(RELEASE_SQL, {"job_id": uuid.UUID(job_id), "worker_id": self.worker_id})
+            await session.execute(text(sql), params)
+
+    async def requeue(self, job_id: str) -> None:
+        """Hand an unfinished job back without consuming an attempt (worker shutdown)"""
+        async with self._session_factory() as session:
+            sql, params = publishing(REQUEUE_SQL, {"job_id": uuid.UUID(job_id), "worker_id": self.worker_id})
+            await session.execute(text(sql), params)
+
+    async def retry_or_fail(self, job_id: str, error_message: str, delay_seconds: float) -> Optional[str]:
+        """Schedule another attempt after `delay_seconds`, or fail the job when attempts are used up"""
+        async with self._session_factory() as session:
+            sql, params = publishing(RETRY_OR_FAIL_SQL, {
+                "job_id": uuid.UUID(job_id),
+                "worker_id": self.worker_id,
+                "max_attempts": self.max_attempts,
+                "delay_seconds": float(delay_seconds),
+                "error_message": error_message,
+            }, returning=("status",))
+            status = (await session.execute(text(sql), params)).scalar()
+        return status
+
+    async def retry_failed(self, job_id: str) -> bool:
+        """Put a failed job back in the queue under the same job_id; False if it is not failed"""
+        async with self._session_factory() as session:
+            sql, params = publishing(RETRY_FAILED_SQL, {"job_id": uuid.UUID(job_id)}, returning=("job_id",))
+            row = (await session.execute(text(sql), params)).first()
+        return row is not None
+
+    async def reclaim_expired(self) -> int:
+        """Release jobs whose worker stopped heartbeating; returns the number reclaimed"""
+        async with self._session_factory() as session:
+            sql, params = publishing(RECLAIM_SQL, {
+                "max_attempts": self.max_attempts,
+                "visibility_timeout": float(self.visibility_timeout),
+            }, returning=("job_id", "status"))
+            rows = (await session.execute(text(sql), params)).mappings().all()
+        for row in rows:
+            logger.warning(f"Reclaimed ETL job {row['job_id']} with a stale heartbeat -> {row['status']}")
+        return len(rows)
+
+    async def get_job_outcomes(self, hours: int = 24) -> Dict[str, Any]:
+        """
+        Finished jobs of the last `hours` across all workers: counts per
+        outcome, failures per stage and the average time from enqueue to
+        completion per outcome.
+        """
+        async with self._session_factory() as session:
+            rows = (await session.execute(text(JOB_OUTCOMES_SQL), {"hours": hours})).mappings().all()
+        counts: Dict[str, int] = {}
+        seconds: Dict[str, float] = {}
+        failed_by_stage: Dict[str, int] = {}
+        for row in rows:
+            counts[row["status"]] = counts.get(row["status"], 0) + row["jobs"]
+            seconds[row["status"]] = seconds.get(row["status"], 0.0) + float(row["avg_seconds"] or 0.0) * row["jobs"]
+            if row["status"] == "failure":
+                stage = row["failed_stage"] or "unknown"
+                failed_by_stage[stage] = failed_by_stage.get(stage, 0) + row["jobs"]
+        return {
+            "window_hours": hours,
+            "succeeded": counts.get("success", 0),
+            "failed": counts.get("failure", 0),
+            "partial": counts.get("partial", 0),
+            "failed_by_stage": failed_by_stage,
+            "avg_seconds": {status: round(seconds[status] / counts[status], 3) for status in counts},
+        }
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and running jobs, in total and per lane"""
+        async with self._session_factory() as session:
+            rows = (await session.execute(text(LANE_COUNTS_SQL))).mappings().all()
+        lanes = {row["priority"]: {"pending": row["queued"], "running": row["running"]} for row in rows}
+        return {
+            "pending": sum(lane["pending"] for lane in lanes.values()),
+            "running": sum(lane["running"] for lane in lanes.values()),
+            "lanes": lanes,
+        }
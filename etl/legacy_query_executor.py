@@ -4,16 +4,28 @@ Wraps existing AptitudeTestQueries class with async interface and error handling
 """
 
 import asyncio
+import json
 import logging
-from typing import Dict, Any, List, Optional, Union
+import re
+from typing import Dict, Any, List, Optional, Tuple, Union, Callable, AsyncIterator
 from dataclasses import dataclass
 from datetime import datetime
 import traceback
+import threading
+import time
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, asynccontextmanager
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncConnection
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
+from etl.population_stats import PopulationStats, PopulationStatsCache
+from etl.reference_data import ReferenceDataSnapshot, ReferenceDataCache, SUBJECT_RANK_COLUMNS
+from etl.query_latency import QueryLatencyTracker
+from etl.job_lanes import FairShareLimiter
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -40,22 +52,112 @@ class QueryValidationError(Exception):
         self.validation_error = validation_error
         super().__init__(f"Query '{query_name}' validation failed: {validation_error}")
 
+# 레거시 조회는 AUTOCOMMIT 연결에서 돌므로 세션 단위(is_local=false)로 건다.
+# 연결에 걸린 값을 기억해 두고 값이 바뀔 때만 다시 보낸다
+STATEMENT_TIMEOUT_SQL = "SELECT set_config('statement_timeout', :timeout, false)"
+# 동기 백엔드: 풀 연결(connection.info)에 마지막으로 건 statement_timeout 값
+STATEMENT_TIMEOUT_INFO_KEY = "legacy_statement_timeout"
+
+def statement_timeout_setting(seconds: float) -> str:
+    """statement_timeout value for a timeout in seconds ('0' would disable it, so at least 1ms)"""
+    return f"{max(int(seconds * 1000), 1)}ms"
+
 class AptitudeTestQueries:
     """
     실제 레거시 DB의 mwd_* 테이블을 조회하여 결과를 반환하는 구현.
     PDF_RESULT.MD에 정의된 쿼리를 기반으로, 파이프라인에서 사용하는 키 이름에 맞춰 최소 핵심 결과를 제공합니다.
     """
 
-    def __init__(self, _unused_session: Session):
+    # 쿼리 이름 -> _query_* 메소드 이름. 쿼리 하나만 실행할 때 이 레지스트리로 바로 디스패치한다.
+    QUERY_METHODS: Dict[str, str] = {
+        "tendencyQuery": "_query_tendency",
+        "topTendencyQuery": "_query_top_tendency",
+        "thinkingSkillsQuery": "_query_thinking_skills",
+        "careerRecommendationQuery": "_query_career_recommendation",
+        "bottomTendencyQuery": "_query_bottom_tendency",
+        "personalityDetailQuery": "_query_personality_detail",
+        "strengthsWeaknessesQuery": "_query_strengths_weaknesses",
+        "learningStyleQuery": "_query_learning_style",
+        "learningStyleChartQuery": "_query_learning_style_chart",
+        "competencyAnalysisQuery": "_query_competency_analysis",
+        "competencySubjectsQuery": "_query_competency_subjects",
+        "competencyJobsQuery": "_query_competency_jobs",
+        "competencyJobMajorsQuery": "_query_competency_job_majors",
+        "dutiesQuery": "_query_duties",
+        "imagePreferenceStatsQuery": "_query_image_preference_stats",
+        "preferenceDataQuery": "_query_preference_data",
+        "preferenceJobsQuery": "_query_preference_jobs",
+        "tendencyStatsQuery": "_query_tendency_stats",
+        "thinkingSkillComparisonQuery": "_query_thinking_skill_comparison",
+        "personalInfoQuery": "_query_personal_info",
+        "subjectRanksQuery": "_query_subject_ranks",
+    }
+
+    # 아직 구현되지 않은 쿼리 키. execute_all_queries 결과에 빈 목록으로 채운다
+    PLACEHOLDER_QUERY_KEYS: Tuple[str, ...] = (
+        "jobMatchingQuery","majorRecommendationQuery",
+        "studyMethodQuery","socialSkillsQuery","leadershipQuery","communicationQuery","problemSolvingQuery",
+        "creativityQuery","analyticalThinkingQuery","practicalThinkingQuery","abstractThinkingQuery","memoryQuery",
+        "attentionQuery","processingSpeedQuery","spatialAbilityQuery","verbalAbilityQuery","numericalAbilityQuery",
+        "reasoningQuery","perceptionQuery","motivationQuery","interestQuery","valueQuery","workStyleQuery",
+        "environmentPreferenceQuery","teamworkQuery","independenceQuery","stabilityQuery","challengeQuery"
+    )
+
+    def __init__(
+        self,
+        _unused_session: Session,
+        population_stats: Optional[PopulationStats] = None,
+        reference_data: Optional[ReferenceDataSnapshot] = None,
+        statement_timeout: Optional[float] = None
+    ):
         # 파이프라인에서 AsyncSession 이 넘어오므로, 레거시 조회는 동기 세션을 별도로 연다
         from database.connection import db_manager
         self._sync_sess = db_manager.get_sync_session()
-
-    def _run(self, sql: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
-        rows = self._sync_sess.execute(text(sql), params).mappings().all()
-        return [dict(r) for r in rows]
+        # 초 단위. 설정되면 서버가 이 시간을 넘긴 문장을 취소한다 (대기만 끊으면 문장은 계속 돈다)
+        self.statement_timeout = statement_timeout
+        # 이 인스턴스가 레거시 DB로 보낸 SQL 문 수
+        self.statement_count = 0
+        # 모집단 통계 스냅샷이 있으면 통계 쿼리가 전체 테이블 대신 캐시된 집계와 조인한다
+        self.population_stats = population_stats
+        # 참조 데이터 스냅샷이 있으면 카탈로그 조인 없이 사용자 행만 읽고 이름은 파이썬에서 채운다
+        self.reference_data = reference_data
+
+    def _run(
+        self,
+        sql: str,
+        params: Dict[str, Any],
+        transform: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None
+    ) -> List[Dict[str, Any]]:
+        # 쿼리마다 독립 트랜잭션(AUTOCOMMIT): BEGIN/ROLLBACK 왕복이 없고, 세션 단위 설정이 풀 연결에 남는다
+        conn = self._sync_sess.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+        setting = statement_timeout_setting(self.statement_timeout) if self.statement_timeout else None
+        if setting != conn.info.get(STATEMENT_TIMEOUT_INFO_KEY):
+            # 쿼리마다 새 인스턴스가 만들어지므로, 같은 연결에 같은 값이면 다시 보내지 않는다
+            conn.execute(text(STATEMENT_TIMEOUT_SQL), {"timeout": setting or "0"})
+            conn.info[STATEMENT_TIMEOUT_INFO_KEY] = setting
+            self.statement_count += 1
+        self.statement_count += 1
+        rows = [dict(r) for r in conn.execute(text(sql), params).mappings().all()]
+        return transform(rows) if transform is not None else rows
+
+    def close(self) -> None:
+        """동기 세션을 반납한다."""
+        self._sync_sess.close()
+
+    def run_statement(self, statement: "LegacyStatement") -> List[Dict[str, Any]]:
+        """미리 만들어 둔 문장(LegacyStatement)을 실행한다."""
+        return self._run(statement.sql, statement.params, statement.transform)
+
+    def execute_query(self, query_name: str, anp_seq: int) -> List[Dict[str, Any]]:
+        """등록된 쿼리 하나만 실행한다. 예외는 호출자(재시도 로직)에게 그대로 전달한다."""
+        method_name = self.QUERY_METHODS.get(query_name)
+        if method_name is None:
+            raise KeyError(f"Unknown legacy query: {query_name}")
+        return getattr(self, method_name)(anp_seq)
 
     def _query_tendency(self, anp_seq: int) -> List[Dict[str, Any]]:
+        if self.reference_data is not None:
+            return self._query_tendency_with_reference(anp_seq)
         sql = """
         select max(case when rk = 1 then tnd end) as "Tnd1",
                max(case when rk = 2 then tnd end) as "Tnd2"
@@ -72,6 +174,8 @@ class AptitudeTestQueries:
         return self._run(sql, {"anp_seq": anp_seq})
 
     def _query_top_tendency(self, anp_seq: int) -> List[Dict[str, Any]]:
+        if self.reference_data is not None:
+            return self._query_top_tendency_with_reference(anp_seq)
         sql = """
         select qa.qua_name as tendency_name,
                sc1.sc1_rank as rank,
@@ -86,6 +190,8 @@ class AptitudeTestQueries:
 
     def _query_career_recommendation(self, anp_seq: int) -> List[Dict[str, Any]]:
         # PDF의 suitableJobsDetailQuery를 기반으로 job_code 포함, match_score는 가중치 없음으로 80 고정
+        if self.reference_data is not None:
+            return self._query_career_recommendation_with_reference(anp_seq)
         sql = """
         select jo.jo_code as job_code,
                jo.jo_name as job_name,
@@ -103,6 +209,8 @@ class AptitudeTestQueries:
 
     def _query_thinking_skills(self, anp_seq: int) -> List[Dict[str, Any]]:
         # PDF의 thinkingScoreQuery를 요약하여 8대 영역을 이름/점수로 매핑
+        if self.reference_data is not None:
+            return self._query_thinking_skills_with_reference(anp_seq)
         sql = """
         select qa.qua_name as skill_name,
                coalesce(round(sc1.sc1_rate * 100), 0)::int as score,
@@ -115,6 +223,8 @@ class AptitudeTestQueries:
         return self._run(sql, {"anp_seq": anp_seq})
 
     def _query_bottom_tendency(self, anp_seq: int) -> List[Dict[str, Any]]:
+        if self.reference_data is not None:
+            return self._query_bottom_tendency_with_reference(anp_seq)
         sql = """
         select qa.qua_name as tendency_name,
                sc1.sc1_rank as rank,
@@ -198,6 +308,8 @@ class AptitudeTestQueries:
         
     def _query_learning_style(self, anp_seq: int) -> List[Dict[str, Any]]:
         # 원본 #30 쿼리(learningStyleQuery) 기반
+        if self.reference_data is not None:
+            return self._query_learning_style_with_reference(anp_seq)
         sql = """
         SELECT
             (SELECT REPLACE(qa.qua_name, '형', '') FROM mwd_question_attr qa WHERE qa.qua_code = rv.rv_tnd1) AS tnd1_name,
@@ -220,6 +332,8 @@ class AptitudeTestQueries:
 
     def _query_learning_style_chart(self, anp_seq: int) -> List[Dict[str, Any]]:
         # 원본 #31 쿼리(style1ChartQuery) 기반
+        if self.reference_data is not None:
+            return self._query_learning_style_chart_with_reference(anp_seq)
         sql = """
         SELECT
             sr.sw_kindname AS item_name,
@@ -291,6 +405,8 @@ class AptitudeTestQueries:
     # ▼▼▼ [3단계: 추가된 메소드 3] ▼▼▼
     def _query_competency_jobs(self, anp_seq: int) -> List[Dict[str, Any]]:
         # 원본 #27 쿼리(competencyJobsQuery) 기반
+        if self.reference_data is not None:
+            return self._query_competency_jobs_with_reference(anp_seq)
         sql = """
         SELECT
           jo.jo_name, jo.jo_outline, jo.jo_mainbusiness, rj.rej_rank as rank
@@ -388,9 +504,31 @@ class AptitudeTestQueries:
         """
         return self._run(sql, {"anp_seq": anp_seq})
 
+    # ▼▼▼ 모집단 통계 집계 쿼리 (PopulationStatsCache 갱신용) ▼▼▼
+    def _query_population_tendency_counts(self) -> List[Dict[str, Any]]:
+        sql = """
+        SELECT rv_tnd1 AS qua_code,
+               COUNT(*) AS tendency_count,
+               SUM(COUNT(*)) OVER () AS total_count
+        FROM mwd_resval
+        GROUP BY rv_tnd1
+        """
+        return self._run(sql, {})
+
+    def _query_population_thinking_averages(self) -> List[Dict[str, Any]]:
+        sql = """
+        SELECT qua_code, AVG(sc1_rate * 100) AS avg_score
+        FROM mwd_score1
+        WHERE sc1_step = 'thk'
+        GROUP BY qua_code
+        """
+        return self._run(sql, {})
+
     # ▼▼▼ [5단계: 추가된 메소드 1] ▼▼▼
     def _query_tendency_stats(self, anp_seq: int) -> List[Dict[str, Any]]:
         # 원본 #34 쿼리(tendencyStatsQuery) 기반
+        if self.population_stats is not None:
+            return self._query_tendency_stats_cached(anp_seq)
         sql = """
         WITH TendencyCounts AS (
             SELECT rv_tnd1, COUNT(*) AS tendency_count
@@ -413,9 +551,37 @@ class AptitudeTestQueries:
         """
         return self._run(sql, {"anp_seq": anp_seq})
 
+    def _query_tendency_stats_cached(self, anp_seq: int) -> List[Dict[str, Any]]:
+        # 전체 mwd_resval 집계 대신 캐시된 성향별 건수를 배열 파라미터로 조인
+        stats = self.population_stats
+        sql = """
+        WITH TendencyCounts AS (
+            SELECT * FROM unnest(CAST(:tnd_codes AS text[]), CAST(:tnd_counts AS bigint[]))
+                AS t(rv_tnd1, tendency_count)
+        ), UserTendencies AS (
+            SELECT rv_tnd1, rv_tnd2 FROM mwd_resval WHERE anp_seq = :anp_seq
+        )
+        SELECT
+            qa.qua_name as tendency_name,
+            COALESCE(
+                (ROUND((tc.tendency_count::numeric / NULLIF(CAST(:total_count AS bigint), 0)) * 100, 1))::float, 0
+            ) as percentage
+        FROM UserTendencies ut
+        JOIN mwd_question_attr qa ON qa.qua_code IN (ut.rv_tnd1, ut.rv_tnd2)
+        LEFT JOIN TendencyCounts tc ON tc.rv_tnd1 = qa.qua_code
+        """
+        return self._run(sql, {
+            "anp_seq": anp_seq,
+            "tnd_codes": stats.tendency_codes,
+            "tnd_counts": stats.tendency_counts,
+            "total_count": stats.total_count,
+        })
+
     # ▼▼▼ [5단계: 추가된 메소드 2] ▼▼▼
     def _query_thinking_skill_comparison(self, anp_seq: int) -> List[Dict[str, Any]]:
         # 원본 #35 쿼리(thinkingSkillComparisonQuery) 기반
+        if self.population_stats is not None:
+            return self._query_thinking_skill_comparison_cached(anp_seq)
         sql = """
         WITH user_scores AS (
             SELECT qua_code, sc1_rate * 100 as score
@@ -439,6 +605,34 @@ class AptitudeTestQueries:
         """
         return self._run(sql, {"anp_seq": anp_seq})
 
+    def _query_thinking_skill_comparison_cached(self, anp_seq: int) -> List[Dict[str, Any]]:
+        # 전체 mwd_score1 평균 대신 캐시된 영역별 평균을 배열 파라미터로 조인
+        stats = self.population_stats
+        sql = """
+        WITH user_scores AS (
+            SELECT qua_code, sc1_rate * 100 as score
+            FROM mwd_score1
+            WHERE anp_seq = :anp_seq AND sc1_step = 'thk'
+        ),
+        average_scores AS (
+            SELECT * FROM unnest(CAST(:thk_codes AS text[]), CAST(:thk_avgs AS numeric[]))
+                AS a(qua_code, avg_score)
+        )
+        SELECT
+            qa.qua_name as skill_name,
+            us.score::int as my_score,
+            avgs.avg_score::int as average_score
+        FROM user_scores us
+        JOIN average_scores avgs ON us.qua_code = avgs.qua_code
+        JOIN mwd_question_attr qa ON us.qua_code = qa.qua_code
+        ORDER BY qa.qua_code
+        """
+        return self._run(sql, {
+            "anp_seq": anp_seq,
+            "thk_codes": stats.thinking_codes,
+            "thk_avgs": stats.thinking_averages,
+        })
+
     # ▼▼▼ [6단계: 추가된 메소드 1] ▼▼▼
     def _query_personal_info(self, anp_seq: int) -> List[Dict[str, Any]]:
         # 원본 #3 쿼리(personalInfoQuery) 기반
@@ -461,6 +655,8 @@ class AptitudeTestQueries:
     # ▼▼▼ [6단계: 추가된 메소드 2] ▼▼▼
     def _query_subject_ranks(self, anp_seq: int) -> List[Dict[str, Any]]:
         # 원본 #32 쿼리(subjectRanksQuery) 기반
+        if self.reference_data is not None:
+            return self._query_subject_ranks_with_reference(anp_seq)
         sql = """
         SELECT
             tsm_subject_group AS subject_group,
@@ -491,107 +687,788 @@ class AptitudeTestQueries:
         """
         return self._run(sql, {"anp_seq": anp_seq})
 
+    # ▼▼▼ 참조 데이터(정적 mwd_* 카탈로그) 스냅샷 ▼▼▼
+    # 카탈로그 테이블은 프로세스당 한 번 적재하고(ReferenceDataCache), 체크섬이 바뀔 때만 다시 읽는다.
+    # 투영/형변환은 적재 쿼리에서 SQL로 처리하므로, 아래 *_with_reference 메소드는 조회만 파이썬에서 한다.
+
+    def _query_reference_checksum(self) -> List[Dict[str, Any]]:
+        sql = """
+        SELECT md5(
+            (SELECT coalesce(string_agg(md5(t::text), '' ORDER BY md5(t::text)), '') FROM mwd_question_attr t) ||
+            (SELECT coalesce(string_agg(md5(t::text), '' ORDER BY md5(t::text)), '') FROM mwd_tendency_study t) ||
+            (SELECT coalesce(string_agg(md5(t::text), '' ORDER BY md5(t::text)), '') FROM mwd_studyway_rate t) ||
+            (SELECT coalesce(string_agg(md5(t::text), '' ORDER BY md5(t::text)), '') FROM mwd_tendency_subject_map t) ||
+            (SELECT coalesce(string_agg(md5(t::text), '' ORDER BY md5(t::text)), '') FROM mwd_job t)
+        ) AS checksum
+        """
+        return self._run(sql, {})
+
+    def _query_reference_question_attr(self) -> List[Dict[str, Any]]:
+        sql = "SELECT qua_code, qua_name FROM mwd_question_attr"
+        return self._run(sql, {})
+
+    def _query_reference_tendency_study(self) -> List[Dict[str, Any]]:
+        sql = "SELECT qua_code, tes_study_tendency, tes_study_way FROM mwd_tendency_study"
+        return self._run(sql, {})
+
+    def _query_reference_studyway_rate(self) -> List[Dict[str, Any]]:
+        sql = """
+        SELECT
+            qua_code,
+            sw_kindname AS item_name,
+            CAST(sw_rate * 100 AS INT) AS item_rate,
+            CASE
+              WHEN sw_color LIKE '#%%' THEN sw_color
+              ELSE REPLACE(REPLACE(sw_color, 'rgb(', 'rgba('), ')', ', 0.8)')
+            END AS item_color,
+            sw_type AS item_type
+        FROM mwd_studyway_rate
+        ORDER BY qua_code, sw_type, sw_kind
+        """
+        return self._run(sql, {})
+
+    def _query_reference_subject_map(self) -> List[Dict[str, Any]]:
+        sql = """
+        SELECT
+            tsm_subject_code,
+            tsm_subject_group AS subject_group,
+            tsm_subject_choice AS subject_choice,
+            tsm_subject AS subject_name,
+            tsm_subject_explain AS subject_explain,
+            CAST(tsm_communication_type AS INT) AS tsm_communication_type,
+            CAST(tsm_creation_type AS INT) AS tsm_creation_type,
+            CAST(tsm_cooperative_type AS INT) AS tsm_cooperative_type,
+            CAST(tsm_human_understanding_type AS INT) AS tsm_human_understanding_type,
+            CAST(tsm_artistic_type AS INT) AS tsm_artistic_type,
+            CAST(tsm_rational_type AS INT) AS tsm_rational_type,
+            CAST(tsm_factual_type AS INT) AS tsm_factual_type,
+            CAST(tsm_logical_type AS INT) AS tsm_logical_type,
+            CAST(tsm_alternative_seeking_type AS INT) AS tsm_alternative_seeking_type,
+            CAST(tsm_metacognitive_type AS INT) AS tsm_metacognitive_type,
+            CAST(tsm_problem_solving_type AS INT) AS tsm_problem_solving_type,
+            CAST(tsm_information_processing_type AS INT) AS tsm_information_processing_type,
+            CAST(tsm_resourceful_type AS INT) AS tsm_resourceful_type,
+            CAST(tsm_future_oriented_type AS INT) AS tsm_future_oriented_type,
+            CAST(tsm_adventurous_type AS INT) AS tsm_adventurous_type
+        FROM mwd_tendency_subject_map
+        WHERE tsm_use = 'Y'
+        ORDER BY tsm_subject_code
+        """
+        return self._run(sql, {})
+
+    def _query_reference_job(self) -> List[Dict[str, Any]]:
+        sql = "SELECT jo_code, jo_name, jo_outline, jo_mainbusiness FROM mwd_job"
+        return self._run(sql, {})
+
+    @staticmethod
+    def _strip_type_suffix(name: Optional[str]) -> Optional[str]:
+        return name.replace('형', '') if name is not None else None
+
+    @staticmethod
+    def _replace_owner(template: Optional[str], person_name: Optional[str]) -> Optional[str]:
+        # SQL의 REPLACE(x, 'OOO', pe_name || '님') 과 동일하게 NULL 이 하나라도 있으면 NULL
+        if template is None or person_name is None:
+            return None
+        return template.replace('OOO', person_name + '님')
+
+    def _query_tendency_with_reference(self, anp_seq: int) -> List[Dict[str, Any]]:
+        ref = self.reference_data
+        sql = "SELECT rv_tnd1, rv_tnd2 FROM mwd_resval WHERE anp_seq = :anp_seq"
+
+        def resolve(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            # 원본 쿼리는 집계 쿼리이므로 결과 행이 없어도 한 행을 반환한다
+            tnd1 = tnd2 = None
+            for row in rows:
+                tnd1 = tnd1 or self._strip_type_suffix(ref.qua_name(row["rv_tnd1"]))
+                tnd2 = tnd2 or self._strip_type_suffix(ref.qua_name(row["rv_tnd2"]))
+            return [{"Tnd1": tnd1, "Tnd2": tnd2}]
+
+        return self._run(sql, {"anp_seq": anp_seq}, resolve)
+
+    def _resolve_tendency_names(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        resolved = []
+        for row in rows:
+            name = self.reference_data.qua_name(row["code"])
+            if name is None:
+                continue
+            resolved.append({"tendency_name": name, "rank": row["rank"], "code": row["code"], "score": row["score"]})
+        return resolved
+
+    def _query_top_tendency_with_reference(self, anp_seq: int) -> List[Dict[str, Any]]:
+        sql = """
+        select sc1_rank as rank, qua_code as code, (round(sc1_rate * 100))::int as score
+        from mwd_score1
+        where anp_seq = :anp_seq and sc1_step='tnd' and sc1_rank <= 3
+        order by sc1_rank
+        """
+        return self._run(sql, {"anp_seq": anp_seq}, self._resolve_tendency_names)
+
+    def _query_bottom_tendency_with_reference(self, anp_seq: int) -> List[Dict[str, Any]]:
+        sql = """
+        select sc1.sc1_rank as rank, sc1.qua_code as code, (round(sc1.sc1_rate * 100))::int as score
+        from mwd_score1 sc1
+        where sc1.anp_seq = :anp_seq and sc1.sc1_step='tnd'
+        and sc1.sc1_rank > (select count(*) from mwd_score1 where anp_seq = :anp_seq and sc1_step='tnd') - 3
+        order by sc1.sc1_rank desc
+        """
+        return self._run(sql, {"anp_seq": anp_seq}, self._resolve_tendency_names)
+
+    def _query_thinking_skills_with_reference(self, anp_seq: int) -> List[Dict[str, Any]]:
+        ref = self.reference_data
+        sql = """
+        select qua_code,
+               coalesce(round(sc1_rate * 100), 0)::int as score,
+               coalesce(round(sc1_rate * 100), 0)::int as percentile
+        from mwd_score1
+        where anp_seq = :anp_seq and sc1_step = 'thk'
+        """
+
+        def resolve(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            resolved = [
+                {"skill_name": ref.qua_name(row["qua_code"]), "score": row["score"], "percentile": row["percentile"]}
+                for row in rows
+                if ref.qua_name(row["qua_code"]) is not None
+            ]
+            return sorted(resolved, key=lambda r: r["skill_name"])
+
+        return self._run(sql, {"anp_seq": anp_seq}, resolve)
+
+    def _query_career_recommendation_with_reference(self, anp_seq: int) -> List[Dict[str, Any]]:
+        ref = self.reference_data
+        sql = """
+        select rej_code
+        from mwd_resjob
+        where anp_seq = :anp_seq and rej_kind = 'rtnd' and rej_rank <= 7
+        order by rej_rank
+        """
+
+        def resolve(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            resolved = []
+            for row in rows:
+                job = ref.get_job(row["rej_code"])
+                if job is None:
+                    continue
+                resolved.append({
+                    "job_code": job["jo_code"],
+                    "job_name": job["jo_name"],
+                    "job_outline": job["jo_outline"] or '',
+                    "main_business": job["jo_mainbusiness"] or '',
+                    "match_score": 80,
+                })
+            return resolved
+
+        return self._run(sql, {"anp_seq": anp_seq}, resolve)
+
+    def _query_competency_jobs_with_reference(self, anp_seq: int) -> List[Dict[str, Any]]:
+        ref = self.reference_data
+        sql = """
+        SELECT rej_code, rej_rank AS rank
+        FROM mwd_resjob
+        WHERE anp_seq = :anp_seq AND rej_kind = 'rtal' AND rej_rank <= 7
+        ORDER BY rej_rank
+        """
+
+        def resolve(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            resolved = []
+            for row in rows:
+                job = ref.get_job(row["rej_code"])
+                if job is None:
+                    continue
+                resolved.append({
+                    "jo_name": job["jo_name"],
+                    "jo_outline": job["jo_outline"],
+                    "jo_mainbusiness": job["jo_mainbusiness"],
+                    "rank": row["rank"],
+                })
+            return resolved
+
+        return self._run(sql, {"anp_seq": anp_seq}, resolve)
+
+    def _query_learning_style_with_reference(self, anp_seq: int) -> List[Dict[str, Any]]:
+        ref = self.reference_data
+        sql = """
+        SELECT rv.rv_tnd1, rv.rv_tnd2, pe.pe_name
+        FROM mwd_resval rv
+        JOIN mwd_answer_progress ap ON ap.anp_seq = rv.anp_seq
+        JOIN mwd_account ac ON ac.ac_gid = ap.ac_gid
+        JOIN mwd_person pe ON pe.pe_seq = ac.pe_seq
+        WHERE rv.anp_seq = :anp_seq
+        """
+
+        def resolve(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            resolved = []
+            for row in rows:
+                tnd1, tnd2, pe_name = row["rv_tnd1"], row["rv_tnd2"], row["pe_name"]
+                ts1 = ref.tendency_study.get(str(tnd1)) if tnd1 is not None else None
+                ts2 = ref.tendency_study.get(str(tnd2)) if tnd2 is not None else None
+                if ts1 is None or ts2 is None:
+                    continue
+                resolved.append({
+                    "tnd1_name": self._strip_type_suffix(ref.qua_name(tnd1)),
+                    "tnd1_study_tendency": self._replace_owner(ts1["tes_study_tendency"], pe_name),
+                    "tnd1_study_way": self._replace_owner(ts1["tes_study_way"], pe_name),
+                    "tnd2_name": self._strip_type_suffix(ref.qua_name(tnd2)),
+                    "tnd2_study_tendency": self._replace_owner(ts2["tes_study_tendency"], pe_name),
+                    "tnd2_study_way": self._replace_owner(ts2["tes_study_way"], pe_name),
+                    # CAST(SUBSTRING(code, 4, 2) AS INT) - 10
+                    "tnd_row": int(str(tnd1)[3:5]) - 10,
+                    "tnd_col": int(str(tnd2)[3:5]) - 10,
+                })
+            return resolved
+
+        return self._run(sql, {"anp_seq": anp_seq}, resolve)
+
+    def _query_learning_style_chart_with_reference(self, anp_seq: int) -> List[Dict[str, Any]]:
+        ref = self.reference_data
+        sql = "SELECT rv_tnd1 FROM mwd_resval WHERE anp_seq = :anp_seq"
+
+        def resolve(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            resolved = []
+            for row in rows:
+                if row["rv_tnd1"] is not None:
+                    resolved.extend(dict(item) for item in ref.studyway_rate.get(str(row["rv_tnd1"]), []))
+            # 스냅샷 행은 (qua_code, sw_type, sw_kind) 순이므로 sw_type 기준 안정 정렬만 하면 된다
+            return sorted(resolved, key=lambda r: (r["item_type"] is None, r["item_type"]))
+
+        return self._run(sql, {"anp_seq": anp_seq}, resolve)
+
+    def _query_subject_ranks_with_reference(self, anp_seq: int) -> List[Dict[str, Any]]:
+        ref = self.reference_data
+        sql = "SELECT rv_tnd1 FROM mwd_resval WHERE anp_seq = :anp_seq"
+
+        def resolve(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            resolved = []
+            for row in rows:
+                rank_column = SUBJECT_RANK_COLUMNS.get(row["rv_tnd1"])
+                for subject in ref.tendency_subject_map:
+                    resolved.append({
+                        "subject_group": subject["subject_group"],
+                        "subject_choice": subject["subject_choice"],
+                        "subject_name": subject["subject_name"],
+                        "subject_explain": subject["subject_explain"],
+                        "rank": subject[rank_column] if rank_column else None,
+                        "_subject_code": subject["tsm_subject_code"],
+                    })
+            # ORDER BY rank, tsm_subject_code (PostgreSQL 오름차순은 NULL 을 마지막에 둔다)
+            resolved.sort(key=lambda r: (
+                r["rank"] is None, r["rank"], r["_subject_code"] is None, r["_subject_code"]
+            ))
+            for r in resolved:
+                del r["_subject_code"]
+            return resolved
+
+        return self._run(sql, {"anp_seq": anp_seq}, resolve)
+
     def execute_all_queries(self, anp_seq: int) -> Dict[str, List[Dict[str, Any]]]:
         results: Dict[str, List[Dict[str, Any]]] = {}
 
-        # --- 1단계까지 구현된 쿼리 호출 ---
-        try: results["tendencyQuery"] = self._query_tendency(anp_seq)
-        except Exception: results["tendencyQuery"] = []
-        try: results["topTendencyQuery"] = self._query_top_tendency(anp_seq)
-        except Exception: results["topTendencyQuery"] = []
-        try: results["thinkingSkillsQuery"] = self._query_thinking_skills(anp_seq)
-        except Exception: results["thinkingSkillsQuery"] = []
-        try: results["careerRecommendationQuery"] = self._query_career_recommendation(anp_seq)
-        except Exception: results["careerRecommendationQuery"] = []
-        try: results["bottomTendencyQuery"] = self._query_bottom_tendency(anp_seq)
-        except Exception: results["bottomTendencyQuery"] = []
-        try: results["personalityDetailQuery"] = self._query_personality_detail(anp_seq)
-        except Exception: results["personalityDetailQuery"] = []
-        try: results["strengthsWeaknessesQuery"] = self._query_strengths_weaknesses(anp_seq)
-        except Exception: results["strengthsWeaknessesQuery"] = []
-
-        # --- 2단계 추가 쿼리 호출 ---
-        try:
-            results["learningStyleQuery"] = self._query_learning_style(anp_seq)
-        except Exception: 
-            results["learningStyleQuery"] = []
-        try:
-            results["learningStyleChartQuery"] = self._query_learning_style_chart(anp_seq)
-        except Exception: 
-            results["learningStyleChartQuery"] = []
-
-        # ▼▼▼ [3단계: 추가된 쿼리 호출] ▼▼▼
-        try: results["competencyAnalysisQuery"] = self._query_competency_analysis(anp_seq)
-        except: results["competencyAnalysisQuery"] = []
-        try: results["competencySubjectsQuery"] = self._query_competency_subjects(anp_seq)
-        except: results["competencySubjectsQuery"] = []
-        try: results["competencyJobsQuery"] = self._query_competency_jobs(anp_seq)
-        except: results["competencyJobsQuery"] = []
-        try: results["competencyJobMajorsQuery"] = self._query_competency_job_majors(anp_seq)
-        except: results["competencyJobMajorsQuery"] = []
-        try: results["dutiesQuery"] = self._query_duties(anp_seq)
-        except: results["dutiesQuery"] = []
-
-        # ▼▼▼ [4단계: 추가된 쿼리 호출] ▼▼▼
-        try: results["imagePreferenceStatsQuery"] = self._query_image_preference_stats(anp_seq)
-        except: results["imagePreferenceStatsQuery"] = []
-        try: results["preferenceDataQuery"] = self._query_preference_data(anp_seq)
-        except: results["preferenceDataQuery"] = []
-        try: results["preferenceJobsQuery"] = self._query_preference_jobs(anp_seq)
-        except: results["preferenceJobsQuery"] = []
-
-        # ▼▼▼ [5단계: 추가된 쿼리 호출] ▼▼▼
-        try: results["tendencyStatsQuery"] = self._query_tendency_stats(anp_seq)
-        except: results["tendencyStatsQuery"] = []
-        try: results["thinkingSkillComparisonQuery"] = self._query_thinking_skill_comparison(anp_seq)
-        except: results["thinkingSkillComparisonQuery"] = []
-
-        # ▼▼▼ [6단계: 추가된 쿼리 호출] ▼▼▼
-        try: results["personalInfoQuery"] = self._query_personal_info(anp_seq)
-        except: results["personalInfoQuery"] = []
-        try: results["subjectRanksQuery"] = self._query_subject_ranks(anp_seq)
-        except: results["subjectRanksQuery"] = []
-
-
-       # [수정] remaining_keys 목록 업데이트
-        remaining_keys = [
-            "jobMatchingQuery","majorRecommendationQuery",
-            "studyMethodQuery","socialSkillsQuery","leadershipQuery","communicationQuery","problemSolvingQuery",
-            "creativityQuery","analyticalThinkingQuery","practicalThinkingQuery","abstractThinkingQuery","memoryQuery",
-            "attentionQuery","processingSpeedQuery","spatialAbilityQuery","verbalAbilityQuery","numericalAbilityQuery",
-            "reasoningQuery","perceptionQuery","motivationQuery","interestQuery","valueQuery","workStyleQuery",
-            "environmentPreferenceQuery","teamworkQuery","independenceQuery","stabilityQuery","challengeQuery"
-        ]
-        for key in remaining_keys:
+        for query_name in self.QUERY_METHODS:
+            try:
+                results[query_name] = self.execute_query(query_name, anp_seq)
+            except Exception:
+                results[query_name] = []
+
+        return self._with_placeholder_keys(results)
+
+    @classmethod
+    def _with_placeholder_keys(cls, results: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+        for key in cls.PLACEHOLDER_QUERY_KEYS:
             results.setdefault(key, [])
+        return results
 
+@dataclass
+class LegacyStatement:
+    """SQL statement produced by a _query_* method, executed later by an async backend"""
+    sql: str
+    params: Dict[str, Any]
+    transform: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None
+
+class LegacyStatementBuilder(AptitudeTestQueries):
+    """Builds the LegacyStatement of a _query_* method without executing it"""
+
+    def __init__(
+        self,
+        population_stats: Optional[PopulationStats] = None,
+        reference_data: Optional[ReferenceDataSnapshot] = None
+    ):
+        self.statement_count = 0
+        self.population_stats = population_stats
+        self.reference_data = reference_data
+
+    def _run(
+        self,
+        sql: str,
+        params: Dict[str, Any],
+        transform: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None
+    ) -> LegacyStatement:
+        return LegacyStatement(sql=sql, params=params, transform=transform)
+
+    def close(self) -> None:
+        pass
+
+    def build(self, query_name: str, anp_seq: int = 0) -> LegacyStatement:
+        return self.execute_query(query_name, anp_seq)
+
+BATCH_COLUMN = "r{index}"
+
+def combine_statements(statements: List[LegacyStatement]) -> LegacyStatement:
+    """
+    Combine independent statements into one statement (one round trip).
+
+    Each statement runs unchanged as a scalar subquery whose rows come back as
+    one JSON array column (r0, r1, ...). Bind parameters are prefixed per
+    statement so equal names with different values do not clash. The
+    statement's own ORDER BY stays inside a subquery that json_agg reads
+    directly; Postgres does not pull up a sorted subquery, so the array keeps
+    that order. Transforms are not attached; split_batch_row() returns raw rows.
+    """
+    columns = []
+    params: Dict[str, Any] = {}
+    for index, statement in enumerate(statements):
+        prefix = f"s{index}_"
+        sql = statement.sql
+        for name in statement.params:
+            # '::int' 같은 형변환은 건드리지 않는다
+            sql = re.sub(rf"(?<![:\w]):{name}\b", f":{prefix}{name}", sql)
+            params[prefix + name] = statement.params[name]
+        columns.append(
+            f"(SELECT coalesce(json_agg(q), '[]'::json) FROM ({sql}) q) AS {BATCH_COLUMN.format(index=index)}"
+        )
+    return LegacyStatement(sql="SELECT\n    " + ",\n    ".join(columns), params=params)
+
+def _json_rows(value: Any) -> List[Dict[str, Any]]:
+    # 드라이버/코덱 설정에 따라 json 이 문자열 또는 파싱된 값으로 온다
+    return json.loads(value) if isinstance(value, str) else list(value or [])
+
+def split_batch_row(row: Dict[str, Any], count: int) -> List[List[Dict[str, Any]]]:
+    """Per-statement rows of the single row returned by a combine_statements() statement"""
+    return [_json_rows(row[BATCH_COLUMN.format(index=index)]) for index in range(count)]
+
+BULK_SEQ_COLUMN = "bulk_anp_seq"
+BULK_ROWS_COLUMN = "bulk_rows"
+
+def to_bulk_statement(statement: LegacyStatement, anp_seqs: List[int]) -> LegacyStatement:
+    """
+    Turn a per-user statement into one statement for many anp_seqs.
+
+    The per-user SQL runs unchanged as a correlated subquery per anp_seq (so
+    per-user LIMIT, rank and aggregate semantics are preserved) and returns one
+    row per anp_seq with that user's rows as a JSON array, in the order of the
+    per-user ORDER BY (see combine_statements()). Users come back in input
+    order, numbered by WITH ORDINALITY. The per-user transform is not
+    attached; partition_bulk_rows() returns raw rows.
+    """
+    per_user_sql = re.sub(r"(?<![:\w]):anp_seq\b", "bulk_seqs.anp_seq", statement.sql)
+    sql = f"""
+    SELECT bulk_seqs.anp_seq AS {BULK_SEQ_COLUMN},
+           (SELECT coalesce(json_agg(q), '[]'::json) FROM ({per_user_sql}) q) AS {BULK_ROWS_COLUMN}
+    FROM unnest(CAST(:anp_seqs AS bigint[])) WITH ORDINALITY AS bulk_seqs(anp_seq, seq_order)
+    ORDER BY bulk_seqs.seq_order
+    """
+    params = {k: v for k, v in statement.params.items() if k != "anp_seq"}
+    params["anp_seqs"] = list(anp_seqs)
+    return LegacyStatement(sql=sql, params=params)
+
+def partition_bulk_rows(rows: List[Dict[str, Any]], anp_seqs: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """Split the rows of a to_bulk_statement() statement back into per-user row lists (users without rows get [])"""
+    partitions: Dict[int, List[Dict[str, Any]]] = {anp_seq: [] for anp_seq in anp_seqs}
+    for row in rows:
+        partitions[row[BULK_SEQ_COLUMN]] = _json_rows(row[BULK_ROWS_COLUMN])
+    return partitions
+
+class PrefetchedQueryResults:
+    """
+    Process-wide hand-off of query results extracted ahead of a job, e.g. by
+    one multi-user bulk extraction for the backfill jobs a worker claimed
+    together. Each entry is taken at most once and expires after
+    `ttl_seconds` (a job resumed past the query stage never takes it).
+    """
+
+    _singleton_instance = None
+
+    def __init__(self, ttl_seconds: float = 600.0):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, Tuple[float, Dict[str, QueryResult]]] = {}
+        self.hits = 0
+
+    @classmethod
+    def instance(cls) -> "PrefetchedQueryResults":
+        if cls._singleton_instance is None:
+            cls._singleton_instance = cls()
+        return cls._singleton_instance
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        for anp_seq in [k for k, (stored_at, _) in self._entries.items() if now - stored_at > self.ttl_seconds]:
+            del self._entries[anp_seq]
+
+    def put(self, anp_seq: int, results: Dict[str, QueryResult]) -> None:
+        self._purge_expired()
+        self._entries[anp_seq] = (time.monotonic(), results)
+
+    def take(self, anp_seq: int) -> Optional[Dict[str, QueryResult]]:
+        self._purge_expired()
+        entry = self._entries.pop(anp_seq, None)
+        if entry is None:
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class AsyncLegacyConnection:
+    """
+    Holds one pooled async connection for all legacy queries of a job.
+    The connection is opened lazily, discarded after a timeout and always
+    returned to the pool by close().
+    """
+
+    def __init__(self, engine=None):
+        self._engine = engine
+        self._conn: Optional[AsyncConnection] = None
+        self._statement_timeout: Optional[str] = None
+        # 이 연결로 보낸 SQL 문 수 (statement_timeout 설정 포함)
+        self.statement_count = 0
+
+    async def run(
+        self,
+        sql: str,
+        params: Dict[str, Any],
+        statement_timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        if self._conn is None:
+            if self._engine is None:
+                from database.connection import db_manager
+                self._engine = db_manager.get_async_engine()
+            conn = await self._engine.connect()
+            # 쿼리마다 독립 트랜잭션: 한 쿼리 실패가 나머지 쿼리를 중단시키지 않도록 한다
+            self._conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        setting = statement_timeout_setting(statement_timeout) if statement_timeout else None
+        if setting != self._statement_timeout:
+            # AUTOCOMMIT 이라 SET LOCAL 이 듣지 않으므로 세션 단위로 걸고 close() 에서 되돌린다
+            await self._conn.execute(
+                text(STATEMENT_TIMEOUT_SQL), {"timeout": setting or "0"}
+            )
+            self.statement_count += 1
+            self._statement_timeout = setting
+        self.statement_count += 1
+        result = await self._conn.execute(text(sql), params)
+        return [dict(r) for r in result.mappings().all()]
+
+    async def discard(self) -> None:
+        """Invalidate the connection (e.g. after a cancelled statement) so the next run reconnects"""
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._statement_timeout = None
+            try:
+                await conn.invalidate()
+            finally:
+                await conn.close()
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            try:
+                if self._statement_timeout is not None:
+                    self.statement_count += 1
+                    await conn.execute(text("RESET statement_timeout"))
+            finally:
+                self._statement_timeout = None
+                await conn.close()
+
+class AsyncAptitudeTestQueries(AptitudeTestQueries):
+    """
+    AptitudeTestQueries의 SQL을 그대로 재사용하되, 동기 세션 대신
+    AsyncLegacyConnection 위에서 실행하는 비동기 구현.
+    """
+
+    def __init__(
+        self,
+        connection: AsyncLegacyConnection,
+        population_stats: Optional[PopulationStats] = None,
+        reference_data: Optional[ReferenceDataSnapshot] = None,
+        statement_timeout: Optional[float] = None
+    ):
+        self._connection = connection
+        self.statement_count = 0
+        self.population_stats = population_stats
+        self.reference_data = reference_data
+        self.statement_timeout = statement_timeout
+
+    def _run(
+        self,
+        sql: str,
+        params: Dict[str, Any],
+        transform: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None
+    ) -> LegacyStatement:
+        return LegacyStatement(sql=sql, params=params, transform=transform)
+
+    def close(self) -> None:
+        pass
+
+    async def execute_query(self, query_name: str, anp_seq: int) -> List[Dict[str, Any]]:
+        return await self.run_statement(super().execute_query(query_name, anp_seq))
+
+    async def run_statement(self, statement: LegacyStatement) -> List[Dict[str, Any]]:
+        # 연결이 함께 보낸 statement_timeout 설정도 센다
+        sent = self._connection.statement_count
+        try:
+            rows = await self._connection.run(statement.sql, statement.params, statement_timeout=self.statement_timeout)
+        finally:
+            self.statement_count += self._connection.statement_count - sent
+        return statement.transform(rows) if statement.transform is not None else rows
+
+    async def execute_queries(
+        self, query_names: List[str], anp_seq: int
+    ) -> List[Union[List[Dict[str, Any]], Exception]]:
+        """
+        Run the given queries as one combined statement (one round trip).
+        A failing combined statement raises; a failing per-query transform is
+        returned in that query's place.
+        """
+        statements = [AptitudeTestQueries.execute_query(self, name, anp_seq) for name in query_names]
+        (row,) = await self.run_statement(combine_statements(statements))
+        results: List[Union[List[Dict[str, Any]], Exception]] = []
+        for statement, rows in zip(statements, split_batch_row(row, len(statements))):
+            try:
+                results.append(statement.transform(rows) if statement.transform is not None else rows)
+            except Exception as e:
+                results.append(e)
         return results
 
+    async def execute_all_queries(self, anp_seq: int) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run every registered query in one round trip on the shared connection.
+        If the combined statement fails, the queries run one by one so a single
+        broken query does not fail the others (failed queries yield []).
+        """
+        query_names = list(self.QUERY_METHODS)
+        results: Dict[str, List[Dict[str, Any]]] = {}
+
+        try:
+            batch = await self.execute_queries(query_names, anp_seq)
+        except Exception:
+            batch = None
+
+        for index, query_name in enumerate(query_names):
+            if batch is not None and not isinstance(batch[index], Exception):
+                results[query_name] = batch[index]
+                continue
+            try:
+                results[query_name] = await self.execute_query(query_name, anp_seq)
+            except Exception:
+                results[query_name] = []
+
+        return self._with_placeholder_keys(results)
+
+def _discard_future_result(future: asyncio.Future) -> None:
+    # 버려진 헤지 시도의 예외가 "never retrieved" 경고로 남지 않도록 소비한다
+    if not future.cancelled():
+        future.exception()
+
 class LegacyQueryExecutor:
     """
     Async wrapper for existing AptitudeTestQueries class
     Provides error handling, retry logic, and result validation
+
+    Two backends are available:
+    - "thread": sync sessions on a ThreadPoolExecutor (default)
+    - "async": all queries of a job on one pooled async connection, sent as one
+      combined statement (one round trip)
     """
+
+    BACKEND_THREAD = "thread"
+    BACKEND_ASYNC = "async"
     
-    def __init__(self, max_retries: int = 3, retry_delay: float = 1.0, max_workers: int = 4, query_timeout: float = 120.0):
+    def __init__(
+        self,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        max_workers: int = 4,
+        query_timeout: float = 120.0,
+        backend: str = BACKEND_THREAD,
+        legacy_engine=None,
+        use_population_stats: bool = True,
+        use_reference_data: bool = True,
+        adaptive_timeouts: bool = True,
+        bulk_chunk_size: int = 500,
+        use_prefetched_results: bool = True,
+    ):
+        if backend not in (self.BACKEND_THREAD, self.BACKEND_ASYNC):
+            raise ValueError(f"Unknown legacy query backend: {backend}")
         self.max_retries = max_retries
         self.retry_delay = retry_delay
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.backend = backend
+        self.legacy_engine = legacy_engine
+        # 모집단 통계는 프로세스 전역 캐시를 공유한다
+        self.population_stats_cache = PopulationStatsCache.instance() if use_population_stats else None
+        # 정적 카탈로그(mwd_question_attr, mwd_job 등) 스냅샷도 프로세스 전역으로 공유한다
+        self.reference_data_cache = ReferenceDataCache.instance() if use_reference_data else None
+        self.executor = ThreadPoolExecutor(max_workers=max_workers) if backend == self.BACKEND_THREAD else None
         self.query_validators = self._setup_validators()
         self.query_timeout = query_timeout
+        # 쿼리별 지연 이력(프로세스 전역)으로 타임아웃과 헤지 지연을 정한다. query_timeout 은 상한이 된다
+        self.latency_tracker = QueryLatencyTracker.instance() if adaptive_timeouts else None
+        # 다중 사용자 추출 시 한 문장에 넣는 anp_seq 수
+        self.bulk_chunk_size = bulk_chunk_size
+        # 미리 추출해 둔 결과(PrefetchedQueryResults)가 있으면 그 쿼리는 다시 보내지 않는다
+        self.prefetched_results = PrefetchedQueryResults.instance() if use_prefetched_results else None
         
         # ▼▼▼ [6단계 수정] 실제로 구현된 쿼리 목록을 클래스 변수로 관리합니다. ▼▼▼
-        self.IMPLEMENTED_QUERIES = [
-            "tendencyQuery", "topTendencyQuery", "thinkingSkillsQuery",
-            "careerRecommendationQuery", "bottomTendencyQuery",
-            "personalityDetailQuery", "strengthsWeaknessesQuery",
-            "learningStyleQuery", "learningStyleChartQuery",
-            "competencyAnalysisQuery", "competencySubjectsQuery",
-            "competencyJobsQuery", "competencyJobMajorsQuery", "dutiesQuery",
-            "imagePreferenceStatsQuery", "preferenceDataQuery", "preferenceJobsQuery",
-            "tendencyStatsQuery", "thinkingSkillComparisonQuery",
-            "personalInfoQuery", "subjectRanksQuery",
-        ]
+        self.IMPLEMENTED_QUERIES = list(AptitudeTestQueries.QUERY_METHODS)
+
+        # 진행 중인 anp_seq(작업)별로 레거시 DB에 보낸 SQL 문 수. 작업이 끝나면 꺼낸다
+        self.statements_issued: Dict[int, int] = {}
+        # 끝난 작업의 문장 수는 최근 것만 남겨 오래 사는 워커에서도 커지지 않게 한다
+        self._finished_statements: "OrderedDict[int, int]" = OrderedDict()
+        self._statement_lock = threading.Lock()
+        # 다중 사용자 추출(execute_bulk_queries_async)로 보낸 SQL 문 수
+        self.bulk_statements_issued = 0
+
+    FINISHED_STATEMENT_HISTORY = 256
+
+    def get_statement_count(self, anp_seq: int) -> int:
+        """Return number of legacy SQL statements issued for the given anp_seq"""
+        with self._statement_lock:
+            if anp_seq in self.statements_issued:
+                return self.statements_issued[anp_seq]
+            return self._finished_statements.get(anp_seq, 0)
+
+    def _finish_statement_count(self, anp_seq: int) -> int:
+        """Stop tracking anp_seq as in flight and return its final statement count"""
+        with self._statement_lock:
+            if anp_seq in self.statements_issued:
+                self._finished_statements[anp_seq] = self.statements_issued.pop(anp_seq)
+                self._finished_statements.move_to_end(anp_seq)
+                while len(self._finished_statements) > self.FINISHED_STATEMENT_HISTORY:
+                    self._finished_statements.popitem(last=False)
+            return self._finished_statements.get(anp_seq, 0)
+
+    def _count_statements(self, anp_seq: int, count: int) -> None:
+        with self._statement_lock:
+            # 끝난 작업에 늦게 끝난 시도(버려진 헤지, 취소된 스레드)가 항목을 되살리지 않게 한다
+            if anp_seq in self.statements_issued:
+                self.statements_issued[anp_seq] += count
+
+    async def _run_catalog_queries(
+        self,
+        session: Session,
+        anp_seq: Optional[int],
+        method_names: List[str],
+        connection: Optional[AsyncLegacyConnection] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Run parameterless AptitudeTestQueries methods (population / reference data loads) on the configured backend"""
+        def count(queries: AptitudeTestQueries) -> None:
+            if anp_seq is not None:
+                self._count_statements(anp_seq, queries.statement_count)
+
+        if connection is not None:
+            queries = AsyncAptitudeTestQueries(connection)
+            try:
+                return [await queries.run_statement(getattr(queries, name)()) for name in method_names]
+            finally:
+                count(queries)
+
+        def run_catalog_queries():
+            queries = AptitudeTestQueries(session)
+            try:
+                return [getattr(queries, name)() for name in method_names]
+            finally:
+                count(queries)
+                queries.close()
+
+        loop = asyncio.get_event_loop()
+        return await asyncio.wait_for(
+            loop.run_in_executor(self.executor, run_catalog_queries),
+            timeout=self.query_timeout,
+        )
+
+    async def _ensure_population_stats(
+        self,
+        session: Session,
+        anp_seq: Optional[int],
+        connection: Optional[AsyncLegacyConnection] = None
+    ) -> Optional[PopulationStats]:
+        """Return population statistics snapshot, refreshing it first if stale"""
+        cache = self.population_stats_cache
+        if cache is None or not cache.enabled:
+            return None
+
+        if cache.is_stale():
+            async with cache.refresh_lock:
+                if cache.is_stale():
+                    try:
+                        tendency_rows, thinking_rows = await self._run_catalog_queries(
+                            session, anp_seq,
+                            ["_query_population_tendency_counts", "_query_population_thinking_averages"],
+                            connection,
+                        )
+                        cache.update(PopulationStats.from_rows(tendency_rows, thinking_rows))
+                    except Exception as e:
+                        if connection is not None:
+                            await connection.discard()
+                        logger.warning(
+                            f"Population statistics refresh failed, "
+                            f"{'using previous snapshot' if cache.get() else 'falling back to full-table queries'}: {e}"
+                        )
+
+        return cache.get()
+
+    async def _ensure_reference_data(
+        self,
+        session: Session,
+        anp_seq: Optional[int],
+        connection: Optional[AsyncLegacyConnection] = None
+    ) -> Optional[ReferenceDataSnapshot]:
+        """Return reference data snapshot; reload the catalogs only when their checksum changed"""
+        cache = self.reference_data_cache
+        if cache is None or not cache.enabled:
+            return None
+
+        if cache.needs_check():
+            async with cache.refresh_lock:
+                if cache.needs_check():
+                    try:
+                        (checksum_rows,) = await self._run_catalog_queries(
+                            session, anp_seq, ["_query_reference_checksum"], connection
+                        )
+                        checksum = str(checksum_rows[0]["checksum"])
+                        current = cache.get()
+                        if current is not None and current.version == checksum:
+                            cache.mark_checked()
+                        else:
+                            rows = await self._run_catalog_queries(
+                                session, anp_seq,
+                                [
+                                    "_query_reference_question_attr",
+                                    "_query_reference_tendency_study",
+                                    "_query_reference_studyway_rate",
+                                    "_query_reference_subject_map",
+                                    "_query_reference_job",
+                                ],
+                                connection,
+                            )
+                            cache.update(ReferenceDataSnapshot.from_rows(checksum, *rows))
+                    except Exception as e:
+                        if connection is not None:
+                            await connection.discard()
+                        logger.warning(
+                            f"Reference data refresh failed, "
+                            f"{'using previous snapshot' if cache.get() else 'falling back to catalog joins'}: {e}"
+                        )
+
+        return cache.get()
+
+    async def warm_up(self, session: Session = None) -> None:
+        """Load the process-wide population / reference data caches before the first job (e.g. at worker start)"""
+        connection = AsyncLegacyConnection(self.legacy_engine) if self.backend == self.BACKEND_ASYNC else None
+        try:
+            await self._ensure_reference_data(session, None, connection)
+            await self._ensure_population_stats(session, None, connection)
+        finally:
+            if connection is not None:
+                await connection.close()
 
     def _setup_validators(self) -> Dict[str, callable]:
         """Setup validation functions for different query types"""
@@ -954,33 +1831,132 @@ class LegacyQueryExecutor:
                 
         return cleaned_data
     
+    async def _run_in_thread_hedged(
+        self,
+        execute_query: Callable[[Optional[threading.Event]], Tuple[List[Dict[str, Any]], float]],
+        query_name: str,
+        timeout: float
+    ) -> Tuple[List[Dict[str, Any]], float]:
+        """
+        Run a query on the thread pool. For cheap queries (per latency history) a
+        second, hedged attempt is sent once the first has been executing longer
+        than the query's p95; the first successful result wins. Each attempt
+        carries `timeout` as its statement_timeout, so an abandoned attempt is
+        cancelled by the server instead of holding a thread and a replica
+        backend until it finishes.
+        """
+        loop = asyncio.get_event_loop()
+        first_started = threading.Event()
+        first = loop.run_in_executor(self.executor, execute_query, first_started)
+
+        hedge_delay = self.latency_tracker.hedge_delay(query_name) if self.latency_tracker is not None else None
+        if hedge_delay is None or hedge_delay >= timeout:
+            return await asyncio.wait_for(first, timeout=timeout)
+
+        done, _ = await asyncio.wait({first}, timeout=hedge_delay)
+        if first in done:
+            return first.result()
+        if not first_started.is_set():
+            # 아직 스레드 풀 대기열에 있으면 헤지 요청도 같은 대기열 뒤에 설 뿐이다
+            return await asyncio.wait_for(first, timeout=timeout - hedge_delay)
+
+        self.latency_tracker.hedged += 1
+        logger.info(f"Query '{query_name}' exceeded p95 ({hedge_delay * 1000:.0f}ms), sending hedged request")
+        second = loop.run_in_executor(self.executor, execute_query, threading.Event())
+
+        pending = {first, second}
+        deadline = loop.time() + timeout - hedge_delay
+        error: Optional[BaseException] = None
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        self.latency_tracker.hedge_wins += 1
+                    # 진 쪽 시도는 statement_timeout 안에 끝나며, 그 결과/예외는 버린다
+                    for loser in pending:
+                        loser.add_done_callback(_discard_future_result)
+                    return future.result()
+                error = future.exception()
+
+        for loser in pending:
+            loser.add_done_callback(_discard_future_result)
+        if error is not None and not pending:
+            raise error
+        raise asyncio.TimeoutError()
+
+    def _timeout_for(self, query_name: str) -> float:
+        if self.latency_tracker is None:
+            return self.query_timeout
+        return self.latency_tracker.timeout_for(query_name, self.query_timeout)
+
     async def _execute_single_query_with_retry(
         self, 
         session: Session, 
         anp_seq: int, 
-        query_name: str
+        query_name: str,
+        connection: Optional[AsyncLegacyConnection] = None,
+        population_stats: Optional[PopulationStats] = None,
+        reference_data: Optional[ReferenceDataSnapshot] = None
     ) -> QueryResult:
-        """Execute a single query with retry logic"""
+        """Execute a single query with retry logic (async backend when a connection is given)"""
         
         for attempt in range(self.max_retries + 1):
             start_time = datetime.now()
             logger.info(f"Query '{query_name}' attempting to execute (attempt {attempt + 1})")
+            timeout = self._timeout_for(query_name)
             try:
-                loop = asyncio.get_event_loop()
+                # 실행 시간은 스레드가 실제로 시작한 뒤부터 잰다 (스레드 풀 대기 시간은 지연 이력에 넣지 않는다)
+                def execute_query(started: Optional[threading.Event] = None):
+                    if started is not None:
+                        started.set()
+                    began = time.perf_counter()
+                    aptitude_queries = AptitudeTestQueries(
+                        session, population_stats=population_stats, reference_data=reference_data,
+                        statement_timeout=timeout
+                    )
+                    try:
+                        return aptitude_queries.execute_query(query_name, anp_seq), time.perf_counter() - began
+                    finally:
+                        self._count_statements(anp_seq, aptitude_queries.statement_count)
+                        aptitude_queries.close()
+
+                async_queries = None
+                if connection is not None:
+                    async_queries = AsyncAptitudeTestQueries(
+                        connection, population_stats=population_stats, reference_data=reference_data,
+                        statement_timeout=timeout
+                    )
+
+                    async def execute_query_async():
+                        began = time.perf_counter()
+                        rows = await async_queries.execute_query(query_name, anp_seq)
+                        return rows, time.perf_counter() - began
 
-                def execute_query():
-                    aptitude_queries = AptitudeTestQueries(session)
-                    all_results = aptitude_queries.execute_all_queries(anp_seq)
-                    return all_results.get(query_name, [])
+                    pending = asyncio.wait_for(execute_query_async(), timeout=timeout)
+                else:
+                    pending = self._run_in_thread_hedged(execute_query, query_name, timeout)
 
                 try:
-                    data = await asyncio.wait_for(
-                        loop.run_in_executor(self.executor, execute_query),
-                        timeout=self.query_timeout,
-                    )
+                    # 레거시 DB 는 작업 레인 사이에서 가중 공정 분배한다 (etl.job_lanes).
+                    # async 백엔드는 연결을 열기 전에 작업 단위로 슬롯을 잡았다 (_legacy_connection).
+                    # 레인 대기 시간은 실행 시간(지연 이력)에 넣지 않는다
+                    async with AsyncExitStack() as lane:
+                        if connection is None:
+                            await lane.enter_async_context(FairShareLimiter.instance("legacy_db").slot())
+                        start_time = datetime.now()
+                        data, execution_time = await pending
                 except asyncio.TimeoutError:
                     execution_time = (datetime.now() - start_time).total_seconds()
-                    logger.error(f"Query '{query_name}' timed out after {self.query_timeout}s")
+                    if self.latency_tracker is not None:
+                        self.latency_tracker.timeouts += 1
+                    logger.error(f"Query '{query_name}' timed out after {timeout:.1f}s")
+                    if connection is not None:
+                        # 취소된 문장이 남은 연결은 재사용하지 않는다
+                        await connection.discard()
                     if attempt < self.max_retries:
                         wait_time = self.retry_delay * (2 ** attempt)
                         logger.warning(f"Retrying '{query_name}' in {wait_time}s due to timeout (attempt {attempt + 1}/{self.max_retries + 1})")
@@ -990,10 +1966,14 @@ class LegacyQueryExecutor:
                         return QueryResult(
                             query_name=query_name,
                             success=False,
-                            error=f"timeout after {self.query_timeout}s",
+                            error=f"timeout after {timeout:.1f}s",
                             execution_time=execution_time,
                         )
-                execution_time = (datetime.now() - start_time).total_seconds()
+                finally:
+                    if async_queries is not None:
+                        self._count_statements(anp_seq, async_queries.statement_count)
+                if self.latency_tracker is not None:
+                    self.latency_tracker.record(query_name, execution_time)
                 
                 cleaned_data = self._clean_query_data(query_name, data)
                 
@@ -1018,6 +1998,8 @@ class LegacyQueryExecutor:
                 
             except Exception as e:
                 execution_time = (datetime.now() - start_time).total_seconds()
+                if connection is not None and not isinstance(e, QueryValidationError):
+                    await connection.discard()
                 
                 if attempt < self.max_retries:
                     wait_time = self.retry_delay * (2 ** attempt)
@@ -1045,6 +2027,255 @@ class LegacyQueryExecutor:
             error="Unknown error occurred"
         )
     
+    @asynccontextmanager
+    async def _legacy_connection(self) -> AsyncIterator[AsyncLegacyConnection]:
+        """
+        Pooled async connection for one job, opened only after the job's lane
+        got a legacy_db slot so a queued job never holds a connection it
+        cannot use. Always returned to the pool.
+        """
+        async with FairShareLimiter.instance("legacy_db").slot():
+            connection = AsyncLegacyConnection(self.legacy_engine)
+            try:
+                yield connection
+            finally:
+                await connection.close()
+
+    async def _execute_query_batch(
+        self,
+        session: Session,
+        anp_seq: int,
+        query_names: List[str],
+        connection: AsyncLegacyConnection,
+        population_stats: Optional[PopulationStats] = None,
+        reference_data: Optional[ReferenceDataSnapshot] = None
+    ) -> List[QueryResult]:
+        """
+        Run the queries on the async connection as one combined statement, so
+        the job pays one round trip instead of one per query. Queries whose
+        rows fail transformation or validation, or every query if the
+        combined statement fails, are re-run one by one with retry logic.
+        Batched results carry the batch's execution time and are not added to
+        the per-query latency history.
+        """
+        timeout = min(sum(self._timeout_for(name) for name in query_names), self.query_timeout)
+        queries = AsyncAptitudeTestQueries(
+            connection, population_stats=population_stats, reference_data=reference_data,
+            statement_timeout=timeout
+        )
+        start_time = datetime.now()
+        try:
+            batch = await asyncio.wait_for(queries.execute_queries(query_names, anp_seq), timeout=timeout)
+        except Exception as e:
+            # 취소되었거나 실패한 문장이 남은 연결은 재사용하지 않는다
+            await connection.discard()
+            logger.warning(
+                f"Batched execution of {len(query_names)} queries failed for anp_seq {anp_seq}, "
+                f"running them one by one: {e}"
+            )
+            batch = [e] * len(query_names)
+        finally:
+            self._count_statements(anp_seq, queries.statement_count)
+        execution_time = (datetime.now() - start_time).total_seconds()
+
+        results: List[QueryResult] = []
+        for query_name, data in zip(query_names, batch):
+            if not isinstance(data, Exception):
+                cleaned_data = self._clean_query_data(query_name, data)
+                if self._validate_query_result(query_name, cleaned_data):
+                    results.append(QueryResult(
+                        query_name=query_name,
+                        success=True,
+                        data=cleaned_data,
+                        execution_time=execution_time,
+                        row_count=len(cleaned_data)
+                    ))
+                    continue
+            results.append(await self._execute_single_query_with_retry(
+                session, anp_seq, query_name, connection=connection,
+                population_stats=population_stats, reference_data=reference_data
+            ))
+        return results
+
+    def _take_prefetched(self, anp_seq: int) -> Dict[str, QueryResult]:
+        """Successful prefetched results of the job, if a bulk extraction covered it"""
+        if self.prefetched_results is None:
+            return {}
+        prefetched = self.prefetched_results.take(anp_seq) or {}
+        return {
+            name: result for name, result in prefetched.items()
+            if result.success and name in self.IMPLEMENTED_QUERIES
+        }
+
+    async def _execute_bulk_query_with_retry(
+        self,
+        session: Session,
+        anp_seqs: List[int],
+        query_name: str,
+        connection: Optional[AsyncLegacyConnection] = None,
+        population_stats: Optional[PopulationStats] = None,
+        reference_data: Optional[ReferenceDataSnapshot] = None
+    ) -> Dict[int, QueryResult]:
+        """Execute one query for many anp_seqs in a single statement, returning per-user results"""
+        statement = LegacyStatementBuilder(population_stats, reference_data).build(query_name)
+        bulk_statement = to_bulk_statement(statement, anp_seqs)
+
+        rows: List[Dict[str, Any]] = []
+        for attempt in range(self.max_retries + 1):
+            start_time = datetime.now()
+            try:
+                def run_bulk_statement():
+                    aptitude_queries = AptitudeTestQueries(session, statement_timeout=self.query_timeout)
+                    try:
+                        return aptitude_queries.run_statement(bulk_statement)
+                    finally:
+                        aptitude_queries.close()
+
+                # 백필 규모의 조회도 단건 조회와 같은 레인 공정 분배를 거친다.
+                # async 백엔드는 연결을 열기 전에 이미 슬롯을 잡았다 (_legacy_connection)
+                async with AsyncExitStack() as lane:
+                    if connection is None:
+                        await lane.enter_async_context(FairShareLimiter.instance("legacy_db").slot())
+                    start_time = datetime.now()
+                    if connection is not None:
+                        pending = AsyncAptitudeTestQueries(
+                            connection, statement_timeout=self.query_timeout
+                        ).run_statement(bulk_statement)
+                    else:
+                        pending = asyncio.get_event_loop().run_in_executor(self.executor, run_bulk_statement)
+
+                    self.bulk_statements_issued += 1
+                    rows = await asyncio.wait_for(pending, timeout=self.query_timeout)
+                break
+            except Exception as e:
+                execution_time = (datetime.now() - start_time).total_seconds()
+                if connection is not None:
+                    await connection.discard()
+                error = f"timeout after {self.query_timeout}s" if isinstance(e, asyncio.TimeoutError) else str(e)
+                if attempt < self.max_retries:
+                    wait_time = self.retry_delay * (2 ** attempt)
+                    logger.warning(
+                        f"Bulk query '{query_name}' ({len(anp_seqs)} users) failed on attempt "
+                        f"{attempt + 1}/{self.max_retries + 1}: {error}. Retrying in {wait_time}s..."
+                    )
+                    await asyncio.sleep(wait_time)
+                    continue
+                logger.error(f"Bulk query '{query_name}' failed after {self.max_retries + 1} attempts: {error}")
+                return {
+                    anp_seq: QueryResult(query_name=query_name, success=False, error=error, execution_time=execution_time)
+                    for anp_seq in anp_seqs
+                }
+
+        execution_time = (datetime.now() - start_time).total_seconds()
+        results: Dict[int, QueryResult] = {}
+        for anp_seq, data in partition_bulk_rows(rows, anp_seqs).items():
+            try:
+                if statement.transform is not None:
+                    data = statement.transform(data)
+                cleaned_data = self._clean_query_data(query_name, data)
+                if not self._validate_query_result(query_name, cleaned_data):
+                    raise QueryValidationError(query_name, f"Query result validation failed for {query_name}")
+                results[anp_seq] = QueryResult(
+                    query_name=query_name,
+                    success=True,
+                    data=cleaned_data,
+                    execution_time=execution_time,
+                    row_count=len(cleaned_data)
+                )
+            except Exception as e:
+                results[anp_seq] = QueryResult(
+                    query_name=query_name, success=False, error=str(e), execution_time=execution_time
+                )
+        return results
+
+    async def execute_bulk_queries_async(
+        self,
+        session: Session,
+        anp_seqs: List[int]
+    ) -> Dict[int, Dict[str, QueryResult]]:
+        """
+        Execute all queries for many users (reprocessing / backfill).
+
+        Each query runs once per chunk of `bulk_chunk_size` anp_seqs and the rows
+        are partitioned back per user, so every value of the returned dict has the
+        same shape as execute_all_queries_async() and can go through
+        get_successful_results() / DocumentTransformer unchanged.
+        """
+        anp_seqs = list(dict.fromkeys(anp_seqs))
+        query_names = list(self.IMPLEMENTED_QUERIES)
+        bulk_results: Dict[int, Dict[str, QueryResult]] = {anp_seq: {} for anp_seq in anp_seqs}
+        statements_before = self.bulk_statements_issued
+
+        logger.info(
+            f"Starting bulk execution of {len(query_names)} queries for {len(anp_seqs)} users "
+            f"(chunk size {self.bulk_chunk_size})"
+        )
+
+        async with AsyncExitStack() as resources:
+            connection = None
+            if self.backend == self.BACKEND_ASYNC:
+                connection = await resources.enter_async_context(self._legacy_connection())
+            reference_data = await self._ensure_reference_data(session, None, connection)
+            population_stats = await self._ensure_population_stats(session, None, connection)
+
+            for start in range(0, len(anp_seqs), self.bulk_chunk_size):
+                chunk = anp_seqs[start:start + self.bulk_chunk_size]
+                tasks = [
+                    self._execute_bulk_query_with_retry(
+                        session, chunk, query_name, connection=connection,
+                        population_stats=population_stats, reference_data=reference_data
+                    )
+                    for query_name in query_names
+                ]
+                if connection is not None:
+                    # 하나의 연결에서는 문장을 순서대로 실행한다
+                    chunk_results = []
+                    for task in tasks:
+                        try:
+                            chunk_results.append(await task)
+                        except Exception as e:
+                            chunk_results.append(e)
+                else:
+                    chunk_results = await asyncio.gather(*tasks, return_exceptions=True)
+
+                for query_name, per_user in zip(query_names, chunk_results):
+                    if isinstance(per_user, Exception):
+                        logger.error(f"Unexpected error for bulk query '{query_name}': {per_user}")
+                        per_user = {
+                            anp_seq: QueryResult(query_name=query_name, success=False, error=str(per_user))
+                            for anp_seq in chunk
+                        }
+                    for anp_seq, result in per_user.items():
+                        bulk_results.setdefault(anp_seq, {})[query_name] = result
+
+        if self.population_stats_cache is not None:
+            self.population_stats_cache.record_results(len(anp_seqs))
+
+        successful_users = sum(
+            1 for per_query in bulk_results.values() if per_query and all(r.success for r in per_query.values())
+        )
+        logger.info(
+            f"Bulk query execution completed for {len(anp_seqs)} users. "
+            f"Fully successful: {successful_users}, "
+            f"Statements issued: {self.bulk_statements_issued - statements_before}"
+        )
+
+        return bulk_results
+
+    async def prefetch_bulk_queries_async(self, session: Session, anp_seqs: List[int]) -> int:
+        """
+        Extract many users' query results with execute_bulk_queries_async() and
+        hand them to the jobs of those users (PrefetchedQueryResults). Returns
+        the number of users with prefetched results; failed queries are left
+        for the job itself to run.
+        """
+        if self.prefetched_results is None:
+            return 0
+        bulk_results = await self.execute_bulk_queries_async(session, anp_seqs)
+        for anp_seq, per_query in bulk_results.items():
+            self.prefetched_results.put(anp_seq, per_query)
+        return len(bulk_results)
+
     async def execute_all_queries_async(
         self, 
         session: Session, 
@@ -1054,66 +2285,46 @@ class LegacyQueryExecutor:
         Execute all queries asynchronously with error handling and retry logic
         """
         
-        # 실제로 구현된 쿼리만 실행 (성능 최적화)
-        implemented_queries = [
-            # --- 기본 구현된 쿼리 ---
-            "tendencyQuery",
-            "topTendencyQuery", 
-            "thinkingSkillsQuery",
-            "careerRecommendationQuery",
-            "bottomTendencyQuery",
-            "personalityDetailQuery",
-            "strengthsWeaknessesQuery",
-            "learningStyleQuery",
-            "learningStyleChartQuery",
-
-            # --- 3단계 신규 쿼리 ---
-            "competencyAnalysisQuery",
-            "competencySubjectsQuery",
-            "competencyJobsQuery",
-            "competencyJobMajorsQuery",
-            "dutiesQuery",
-
-            # --- 4단계 신규 쿼리 ---
-            "imagePreferenceStatsQuery",
-            "preferenceDataQuery",
-            "preferenceJobsQuery",
-
-            # --- 5단계 신규 쿼리 ---
-            "tendencyStatsQuery",
-            "thinkingSkillComparisonQuery",
-
-            # --- 6단계 신규 쿼리 ---
-            "personalInfoQuery",
-            "subjectRanksQuery",
-        ]
-        
-        # 구현되지 않은 쿼리들은 빈 배열로 즉시 설정
-        unimplemented_queries = [
-            "jobMatchingQuery", "majorRecommendationQuery", "studyMethodQuery",
-            "socialSkillsQuery", "leadershipQuery", "communicationQuery", 
-            "problemSolvingQuery", "creativityQuery", "analyticalThinkingQuery",
-            "practicalThinkingQuery", "abstractThinkingQuery", "memoryQuery",
-            "attentionQuery", "processingSpeedQuery", "spatialAbilityQuery",
-            "verbalAbilityQuery", "numericalAbilityQuery", "reasoningQuery",
-            "perceptionQuery", "motivationQuery", "interestQuery", "valueQuery",
-            "workStyleQuery", "environmentPreferenceQuery", "teamworkQuery",
-            "independenceQuery", "stabilityQuery", "challengeQuery"
-        ]
-        
-        query_names = implemented_queries
-        
-        logger.info(f"Starting execution of {len(query_names)} queries for anp_seq: {anp_seq}")
+        # 실제로 구현된 쿼리만 실행 (성능 최적화). 미리 추출된 결과가 있는 쿼리는 건너뛴다
+        prefetched = self._take_prefetched(anp_seq)
+        query_names = [name for name in self.IMPLEMENTED_QUERIES if name not in prefetched]
+        with self._statement_lock:
+            self.statements_issued[anp_seq] = 0
         
-        tasks = [
-            self._execute_single_query_with_retry(session, anp_seq, query_name)
-            for query_name in query_names
-        ]
+        logger.info(
+            f"Starting execution of {len(query_names)} queries for anp_seq: {anp_seq}"
+            + (f" ({len(prefetched)} prefetched)" if prefetched else "")
+        )
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        if not query_names:
+            results = []
+        elif self.backend == self.BACKEND_ASYNC:
+            # 하나의 풀 연결에서 모든 쿼리를 한 번의 왕복으로 보내고, 작업이 끝나면 연결을 반드시 반납한다
+            async with self._legacy_connection() as connection:
+                reference_data = await self._ensure_reference_data(session, anp_seq, connection)
+                population_stats = await self._ensure_population_stats(session, anp_seq, connection)
+                try:
+                    results = await self._execute_query_batch(
+                        session, anp_seq, query_names, connection,
+                        population_stats=population_stats, reference_data=reference_data
+                    )
+                except Exception as e:
+                    results = [e] * len(query_names)
+        else:
+            reference_data = await self._ensure_reference_data(session, anp_seq)
+            population_stats = await self._ensure_population_stats(session, anp_seq)
+            tasks = [
+                self._execute_single_query_with_retry(
+                    session, anp_seq, query_name,
+                    population_stats=population_stats, reference_data=reference_data
+                )
+                for query_name in query_names
+            ]
+            
+            results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        query_results = {}
-        successful_queries = 0
+        query_results = dict(prefetched)
+        successful_queries = len(prefetched)
         failed_queries = 0
         
         for i, result in enumerate(results):
@@ -1134,13 +2345,99 @@ class LegacyQueryExecutor:
                 else:
                     failed_queries += 1
         
+        # 미리 추출된 사용자는 다중 사용자 추출에서 이미 셌다
+        if self.population_stats_cache is not None and not prefetched:
+            self.population_stats_cache.record_results(1)
+        
         logger.info(
             f"Query execution completed for anp_seq: {anp_seq}. "
-            f"Successful: {successful_queries}, Failed: {failed_queries}"
+            f"Successful: {successful_queries}, Failed: {failed_queries}, "
+            f"Statements issued: {self._finish_statement_count(anp_seq)}"
         )
         
         return query_results
     
+    async def stream_queries_async(
+        self,
+        session: Session,
+        anp_seq: int,
+        query_names: Optional[List[str]] = None
+    ) -> AsyncIterator[QueryResult]:
+        """
+        Yield each QueryResult as soon as it is available (ETL dataflow mode).
+
+        The thread backend runs the queries concurrently and yields them in
+        completion order; the async backend runs them one after another on a
+        single connection in the given order. Failures are yielded as
+        unsuccessful results, never raised.
+        """
+        query_names = list(query_names or self.IMPLEMENTED_QUERIES)
+        prefetched = {
+            name: result for name, result in self._take_prefetched(anp_seq).items() if name in query_names
+        }
+        query_names = [name for name in query_names if name not in prefetched]
+        with self._statement_lock:
+            self.statements_issued[anp_seq] = 0
+
+        logger.info(
+            f"Streaming {len(query_names)} queries for anp_seq: {anp_seq}"
+            + (f" ({len(prefetched)} prefetched)" if prefetched else "")
+        )
+
+        def failed(query_name: str, error: Exception) -> QueryResult:
+            logger.error(f"Unexpected error for query '{query_name}': {error}")
+            return QueryResult(query_name=query_name, success=False, error=str(error))
+
+        try:
+            for result in prefetched.values():
+                yield result
+
+            if query_names and self.backend == self.BACKEND_ASYNC:
+                async with self._legacy_connection() as connection:
+                    reference_data = await self._ensure_reference_data(session, anp_seq, connection)
+                    population_stats = await self._ensure_population_stats(session, anp_seq, connection)
+                    for query_name in query_names:
+                        try:
+                            result = await self._execute_single_query_with_retry(
+                                session, anp_seq, query_name, connection=connection,
+                                population_stats=population_stats, reference_data=reference_data
+                            )
+                        except Exception as e:
+                            result = failed(query_name, e)
+                        yield result
+            elif query_names:
+                reference_data = await self._ensure_reference_data(session, anp_seq)
+                population_stats = await self._ensure_population_stats(session, anp_seq)
+
+                async def run(query_name: str) -> QueryResult:
+                    try:
+                        return await self._execute_single_query_with_retry(
+                            session, anp_seq, query_name,
+                            population_stats=population_stats, reference_data=reference_data
+                        )
+                    except Exception as e:
+                        return failed(query_name, e)
+
+                tasks = [asyncio.ensure_future(run(query_name)) for query_name in query_names]
+                try:
+                    for next_result in asyncio.as_completed(tasks):
+                        yield await next_result
+                finally:
+                    # 소비자가 중간에 멈추면 남은 쿼리를 취소한다
+                    for task in tasks:
+                        task.cancel()
+
+            if self.population_stats_cache is not None and not prefetched:
+                self.population_stats_cache.record_results(1)
+
+            logger.info(
+                f"Query streaming completed for anp_seq: {anp_seq}. "
+                f"Statements issued: {self._finish_statement_count(anp_seq)}"
+            )
+        finally:
+            # 소비자가 중간에 멈춰도 진행 중 문장 수를 남기지 않는다
+            self._finish_statement_count(anp_seq)
+
     async def get_successful_results(
         self, 
         query_results: Dict[str, QueryResult]
@@ -1158,19 +2455,7 @@ class LegacyQueryExecutor:
                 logger.warning(f"Excluding failed query '{query_name}' from results")
         
         # 구현되지 않은 쿼리들을 빈 배열로 추가 (DocumentTransformer 호환성)
-        unimplemented_queries = [
-            "jobMatchingQuery", "majorRecommendationQuery", "studyMethodQuery",
-            "socialSkillsQuery", "leadershipQuery", "communicationQuery", 
-            "problemSolvingQuery", "creativityQuery", "analyticalThinkingQuery",
-            "practicalThinkingQuery", "abstractThinkingQuery", "memoryQuery",
-            "attentionQuery", "processingSpeedQuery", "spatialAbilityQuery",
-            "verbalAbilityQuery", "numericalAbilityQuery", "reasoningQuery",
-            "perceptionQuery", "motivationQuery", "interestQuery", "valueQuery",
-            "workStyleQuery", "environmentPreferenceQuery", "teamworkQuery",
-            "independenceQuery", "stabilityQuery", "challengeQuery"
-        ]
-        
-        for query_name in unimplemented_queries:
+        for query_name in AptitudeTestQueries.PLACEHOLDER_QUERY_KEYS:
             successful_results[query_name] = []
         
         return successful_results
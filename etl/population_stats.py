@@ -0,0 +1,120 @@
+"""
+Population Statistics Cache
+Keeps population-wide aggregates of the legacy mwd_* tables in memory so that
+per-user queries (tendencyStatsQuery, thinkingSkillComparisonQuery) do not have
+to scan mwd_resval / mwd_score1 for every job.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PopulationStats:
+    """Snapshot of population aggregates, passed to the per-user queries as array parameters"""
+    tendency_codes: List[str] = field(default_factory=list)
+    tendency_counts: List[int] = field(default_factory=list)
+    total_count: int = 0
+    thinking_codes: List[str] = field(default_factory=list)
+    thinking_averages: List[Decimal] = field(default_factory=list)
+    loaded_at: float = 0.0
+
+    @classmethod
+    def from_rows(
+        cls,
+        tendency_rows: List[Dict[str, Any]],
+        thinking_rows: List[Dict[str, Any]]
+    ) -> "PopulationStats":
+        """Build snapshot from the rows of the two population aggregate queries"""
+        # total_count는 rv_tnd1 이 NULL 인 행까지 포함한 mwd_resval 전체 건수
+        total_count = int(tendency_rows[0]["total_count"]) if tendency_rows else 0
+        tendency_rows = [r for r in tendency_rows if r.get("qua_code") is not None]
+        thinking_rows = [r for r in thinking_rows if r.get("qua_code") is not None]
+        return cls(
+            tendency_codes=[str(r["qua_code"]) for r in tendency_rows],
+            tendency_counts=[int(r["tendency_count"]) for r in tendency_rows],
+            total_count=total_count,
+            thinking_codes=[str(r["qua_code"]) for r in thinking_rows],
+            thinking_averages=[
+                r["avg_score"] if isinstance(r["avg_score"], Decimal) else Decimal(str(r["avg_score"]))
+                for r in thinking_rows
+            ],
+            loaded_at=time.time(),
+        )
+
+class PopulationStatsCache:
+    """
+    Process-wide cache of population statistics.
+
+    The snapshot is considered stale after `ttl_seconds` or after
+    `refresh_after_results` newly processed results, whichever comes first.
+    """
+
+    _singleton_instance = None
+
+    def __init__(
+        self,
+        ttl_seconds: int = int(os.getenv('POPULATION_STATS_TTL_SECONDS', '3600')),
+        refresh_after_results: int = int(os.getenv('POPULATION_STATS_REFRESH_AFTER_RESULTS', '500')),
+        enabled: bool = os.getenv('POPULATION_STATS_ENABLE_CACHE', 'true').lower() == 'true'
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.refresh_after_results = refresh_after_results
+        self.enabled = enabled
+        self._stats: Optional[PopulationStats] = None
+        self._results_since_refresh = 0
+        self.refresh_lock = asyncio.Lock()
+        self.refresh_count = 0
+
+    @classmethod
+    def instance(cls) -> "PopulationStatsCache":
+        """Return a process-wide singleton so every job shares the same aggregates."""
+        if cls._singleton_instance is None:
+            cls._singleton_instance = cls()
+        return cls._singleton_instance
+
+    def get(self) -> Optional[PopulationStats]:
+        """Return current snapshot, or None if caching is disabled"""
+        return self._stats if self.enabled else None
+
+    def is_stale(self) -> bool:
+        if not self.enabled:
+            return False
+        if self._stats is None:
+            return True
+        if time.time() - self._stats.loaded_at > self.ttl_seconds:
+            return True
+        return self._results_since_refresh >= self.refresh_after_results
+
+    def update(self, stats: PopulationStats) -> None:
+        self._stats = stats
+        self._results_since_refresh = 0
+        self.refresh_count += 1
+        logger.info(
+            f"Population statistics refreshed: {stats.total_count} results, "
+            f"{len(stats.tendency_codes)} tendencies, {len(stats.thinking_codes)} thinking skills"
+        )
+
+    def record_results(self, count: int = 1) -> None:
+        """Record newly processed test results; triggers a refresh once the threshold is hit"""
+        self._results_since_refresh += count
+
+    def invalidate(self) -> None:
+        self._stats = None
+        self._results_since_refresh = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "loaded": self._stats is not None,
+            "age_seconds": time.time() - self._stats.loaded_at if self._stats else None,
+            "results_since_refresh": self._results_since_refresh,
+            "refresh_count": self.refresh_count,
+            "total_count": self._stats.total_count if self._stats else 0,
+        }
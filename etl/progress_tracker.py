@@ -0,0 +1,198 @@
+"""
+Coalescing Job Tracker
+Write-behind JobTracker for ETL workers: progress updates are merged per job
+in memory and written for all jobs at once with a single
+UPDATE ... FROM (VALUES ...) statement.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from database.connection import db_manager
+from etl.config import BACKGROUND_PROCESSING_CONFIG
+from etl.job_events import publishing
+from etl.test_completion_handler import JobTracker, JobProgress
+
+logger = logging.getLogger(__name__)
+
+# update_job() keyword -> chat_etl_jobs column type used in the VALUES list
+COLUMN_TYPES = {
+    'status': 'varchar',
+    'progress_percentage': 'integer',
+    'current_step': 'varchar',
+    'completed_steps': 'integer',
+    'total_steps': 'integer',
+    'completed_at': 'timestamp',
+    'error_message': 'text',
+    'error_type': 'varchar',
+    'failed_stage': 'varchar',
+    'retry_count': 'integer',
+    'query_results_summary': 'jsonb',
+    'documents_created': 'text[]',
+}
+
+TERMINAL_STATUSES = {'success', 'failure', 'partial'}
+
+def _column_value(column: str, value: Any) -> Any:
+    value = getattr(value, 'value', value)
+    if value is None:
+        return None
+    if column == 'progress_percentage':
+        return int(value)  # 모델은 정수 퍼센트로 저장
+    if column == 'completed_at' and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if column == 'query_results_summary':
+        return json.dumps(value, default=str)
+    if column == 'documents_created':
+        return [getattr(v, 'value', v) for v in value]
+    return value
+
+def build_flush_statement(batch: Dict[str, Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+    """
+    One UPDATE for every job in `batch`. Each VALUES row carries a set_<column>
+    flag per column so jobs that did not touch a column keep its stored value.
+    Updated rows are published to SSE listeners (etl.job_events).
+    """
+    columns = [c for c in COLUMN_TYPES if any(c in updates for updates in batch.values())]
+    rows: List[str] = []
+    params: Dict[str, Any] = {}
+    for i, (job_id, updates) in enumerate(batch.items()):
+        cells = [f"CAST(:job_id_{i} AS uuid)"]
+        params[f"job_id_{i}"] = uuid.UUID(job_id)
+        for column in columns:
+            cells.append(f"CAST(:set_{column}_{i} AS boolean)")
+            cells.append(f"CAST(:{column}_{i} AS {COLUMN_TYPES[column]})")
+            params[f"set_{column}_{i}"] = column in updates
+            params[f"{column}_{i}"] = _column_value(column, updates.get(column))
+        rows.append(f"({', '.join(cells)})")
+
+    assignments = [f"{c} = CASE WHEN v.set_{c} THEN v.{c} ELSE j.{c} END" for c in columns]
+    assignments.append("updated_at = CURRENT_TIMESTAMP")
+    names = ["job_id"] + [name for c in columns for name in (f"set_{c}", c)]
+    sql = (
+        f"UPDATE chat_etl_jobs AS j SET {', '.join(assignments)} "
+        f"FROM (VALUES {', '.join(rows)}) AS v({', '.join(names)}) "
+        f"WHERE j.job_id = v.job_id"
+    )
+    return publishing(sql, params)
+
+class CoalescingJobTracker(JobTracker):
+    """
+    JobTracker whose update_job() is write-behind.
+
+    - updates of the same job are merged (the latest value per field wins)
+    - a status change is written immediately, together with every other
+      pending job; plain progress updates are written within
+      `flush_interval` seconds
+    - reads (get_job / get_user_jobs) see the tracker's own pending writes
+      because they flush first
+    """
+
+    _singleton_instance = None
+
+    def __init__(
+        self,
+        flush_interval: float = BACKGROUND_PROCESSING_CONFIG['progress_flush_interval_ms'] / 1000.0,
+        session_factory=None,
+    ):
+        super().__init__()
+        self.flush_interval = flush_interval
+        self._session_factory = session_factory or db_manager.get_async_session
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._last_status: Dict[str, str] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self.updates_received = 0
+        self.flushes = 0
+        self.rows_written = 0
+
+    @classmethod
+    def instance(cls) -> "CoalescingJobTracker":
+        """Return the process-wide tracker, so updates of concurrent jobs share flushes."""
+        if cls._singleton_instance is None:
+            cls._singleton_instance = cls()
+        return cls._singleton_instance
+
+    async def update_job(self, job_id: str, **updates) -> Optional[JobProgress]:
+        """Queue an update; returns None because the row is written later"""
+        updates = {k: v for k, v in updates.items() if k in COLUMN_TYPES}
+        self.updates_received += 1
+        self._pending.setdefault(job_id, {}).update(updates)
+
+        status = getattr(updates.get('status'), 'value', updates.get('status'))
+        transition = status is not None and self._last_status.get(job_id) != status
+
+        if transition or self.flush_interval <= 0:
+            await self.flush()
+            # 기록에 성공한 상태만 기억해 실패한 전이는 다음 갱신에서 다시 즉시 기록
+            if status in TERMINAL_STATUSES:
+                self._last_status.pop(job_id, None)
+            elif status is not None:
+                self._last_status[job_id] = status
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+        return None
+
+    def discard(self, job_id: str) -> None:
+        """Drop unwritten updates of a job that stopped without finishing (cancelled / lost lease)"""
+        self._pending.pop(job_id, None)
+        self._last_status.pop(job_id, None)
+
+    async def flush(self) -> None:
+        """Write all pending updates with one statement"""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            sql, params = build_flush_statement(batch)
+            try:
+                async with self._session_factory() as session:
+                    await session.execute(text(sql), params)
+            except Exception:
+                # 실패한 묶음을 되돌리되 그 사이 들어온 최신 값이 우선한다
+                for job_id, updates in batch.items():
+                    self._pending[job_id] = {**updates, **self._pending.get(job_id, {})}
+                raise
+            self.flushes += 1
+            self.rows_written += len(batch)
+
+    async def _flush_later(self) -> None:
+        # flush 도중 들어온 갱신까지 비울 때까지 반복
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Job progress flush failed, retrying in {self.flush_interval}s: {e}")
+            if not self._pending:
+                return
+
+    async def close(self) -> None:
+        """Write what is left (worker shutdown)"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+
+    async def get_job(self, job_id: str) -> Optional[JobProgress]:
+        if job_id in self._pending:
+            await self.flush()
+        return await super().get_job(job_id)
+
+    async def get_user_jobs(self, user_id: str, limit: int = 10) -> List[JobProgress]:
+        await self.flush()
+        return await super().get_user_jobs(user_id, limit)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "updates_received": self.updates_received,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "pending_jobs": len(self._pending),
+        }
@@ -0,0 +1,120 @@
+"""
+Legacy Query Latency Tracking
+Rolling per-query latency history used to derive adaptive timeouts and the
+delay after which a cheap query gets a hedged second attempt.
+"""
+
+import math
+import os
+import threading
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile (pct in 0..100); 0.0 for an empty list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower, upper = math.floor(rank), math.ceil(rank)
+    if lower == upper:
+        return float(ordered[lower])
+    return float(ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower))
+
+class QueryLatencyTracker:
+    """
+    Keeps the last `window` successful latencies (seconds) per query name.
+
+    - timeout_for(): p99 x `timeout_multiplier`, clamped to
+      [`min_timeout`, configured query timeout]
+    - hedge_delay(): p95 for cheap queries (p50 <= `hedge_max_p50`), else None
+
+    Both fall back to the configured defaults until `min_samples` latencies
+    have been recorded for the query.
+    """
+
+    _singleton_instance = None
+
+    def __init__(
+        self,
+        window: int = int(os.getenv('LEGACY_QUERY_LATENCY_WINDOW', '200')),
+        min_samples: int = int(os.getenv('LEGACY_QUERY_LATENCY_MIN_SAMPLES', '20')),
+        timeout_multiplier: float = float(os.getenv('LEGACY_QUERY_TIMEOUT_MULTIPLIER', '3.0')),
+        min_timeout: float = float(os.getenv('LEGACY_QUERY_MIN_TIMEOUT_SECONDS', '2.0')),
+        hedging_enabled: bool = os.getenv('LEGACY_QUERY_ENABLE_HEDGING', 'true').lower() == 'true',
+        hedge_max_p50: float = float(os.getenv('LEGACY_QUERY_HEDGE_MAX_P50_SECONDS', '0.2')),
+        hedge_min_delay: float = float(os.getenv('LEGACY_QUERY_HEDGE_MIN_DELAY_SECONDS', '0.05')),
+    ):
+        self.window = window
+        self.min_samples = min_samples
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+        self.hedging_enabled = hedging_enabled
+        self.hedge_max_p50 = hedge_max_p50
+        self.hedge_min_delay = hedge_min_delay
+        self._latencies: Dict[str, Deque[float]] = {}
+        # 스레드 백엔드에서는 여러 작업 스레드가 동시에 기록한다
+        self._lock = threading.Lock()
+        self.timeouts = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @classmethod
+    def instance(cls) -> "QueryLatencyTracker":
+        """Return a process-wide singleton so history survives across jobs."""
+        if cls._singleton_instance is None:
+            cls._singleton_instance = cls()
+        return cls._singleton_instance
+
+    def record(self, query_name: str, seconds: float) -> None:
+        with self._lock:
+            history = self._latencies.get(query_name)
+            if history is None:
+                history = self._latencies[query_name] = deque(maxlen=self.window)
+            history.append(seconds)
+
+    def _history(self, query_name: str) -> List[float]:
+        with self._lock:
+            return list(self._latencies.get(query_name, ()))
+
+    def percentile(self, query_name: str, pct: float) -> Optional[float]:
+        history = self._history(query_name)
+        if len(history) < self.min_samples:
+            return None
+        return percentile(history, pct)
+
+    def timeout_for(self, query_name: str, default_timeout: float) -> float:
+        p99 = self.percentile(query_name, 99)
+        if p99 is None:
+            return default_timeout
+        return min(default_timeout, max(self.min_timeout, p99 * self.timeout_multiplier))
+
+    def hedge_delay(self, query_name: str) -> Optional[float]:
+        if not self.hedging_enabled:
+            return None
+        history = self._history(query_name)
+        if len(history) < self.min_samples or percentile(history, 50) > self.hedge_max_p50:
+            return None
+        return max(self.hedge_min_delay, percentile(history, 95))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latencies.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {name: list(history) for name, history in self._latencies.items()}
+        return {
+            "timeouts": self.timeouts,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "queries": {
+                name: {
+                    "samples": len(history),
+                    "p50_ms": round(percentile(history, 50) * 1000, 2),
+                    "p95_ms": round(percentile(history, 95) * 1000, 2),
+                    "p99_ms": round(percentile(history, 99) * 1000, 2),
+                }
+                for name, history in snapshot.items()
+            },
+        }
@@ -0,0 +1,262 @@
+"""
+Legacy Query Profiler
+Runs every AptitudeTestQueries query against a (synthetic) legacy database,
+captures EXPLAIN (ANALYZE, BUFFERS) plans, latency percentiles and row counts,
+and compares the JSON report with a stored baseline to catch plan regressions.
+"""
+
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+
+from etl.legacy_query_executor import AptitudeTestQueries, LegacyStatementBuilder
+from etl.population_stats import PopulationStats
+from etl.query_latency import percentile
+from etl.reference_data import ReferenceDataSnapshot
+
+logger = logging.getLogger(__name__)
+
+REPORT_VERSION = 1
+
+def _walk_plan(node: Dict[str, Any]):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk_plan(child)
+
+def plan_signature(node: Dict[str, Any]) -> str:
+    """Shape of a plan tree (node types and relations, no costs), stable across runs"""
+    label = node.get("Node Type", "?")
+    if node.get("Relation Name"):
+        label += f"[{node['Relation Name']}]"
+    if node.get("Index Name"):
+        label += f"<{node['Index Name']}>"
+    children = node.get("Plans", [])
+    if children:
+        label += "(" + ",".join(plan_signature(child) for child in children) + ")"
+    return label
+
+def summarize_plan(explain_output: Any) -> Dict[str, Any]:
+    """Summarize EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) output"""
+    if isinstance(explain_output, str):
+        explain_output = json.loads(explain_output)
+    if isinstance(explain_output, list):
+        explain_output = explain_output[0]
+    root = explain_output["Plan"]
+    nodes = list(_walk_plan(root))
+    return {
+        "signature": plan_signature(root),
+        "node_types": sorted({n["Node Type"] for n in nodes}),
+        "seq_scans": sorted({n["Relation Name"] for n in nodes if n["Node Type"] == "Seq Scan" and n.get("Relation Name")}),
+        "total_cost": root.get("Total Cost"),
+        "plan_rows": root.get("Plan Rows"),
+        "actual_rows": root.get("Actual Rows"),
+        "planning_time_ms": explain_output.get("Planning Time"),
+        "execution_time_ms": explain_output.get("Execution Time"),
+        "shared_hit_blocks": root.get("Shared Hit Blocks", 0),
+        "shared_read_blocks": root.get("Shared Read Blocks", 0),
+    }
+
+@dataclass
+class ProfileSettings:
+    """Profiling run parameters"""
+    iterations: int = 20
+    sample_size: int = 20
+    random_seed: int = 42
+    explain: bool = True
+
+class LegacyQueryProfiler:
+    """
+    Profiles the statements the ETL actually sends: each query is built by the
+    same _query_* methods, once without caches ("raw") and once with the
+    population statistics / reference data snapshots loaded ("cached") when
+    that produces a different statement.
+    """
+
+    def __init__(self, database_url: str = None, engine: Optional[Engine] = None, settings: ProfileSettings = None):
+        if not database_url and engine is None:
+            raise ValueError("A database URL for the profiled legacy database is required")
+        self.engine = engine or create_engine(database_url)
+        self.settings = settings or ProfileSettings()
+
+    def _fetch(self, conn: Connection, sql: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [dict(r) for r in conn.execute(text(sql), params).mappings().all()]
+
+    def sample_anp_seqs(self, conn: Connection) -> List[int]:
+        seqs = [r["anp_seq"] for r in self._fetch(conn, "SELECT anp_seq FROM mwd_answer_progress ORDER BY anp_seq", {})]
+        if not seqs:
+            raise RuntimeError("mwd_answer_progress is empty; seed the legacy database first")
+        rng = random.Random(self.settings.random_seed)
+        return sorted(rng.sample(seqs, min(self.settings.sample_size, len(seqs))))
+
+    def _load_snapshots(self, conn: Connection):
+        builder = LegacyStatementBuilder()
+
+        def run(method_name: str) -> List[Dict[str, Any]]:
+            statement = getattr(builder, method_name)()
+            return self._fetch(conn, statement.sql, statement.params)
+
+        population_stats = PopulationStats.from_rows(
+            run("_query_population_tendency_counts"), run("_query_population_thinking_averages")
+        )
+        reference_data = ReferenceDataSnapshot.from_rows(
+            str(run("_query_reference_checksum")[0]["checksum"]),
+            run("_query_reference_question_attr"),
+            run("_query_reference_tendency_study"),
+            run("_query_reference_studyway_rate"),
+            run("_query_reference_subject_map"),
+            run("_query_reference_job"),
+        )
+        return population_stats, reference_data
+
+    def _profile_statement(self, conn: Connection, builder: LegacyStatementBuilder, query_name: str, seqs: List[int]) -> Dict[str, Any]:
+        statements = [builder.build(query_name, seq) for seq in seqs]
+        # 워밍업: 첫 실행의 캐시 미스가 지연 분포를 왜곡하지 않도록 한 번 실행
+        self._fetch(conn, statements[0].sql, statements[0].params)
+
+        latencies: List[float] = []
+        row_counts: List[int] = []
+        for i in range(self.settings.iterations):
+            statement = statements[i % len(statements)]
+            started = time.perf_counter()
+            rows = self._fetch(conn, statement.sql, statement.params)
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            if statement.transform is not None:
+                rows = statement.transform(rows)
+            row_counts.append(len(rows))
+
+        profile = {
+            "sql": " ".join(statements[0].sql.split()),
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50), 3),
+                "p95": round(percentile(latencies, 95), 3),
+                "p99": round(percentile(latencies, 99), 3),
+                "max": round(max(latencies), 3),
+                "mean": round(sum(latencies) / len(latencies), 3),
+            },
+            "rows": {
+                "min": min(row_counts),
+                "max": max(row_counts),
+                "mean": round(sum(row_counts) / len(row_counts), 2),
+            },
+        }
+        if self.settings.explain:
+            explain_output = conn.execute(
+                text("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statements[0].sql), statements[0].params
+            ).scalar()
+            profile["plan"] = summarize_plan(explain_output)
+        return profile
+
+    def run(self, query_names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Profile the given (default: all registered) queries and return the report dict"""
+        query_names = query_names or list(AptitudeTestQueries.QUERY_METHODS)
+        report: Dict[str, Any] = {
+            "version": REPORT_VERSION,
+            "generated_at": datetime.now().isoformat(),
+            "settings": {
+                "iterations": self.settings.iterations,
+                "sample_size": self.settings.sample_size,
+                "random_seed": self.settings.random_seed,
+            },
+            "queries": {},
+        }
+
+        with self.engine.connect() as conn:
+            report["server_version"] = conn.execute(text("SHOW server_version")).scalar()
+            report["testers"] = conn.execute(text("SELECT COUNT(*) FROM mwd_answer_progress")).scalar()
+            seqs = self.sample_anp_seqs(conn)
+            population_stats, reference_data = self._load_snapshots(conn)
+            variants = {
+                "raw": LegacyStatementBuilder(),
+                "cached": LegacyStatementBuilder(population_stats, reference_data),
+            }
+
+            for query_name in query_names:
+                raw_sql = variants["raw"].build(query_name, seqs[0]).sql
+                for variant, builder in variants.items():
+                    if variant != "raw" and builder.build(query_name, seqs[0]).sql == raw_sql:
+                        continue
+                    key = query_name if variant == "raw" else f"{query_name}[{variant}]"
+                    try:
+                        report["queries"][key] = self._profile_statement(conn, builder, query_name, seqs)
+                        logger.info(f"Profiled {key}: p95 {report['queries'][key]['latency_ms']['p95']}ms")
+                    except Exception as e:
+                        conn.rollback()
+                        report["queries"][key] = {"error": str(e)}
+                        logger.error(f"Profiling {key} failed: {e}")
+                    # EXPLAIN ANALYZE 등이 열어 둔 트랜잭션을 쿼리마다 정리한다
+                    conn.rollback()
+
+        return report
+
+def compare_reports(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    latency_regression_ratio: float = 1.5,
+    min_latency_ms: float = 5.0
+) -> List[Dict[str, Any]]:
+    """
+    Diff a profiling report against a baseline.
+
+    Findings with severity "error" are regressions (new sequential scans,
+    failing/missing queries, p95 latency above ratio x baseline); "warning"
+    findings (plan shape or buffer changes) are reported but not fatal.
+    """
+    findings: List[Dict[str, Any]] = []
+
+    def add(query: str, kind: str, severity: str, detail: str) -> None:
+        findings.append({"query": query, "kind": kind, "severity": severity, "detail": detail})
+
+    if baseline.get("testers") != current.get("testers"):
+        add("*", "scale_mismatch", "warning",
+            f"baseline has {baseline.get('testers')} testers, current has {current.get('testers')}")
+
+    for query, base in baseline.get("queries", {}).items():
+        cur = current.get("queries", {}).get(query)
+        if cur is None:
+            add(query, "missing", "error", "query not present in current report")
+            continue
+        if "error" in cur:
+            add(query, "failed", "error", cur["error"])
+            continue
+        if "error" in base:
+            continue
+
+        base_p95, cur_p95 = base["latency_ms"]["p95"], cur["latency_ms"]["p95"]
+        if cur_p95 > max(base_p95 * latency_regression_ratio, min_latency_ms):
+            add(query, "latency", "error", f"p95 {base_p95}ms -> {cur_p95}ms")
+
+        if base["rows"] != cur["rows"]:
+            add(query, "rows", "warning", f"rows {base['rows']} -> {cur['rows']}")
+
+        base_plan, cur_plan = base.get("plan"), cur.get("plan")
+        if base_plan and cur_plan:
+            new_seq_scans = sorted(set(cur_plan["seq_scans"]) - set(base_plan["seq_scans"]))
+            if new_seq_scans:
+                add(query, "seq_scan", "error", f"new sequential scan on {', '.join(new_seq_scans)}")
+            if base_plan["signature"] != cur_plan["signature"]:
+                add(query, "plan_changed", "warning", f"{base_plan['signature']} -> {cur_plan['signature']}")
+            base_blocks = base_plan["shared_hit_blocks"] + base_plan["shared_read_blocks"]
+            cur_blocks = cur_plan["shared_hit_blocks"] + cur_plan["shared_read_blocks"]
+            if base_blocks and cur_blocks > base_blocks * latency_regression_ratio:
+                add(query, "buffers", "warning", f"shared blocks {base_blocks} -> {cur_blocks}")
+
+    for query in current.get("queries", {}):
+        if query not in baseline.get("queries", {}):
+            add(query, "new_query", "warning", "not in baseline")
+
+    return findings
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
@@ -0,0 +1,191 @@
+"""
+Adaptive Rate Limiter
+Process-wide token bucket for embedding API calls. The rate shrinks
+multiplicatively when the API answers 429 and grows back additively on
+success (AIMD), so bursts of ETL jobs settle just under the real quota
+instead of alternating between 429 waves and idle periods.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterator, Optional, TypeVar
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 공유 없이 프로세스 단위로만 제한
+    fcntl = None
+
+from etl.config import EMBEDDING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket refilled at `rate` requests per minute, holding at most
+    `burst` tokens.
+
+    - acquire() takes a token, sleeping until one is available; the lock
+      only guards the bookkeeping and is never held while sleeping
+    - on_throttled() (429): rate x `decrease_factor`, at most once per
+      `decrease_cooldown` seconds so one wave of 429s counts once, never
+      below `min_rate`
+    - on_success(): rate + `increase_per_success`, up to `max_rate`
+
+    With `state_file` the bucket lives in that file (guarded by flock), so
+    all worker processes on a host share one quota. The flock and file I/O
+    run in the default executor, never on the event loop.
+    """
+
+    _instances: Dict[str, "AdaptiveRateLimiter"] = {}
+
+    def __init__(
+        self,
+        max_rate: float = EMBEDDING_CONFIG['rate_limit_per_minute'],
+        min_rate: float = EMBEDDING_CONFIG['rate_limit_min_per_minute'],
+        burst: float = EMBEDDING_CONFIG['rate_limit_burst'],
+        decrease_factor: float = 0.5,
+        increase_per_success: float = 1.0,
+        decrease_cooldown: float = 5.0,
+        state_file: Optional[str] = EMBEDDING_CONFIG['rate_limit_state_file'] or None,
+        clock=time.monotonic,
+    ):
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.burst = max(burst, 1.0)
+        self.decrease_factor = decrease_factor
+        self.increase_per_success = increase_per_success
+        self.decrease_cooldown = decrease_cooldown
+        self._clock = clock
+        if state_file and fcntl is None:
+            logger.warning("File-shared embedding rate limit is not supported on this platform; limiting per process")
+            state_file = None
+        self.state_file = state_file
+        # 파일 공유 시 프로세스마다 다른 monotonic 시계 대신 벽시계를 쓴다
+        if state_file:
+            self._clock = time.time
+
+        self._lock = asyncio.Lock()
+        self._state = {"tokens": self.burst, "updated_at": self._clock(), "rate": max_rate, "decreased_at": None}
+
+        self.acquired = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.throttled = 0
+
+    @classmethod
+    def instance(cls, name: str = "embedding") -> "AdaptiveRateLimiter":
+        """Return the process-wide limiter of an API, shared by all its clients."""
+        if name not in cls._instances:
+            cls._instances[name] = cls()
+        return cls._instances[name]
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[Dict[str, Any]]:
+        if not self.state_file:
+            yield self._state
+            return
+        with open(self.state_file, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                content = f.read()
+                if content:
+                    self._state = json.loads(content)
+                before = dict(self._state)
+                yield self._state
+                # 바뀐 것이 없으면 다시 쓰지 않는다
+                if self._state != before:
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps(self._state))
+                    f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    async def _update(self, update: Callable[[Dict[str, Any]], T]) -> T:
+        """Apply `update` to the bucket state under the process lock and, if shared, the file lock"""
+        def locked() -> T:
+            with self._locked_state() as state:
+                return update(state)
+
+        async with self._lock:
+            if not self.state_file:
+                return locked()
+            # 다른 프로세스가 flock 을 잡고 있어도 이벤트 루프는 막히지 않는다
+            return await asyncio.get_running_loop().run_in_executor(None, locked)
+
+    def _refill(self, state: Dict[str, Any], now: float) -> None:
+        elapsed = max(now - state["updated_at"], 0.0)
+        state["tokens"] = min(self.burst, state["tokens"] + elapsed * state["rate"] / 60.0)
+        state["updated_at"] = now
+
+    def _take_token(self, state: Dict[str, Any]) -> Optional[float]:
+        """Take a token; None on success, otherwise the seconds until one is available"""
+        self._refill(state, self._clock())
+        if state["tokens"] >= 1.0:
+            state["tokens"] -= 1.0
+            return None
+        return (1.0 - state["tokens"]) * 60.0 / state["rate"]
+
+    def _decrease(self, state: Dict[str, Any]) -> bool:
+        now = self._clock()
+        decreased_at = state.get("decreased_at")
+        if decreased_at is not None and now - decreased_at < self.decrease_cooldown:
+            return False
+        self._refill(state, now)
+        state["rate"] = max(self.min_rate, state["rate"] * self.decrease_factor)
+        state["tokens"] = min(state["tokens"], 0.0)
+        state["decreased_at"] = now
+        return True
+
+    def _increase(self, state: Dict[str, Any]) -> None:
+        if state["rate"] >= self.max_rate:
+            return
+        self._refill(state, self._clock())
+        state["rate"] = min(self.max_rate, state["rate"] + self.increase_per_success)
+
+    async def acquire(self) -> None:
+        """Take one token, waiting for the bucket to refill if needed"""
+        while True:
+            delay = await self._update(self._take_token)
+            if delay is None:
+                self.acquired += 1
+                return
+            # 잠금을 놓고 기다린 뒤 다시 확인한다 (그 사이 속도가 바뀔 수 있다)
+            self.waits += 1
+            self.wait_seconds += delay
+            logger.debug(f"Embedding rate limit reached, waiting {delay:.2f} seconds")
+            await asyncio.sleep(delay)
+
+    async def on_throttled(self) -> None:
+        """The API answered 429: halve the rate and drop the accumulated burst"""
+        self.throttled += 1
+        if await self._update(self._decrease):
+            logger.warning(f"Embedding API throttled, rate limit lowered to {self._state['rate']:.1f}/min")
+
+    async def on_success(self) -> None:
+        # 이미 최대 속도면 잠금도 파일도 건드리지 않는다; 공유 파일의 속도는 요청 직전
+        # acquire() 에서 다시 읽었으므로 다른 프로세스가 낮춘 값도 여기서 보인다
+        if self._state["rate"] >= self.max_rate:
+            return
+        await self._update(self._increase)
+
+    @property
+    def rate(self) -> float:
+        return self._state["rate"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "rate_per_minute": round(self._state["rate"], 2),
+            "max_rate_per_minute": self.max_rate,
+            "shared_via": self.state_file or "process",
+            "acquired": self.acquired,
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 2),
+            "throttled": self.throttled,
+        }
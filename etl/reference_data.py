@@ -0,0 +1,153 @@
+"""
+Reference Data Snapshot
+In-process, versioned copy of the static mwd_* catalog tables
+(mwd_question_attr, mwd_tendency_study, mwd_studyway_rate,
+mwd_tendency_subject_map, mwd_job). Legacy queries fetch only per-user rows
+and resolve names/descriptions from this snapshot.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# tendency code -> converted rank column in the mwd_tendency_subject_map snapshot
+SUBJECT_RANK_COLUMNS = {
+    'tnd11000': 'tsm_communication_type',
+    'tnd12000': 'tsm_creation_type',
+    'tnd13000': 'tsm_cooperative_type',
+    'tnd14000': 'tsm_human_understanding_type',
+    'tnd15000': 'tsm_artistic_type',
+    'tnd16000': 'tsm_rational_type',
+    'tnd17000': 'tsm_factual_type',
+    'tnd18000': 'tsm_logical_type',
+    'tnd19000': 'tsm_alternative_seeking_type',
+    'tnd20000': 'tsm_metacognitive_type',
+    'tnd21000': 'tsm_problem_solving_type',
+    'tnd22000': 'tsm_information_processing_type',
+    'tnd23000': 'tsm_resourceful_type',
+    'tnd24000': 'tsm_future_oriented_type',
+    'tnd25000': 'tsm_adventurous_type',
+}
+
+@dataclass
+class ReferenceDataSnapshot:
+    """Versioned snapshot of the static catalog tables"""
+    version: str
+    question_attr: Dict[str, str] = field(default_factory=dict)
+    tendency_study: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    studyway_rate: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    tendency_subject_map: List[Dict[str, Any]] = field(default_factory=list)
+    job: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    loaded_at: float = 0.0
+
+    @classmethod
+    def from_rows(
+        cls,
+        version: str,
+        question_attr_rows: List[Dict[str, Any]],
+        tendency_study_rows: List[Dict[str, Any]],
+        studyway_rate_rows: List[Dict[str, Any]],
+        subject_map_rows: List[Dict[str, Any]],
+        job_rows: List[Dict[str, Any]]
+    ) -> "ReferenceDataSnapshot":
+        """Build snapshot from the rows of the catalog load queries (already ordered by SQL)"""
+        studyway_rate: Dict[str, List[Dict[str, Any]]] = {}
+        for row in studyway_rate_rows:
+            row = dict(row)
+            studyway_rate.setdefault(str(row.pop('qua_code')), []).append(row)
+
+        return cls(
+            version=version,
+            question_attr={str(r['qua_code']): r['qua_name'] for r in question_attr_rows},
+            tendency_study={
+                str(r['qua_code']): {
+                    'tes_study_tendency': r['tes_study_tendency'],
+                    'tes_study_way': r['tes_study_way'],
+                }
+                for r in tendency_study_rows
+            },
+            studyway_rate=studyway_rate,
+            tendency_subject_map=[dict(r) for r in subject_map_rows],
+            job={str(r['jo_code']): dict(r) for r in job_rows},
+            loaded_at=time.time(),
+        )
+
+    def qua_name(self, qua_code: Any) -> Optional[str]:
+        if qua_code is None:
+            return None
+        return self.question_attr.get(str(qua_code))
+
+    def get_job(self, jo_code: Any) -> Optional[Dict[str, Any]]:
+        if jo_code is None:
+            return None
+        return self.job.get(str(jo_code))
+
+class ReferenceDataCache:
+    """
+    Process-wide holder of the current ReferenceDataSnapshot.
+
+    The catalog checksum is re-read every `check_interval_seconds`; the
+    tables are reloaded only when the checksum differs from the snapshot version.
+    """
+
+    _singleton_instance = None
+
+    def __init__(
+        self,
+        check_interval_seconds: int = int(os.getenv('REFERENCE_DATA_CHECK_INTERVAL_SECONDS', '300')),
+        enabled: bool = os.getenv('REFERENCE_DATA_ENABLE_CACHE', 'true').lower() == 'true'
+    ):
+        self.check_interval_seconds = check_interval_seconds
+        self.enabled = enabled
+        self._snapshot: Optional[ReferenceDataSnapshot] = None
+        self._checked_at = 0.0
+        self.refresh_lock = asyncio.Lock()
+        self.reload_count = 0
+
+    @classmethod
+    def instance(cls) -> "ReferenceDataCache":
+        """Return a process-wide singleton so every job shares one snapshot."""
+        if cls._singleton_instance is None:
+            cls._singleton_instance = cls()
+        return cls._singleton_instance
+
+    def get(self) -> Optional[ReferenceDataSnapshot]:
+        return self._snapshot if self.enabled else None
+
+    def needs_check(self) -> bool:
+        if not self.enabled:
+            return False
+        if self._snapshot is None:
+            return True
+        return time.time() - self._checked_at > self.check_interval_seconds
+
+    def mark_checked(self) -> None:
+        self._checked_at = time.time()
+
+    def update(self, snapshot: ReferenceDataSnapshot) -> None:
+        self._snapshot = snapshot
+        self.reload_count += 1
+        self.mark_checked()
+        logger.info(
+            f"Reference data snapshot loaded (version {snapshot.version[:12]}): "
+            f"{len(snapshot.question_attr)} attributes, {len(snapshot.job)} jobs, "
+            f"{len(snapshot.tendency_subject_map)} subjects"
+        )
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+        self._checked_at = 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "loaded": self._snapshot is not None,
+            "version": self._snapshot.version if self._snapshot else None,
+            "age_seconds": time.time() - self._snapshot.loaded_at if self._snapshot else None,
+            "reload_count": self.reload_count,
+        }
@@ -0,0 +1,169 @@
+"""
+ETL Stage Output Store
+Persists the output of the last finished ETL stage per job in
+chat_etl_stage_outputs so a retried job resumes after that stage instead
+of re-running the legacy queries and the embedding calls.
+"""
+
+import base64
+import json
+import logging
+import sys
+import uuid
+import zlib
+from array import array
+from dataclasses import dataclass, asdict, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import text
+
+from database.connection import db_manager
+from database.models import DocumentType
+from etl.config import ETL_CONFIG
+from etl.document_transformer import TransformedDocument
+from etl.legacy_query_executor import QueryResult
+
+logger = logging.getLogger(__name__)
+
+SAVE_SQL = """
+INSERT INTO chat_etl_stage_outputs (job_id, stage, payload, raw_bytes, updated_at)
+VALUES (:job_id, :stage, :payload, :raw_bytes, CURRENT_TIMESTAMP)
+ON CONFLICT (job_id) DO UPDATE
+SET stage = EXCLUDED.stage,
+    payload = EXCLUDED.payload,
+    raw_bytes = EXCLUDED.raw_bytes,
+    updated_at = EXCLUDED.updated_at
+"""
+
+LOAD_SQL = "SELECT stage, payload FROM chat_etl_stage_outputs WHERE job_id = :job_id"
+
+DELETE_SQL = "DELETE FROM chat_etl_stage_outputs WHERE job_id = :job_id"
+
+@dataclass
+class StageOutput:
+    """Output of the last finished stage of a job"""
+    stage: str
+    output: Any
+    # rollback_data 중 재개 후에도 필요한 값 (legacy_statements_issued 등)
+    state: Dict[str, Any] = field(default_factory=dict)
+
+def _json_default(value: Any) -> Any:
+    # 레거시 쿼리 결과의 날짜/Decimal 타입을 그대로 복원하기 위해 태그를 붙인다
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"__decimal__": str(value)}
+    return str(value)
+
+def _json_object_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        key, value = next(iter(obj.items()))
+        if key == "__datetime__":
+            return datetime.fromisoformat(value)
+        if key == "__date__":
+            return date.fromisoformat(value)
+        if key == "__decimal__":
+            return Decimal(value)
+        if key == "__f32__":
+            return _unpack_vector(value)
+    return obj
+
+def _pack_vector(vector: List[float]) -> Dict[str, str]:
+    # pgvector 도 float32 로 저장하므로 정밀도 손실 없이 JSON 숫자 목록의 1/4 크기
+    values = array("f", vector)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return {"__f32__": base64.b64encode(values.tobytes()).decode("ascii")}
+
+def _unpack_vector(encoded: str) -> List[float]:
+    values = array("f")
+    values.frombytes(base64.b64decode(encoded))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tolist()
+
+def _doc_type(value: Any) -> Any:
+    try:
+        return DocumentType(value)
+    except ValueError:
+        return value
+
+def _encode_output(stage: str, output: Any) -> Any:
+    if stage == "query_execution":
+        return {name: asdict(result) for name, result in output.items()}
+    if stage == "document_transformation":
+        return [asdict(document) for document in output]
+    if stage == "embedding_generation":
+        return [
+            dict(doc, embedding_vector=_pack_vector(doc["embedding_vector"]))
+            if doc.get("embedding_vector") is not None else doc
+            for doc in output
+        ]
+    return output
+
+def _decode_output(stage: str, output: Any) -> Any:
+    if stage == "query_execution":
+        return {name: QueryResult(**result) for name, result in output.items()}
+    if stage == "document_transformation":
+        return [TransformedDocument(**dict(document, doc_type=_doc_type(document["doc_type"]))) for document in output]
+    if stage in ("embedding_generation", "document_storage"):
+        return [dict(doc, doc_type=_doc_type(doc["doc_type"])) for doc in output]
+    return output
+
+def _dump(stage: str, output: Any, state: Optional[Dict[str, Any]]) -> bytes:
+    return json.dumps(
+        {"output": _encode_output(stage, output), "state": state or {}},
+        default=_json_default, ensure_ascii=False, separators=(",", ":"),
+    ).encode("utf-8")
+
+def encode_stage_output(stage: str, output: Any, state: Optional[Dict[str, Any]] = None) -> bytes:
+    """Serialize a stage output to compressed JSON"""
+    return zlib.compress(_dump(stage, output, state), ETL_CONFIG['stage_output_compression_level'])
+
+def decode_stage_output(stage: str, payload: bytes) -> StageOutput:
+    """Inverse of encode_stage_output"""
+    data = json.loads(zlib.decompress(payload).decode("utf-8"), object_hook=_json_object_hook)
+    state = data.get("state", {})
+    if "documents_unchanged" in state:
+        state["documents_unchanged"] = [_doc_type(d) for d in state["documents_unchanged"]]
+    return StageOutput(stage=stage, output=_decode_output(stage, data["output"]), state=state)
+
+class StageOutputStore:
+    """
+    chat_etl_stage_outputs access. Each job keeps only the output of its last
+    finished stage; it is written in its own transaction so it survives the
+    rollback of a failed job.
+    """
+
+    def __init__(self, session_factory=None):
+        self._session_factory = session_factory or db_manager.get_async_session
+
+    async def save(self, job_id: str, stage: str, output: Any, state: Optional[Dict[str, Any]] = None) -> int:
+        """Persist the output of `stage`; returns the compressed size in bytes"""
+        raw = _dump(stage, output, state)
+        payload = zlib.compress(raw, ETL_CONFIG['stage_output_compression_level'])
+        async with self._session_factory() as session:
+            await session.execute(text(SAVE_SQL), {
+                "job_id": uuid.UUID(job_id),
+                "stage": stage,
+                "payload": payload,
+                "raw_bytes": len(raw),
+            })
+        logger.debug(f"Saved {stage} output for job {job_id} ({len(payload)} bytes)")
+        return len(payload)
+
+    async def load(self, job_id: str) -> Optional[StageOutput]:
+        """Return the last finished stage output of a job, if any"""
+        async with self._session_factory() as session:
+            row = (await session.execute(text(LOAD_SQL), {"job_id": uuid.UUID(job_id)})).mappings().first()
+        if row is None:
+            return None
+        return decode_stage_output(row["stage"], bytes(row["payload"]))
+
+    async def delete(self, job_id: str) -> None:
+        async with self._session_factory() as session:
+            await session.execute(text(DELETE_SQL), {"job_id": uuid.UUID(job_id)})
@@ -0,0 +1,344 @@
+"""
+Synthetic Legacy Database
+Creates the mwd_* tables read by AptitudeTestQueries in a local PostgreSQL
+database and fills them with synthetic testers, for query profiling and
+load testing without production data.
+
+Per-tester rows are generated server-side (generate_series / random()), so
+large scales load in a few statements per batch.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import create_engine, text, inspect
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+TENDENCY_CODES = [f"tnd{n}000" for n in range(11, 26)]
+THINKING_CODES = [f"thk{n:02d}000" for n in range(1, 9)]
+TALENT_CODES = [f"tal{n:02d}000" for n in range(1, 15)]
+IMAGE_CODES = [f"img{n:02d}000" for n in range(1, 7)]
+
+# score step -> qua_code 목록 (mwd_score1 의 sc1_step 값)
+SCORE_STEPS = {
+    "tnd": TENDENCY_CODES,
+    "thk": THINKING_CODES,
+    "tal": TALENT_CODES,
+    "img": IMAGE_CODES,
+}
+
+# mwd_resjob 의 rej_kind -> 사용자당 순위 수
+RESJOB_KINDS = {"rtnd": 7, "rtal": 7, "rimg1": 5, "rimg2": 5, "rimg3": 5}
+
+SUBJECT_TYPE_COLUMNS = [
+    "tsm_communication_type", "tsm_creation_type", "tsm_cooperative_type",
+    "tsm_human_understanding_type", "tsm_artistic_type", "tsm_rational_type",
+    "tsm_factual_type", "tsm_logical_type", "tsm_alternative_seeking_type",
+    "tsm_metacognitive_type", "tsm_problem_solving_type", "tsm_information_processing_type",
+    "tsm_resourceful_type", "tsm_future_oriented_type", "tsm_adventurous_type",
+]
+
+MARKER_TABLE = "mwd_synthetic_marker"
+
+SCHEMA_DDL = [
+    """CREATE TABLE IF NOT EXISTS mwd_person (
+        pe_seq integer PRIMARY KEY, pe_name text, pe_birth_year integer,
+        pe_birth_month integer, pe_birth_day integer, pe_sex char(1))""",
+    "CREATE TABLE IF NOT EXISTS mwd_account (ac_gid text PRIMARY KEY, pe_seq integer NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS mwd_answer_progress (anp_seq integer PRIMARY KEY, ac_gid text NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS mwd_question_attr (qua_code text PRIMARY KEY, qua_name text)",
+    """CREATE TABLE IF NOT EXISTS mwd_question_explain (
+        qua_code text, que_switch integer, que_explain text)""",
+    """CREATE TABLE IF NOT EXISTS mwd_question (
+        qu_code text PRIMARY KEY, qu_explain text, qu_kind1 text, qu_kind2 text,
+        qu_use char(1), qu_qusyn char(1))""",
+    """CREATE TABLE IF NOT EXISTS mwd_answer (
+        anp_seq integer, qu_code text, an_wei integer, PRIMARY KEY (anp_seq, qu_code))""",
+    """CREATE TABLE IF NOT EXISTS mwd_score1 (
+        anp_seq integer, sc1_step text, qua_code text, sc1_rate numeric, sc1_rank integer,
+        sc1_qcnt integer, sc1_resrate numeric, PRIMARY KEY (anp_seq, sc1_step, qua_code))""",
+    """CREATE TABLE IF NOT EXISTS mwd_resval (
+        anp_seq integer PRIMARY KEY, rv_tnd1 text, rv_tnd2 text, rv_imgtcnt integer,
+        rv_imgrcnt integer, rv_imgresrate numeric)""",
+    """CREATE TABLE IF NOT EXISTS mwd_job (
+        jo_code text PRIMARY KEY, jo_name text, jo_outline text, jo_mainbusiness text)""",
+    "CREATE TABLE IF NOT EXISTS mwd_major (ma_code text PRIMARY KEY, ma_name text)",
+    "CREATE TABLE IF NOT EXISTS mwd_job_major_map (jo_code text, ma_code text)",
+    """CREATE TABLE IF NOT EXISTS mwd_resjob (
+        anp_seq integer, rej_kind text, rej_rank integer, rej_code text, rej_quacode text,
+        PRIMARY KEY (anp_seq, rej_kind, rej_rank))""",
+    """CREATE TABLE IF NOT EXISTS mwd_duty (
+        du_code text PRIMARY KEY, du_name text, du_outline text, du_department text)""",
+    """CREATE TABLE IF NOT EXISTS mwd_resduty (
+        anp_seq integer, red_kind text, red_rank integer, red_code text,
+        PRIMARY KEY (anp_seq, red_kind, red_rank))""",
+    """CREATE TABLE IF NOT EXISTS mwd_tendency_study (
+        qua_code text PRIMARY KEY, tes_study_tendency text, tes_study_way text)""",
+    """CREATE TABLE IF NOT EXISTS mwd_studyway_rate (
+        qua_code text, sw_type text, sw_kind integer, sw_kindname text, sw_rate numeric, sw_color text)""",
+    """CREATE TABLE IF NOT EXISTS mwd_tendency_subject_map (
+        tsm_subject_code text PRIMARY KEY, tsm_subject_group text, tsm_subject_choice text,
+        tsm_subject text, tsm_subject_explain text, tsm_use char(1), """
+    + ", ".join(f"{column} integer" for column in SUBJECT_TYPE_COLUMNS) + ")",
+    """CREATE TABLE IF NOT EXISTS mwd_competency_subject_map (
+        tal_code text, mcs_group text, mcs_area text, mcs_name text, mcs_explain text,
+        mcs_rank integer, mcs_use char(1))""",
+    "CREATE INDEX IF NOT EXISTS idx_mwd_question_kind ON mwd_question (qu_kind1, qu_kind2)",
+    "CREATE INDEX IF NOT EXISTS idx_mwd_score1_step ON mwd_score1 (sc1_step, qua_code)",
+    "CREATE INDEX IF NOT EXISTS idx_mwd_job_major_map_job ON mwd_job_major_map (jo_code)",
+    f"CREATE TABLE IF NOT EXISTS {MARKER_TABLE} (created_at timestamptz DEFAULT now(), testers integer)",
+]
+
+TABLES = [
+    "mwd_person", "mwd_account", "mwd_answer_progress", "mwd_question_attr", "mwd_question_explain",
+    "mwd_question", "mwd_answer", "mwd_score1", "mwd_resval", "mwd_job", "mwd_major",
+    "mwd_job_major_map", "mwd_resjob", "mwd_duty", "mwd_resduty", "mwd_tendency_study",
+    "mwd_studyway_rate", "mwd_tendency_subject_map", "mwd_competency_subject_map", MARKER_TABLE,
+]
+
+@dataclass
+class SyntheticScale:
+    """Size of the generated data set"""
+    testers: int = 1000
+    jobs: int = 500
+    majors: int = 200
+    duties: int = 100
+    subjects: int = 40
+    questions_per_tendency: int = 20
+    questions_per_thinking_skill: int = 10
+    batch_size: int = 5000
+
+    @property
+    def answers_per_tester(self) -> int:
+        return (
+            len(TENDENCY_CODES) * self.questions_per_tendency
+            + len(THINKING_CODES) * self.questions_per_thinking_skill
+        )
+
+class SyntheticLegacyDatabase:
+    """
+    Builds a synthetic legacy database.
+
+    Only ever pass the URL of a disposable local database: reset() refuses to
+    drop mwd_* tables that were not created by this class.
+    """
+
+    def __init__(self, database_url: str, engine: Optional[Engine] = None):
+        if not database_url and engine is None:
+            raise ValueError("A database URL for the synthetic legacy database is required")
+        self.engine = engine or create_engine(database_url)
+
+    def is_synthetic(self) -> bool:
+        tables = set(inspect(self.engine).get_table_names())
+        return MARKER_TABLE in tables or "mwd_answer_progress" not in tables
+
+    def reset(self) -> None:
+        """Drop all synthetic mwd_* tables"""
+        if not self.is_synthetic():
+            raise RuntimeError(
+                "Refusing to drop mwd_* tables: database was not created by SyntheticLegacyDatabase"
+            )
+        with self.engine.begin() as conn:
+            for table in TABLES:
+                conn.execute(text(f"DROP TABLE IF EXISTS {table} CASCADE"))
+
+    def create_schema(self) -> None:
+        with self.engine.begin() as conn:
+            for ddl in SCHEMA_DDL:
+                conn.execute(text(ddl))
+
+    def generate(self, scale: SyntheticScale, seed: float = 0.42, reset: bool = True) -> Dict[str, Any]:
+        """Create schema, catalogs and `scale.testers` synthetic testers; returns row counts"""
+        started = time.time()
+        if reset:
+            self.reset()
+        self.create_schema()
+
+        with self.engine.begin() as conn:
+            conn.execute(text("SELECT setseed(:seed)"), {"seed": seed})
+            self._insert_catalogs(conn, scale)
+
+        for first in range(1, scale.testers + 1, scale.batch_size):
+            last = min(first + scale.batch_size - 1, scale.testers)
+            with self.engine.begin() as conn:
+                conn.execute(text("SELECT setseed(:seed)"), {"seed": (seed * first) % 1})
+                self._insert_testers(conn, scale, first, last)
+            logger.info(f"Generated synthetic testers {first}-{last} of {scale.testers}")
+
+        with self.engine.begin() as conn:
+            conn.execute(text(f"INSERT INTO {MARKER_TABLE} (testers) VALUES (:testers)"), {"testers": scale.testers})
+        # 통계가 없으면 플래너가 실제와 다른 계획을 고르므로 적재 후 반드시 ANALYZE
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE"))
+
+        counts = self.row_counts()
+        logger.info(f"Synthetic legacy database ready in {time.time() - started:.1f}s: {counts}")
+        return counts
+
+    def row_counts(self) -> Dict[str, int]:
+        with self.engine.connect() as conn:
+            return {
+                table: conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+                for table in TABLES if table != MARKER_TABLE
+            }
+
+    def _insert_catalogs(self, conn, scale: SyntheticScale) -> None:
+        names = {"tnd": "성향{}형", "thk": "사고력{}", "tal": "역량{}", "img": "이미지선호{}"}
+        attr_rows = [
+            {"code": code, "name": names[step].format(i + 1)}
+            for step, codes in SCORE_STEPS.items()
+            for i, code in enumerate(codes)
+        ]
+        conn.execute(text("INSERT INTO mwd_question_attr VALUES (:code, :name)"), attr_rows)
+        conn.execute(
+            text("INSERT INTO mwd_question_explain VALUES (:code, 1, :explain)"),
+            [
+                {"code": row["code"], "explain": f"OOO은 {row['name']} 특성을 보입니다."}
+                for row in attr_rows if row["code"][:3] in ("tal", "img")
+            ],
+        )
+
+        question_rows = []
+        for code in TENDENCY_CODES:
+            question_rows += [
+                {"qu": f"q{code}_{i:03d}", "explain": f"{code} 문항 {i}", "k1": "tnd", "k2": code}
+                for i in range(scale.questions_per_tendency)
+            ]
+        for code in THINKING_CODES:
+            question_rows += [
+                {"qu": f"q{code}_{i:03d}", "explain": f"{code} 문항 {i}", "k1": "thk", "k2": code}
+                for i in range(scale.questions_per_thinking_skill)
+            ]
+        conn.execute(text("INSERT INTO mwd_question VALUES (:qu, :explain, :k1, :k2, 'Y', 'Y')"), question_rows)
+
+        conn.execute(
+            text("INSERT INTO mwd_tendency_study VALUES (:code, :tendency, :way)"),
+            [
+                {"code": code, "tendency": f"OOO은 {code} 학습 성향입니다.", "way": f"OOO에게 맞는 {code} 학습법"}
+                for code in TENDENCY_CODES
+            ],
+        )
+        conn.execute(
+            text("""
+            INSERT INTO mwd_studyway_rate
+            SELECT t.code, k.sw_type, k.sw_kind, k.sw_type || '-' || k.sw_kind,
+                   round(random()::numeric, 2),
+                   CASE WHEN k.sw_kind % 2 = 0 THEN '#4a90d9' ELSE 'rgb(74, 144, 217)' END
+            FROM unnest(CAST(:codes AS text[])) AS t(code)
+            CROSS JOIN (SELECT t2.sw_type, g AS sw_kind
+                        FROM unnest(ARRAY['S', 'W']) AS t2(sw_type), generate_series(1, 4) g) k
+            """),
+            {"codes": TENDENCY_CODES},
+        )
+        conn.execute(
+            text(f"""
+            INSERT INTO mwd_tendency_subject_map
+            SELECT 'sub' || lpad(g::text, 3, '0'), '교과군' || (g % 5), '선택' || (g % 3), '과목' || g,
+                   '과목 ' || g || ' 설명', CASE WHEN g % 10 = 0 THEN 'N' ELSE 'Y' END,
+                   {", ".join("(1 + floor(random() * :subjects))::int" for _ in SUBJECT_TYPE_COLUMNS)}
+            FROM generate_series(1, :subjects) g
+            """),
+            {"subjects": scale.subjects},
+        )
+        conn.execute(
+            text("""
+            INSERT INTO mwd_competency_subject_map
+            SELECT t.code, '그룹' || r, '영역' || r, t.code || ' 과목' || r, '설명', r, 'Y'
+            FROM unnest(CAST(:codes AS text[])) AS t(code), generate_series(1, 5) r
+            """),
+            {"codes": TALENT_CODES},
+        )
+        conn.execute(
+            text("""
+            INSERT INTO mwd_job
+            SELECT 'job' || lpad(g::text, 5, '0'), '직업' || g, '직업 ' || g || ' 개요',
+                   CASE WHEN g % 7 = 0 THEN NULL ELSE '직업 ' || g || ' 주요 업무' END
+            FROM generate_series(1, :jobs) g
+            """),
+            {"jobs": scale.jobs},
+        )
+        conn.execute(
+            text("INSERT INTO mwd_major SELECT 'ma' || lpad(g::text, 4, '0'), '학과' || g FROM generate_series(1, :majors) g"),
+            {"majors": scale.majors},
+        )
+        conn.execute(
+            text("""
+            INSERT INTO mwd_job_major_map
+            SELECT 'job' || lpad(g::text, 5, '0'), 'ma' || lpad((1 + (g * 7 + i * 13) % :majors)::text, 4, '0')
+            FROM generate_series(1, :jobs) g, generate_series(1, 3) i
+            """),
+            {"jobs": scale.jobs, "majors": scale.majors},
+        )
+        conn.execute(
+            text("""
+            INSERT INTO mwd_duty
+            SELECT 'du' || lpad(g::text, 4, '0'), '직무' || g, '직무 ' || g || ' 내용', '관련학과' || (g % 20)
+            FROM generate_series(1, :duties) g
+            """),
+            {"duties": scale.duties},
+        )
+
+    def _insert_testers(self, conn, scale: SyntheticScale, first: int, last: int) -> None:
+        params: Dict[str, Any] = {"first": first, "last": last}
+        conn.execute(text("""
+            INSERT INTO mwd_person
+            SELECT g, '테스터' || g, 1970 + floor(random() * 35)::int, 1 + floor(random() * 12)::int,
+                   1 + floor(random() * 28)::int, CASE WHEN random() < 0.5 THEN 'M' ELSE 'F' END
+            FROM generate_series(:first, :last) g
+        """), params)
+        conn.execute(text("""
+            INSERT INTO mwd_account SELECT 'gid-' || g, g FROM generate_series(:first, :last) g
+        """), params)
+        conn.execute(text("""
+            INSERT INTO mwd_answer_progress SELECT g, 'gid-' || g FROM generate_series(:first, :last) g
+        """), params)
+
+        steps: List[str] = []
+        codes: List[str] = []
+        for step, step_codes in SCORE_STEPS.items():
+            steps += [step] * len(step_codes)
+            codes += step_codes
+        conn.execute(text("""
+            INSERT INTO mwd_score1
+            SELECT anp_seq, step, code, rate,
+                   row_number() OVER (PARTITION BY anp_seq, step ORDER BY rate DESC, code),
+                   10, resrate
+            FROM (
+                SELECT g AS anp_seq, c.step, c.code,
+                       round(random()::numeric, 4) AS rate, round(random()::numeric, 4) AS resrate
+                FROM generate_series(:first, :last) g
+                CROSS JOIN unnest(CAST(:steps AS text[]), CAST(:codes AS text[])) AS c(step, code)
+            ) s
+        """), {**params, "steps": steps, "codes": codes})
+        conn.execute(text("""
+            INSERT INTO mwd_resval
+            SELECT anp_seq,
+                   max(CASE WHEN sc1_rank = 1 THEN qua_code END),
+                   max(CASE WHEN sc1_rank = 2 THEN qua_code END),
+                   60, 30 + floor(random() * 30)::int, round(random()::numeric, 4)
+            FROM mwd_score1
+            WHERE sc1_step = 'tnd' AND anp_seq BETWEEN :first AND :last
+            GROUP BY anp_seq
+        """), params)
+        conn.execute(text("""
+            INSERT INTO mwd_answer
+            SELECT g, q.qu_code, 1 + floor(random() * 5)::int
+            FROM generate_series(:first, :last) g CROSS JOIN mwd_question q
+        """), params)
+        conn.execute(text("""
+            INSERT INTO mwd_resjob
+            SELECT g, k.kind, r, 'job' || lpad((1 + floor(random() * :jobs))::int::text, 5, '0'),
+                   CASE WHEN k.kind LIKE 'rimg%' THEN 'img0' || substr(k.kind, 5, 1) || '000' END
+            FROM generate_series(:first, :last) g
+            CROSS JOIN unnest(CAST(:kinds AS text[]), CAST(:ranks AS integer[])) AS k(kind, max_rank)
+            CROSS JOIN LATERAL generate_series(1, k.max_rank) r
+        """), {**params, "jobs": scale.jobs, "kinds": list(RESJOB_KINDS), "ranks": list(RESJOB_KINDS.values())})
+        conn.execute(text("""
+            INSERT INTO mwd_resduty
+            SELECT g, 'rtnd', r, 'du' || lpad((1 + floor(random() * :duties))::int::text, 4, '0')
+            FROM generate_series(:first, :last) g CROSS JOIN generate_series(1, 5) r
+        """), {**params, "duties": scale.duties})
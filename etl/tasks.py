@@ -10,6 +10,7 @@ from typing import Dict, Any, List, Optional
 import traceback
 import os
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.models import ChatUser, ChatDocument
@@ -18,7 +19,10 @@ from database.connection import db_manager
 from etl.legacy_query_executor import LegacyQueryExecutor, QueryResult
 from etl.document_transformer import DocumentTransformer, TransformedDocument
 from etl.vector_embedder import VectorEmbedder
-from etl.test_completion_handler import JobTracker
+from etl.embedding_store import EmbeddingStore
+from etl.progress_tracker import CoalescingJobTracker
+from etl.error_handling import classify_error
+from etl.config import BACKGROUND_PROCESSING_CONFIG, EMBEDDING_CONFIG, ETL_CONFIG, QUERY_CONFIG
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +44,8 @@ async def process_test_completion(
     job_id: str,
     test_type: str = "standard",
     completed_at: str = None,
-    notification_source: str = "test_system"
+    notification_source: str = "test_system",
+    force: bool = False
 ) -> Dict[str, Any]:
     """
     Main ETL processing task for test completion
@@ -52,23 +57,45 @@ async def process_test_completion(
         test_type: Type of test completed
         completed_at: ISO timestamp of test completion
         notification_source: Source of the notification
+        force: Re-embed and store documents whose content is unchanged
     """
     return await _process_test_completion_async(
-        user_id, anp_seq, job_id, test_type, completed_at, notification_source
+        user_id, anp_seq, job_id, test_type, completed_at, notification_source, force
     )
 
+async def prefetch_legacy_query_results(anp_seqs: List[int]) -> int:
+    """
+    Extract the legacy query results of many users in one bulk pass and hand
+    them to their jobs (reprocess / backfill jobs claimed together by the
+    worker pool). Returns the number of users with prefetched results.
+    """
+    executor = LegacyQueryExecutor(
+        max_retries=QUERY_CONFIG['max_retries'],
+        retry_delay=QUERY_CONFIG['retry_delay'],
+        query_timeout=QUERY_CONFIG['timeout_seconds'],
+        backend=QUERY_CONFIG['backend'],
+        bulk_chunk_size=QUERY_CONFIG['bulk_chunk_size'],
+    )
+    try:
+        return await executor.prefetch_bulk_queries_async(None, anp_seqs)
+    finally:
+        await executor.close()
+
 async def _process_test_completion_async(
     user_id: str,
     anp_seq: int,
     job_id: str,
     test_type: str,
     completed_at: str,
-    notification_source: str
+    notification_source: str,
+    force: bool = False
 ) -> Dict[str, Any]:
     """
     Async implementation of ETL processing using the orchestrator
     """
     start_time = datetime.now()
+    # 프로세스 공용 tracker: 동시 작업들의 진행률 갱신을 한 번의 UPDATE 로 모아 쓴다
+    job_tracker = CoalescingJobTracker.instance()
     
     try:
         logger.info(f"Starting ETL processing for job {job_id}, user {user_id}, anp_seq {anp_seq}")
@@ -86,35 +113,31 @@ async def _process_test_completion_async(
         orchestrator = ETLOrchestrator(
             validation_level=validation_level,
             enable_rollback=os.getenv('ETL_ENABLE_ROLLBACK', 'true').lower() == 'true',
-            max_retries_per_stage=int(os.getenv('ETL_MAX_RETRIES_PER_STAGE', '2'))
+            max_retries_per_stage=int(os.getenv('ETL_MAX_RETRIES_PER_STAGE', '2')),
+            # 강제 재처리는 content_hash 가 같아도 모든 문서를 다시 임베딩한다
+            skip_unchanged_documents=ETL_CONFIG['skip_unchanged_documents'] and not force
         )
         
         # Get database session
         async with get_database_session() as session:
-            # Process test completion using orchestrator with DB-based tracker
+            # Process test completion using orchestrator with DB-based tracker.
+            # The completion stage marks the job as success.
             result = await orchestrator.process_test_completion(
                 user_id=user_id,
                 anp_seq=anp_seq,
                 job_id=job_id,
                 session=session,
-                job_tracker=JobTracker()
+                job_tracker=job_tracker
             )
             
             logger.info(f"ETL processing completed successfully for job {job_id}")
-            # Ensure job is marked as success if orchestrator didn't already
-            try:
-                await JobTracker().update_job(
-                    job_id,
-                    status="success",
-                    progress_percentage=100.0,
-                    current_step="ETL processing completed",
-                    completed_steps=7,
-                    completed_at=datetime.now(),
-                )
-            except Exception:
-                pass
             return result
         
+    except asyncio.CancelledError:
+        # Timeout / shutdown / lost lease: the queue owns the row now, so
+        # unwritten progress must not overwrite its status later
+        job_tracker.discard(job_id)
+        raise
     except Exception as e:
         # Handle failure
         processing_time = (datetime.now() - start_time).total_seconds()
@@ -125,7 +148,7 @@ async def _process_test_completion_async(
         
         # Ensure failure is recorded
         try:
-            await JobTracker().update_job(
+            await job_tracker.update_job(
                 job_id,
                 status="failure",
                 error_message=error_message,
@@ -138,31 +161,66 @@ async def _process_test_completion_async(
             "job_id": job_id,
             "status": "failure",
             "error_message": error_message,
-            "processing_time_seconds": processing_time
+            "processing_time_seconds": processing_time,
+            # 일시적 오류면 작업 큐가 같은 job_id 로 다시 시도한다 (BackgroundTaskManager)
+            "retryable": classify_error(e)[2]
         }
 
 # Individual step functions are now handled by the ETL orchestrator
 # This keeps the code cleaner and provides better error handling and validation
 
-async def cleanup_failed_jobs(max_age_hours: int = 168) -> Dict[str, Any]:
+async def cleanup_failed_jobs(
+    max_age_hours: int = 168,
+    purge: bool = BACKGROUND_PROCESSING_CONFIG['purge_failed_jobs']
+) -> Dict[str, Any]:
     """
-    Cleanup old failed jobs
+    Report (and, if `purge` is set, delete) old failed jobs
     
     Args:
-        max_age_hours: Maximum age of jobs to keep in hours
+        max_age_hours: Age in hours after which a failed job counts as old
+        purge: Delete the old failed jobs. This removes their job history and,
+            through ON DELETE CASCADE, their saved stage outputs
+            (chat_etl_stage_outputs), so they can no longer be retried or resumed.
+            Off by default (ETL_PURGE_FAILED_JOBS)
     """
-    return await _cleanup_failed_jobs_async(max_age_hours)
+    return await _cleanup_failed_jobs_async(max_age_hours, purge)
 
-async def _cleanup_failed_jobs_async(max_age_hours: int) -> Dict[str, Any]:
+OLD_FAILED_JOBS_WHERE = (
+    "WHERE status = 'failure' AND locked_by IS NULL "
+    "AND COALESCE(completed_at, updated_at) < CURRENT_TIMESTAMP - make_interval(hours => :max_age_hours)"
+)
+
+async def _cleanup_failed_jobs_async(max_age_hours: int, purge: bool) -> Dict[str, Any]:
     """Async implementation of job cleanup"""
     try:
-        # This would need to be implemented based on how we store job data
-        # For now, just log the intent
-        logger.info(f"Would cleanup jobs older than {max_age_hours} hours")
+        async with get_database_session() as session:
+            if not purge:
+                failed_jobs = (await session.execute(
+                    text(f"SELECT count(*) FROM chat_etl_jobs {OLD_FAILED_JOBS_WHERE}"),
+                    {"max_age_hours": max_age_hours}
+                )).scalar_one()
+                logger.info(
+                    f"{failed_jobs} failed jobs older than {max_age_hours} hours "
+                    f"(kept; set ETL_PURGE_FAILED_JOBS=true to delete them)"
+                )
+                return {
+                    "status": "success",
+                    "failed_jobs": failed_jobs,
+                    "cleaned_jobs": 0,
+                    "message": "Cleanup completed"
+                }
+
+            result = await session.execute(
+                text(f"DELETE FROM chat_etl_jobs {OLD_FAILED_JOBS_WHERE} RETURNING job_id"),
+                {"max_age_hours": max_age_hours}
+            )
+            cleaned_jobs = len(result.all())
         
+        logger.info(f"Purged {cleaned_jobs} failed jobs older than {max_age_hours} hours (with their stage outputs)")
         return {
             "status": "success",
-            "cleaned_jobs": 0,
+            "failed_jobs": cleaned_jobs,
+            "cleaned_jobs": cleaned_jobs,
             "message": "Cleanup completed"
         }
         
@@ -209,7 +267,8 @@ async def _reprocess_user_data_async(user_id: str, anp_seq: int, force: bool) ->
             anp_seq=anp_seq,
             test_type="reprocess",
             completed_at=datetime.now(),
-            notification_source="reprocess_system"
+            notification_source="reprocess_system",
+            force=force
         )
         
         # This would need the actual handler instance
@@ -230,13 +289,36 @@ async def _reprocess_user_data_async(user_id: str, anp_seq: int, force: bool) ->
             "error_message": str(e)
         }
 
+async def prune_embedding_cache(
+    max_idle_days: int = EMBEDDING_CONFIG['persistent_cache_ttl_days']
+) -> Dict[str, Any]:
+    """
+    Delete persistent embedding cache rows not read for `max_idle_days` days
+    (including every row of a model that is no longer used)
+    """
+    try:
+        pruned = await EmbeddingStore.instance().prune(max_idle_days)
+        logger.info(f"Pruned {pruned} embedding cache rows idle for over {max_idle_days} days")
+        return {
+            "status": "success",
+            "pruned_embeddings": pruned,
+            "message": "Embedding cache pruned"
+        }
+
+    except Exception as e:
+        logger.error(f"Embedding cache pruning failed: {e}")
+        return {
+            "status": "failure",
+            "error_message": str(e)
+        }
+
 async def health_check() -> Dict[str, Any]:
     """Health check task for monitoring"""
     try:
         # Check database connection
         async with get_database_session() as session:
             # Simple query to test connection
-            await session.execute("SELECT 1")
+            await session.execute(text("SELECT 1"))
         
         return {
             "status": "healthy",
@@ -252,13 +334,17 @@ async def health_check() -> Dict[str, Any]:
             "error": str(e)
         }
 
-# Periodic task configuration (for future BackgroundTaskManager implementation)
+# Periodic task configuration (run by the standalone worker, etl/worker.py)
 PERIODIC_TASKS = {
     'cleanup-failed-jobs': {
         'function': cleanup_failed_jobs,
         'schedule_seconds': 3600,  # Every hour
         'args': (168,)  # 7 days
     },
+    'prune-embedding-cache': {
+        'function': prune_embedding_cache,
+        'schedule_seconds': 86400,  # Daily
+    },
     'health-check': {
         'function': health_check,
         'schedule_seconds': 300,  # Every 5 minutes
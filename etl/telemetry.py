@@ -0,0 +1,167 @@
+"""
+ETL Telemetry
+Records per-stage durations, legacy query latency and row counts, embedding
+cache hits and job outcomes in the shared MetricsRegistry (served by
+/metrics), and summarizes them for /api/etl/stats.
+"""
+
+from typing import Dict, Any, Iterable, List, Optional
+
+from monitoring.metrics import inc, observe, get_metrics
+
+METRIC_PREFIX = "etl_"
+STAGE_SECONDS = "etl_stage_seconds"
+STAGE_MEMORY_MB = "etl_stage_memory_mb"
+QUERY_SECONDS = "etl_query_seconds"
+QUERY_ROWS = "etl_query_rows"
+QUERY_FAILURES = "etl_query_failures_total"
+EMBEDDINGS = "etl_embeddings_total"
+JOBS = "etl_jobs_total"
+JOB_SECONDS = "etl_job_seconds"
+
+# 단계 하나가 수 분까지 걸릴 수 있어 (재시도 대기 포함) 넓게 잡는다
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+QUERY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+JOB_BUCKETS = (1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# doc_type label of checkpoints that cover every document (staged pipeline)
+ALL_DOCUMENTS = "all"
+
+async def record_stage(
+    stage: str,
+    duration: float,
+    success: bool,
+    memory_mb: float,
+    doc_type: Optional[str] = None
+) -> None:
+    """One stage run (or one document step in dataflow mode)"""
+    labels = {"stage": stage, "doc_type": doc_type or ALL_DOCUMENTS, "status": "success" if success else "failure"}
+    await observe(STAGE_SECONDS, duration, labels, buckets=STAGE_BUCKETS)
+    if memory_mb:
+        await observe(STAGE_MEMORY_MB, memory_mb, {"stage": stage})
+
+async def record_query_results(results: Iterable[Any]) -> None:
+    """Latency and row count of executed legacy queries (QueryResult)"""
+    for result in results:
+        labels = {"query": result.query_name}
+        if not result.success:
+            await inc(QUERY_FAILURES, labels=labels)
+        if result.execution_time is not None:
+            await observe(
+                QUERY_SECONDS, result.execution_time,
+                {**labels, "status": "success" if result.success else "failure"}, buckets=QUERY_BUCKETS
+            )
+        if result.success and result.row_count is not None:
+            await observe(QUERY_ROWS, result.row_count, labels)
+
+def embedding_source(document: Dict[str, Any]) -> str:
+    """'cache', 'api' or 'dummy' (zero vector: the whole embedder or just this text failed)"""
+    if not any(document.get('embedding_vector') or ()):
+        return "dummy"
+    metadata = document.get('embedding_metadata') or {}
+    return "cache" if metadata.get('cached') else "api"
+
+async def record_embeddings(documents: List[Dict[str, Any]]) -> None:
+    for document in documents:
+        doc_type = getattr(document.get('doc_type'), 'value', document.get('doc_type'))
+        await inc(EMBEDDINGS, labels={"doc_type": doc_type, "source": embedding_source(document)})
+
+async def record_job(
+    status: str,
+    duration: float,
+    failed_stage: Optional[str] = None,
+    error_type: Optional[str] = None
+) -> None:
+    """Outcome of one job attempt ('success' or 'failure')"""
+    labels = {"status": status}
+    if status != "success":
+        labels.update(failed_stage=failed_stage or "unknown", error_type=error_type or "unknown")
+    await inc(JOBS, labels=labels)
+    await observe(JOB_SECONDS, duration, {"status": status}, buckets=JOB_BUCKETS)
+
+def _merge(totals: Dict[str, Dict[str, float]], key: str, hist: Dict[str, Any]) -> Dict[str, float]:
+    entry = totals.setdefault(key, {"count": 0.0, "sum": 0.0, "max": 0.0})
+    entry["count"] += hist["count"]
+    entry["sum"] += hist["sum"]
+    entry["max"] = max(entry["max"], hist["max"])
+    return entry
+
+def _ratio(part: float, total: float) -> float:
+    return round(part / total, 4) if total else 0.0
+
+async def summarize() -> Dict[str, Any]:
+    """Process-local ETL telemetry since start, aggregated for /api/etl/stats"""
+    snapshot = await get_metrics(METRIC_PREFIX)
+    stages: Dict[str, Dict[str, float]] = {}
+    queries: Dict[str, Dict[str, float]] = {}
+    rows: Dict[str, Dict[str, float]] = {}
+    job_time: Dict[str, Dict[str, float]] = {}
+    for hist in snapshot["histograms"]:
+        labels = hist["labels"]
+        if hist["name"] == STAGE_SECONDS:
+            entry = _merge(stages, labels["stage"], hist)
+            if labels.get("status") == "failure":
+                entry["failures"] = entry.get("failures", 0.0) + hist["count"]
+        elif hist["name"] == QUERY_SECONDS:
+            _merge(queries, labels["query"], hist)
+        elif hist["name"] == QUERY_ROWS:
+            _merge(rows, labels["query"], hist)
+        elif hist["name"] == JOB_SECONDS:
+            _merge(job_time, labels["status"], hist)
+
+    query_failures: Dict[str, float] = {}
+    embeddings: Dict[str, Dict[str, float]] = {}
+    jobs: Dict[str, float] = {}
+    failed_stages: Dict[str, float] = {}
+    for counter in snapshot["counters"]:
+        labels = counter["labels"]
+        if counter["name"] == QUERY_FAILURES:
+            query_failures[labels["query"]] = counter["value"]
+        elif counter["name"] == EMBEDDINGS:
+            by_source = embeddings.setdefault(labels["doc_type"], {"cache": 0.0, "api": 0.0, "dummy": 0.0})
+            by_source[labels["source"]] = by_source.get(labels["source"], 0.0) + counter["value"]
+        elif counter["name"] == JOBS:
+            jobs[labels["status"]] = jobs.get(labels["status"], 0.0) + counter["value"]
+            if "failed_stage" in labels:
+                failed_stages[labels["failed_stage"]] = failed_stages.get(labels["failed_stage"], 0.0) + counter["value"]
+
+    def cache_stats(by_source: Dict[str, float]) -> Dict[str, Any]:
+        lookups = by_source["cache"] + by_source["api"]
+        return {**by_source, "hit_ratio": _ratio(by_source["cache"], lookups)}
+
+    all_sources = {"cache": 0.0, "api": 0.0, "dummy": 0.0}
+    for by_source in embeddings.values():
+        for source, count in by_source.items():
+            all_sources[source] += count
+
+    return {
+        "jobs": {
+            "succeeded": jobs.get("success", 0.0),
+            "failed": jobs.get("failure", 0.0),
+            "failed_by_stage": failed_stages,
+            "avg_seconds": {status: _ratio(t["sum"], t["count"]) for status, t in job_time.items()},
+        },
+        "stages": {
+            stage: {
+                "count": t["count"],
+                "failures": t.get("failures", 0.0),
+                "avg_seconds": _ratio(t["sum"], t["count"]),
+                "max_seconds": round(t["max"], 4),
+            }
+            for stage, t in stages.items()
+        },
+        "queries": {
+            name: {
+                "count": queries.get(name, {}).get("count", 0.0),
+                "failures": query_failures.get(name, 0.0),
+                "avg_seconds": _ratio(queries[name]["sum"], queries[name]["count"]) if name in queries else 0.0,
+                "max_seconds": round(queries[name]["max"], 4) if name in queries else 0.0,
+                "avg_rows": _ratio(rows[name]["sum"], rows[name]["count"]) if name in rows else 0.0,
+            }
+            for name in sorted(set(queries) | set(query_failures))
+        },
+        "embedding_cache": {
+            "overall": cache_stats(all_sources),
+            "by_doc_type": {doc_type: cache_stats(by_source) for doc_type, by_source in embeddings.items()},
+        },
+    }
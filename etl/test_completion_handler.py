@@ -3,17 +3,17 @@ Test Completion Event Handler
 Handles test completion notifications and triggers ETL processing
 """
 
-import asyncio
 import logging
 import uuid
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 import json
 
 # Note: Celery and Redis dependencies removed - using database-based job tracking
 from fastapi import HTTPException
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.models import ChatUser, ChatETLJob
@@ -22,6 +22,10 @@ from database.repositories import UserRepository
 from etl.legacy_query_executor import LegacyQueryExecutor
 from etl.document_transformer import DocumentTransformer
 from etl.vector_embedder import VectorEmbedder
+from etl.background_task_manager import BackgroundTaskManager
+from etl.job_queue import ETLJobQueue
+from etl.job_lanes import JobPriority, lane_rank
+from etl.job_events import PROGRESS_CHANNEL, progress_event
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +62,11 @@ class JobProgress:
     retry_count: int = 0
     query_results_summary: Optional[Dict[str, Any]] = None
     documents_created: Optional[List[str]] = None
+    priority: JobPriority = JobPriority.INTERACTIVE
+    # 내용이 바뀌지 않은 문서도 다시 임베딩/저장한다 (강제 재처리)
+    force: bool = False
+    # 워커가 아직 작업을 잡고 있는지 (failure 이후 큐가 재시도로 돌릴 수 있다)
+    leased: bool = False
 
 @dataclass
 class TestCompletionRequest:
@@ -67,6 +76,104 @@ class TestCompletionRequest:
     test_type: str
     completed_at: datetime
     notification_source: str = "test_system"
+    priority: JobPriority = JobPriority.INTERACTIVE
+    force: bool = False
+
+# Notifications of the same test are serialized with transaction-level
+# advisory locks on (INFLIGHT_LOCK_NAMESPACE, anp_seq bucket). Tests share a
+# bounded set of buckets so a bulk request never holds more than
+# INFLIGHT_LOCK_BUCKETS locks (the shared lock table holds only
+# max_locks_per_transaction x max_connections entries).
+INFLIGHT_LOCK_NAMESPACE = 73_010_015
+INFLIGHT_LOCK_BUCKETS = 256
+
+INFLIGHT_LOCK_SQL = "SELECT pg_advisory_xact_lock(:namespace, :bucket)"
+
+def inflight_lock_bucket(anp_seq: int) -> int:
+    return anp_seq % INFLIGHT_LOCK_BUCKETS
+
+# Bulk ingest: set-based statements over unnest()ed request arrays.
+# The bucket locks of create_or_get_inflight_job are taken deduplicated and
+# in sorted order so concurrent bulk requests cannot deadlock.
+BULK_LOCK_SQL = """
+SELECT pg_advisory_xact_lock(:namespace, b)
+FROM (SELECT b FROM unnest(CAST(:buckets AS integer[])) AS b ORDER BY b) AS ordered_buckets
+"""
+
+BULK_INSERT_USERS_SQL = """
+INSERT INTO chat_users (user_id, anp_seq, name, test_completed_at)
+SELECT s.user_id, s.anp_seq, 'User_' || s.anp_seq, s.completed_at
+FROM unnest(
+    CAST(:user_ids AS uuid[]), CAST(:anp_seqs AS integer[]), CAST(:completed_at AS timestamp[])
+) AS s(user_id, anp_seq, completed_at)
+WHERE NOT EXISTS (SELECT 1 FROM chat_users u WHERE u.user_id = s.user_id)
+ON CONFLICT DO NOTHING
+"""
+
+BULK_USERS_SQL = """
+SELECT user_id, anp_seq FROM chat_users
+WHERE user_id = ANY(CAST(:user_ids AS uuid[])) OR anp_seq = ANY(CAST(:anp_seqs AS integer[]))
+"""
+
+BULK_INSERT_JOBS_SQL = """
+INSERT INTO chat_etl_jobs (
+    job_id, user_id, anp_seq, status, progress_percentage, current_step,
+    completed_steps, total_steps, started_at, updated_at, available_at, retry_count, attempts, priority
+)
+SELECT s.job_id, s.user_id, s.anp_seq, 'pending', 0, 'Queued for processing',
+       0, :total_steps, :now, :now, :now, 0, 0, s.priority
+FROM unnest(
+    CAST(:job_ids AS uuid[]), CAST(:user_ids AS uuid[]), CAST(:anp_seqs AS integer[]),
+    CAST(:priorities AS varchar[])
+) AS s(job_id, user_id, anp_seq, priority)
+"""
+
+# 합쳐진 알림이 더 급한 레인이면 아직 대기 중인 작업의 레인을 올린다
+BULK_PROMOTE_SQL = """
+UPDATE chat_etl_jobs AS j
+SET priority = s.priority
+FROM unnest(CAST(:job_ids AS uuid[]), CAST(:priorities AS varchar[])) AS s(job_id, priority)
+WHERE j.job_id = s.job_id AND j.status = 'pending'
+"""
+
+TERMINAL_JOB_STATUSES = [JobStatus.SUCCESS.value, JobStatus.FAILURE.value, JobStatus.PARTIAL.value]
+
+def _local_naive(value: datetime) -> datetime:
+    """chat_etl_jobs timestamps are naive local time"""
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo is not None else value
+
+def _parse_user_id(user_id: str) -> uuid.UUID:
+    try:
+        return uuid.UUID(user_id)
+    except (ValueError, TypeError):
+        # Same fallback as create_job (should not happen with API validation)
+        return uuid.uuid4()
+
+def select_coalescing_job(inflight_jobs: List[ChatETLJob], data_as_of: datetime) -> Optional[ChatETLJob]:
+    """
+    Pick the in-flight job that already covers a completion whose data is as
+    of `data_as_of`, or None when a (follow-up) job must be queued.
+
+    - a job that has never been claimed reads the data when it runs
+    - a pending job waiting for a retry resumes from its saved stage
+      outputs (etl.stage_store), so like a running job it covers only data
+      that was final when it was queued
+    - a running job covers the request if it was queued after the data was
+      final (e.g. a retried webhook); otherwise one follow-up job is queued,
+      which the queue starts only after the running job (etl.job_queue)
+    """
+    data_as_of = _local_naive(data_as_of)
+    for job in inflight_jobs:
+        if job.status == JobStatus.PENDING.value and job.locked_by is None and not (job.attempts or job.retry_count):
+            return job
+    for job in inflight_jobs:
+        if job.started_at is not None and data_as_of <= job.started_at:
+            return job
+    return None
+
+def promotes(job: ChatETLJob, priority: JobPriority) -> bool:
+    """True if a request of `priority` coalesced into `job` should move the job to a more urgent lane"""
+    return job.status == JobStatus.PENDING.value and lane_rank(priority.value) < lane_rank(job.priority)
 
 class JobTracker:
     """
@@ -79,50 +186,205 @@ class JobTracker:
     async def create_job(self, job_progress: JobProgress) -> None:
         """Create new job tracking entry in database"""
         async with db_manager.get_async_session() as session:
-            # Ensure user exists to satisfy FK constraint on chat_etl_jobs
-            try:
-                user_uuid = uuid.UUID(job_progress.user_id)
-            except Exception:
-                # Fallback: generate UUID if invalid input (should not happen with API validation)
-                user_uuid = uuid.uuid4()
-            existing_user = await session.get(ChatUser, user_uuid)
-            if not existing_user:
-                # If user_id not found, try to find by anp_seq to avoid unique violations
-                from sqlalchemy import select
-                result = await session.execute(select(ChatUser).where(ChatUser.anp_seq == job_progress.anp_seq))
-                user_by_anp = result.scalar_one_or_none()
-                if user_by_anp:
-                    user_uuid = user_by_anp.user_id
-                else:
-                    # Create minimal user record
-                    session.add(ChatUser(
-                        user_id=user_uuid,
-                        anp_seq=job_progress.anp_seq,
-                        name=f"User_{job_progress.anp_seq}",
-                        test_completed_at=job_progress.started_at,
-                    ))
-                    await session.flush()
-
-            job = ChatETLJob(
-                job_id=uuid.UUID(job_progress.job_id),
-                user_id=user_uuid,
-                anp_seq=job_progress.anp_seq,
-                status=job_progress.status.value,
-                progress_percentage=int(job_progress.progress_percentage),
-                current_step=job_progress.current_step,
-                completed_steps=job_progress.completed_steps,
-                total_steps=job_progress.total_steps,
-                started_at=job_progress.started_at,
-                updated_at=job_progress.updated_at,
-                completed_at=job_progress.completed_at,
-                error_message=job_progress.error_message,
-                retry_count=job_progress.retry_count,
-                query_results_summary=job_progress.query_results_summary,
-                documents_created=job_progress.documents_created,
+            await self._add_job(session, job_progress)
+        logger.info(f"Created job tracking for job_id: {job_progress.job_id}")
+
+    async def create_or_get_inflight_job(
+        self, job_progress: JobProgress, data_as_of: datetime
+    ) -> Tuple[JobProgress, bool]:
+        """
+        Create the job unless one for the same test can absorb it.
+
+        Jobs are matched by anp_seq (unique per user, so this is the
+        (user_id, anp_seq) pair). Returns (job, created).
+        """
+        async with db_manager.get_async_session() as session:
+            # 같은 검사의 동시 알림을 직렬화해 중복 작업이 생기지 않게 한다
+            await session.execute(text(INFLIGHT_LOCK_SQL), {
+                "namespace": INFLIGHT_LOCK_NAMESPACE, "bucket": inflight_lock_bucket(job_progress.anp_seq),
+            })
+            result = await session.execute(
+                select(ChatETLJob)
+                .where(ChatETLJob.anp_seq == job_progress.anp_seq)
+                .where(ChatETLJob.status.notin_(TERMINAL_JOB_STATUSES))
+                .order_by(ChatETLJob.started_at)
             )
-            session.add(job)
-            await session.flush()
+            existing = select_coalescing_job(result.scalars().all(), data_as_of)
+            if existing is not None:
+                if promotes(existing, job_progress.priority):
+                    existing.priority = job_progress.priority.value
+                if job_progress.force and existing.status == JobStatus.PENDING.value:
+                    # 아직 시작하지 않은 작업이 강제 재처리 요청을 넘겨받는다
+                    existing.force_reprocess = True
+                return self._to_job_progress(existing), False
+            await self._add_job(session, job_progress)
         logger.info(f"Created job tracking for job_id: {job_progress.job_id}")
+        return job_progress, True
+
+    async def create_jobs_bulk(
+        self, requests: List[TestCompletionRequest]
+    ) -> List[Tuple[JobProgress, bool]]:
+        """
+        Set-based create_or_get_inflight_job for many tests at once: one
+        statement each for the locks, the missing users, the user lookup,
+        the in-flight jobs and the new jobs (plus one for lane promotions of
+        pending jobs). Returns (job, created) per request; requests for the
+        same anp_seq share one job, in the most urgent lane among them.
+        """
+        latest: Dict[int, TestCompletionRequest] = {}
+        priorities: Dict[int, JobPriority] = {}
+        for request in requests:
+            current = latest.get(request.anp_seq)
+            if current is None or _local_naive(request.completed_at) > _local_naive(current.completed_at):
+                latest[request.anp_seq] = request
+            # 같은 검사의 요청 중 가장 급한 레인을 쓴다
+            if request.anp_seq not in priorities or lane_rank(request.priority.value) < lane_rank(priorities[request.anp_seq].value):
+                priorities[request.anp_seq] = request.priority
+        anp_seqs = sorted(latest)
+        requested_user_ids = {anp_seq: _parse_user_id(latest[anp_seq].user_id) for anp_seq in anp_seqs}
+        now = datetime.now()
+        results: Dict[int, Tuple[JobProgress, bool]] = {}
+
+        async with db_manager.get_async_session() as session:
+            await session.execute(text(BULK_LOCK_SQL), {
+                "namespace": INFLIGHT_LOCK_NAMESPACE,
+                "buckets": sorted({inflight_lock_bucket(a) for a in anp_seqs}),
+            })
+            await session.execute(text(BULK_INSERT_USERS_SQL), {
+                "user_ids": [requested_user_ids[a] for a in anp_seqs],
+                "anp_seqs": anp_seqs,
+                "completed_at": [_local_naive(latest[a].completed_at) for a in anp_seqs],
+            })
+            rows = (await session.execute(text(BULK_USERS_SQL), {
+                "user_ids": [requested_user_ids[a] for a in anp_seqs], "anp_seqs": anp_seqs,
+            })).mappings().all()
+            # create_job 과 같은 규칙: user_id 가 있으면 그 사용자, 없으면 anp_seq 의 사용자
+            existing_users = {row["user_id"] for row in rows}
+            users_by_anp_seq = {row["anp_seq"]: row["user_id"] for row in rows}
+            user_ids = {
+                a: requested_user_ids[a] if requested_user_ids[a] in existing_users else users_by_anp_seq[a]
+                for a in anp_seqs
+            }
+
+            inflight: Dict[int, List[ChatETLJob]] = {}
+            result = await session.execute(
+                select(ChatETLJob)
+                .where(ChatETLJob.anp_seq.in_(anp_seqs))
+                .where(ChatETLJob.status.notin_(TERMINAL_JOB_STATUSES))
+                .order_by(ChatETLJob.started_at)
+            )
+            for job in result.scalars().all():
+                inflight.setdefault(job.anp_seq, []).append(job)
+
+            new_jobs: List[JobProgress] = []
+            promoted: List[Tuple[uuid.UUID, str]] = []
+            for anp_seq in anp_seqs:
+                existing = select_coalescing_job(inflight.get(anp_seq, []), latest[anp_seq].completed_at)
+                if existing is not None:
+                    if promotes(existing, priorities[anp_seq]):
+                        promoted.append((existing.job_id, priorities[anp_seq].value))
+                    results[anp_seq] = (self._to_job_progress(existing), False)
+                    continue
+                job_progress = JobProgress(
+                    job_id=str(uuid.uuid4()),
+                    user_id=str(user_ids[anp_seq]),
+                    anp_seq=anp_seq,
+                    status=JobStatus.PENDING,
+                    progress_percentage=0.0,
+                    current_step="Queued for processing",
+                    total_steps=5,
+                    completed_steps=0,
+                    started_at=now,
+                    updated_at=now,
+                    priority=priorities[anp_seq],
+                )
+                new_jobs.append(job_progress)
+                results[anp_seq] = (job_progress, True)
+
+            if new_jobs:
+                await session.execute(text(BULK_INSERT_JOBS_SQL), {
+                    "job_ids": [uuid.UUID(j.job_id) for j in new_jobs],
+                    "user_ids": [uuid.UUID(j.user_id) for j in new_jobs],
+                    "anp_seqs": [j.anp_seq for j in new_jobs],
+                    "priorities": [j.priority.value for j in new_jobs],
+                    "total_steps": 5,
+                    "now": now,
+                })
+            if promoted:
+                await session.execute(text(BULK_PROMOTE_SQL), {
+                    "job_ids": [job_id for job_id, _lane in promoted],
+                    "priorities": [lane for _job_id, lane in promoted],
+                })
+        logger.info(f"Bulk ingest: {len(new_jobs)} jobs created, {len(anp_seqs) - len(new_jobs)} coalesced")
+        return [results[request.anp_seq] for request in requests]
+
+    @staticmethod
+    def _to_job_progress(job: ChatETLJob) -> JobProgress:
+        return JobProgress(
+            job_id=str(job.job_id),
+            user_id=str(job.user_id),
+            anp_seq=job.anp_seq,
+            status=JobStatus(job.status),
+            progress_percentage=float(job.progress_percentage or 0),
+            current_step=job.current_step or "",
+            total_steps=job.total_steps,
+            completed_steps=job.completed_steps,
+            started_at=job.started_at,
+            updated_at=job.updated_at,
+            completed_at=job.completed_at,
+            error_message=job.error_message,
+            retry_count=job.retry_count,
+            priority=JobPriority(job.priority or JobPriority.INTERACTIVE.value),
+            force=bool(job.force_reprocess),
+            leased=job.locked_by is not None,
+        )
+
+    async def _add_job(self, session: AsyncSession, job_progress: JobProgress) -> None:
+        """Insert the job row (creating a minimal user first if needed)"""
+        # Ensure user exists to satisfy FK constraint on chat_etl_jobs
+        try:
+            user_uuid = uuid.UUID(job_progress.user_id)
+        except Exception:
+            # Fallback: generate UUID if invalid input (should not happen with API validation)
+            user_uuid = uuid.uuid4()
+        existing_user = await session.get(ChatUser, user_uuid)
+        if not existing_user:
+            # If user_id not found, try to find by anp_seq to avoid unique violations
+            result = await session.execute(select(ChatUser).where(ChatUser.anp_seq == job_progress.anp_seq))
+            user_by_anp = result.scalar_one_or_none()
+            if user_by_anp:
+                user_uuid = user_by_anp.user_id
+            else:
+                # Create minimal user record
+                session.add(ChatUser(
+                    user_id=user_uuid,
+                    anp_seq=job_progress.anp_seq,
+                    name=f"User_{job_progress.anp_seq}",
+                    test_completed_at=job_progress.started_at,
+                ))
+                await session.flush()
+
+        job = ChatETLJob(
+            job_id=uuid.UUID(job_progress.job_id),
+            user_id=user_uuid,
+            anp_seq=job_progress.anp_seq,
+            status=job_progress.status.value,
+            progress_percentage=int(job_progress.progress_percentage),
+            current_step=job_progress.current_step,
+            completed_steps=job_progress.completed_steps,
+            total_steps=job_progress.total_steps,
+            started_at=job_progress.started_at,
+            updated_at=job_progress.updated_at,
+            completed_at=job_progress.completed_at,
+            error_message=job_progress.error_message,
+            retry_count=job_progress.retry_count,
+            query_results_summary=job_progress.query_results_summary,
+            documents_created=job_progress.documents_created,
+            priority=job_progress.priority.value,
+            force_reprocess=job_progress.force,
+        )
+        session.add(job)
+        await session.flush()
 
     async def update_job(self, job_id: str, **updates) -> Optional[JobProgress]:
         """Update job progress in database and return updated JobProgress if available"""
@@ -153,6 +415,11 @@ class JobTracker:
             job.updated_at = datetime.now()
 
             await session.flush()
+            # SSE 구독자에게 커밋 시점에 전달된다
+            await session.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": PROGRESS_CHANNEL, "payload": json.dumps(progress_event(job), default=str)},
+            )
 
             return JobProgress(
                 job_id=str(job.job_id),
@@ -196,6 +463,7 @@ class JobTracker:
                 retry_count=job.retry_count,
                 query_results_summary=job.query_results_summary,
                 documents_created=job.documents_created,
+                leased=job.locked_by is not None,
             )
 
     async def get_user_jobs(self, user_id: str, limit: int = 10) -> List[JobProgress]:
@@ -276,53 +544,49 @@ class TestCompletionHandler:
                 anp_seq=request.anp_seq,
                 status=JobStatus.PENDING,
                 progress_percentage=0.0,
-                current_step="Initializing ETL processing",
+                current_step="Queued for processing",
                 total_steps=5,  # queries, transform, embed, store, complete
                 completed_steps=0,
                 started_at=datetime.now(),
-                updated_at=datetime.now()
+                updated_at=datetime.now(),
+                priority=request.priority,
+                force=request.force
             )
             
-            # Store job tracking (creates user if needed)
-            await self.job_tracker.create_job(job_progress)
-            
-            # Mark job as started
-            await self.job_tracker.update_job(
-                job_id,
-                status=JobStatus.STARTED.value,
-                current_step="Queued for processing",
-                progress_percentage=1,
-                completed_steps=0
+            # Enqueue: the pending row in chat_etl_jobs is the queue entry (creates user if needed).
+            # ETL workers claim it with FOR UPDATE SKIP LOCKED (etl.job_queue).
+            # Duplicate notifications for the same test reuse the in-flight job.
+            job_progress, created = await self.job_tracker.create_or_get_inflight_job(
+                job_progress, request.completed_at
             )
+            if not created:
+                logger.info(
+                    f"Coalesced {request.notification_source} notification for anp_seq {request.anp_seq} "
+                    f"into in-flight job {job_progress.job_id}"
+                )
+                return {
+                    "job_id": job_progress.job_id,
+                    "task_id": f"task_{job_progress.job_id}",
+                    "status": job_progress.status.value,
+                    "message": "ETL job already queued or running for this test",
+                    "estimated_completion_time": "5-10 minutes",
+                    "progress_url": f"/api/etl/jobs/{job_progress.job_id}/status"
+                }
+            task_id = f"task_{job_id}"
             
-            # Trigger async ETL processing (fire-and-forget)
-            # For now, schedule with asyncio.create_task
-            try:
-                from etl.tasks import process_test_completion as _process
-                asyncio.create_task(_process(
-                    user_id=request.user_id,
-                    anp_seq=request.anp_seq,
-                    job_id=job_id,
-                    test_type=request.test_type,
-                    completed_at=request.completed_at.isoformat() if isinstance(request.completed_at, datetime) else None,
-                    notification_source=request.notification_source,
-                ))
-                task_id = f"task_{job_id}"
-            except Exception as schedule_err:
-                logger.error(f"Failed to schedule ETL task: {schedule_err}")
-                task_id = f"task_{job_id}_failed_to_schedule"
+            # Wake the in-process worker pool, if this process runs one
+            BackgroundTaskManager.notify_local()
             
             logger.info(
-                f"Triggered ETL processing for user {request.user_id}, "
-                f"anp_seq {request.anp_seq}, job_id {job_id}, "
-                f"task_id {task_id}"
+                f"Queued ETL processing for user {request.user_id}, "
+                f"anp_seq {request.anp_seq}, job_id {job_id}"
             )
             
             return {
                 "job_id": job_id,
                 "task_id": task_id,
-                "status": JobStatus.STARTED.value,
-                "message": "ETL job queued and started",
+                "status": JobStatus.PENDING.value,
+                "message": "ETL job queued",
                 "estimated_completion_time": "5-10 minutes",
                 "progress_url": f"/api/etl/jobs/{job_id}/status"
             }
@@ -334,6 +598,51 @@ class TestCompletionHandler:
                 detail=f"Failed to start ETL processing: {str(e)}"
             )
     
+    async def handle_bulk_test_completion(
+        self,
+        requests: List[TestCompletionRequest]
+    ) -> Dict[str, Any]:
+        """
+        Queue ETL jobs for many test completions at once (e.g. an institution-wide
+        result release) with set-based inserts and a single worker wake-up
+        
+        Args:
+            requests: Test completion requests
+            
+        Returns:
+            Dictionary with created / coalesced counts and per-request job information
+        """
+        try:
+            results = await self.job_tracker.create_jobs_bulk(requests)
+        except Exception as e:
+            logger.error(f"Failed to handle bulk test completion: {e}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to start ETL processing: {str(e)}"
+            )
+        
+        created_ids = {job.job_id for job, created in results if created}
+        if created_ids:
+            BackgroundTaskManager.notify_local()
+        logger.info(
+            f"Queued {len(created_ids)} ETL jobs for {len(requests)} test completion notifications"
+        )
+        
+        return {
+            "jobs_created": len(created_ids),
+            "jobs_coalesced": len({job.job_id for job, _created in results} - created_ids),
+            "jobs": [
+                {
+                    "anp_seq": job.anp_seq,
+                    "job_id": job.job_id,
+                    "status": job.status.value,
+                    "coalesced": not created,
+                    "progress_url": f"/api/etl/jobs/{job.job_id}/status"
+                }
+                for job, created in results
+            ]
+        }
+    
     async def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
         """
         Get current job status and progress
@@ -374,6 +683,8 @@ class TestCompletionHandler:
             "retry_count": job_progress.retry_count,
             "query_results_summary": job_progress.query_results_summary,
             "documents_created": job_progress.documents_created,
+            "priority": job_progress.priority.value,
+            "leased": job_progress.leased,
             "task_status": "placeholder"
         }
     
@@ -450,11 +761,14 @@ class TestCompletionHandler:
         """
         Retry a failed job
         
+        The job is requeued under the same job_id, so the worker resumes after
+        the last stage the failed attempt finished (etl.stage_store).
+        
         Args:
             job_id: Job identifier
             
         Returns:
-            New job information or None if retry not possible
+            Job information or None if retry not possible
         """
         job_progress = await self.job_tracker.get_job(job_id)
         
@@ -467,16 +781,20 @@ class TestCompletionHandler:
         if job_progress.retry_count >= self.max_retries:
             return None  # Max retries exceeded
         
-        # Create new job for retry
-        new_request = TestCompletionRequest(
-            user_id=job_progress.user_id,
-            anp_seq=job_progress.anp_seq,
-            test_type="retry",  # Mark as retry
-            completed_at=datetime.now(),
-            notification_source="retry_system"
-        )
+        if not await ETLJobQueue().retry_failed(job_id):
+            return None  # Picked up by another retry in the meantime
+        
+        BackgroundTaskManager.notify_local()
+        logger.info(f"Requeued failed job {job_id} (retry {job_progress.retry_count + 1})")
         
-        return await self.handle_test_completion(new_request)
+        return {
+            "job_id": job_id,
+            "task_id": f"task_{job_id}",
+            "status": JobStatus.PENDING.value,
+            "message": "ETL job queued for retry",
+            "estimated_completion_time": "1-10 minutes",
+            "progress_url": f"/api/etl/jobs/{job_id}/status"
+        }
 
 # Failure recovery mechanisms
 class FailureRecoveryManager:
@@ -8,15 +8,25 @@ import logging
 import hashlib
 import json
 import os
-from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from typing import List, Dict, Any, Callable, Optional, Set, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import aiohttp
+import numpy as np
 import time
 from concurrent.futures import ThreadPoolExecutor
 
+from etl.config import EMBEDDING_CONFIG
+from etl.embedding_store import EmbeddingStore
+from etl.job_lanes import FairShareLimiter
+from etl.rate_limiter import AdaptiveRateLimiter
+
 logger = logging.getLogger(__name__)
 
+# batchEmbedContents accepts at most 100 requests per call
+MAX_BATCH_REQUESTS = 100
+
 class EmbeddingError(Exception):
     """Raised when embedding generation fails"""
     def __init__(self, text: str, error_message: str):
@@ -36,78 +46,112 @@ class EmbeddingResult:
 
 class EmbeddingCache:
     """
-    In-memory cache for embeddings with TTL support
-    In production, this should be replaced with Redis or similar
+    In-memory LRU cache for embeddings with TTL support
+    
+    Vectors live in one preallocated float32 slab (max_size x dimensions,
+    ~30 MB for 10k 768-d vectors instead of ~250 MB of Python floats); an
+    OrderedDict maps keys to slab rows in LRU order, so lookups, inserts and
+    evictions are O(1). The slab is sized by the first vector stored;
+    vectors of another length are not cached.
     """
     
     def __init__(self, max_size: int = 10000, ttl_hours: int = 24):
-        self.cache: Dict[str, Tuple[List[float], datetime]] = {}
         self.max_size = max_size
         self.ttl = timedelta(hours=ttl_hours)
-        self.access_times: Dict[str, datetime] = {}
+        self._slots: "OrderedDict[str, int]" = OrderedDict()  # key -> slab row, least recently used first
+        self._slab: Optional[np.ndarray] = None
+        self._stored_at = np.zeros(max_size, dtype=np.float64)
+        self._used = np.zeros(max_size, dtype=bool)
+        self._row_keys: List[Optional[str]] = [None] * max_size
+        self._free_rows: List[int] = list(range(max_size - 1, -1, -1))
+    
+    _shared_instance = None
+    
+    @classmethod
+    def shared(cls) -> "EmbeddingCache":
+        """Process-wide cache, so short-lived embedders (one per ETL job) reuse each other's embeddings"""
+        if cls._shared_instance is None:
+            cls._shared_instance = cls(
+                max_size=EMBEDDING_CONFIG['memory_cache_size'], ttl_hours=EMBEDDING_CONFIG['cache_ttl_hours']
+            )
+        return cls._shared_instance
     
     def _generate_key(self, text: str, model: str) -> str:
         """Generate cache key from text and model"""
         content = f"{text}:{model}"
         return hashlib.md5(content.encode()).hexdigest()
     
+    def _release(self, key: str) -> None:
+        row = self._slots.pop(key)
+        self._row_keys[row] = None
+        self._used[row] = False
+        self._free_rows.append(row)
+    
     def get(self, text: str, model: str) -> Optional[List[float]]:
         """Get embedding from cache if available and not expired"""
         key = self._generate_key(text, model)
         
-        if key in self.cache:
-            embedding, timestamp = self.cache[key]
-            
-            # Check if expired
-            if datetime.now() - timestamp > self.ttl:
-                del self.cache[key]
-                if key in self.access_times:
-                    del self.access_times[key]
-                return None
-            
-            # Update access time
-            self.access_times[key] = datetime.now()
-            return embedding
+        row = self._slots.get(key)
+        if row is None:
+            return None
         
-        return None
+        # Check if expired
+        if time.time() - self._stored_at[row] > self.ttl.total_seconds():
+            self._release(key)
+            return None
+        
+        # Mark as most recently used
+        self._slots.move_to_end(key)
+        return self._slab[row].tolist()
     
     def set(self, text: str, model: str, embedding: List[float]) -> None:
         """Store embedding in cache"""
-        key = self._generate_key(text, model)
-        
-        # If cache is full, remove oldest accessed item
-        if len(self.cache) >= self.max_size:
-            oldest_key = min(self.access_times.keys(), key=lambda k: self.access_times[k])
-            del self.cache[oldest_key]
-            del self.access_times[oldest_key]
+        if self.max_size <= 0 or not embedding:
+            return
+        if self._slab is None:
+            # np.zeros 는 실제로 쓴 페이지만 메모리를 차지한다
+            self._slab = np.zeros((self.max_size, len(embedding)), dtype=np.float32)
+        elif len(embedding) != self._slab.shape[1]:
+            logger.debug(f"Not caching {len(embedding)}-d embedding in {self._slab.shape[1]}-d cache")
+            return
         
-        self.cache[key] = (embedding, datetime.now())
-        self.access_times[key] = datetime.now()
+        key = self._generate_key(text, model)
+        row = self._slots.get(key)
+        if row is None:
+            # If cache is full, remove least recently used item
+            if not self._free_rows:
+                self._release(next(iter(self._slots)))
+            row = self._free_rows.pop()
+            self._row_keys[row] = key
+            self._used[row] = True
+            self._slots[key] = row
+        else:
+            self._slots.move_to_end(key)
+        
+        self._slab[row] = embedding
+        self._stored_at[row] = time.time()
     
     def clear(self) -> None:
         """Clear all cached embeddings"""
-        self.cache.clear()
-        self.access_times.clear()
+        self._slots.clear()
+        self._used[:] = False
+        self._row_keys = [None] * self.max_size
+        self._free_rows = list(range(self.max_size - 1, -1, -1))
     
     def size(self) -> int:
         """Get current cache size"""
-        return len(self.cache)
+        return len(self._slots)
     
     def cleanup_expired(self) -> int:
         """Remove expired entries and return count of removed items"""
-        now = datetime.now()
-        expired_keys = []
-        
-        for key, (_, timestamp) in self.cache.items():
-            if now - timestamp > self.ttl:
-                expired_keys.append(key)
+        if not self._slots:
+            return 0
+        expired_rows = np.flatnonzero(self._used & (time.time() - self._stored_at > self.ttl.total_seconds()))
         
-        for key in expired_keys:
-            del self.cache[key]
-            if key in self.access_times:
-                del self.access_times[key]
+        for row in expired_rows.tolist():
+            self._release(self._row_keys[row])
         
-        return len(expired_keys)
+        return len(expired_rows)
 
 class VectorEmbedder:
     """
@@ -119,13 +163,16 @@ class VectorEmbedder:
     def __init__(
         self,
         api_key: Optional[str] = None,
-        model: str = "models/embedding-001",
+        model: str = EMBEDDING_CONFIG['model'],
         max_retries: int = 3,
         retry_delay: float = 1.0,
         batch_size: int = 10,
-        rate_limit_per_minute: int = 60,
+        rate_limit_per_minute: Optional[int] = None,
         enable_cache: bool = True,
-        cache_ttl_hours: int = 24
+        cache_ttl_hours: int = 24,
+        cache: Optional[EmbeddingCache] = None,
+        store: Optional[EmbeddingStore] = None,
+        persistent_cache: bool = EMBEDDING_CONFIG['persistent_cache']
     ):
         self.api_key = api_key or os.getenv('GOOGLE_API_KEY')
         if not self.api_key:
@@ -134,16 +181,31 @@ class VectorEmbedder:
         self.model = model
         self.max_retries = max_retries
         self.retry_delay = retry_delay
-        self.batch_size = batch_size
-        self.rate_limit_per_minute = rate_limit_per_minute
+        self.batch_size = min(batch_size, MAX_BATCH_REQUESTS)
         self.enable_cache = enable_cache
         
-        # Initialize cache
-        self.cache = EmbeddingCache(ttl_hours=cache_ttl_hours) if enable_cache else None
+        # Initialize cache: in-process cache in front of the persistent store shared by all processes
+        self.cache = (cache or EmbeddingCache(ttl_hours=cache_ttl_hours)) if enable_cache else None
+        # `store` overrides the process-wide store; persistent_cache=False runs without one
+        if not (enable_cache and persistent_cache):
+            store = None
+        elif store is None:
+            store = EmbeddingStore.instance()
+        self.store = store
         
         # Rate limiting
-        self.request_times: List[float] = []
-        self.rate_limit_lock = asyncio.Lock()
+        # 같은 API 키를 쓰는 모든 임베더가 하나의 한도를 나눠 쓴다; 직접 준 한도는 이 인스턴스 전용
+        self.rate_limiter = (
+            AdaptiveRateLimiter(max_rate=rate_limit_per_minute, state_file=None)
+            if rate_limit_per_minute else AdaptiveRateLimiter.instance("embedding")
+        )
+        self.api_requests = 0
+        self.batch_fallbacks = 0
+        # In-flight requests by (model, preprocessed text), awaited by concurrent callers of the same text
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        # 요청을 시작한 호출자와 분리된 태스크 (호출자가 취소되어도 기다리는 다른 호출자를 위해 끝까지 돈다)
+        self._flights: Set[asyncio.Task] = set()
+        self.requests_deduplicated = 0
         
         # HTTP session
         self.session: Optional[aiohttp.ClientSession] = None
@@ -183,24 +245,12 @@ class VectorEmbedder:
             )
     
     async def _wait_for_rate_limit(self):
-        """Implement rate limiting"""
-        async with self.rate_limit_lock:
-            now = time.time()
-            
-            # Remove requests older than 1 minute
-            self.request_times = [t for t in self.request_times if now - t < 60]
-            
-            # If we're at the rate limit, wait
-            if len(self.request_times) >= self.rate_limit_per_minute:
-                sleep_time = 60 - (now - self.request_times[0])
-                if sleep_time > 0:
-                    logger.info(f"Rate limit reached, waiting {sleep_time:.2f} seconds")
-                    await asyncio.sleep(sleep_time)
-                    # Remove the oldest request after waiting
-                    self.request_times.pop(0)
-            
-            # Record this request
-            self.request_times.append(now)
+        """
+        Take a token from the shared rate limiter (etl.rate_limiter). Jobs of
+        different lanes take turns by weight for the next token (etl.job_lanes).
+        """
+        async with FairShareLimiter.instance("embedding").slot():
+            await self.rate_limiter.acquire()
     
     def _preprocess_text(self, text: str) -> str:
         """Preprocess text for embedding generation"""
@@ -228,66 +278,158 @@ class VectorEmbedder:
             raise EmbeddingError(text, "Empty or invalid text after preprocessing")
         
         # Check cache first
-        if self.cache:
-            cached_embedding = self.cache.get(processed_text, self.model)
-            if cached_embedding is not None:
+        cached_embedding = self.cache.get(processed_text, self.model) if self.cache else None
+        if cached_embedding is not None:
+            logger.debug(f"Retrieved embedding from cache for text length {len(processed_text)}")
+            return self._cached_result(processed_text, cached_embedding, start_time)
+        
+        # Another caller is already looking this text up: share its response
+        key = (self.model, processed_text)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.requests_deduplicated += 1
+            return self._cached_result(processed_text, await asyncio.shield(inflight), start_time)
+        
+        # 저장소 조회와 API 요청을 같은 텍스트의 동시 호출자들이 한 번만 하도록 먼저 등록한다
+        flight = self._start_flight([processed_text], self._fetch_single_embedding(processed_text, text, start_time))
+        return (await asyncio.shield(flight))[processed_text]
+    
+    async def _fetch_single_embedding(
+        self, processed_text: str, text: str, start_time: float
+    ) -> Dict[str, EmbeddingResult]:
+        """Persistent store, then an embedContent request; stores what it generated"""
+        stored = (await self._lookup_cached([processed_text])).get(processed_text) if self.store else None
+        if stored is not None:
+            return {processed_text: self._cached_result(processed_text, stored, start_time)}
+        result = await self._request_single_embedding(processed_text, text, start_time)
+        if self.store:
+            await self.store.put_many(self.model, {processed_text: result.embedding})
+        return {processed_text: result}
+    
+    def _cached_result(self, processed_text: str, embedding: List[float], start_time: float) -> EmbeddingResult:
+        """Result served without an API request of this caller (cache, store or a shared request)"""
+        return EmbeddingResult(
+            text=processed_text,
+            embedding=embedding,
+            model=self.model,
+            dimensions=len(embedding),
+            processing_time=time.time() - start_time,
+            cached=True
+        )
+    
+    def _start_flight(self, texts: List[str], fetch) -> asyncio.Task:
+        """
+        Run `fetch` (-> {text: EmbeddingResult}) as a task of its own and
+        register one future per text for concurrent callers of the same texts.
+        Every caller, including the one that started it, awaits the task or
+        its futures through asyncio.shield, so a cancelled caller never fails
+        the others.
+        """
+        loop = asyncio.get_running_loop()
+        futures: Dict[str, asyncio.Future] = {}
+        for processed_text in texts:
+            future = loop.create_future()
+            # 기다리는 호출자가 없어도 "exception was never retrieved" 경고가 나지 않게 한다
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._inflight[(self.model, processed_text)] = future
+            futures[processed_text] = future
+        flight = asyncio.ensure_future(fetch)
+        self._flights.add(flight)
+        flight.add_done_callback(lambda task: self._finish_flight(task, futures))
+        return flight
+    
+    def _finish_flight(self, flight: asyncio.Task, futures: Dict[str, asyncio.Future]) -> None:
+        """Hand the outcome of a finished flight to the callers waiting for its texts"""
+        self._flights.discard(flight)
+        error = None if flight.cancelled() else flight.exception()
+        embedded = {} if flight.cancelled() or error is not None else flight.result()
+        for processed_text, future in futures.items():
+            key = (self.model, processed_text)
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            if future.done():
+                continue
+            result = embedded.get(processed_text)
+            if result is not None:
+                future.set_result(result.embedding)
+            else:
+                future.set_exception(error or EmbeddingError(processed_text, "Shared embedding request failed"))
+    
+    async def _request_single_embedding(self, processed_text: str, text: str, start_time: float) -> EmbeddingResult:
+        """Embed one preprocessed text with an embedContent request"""
+        def parse(data: Dict[str, Any]) -> EmbeddingResult:
+            # Extract embedding
+            if 'embedding' in data and 'values' in data['embedding']:
+                embedding = data['embedding']['values']
+                
+                # Validate embedding
+                if not isinstance(embedding, list) or len(embedding) == 0:
+                    raise EmbeddingError(text, "Invalid embedding format received")
+                
+                # Cache the result
+                if self.cache:
+                    self.cache.set(processed_text, self.model, embedding)
+                
                 processing_time = time.time() - start_time
-                logger.debug(f"Retrieved embedding from cache for text length {len(processed_text)}")
+                logger.debug(f"Generated embedding for text length {len(processed_text)} in {processing_time:.2f}s")
+                
                 return EmbeddingResult(
                     text=processed_text,
-                    embedding=cached_embedding,
+                    embedding=embedding,
                     model=self.model,
-                    dimensions=len(cached_embedding),
+                    dimensions=len(embedding),
                     processing_time=processing_time,
-                    cached=True
+                    cached=False
                 )
+            raise EmbeddingError(text, "No embedding data in API response")
         
-        # Generate embedding via API
+        payload = {
+            "content": {
+                "parts": [{"text": processed_text}]
+            }
+        }
+        return await self._request_with_retries("embedContent", payload, text, parse)
+    
+    async def _lookup_cached(self, processed_texts: List[str]) -> Dict[str, List[float]]:
+        """Embeddings from the in-process cache, then the persistent store (one lookup for all misses)"""
+        found: Dict[str, List[float]] = {}
+        if self.cache:
+            for processed_text in processed_texts:
+                embedding = self.cache.get(processed_text, self.model)
+                if embedding is not None:
+                    found[processed_text] = embedding
+        misses = [t for t in processed_texts if t not in found]
+        if self.store and misses:
+            stored = await self.store.get_many(self.model, misses)
+            for processed_text, embedding in stored.items():
+                if self.cache:
+                    self.cache.set(processed_text, self.model, embedding)
+            found.update(stored)
+        return found
+    
+    async def _request_with_retries(
+        self,
+        method: str,
+        payload: Dict[str, Any],
+        text: str,
+        parse: Callable[[Dict[str, Any]], Any]
+    ) -> Any:
+        """POST to {model}:{method} with rate limiting and retries; returns parse(response JSON)"""
         for attempt in range(self.max_retries + 1):
             try:
                 await self._ensure_session()
                 await self._wait_for_rate_limit()
-                
-                # Prepare request
-                url = f"{self.base_url}/{self.model}:embedContent"
-                payload = {
-                    "content": {
-                        "parts": [{"text": processed_text}]
-                    }
-                }
+                self.api_requests += 1
                 
                 # Make API request
+                url = f"{self.base_url}/{self.model}:{method}"
                 async with self.session.post(url, json=payload) as response:
                     if response.status == 200:
-                        data = await response.json()
-                        
-                        # Extract embedding
-                        if 'embedding' in data and 'values' in data['embedding']:
-                            embedding = data['embedding']['values']
-                            
-                            # Validate embedding
-                            if not isinstance(embedding, list) or len(embedding) == 0:
-                                raise EmbeddingError(text, "Invalid embedding format received")
-                            
-                            # Cache the result
-                            if self.cache:
-                                self.cache.set(processed_text, self.model, embedding)
-                            
-                            processing_time = time.time() - start_time
-                            logger.debug(f"Generated embedding for text length {len(processed_text)} in {processing_time:.2f}s")
-                            
-                            return EmbeddingResult(
-                                text=processed_text,
-                                embedding=embedding,
-                                model=self.model,
-                                dimensions=len(embedding),
-                                processing_time=processing_time,
-                                cached=False
-                            )
-                        else:
-                            raise EmbeddingError(text, "No embedding data in API response")
+                        await self.rate_limiter.on_success()
+                        return parse(await response.json())
                     
                     elif response.status == 429:  # Rate limit
+                        await self.rate_limiter.on_throttled()
                         if attempt < self.max_retries:
                             wait_time = self.retry_delay * (2 ** attempt)
                             logger.warning(f"Rate limited, waiting {wait_time}s before retry {attempt + 1}")
@@ -344,10 +486,40 @@ class VectorEmbedder:
         """
         return await self._generate_single_embedding(text)
     
+    async def _generate_chunk_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Embed preprocessed texts with one batchEmbedContents request.
+        
+        Returns one embedding per text, None for items the response did not
+        cover with a valid vector; raises EmbeddingError if the request fails.
+        """
+        def parse(data: Dict[str, Any]) -> List[Optional[List[float]]]:
+            embeddings = data.get('embeddings')
+            if not isinstance(embeddings, list):
+                raise EmbeddingError(texts[0], "No embeddings in batch API response")
+            vectors: List[Optional[List[float]]] = [None] * len(texts)
+            for i, item in enumerate(embeddings[:len(texts)]):
+                values = item.get('values') if isinstance(item, dict) else None
+                if isinstance(values, list) and values:
+                    vectors[i] = values
+            return vectors
+        
+        payload = {
+            "requests": [
+                {"model": self.model, "content": {"parts": [{"text": text}]}}
+                for text in texts
+            ]
+        }
+        return await self._request_with_retries("batchEmbedContents", payload, texts[0], parse)
+    
     async def generate_embeddings_batch(self, texts: List[str]) -> List[EmbeddingResult]:
         """
         Generate embeddings for multiple texts in batches
         
+        Cache hits are answered locally; the remaining distinct texts are sent
+        `batch_size` at a time through batchEmbedContents (one API request per
+        batch). Only the texts a batch did not embed are retried one by one.
+        
         Args:
             texts: List of texts to generate embeddings for
             
@@ -359,52 +531,116 @@ class VectorEmbedder:
         
         logger.info(f"Generating embeddings for {len(texts)} texts in batches of {self.batch_size}")
         
-        results = []
-        
-        # Process in batches to avoid overwhelming the API
-        for i in range(0, len(texts), self.batch_size):
-            batch = texts[i:i + self.batch_size]
-            batch_start_time = time.time()
-            
-            logger.debug(f"Processing batch {i//self.batch_size + 1}/{(len(texts) + self.batch_size - 1)//self.batch_size}")
-            
-            # Generate embeddings concurrently within batch
-            tasks = [self._generate_single_embedding(text) for text in batch]
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Process results
-            for j, result in enumerate(batch_results):
-                if isinstance(result, Exception):
-                    logger.error(f"Failed to generate embedding for text {i+j}: {result}")
-                    # Create a dummy result for failed embeddings
-                    results.append(EmbeddingResult(
-                        text=batch[j],
-                        embedding=[0.0] * 768,  # Default dimension
-                        model=self.model,
-                        dimensions=768,
-                        processing_time=0.0,
-                        cached=False
-                    ))
-                else:
-                    results.append(result)
-            
-            batch_time = time.time() - batch_start_time
-            logger.debug(f"Batch completed in {batch_time:.2f}s")
-            
-            # Small delay between batches to be respectful to the API
-            if i + self.batch_size < len(texts):
-                await asyncio.sleep(0.1)
+        start_time = time.time()
+        results: List[Optional[EmbeddingResult]] = [None] * len(texts)
+        processed = [self._preprocess_text(text) for text in texts]
+        
+        # Cache lookups; identical texts are requested once
+        cached = await self._lookup_cached([t for t in dict.fromkeys(processed) if t])
+        pending: Dict[str, List[int]] = {}
+        for i, processed_text in enumerate(processed):
+            if not processed_text:
+                continue
+            cached_embedding = cached.get(processed_text)
+            if cached_embedding is not None:
+                results[i] = self._cached_result(processed_text, cached_embedding, start_time)
+            else:
+                pending.setdefault(processed_text, []).append(i)
+        
+        # Texts another caller is already requesting are awaited, not requested again
+        joined = {t: self._inflight[(self.model, t)] for t in pending if (self.model, t) in self._inflight}
+        misses = [t for t in pending if t not in joined]
+        failed: List[str] = []
+        if misses:
+            embedded = await asyncio.shield(
+                self._start_flight(misses, self._embed_misses(misses, start_time, failed))
+            )
+            for processed_text, result in embedded.items():
+                for index in pending[processed_text]:
+                    results[index] = result
+        
+        if joined:
+            self.requests_deduplicated += len(joined)
+            shared = await asyncio.gather(*(asyncio.shield(f) for f in joined.values()), return_exceptions=True)
+            for processed_text, embedding in zip(joined, shared):
+                if isinstance(embedding, Exception):
+                    logger.error(f"Shared embedding request failed for text of length {len(processed_text)}: {embedding}")
+                    continue
+                for index in pending[processed_text]:
+                    results[index] = self._cached_result(processed_text, embedding, start_time)
+        
+        for i, result in enumerate(results):
+            if result is None:
+                # Create a dummy result for failed embeddings
+                results[i] = EmbeddingResult(
+                    text=texts[i],
+                    embedding=[0.0] * 768,  # Default dimension
+                    model=self.model,
+                    dimensions=768,
+                    processing_time=0.0,
+                    cached=False
+                )
         
-        successful_count = sum(1 for r in results if len(r.embedding) > 1)  # Not dummy embedding
+        successful_count = sum(1 for r in results if any(r.embedding))  # Not dummy embedding
         cached_count = sum(1 for r in results if r.cached)
         
         logger.info(
             f"Embedding generation completed: {successful_count}/{len(texts)} successful, "
-            f"{cached_count} from cache"
+            f"{cached_count} from cache or shared requests, {len(failed)} single-request fallbacks"
         )
         
         return results
     
+    async def _embed_misses(
+        self,
+        misses: List[str],
+        start_time: float,
+        failed: List[str]
+    ) -> Dict[str, EmbeddingResult]:
+        """Batch-embed `misses`; returns the results by text and adds the texts that needed a single-request fallback to `failed`"""
+        embedded: Dict[str, EmbeddingResult] = {}
+        for i in range(0, len(misses), self.batch_size):
+            batch = misses[i:i + self.batch_size]
+            logger.debug(f"Processing batch {i//self.batch_size + 1}/{(len(misses) + self.batch_size - 1)//self.batch_size}")
+            try:
+                vectors = await self._generate_chunk_embeddings(batch)
+            except EmbeddingError as e:
+                logger.warning(f"Batch embedding request failed, falling back to single requests: {e}")
+                vectors = [None] * len(batch)
+            
+            for processed_text, embedding in zip(batch, vectors):
+                if embedding is None:
+                    failed.append(processed_text)
+                    continue
+                if self.cache:
+                    self.cache.set(processed_text, self.model, embedding)
+                embedded[processed_text] = EmbeddingResult(
+                    text=processed_text,
+                    embedding=embedding,
+                    model=self.model,
+                    dimensions=len(embedding),
+                    processing_time=time.time() - start_time,
+                    cached=False
+                )
+        
+        # Per-text fallback for the items no batch could embed
+        if failed:
+            self.batch_fallbacks += len(failed)
+            fallback = await asyncio.gather(
+                *(self._request_single_embedding(text, text, start_time) for text in failed),
+                return_exceptions=True
+            )
+            for processed_text, result in zip(failed, fallback):
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to generate embedding for text of length {len(processed_text)}: {result}")
+                    continue
+                embedded[processed_text] = result
+        
+        # 배치와 개별 요청 결과를 한 번에 저장소에 쓴다
+        if self.store:
+            await self.store.put_many(self.model, {t: r.embedding for t, r in embedded.items()})
+        return embedded
+    
     async def generate_document_embeddings(
         self, 
         documents: List[Dict[str, Any]]
@@ -464,11 +700,16 @@ class VectorEmbedder:
             "cache_enabled": True,
             "cache_size": self.cache.size(),
             "max_size": self.cache.max_size,
-            "ttl_hours": self.cache.ttl.total_seconds() / 3600
+            "ttl_hours": self.cache.ttl.total_seconds() / 3600,
+            "persistent_store": self.store.get_stats() if self.store else None,
+            "requests_deduplicated": self.requests_deduplicated
         }
     
     async def close(self):
         """Clean up resources"""
+        # 아무도 기다리지 않게 된 요청은 세션을 닫기 전에 멈춘다
+        for flight in list(self._flights):
+            flight.cancel()
         if self.session and not self.session.closed:
             await self.session.close()
         
@@ -481,7 +722,7 @@ class VectorEmbedder:
 async def generate_text_embedding(
     text: str, 
     api_key: Optional[str] = None,
-    model: str = "models/embedding-001"
+    model: str = EMBEDDING_CONFIG['model']
 ) -> List[float]:
     """
     Simple function to generate embedding for a single text
@@ -502,7 +743,7 @@ async def generate_text_embedding(
 async def generate_text_embeddings_batch(
     texts: List[str],
     api_key: Optional[str] = None,
-    model: str = "models/embedding-001",
+    model: str = EMBEDDING_CONFIG['model'],
     batch_size: int = 10
 ) -> List[List[float]]:
     """
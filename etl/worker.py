@@ -0,0 +1,174 @@
+"""
+Standalone ETL Worker
+Runs the ETL job loop, periodic maintenance tasks and health checks outside
+the API server. The API process only enqueues jobs in chat_etl_jobs; any
+number of workers (on other cores or nodes) claim and process them.
+
+    python -m etl.worker [--concurrency N] [--no-warm-up]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import signal
+import sys
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+# Load environment variables before etl.config is imported
+load_dotenv()
+
+from database.connection import db_manager
+from etl.background_task_manager import BackgroundTaskManager
+from etl.config import BACKGROUND_PROCESSING_CONFIG, QUERY_CONFIG
+from etl.legacy_query_executor import LegacyQueryExecutor
+from etl.progress_tracker import CoalescingJobTracker
+from etl.cpu_pool import CPUWorkPool
+from etl.logging_config import setup_logging
+from etl.tasks import PERIODIC_TASKS
+from etl import telemetry
+from monitoring.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+async def warm_up_legacy_caches() -> None:
+    """Load population statistics / reference data snapshots before the first job"""
+    executor = LegacyQueryExecutor(backend=QUERY_CONFIG['backend'])
+    try:
+        await executor.warm_up()
+        logger.info("Legacy query caches warmed up")
+    except Exception as e:
+        # 캐시는 첫 작업에서 다시 채워지므로 워커 기동을 막지 않는다
+        logger.warning(f"Legacy query cache warm-up failed, loading on first job instead: {e}")
+    finally:
+        await executor.close()
+
+async def run_periodic_task(name: str, spec: Dict[str, Any], stop_event: asyncio.Event) -> None:
+    """Run one PERIODIC_TASKS entry every `schedule_seconds` until the worker stops"""
+    while not stop_event.is_set():
+        try:
+            result = await spec['function'](*spec.get('args', ()))
+            logger.info(f"Periodic task {name}: {result}")
+        except Exception as e:
+            logger.error(f"Periodic task {name} failed: {e}")
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=spec['schedule_seconds'])
+        except asyncio.TimeoutError:
+            pass
+
+async def serve_metrics(workers: BackgroundTaskManager, port: int, host: str = "0.0.0.0") -> asyncio.AbstractServer:
+    """
+    Minimal HTTP endpoint for this worker's process-local metrics, which the
+    API's /metrics cannot see: GET /metrics (raw registry) and GET /stats
+    (worker pool + ETL telemetry summary), both JSON.
+    """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            # 헤더는 읽고 버린다
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            path = request_line[1].split("?", 1)[0] if len(request_line) >= 2 else ""
+            if request_line[:1] != ["GET"]:
+                status_line, body = "405 Method Not Allowed", {"error": "method not allowed"}
+            elif path == "/metrics":
+                status_line, body = "200 OK", await get_metrics()
+            elif path == "/stats":
+                status_line, body = "200 OK", {
+                    "worker_id": workers.queue.worker_id,
+                    "background_tasks": workers.get_stats(),
+                    "telemetry": await telemetry.summarize(),
+                }
+            else:
+                status_line, body = "404 Not Found", {"error": "not found"}
+            payload = json.dumps(body, default=str).encode()
+            writer.write(
+                f"HTTP/1.1 {status_line}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.warning(f"Worker metrics request failed: {e}")
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info(f"Worker metrics served on {host}:{server.sockets[0].getsockname()[1]}")
+    return server
+
+async def run_worker(
+    concurrency: Optional[int] = None,
+    warm_up: bool = True,
+    stop_event: Optional[asyncio.Event] = None,
+) -> int:
+    """Run until SIGINT/SIGTERM (or `stop_event`); returns the process exit code"""
+    stop_event = stop_event or asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows / non-main thread
+
+    if not await db_manager.test_connection():
+        logger.error("ETL worker cannot reach the database; exiting")
+        return 1
+
+    if warm_up:
+        await warm_up_legacy_caches()
+
+    workers = BackgroundTaskManager.instance()
+    if concurrency:
+        workers.concurrency = concurrency
+    await workers.start()
+    periodic_tasks = [
+        asyncio.create_task(run_periodic_task(name, spec, stop_event))
+        for name, spec in PERIODIC_TASKS.items()
+    ]
+    metrics_server = None
+    metrics_port = BACKGROUND_PROCESSING_CONFIG['worker_metrics_port']
+    if metrics_port:
+        try:
+            metrics_server = await serve_metrics(workers, metrics_port)
+        except OSError as e:
+            # 지표 포트가 막혀도 작업 처리는 계속한다
+            logger.error(f"Could not serve worker metrics on port {metrics_port}: {e}")
+    logger.info(f"ETL worker {workers.queue.worker_id} running")
+
+    try:
+        await stop_event.wait()
+    finally:
+        logger.info("Stopping ETL worker...")
+        if metrics_server is not None:
+            metrics_server.close()
+            await metrics_server.wait_closed()
+        await workers.stop()
+        for task in periodic_tasks:
+            task.cancel()
+        await asyncio.gather(*periodic_tasks, return_exceptions=True)
+        try:
+            await CoalescingJobTracker.instance().close()
+        except Exception as e:
+            logger.error(f"Could not write pending job progress: {e}")
+        await CPUWorkPool.instance().close()
+        await db_manager.close()
+        logger.info(f"ETL worker stopped: {workers.get_stats()}")
+    return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the ETL job worker")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="jobs processed at once by this worker (default: ETL_WORKER_POOL_SIZE)")
+    parser.add_argument("--no-warm-up", action="store_true",
+                        help="skip loading the legacy query caches at start")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    setup_logging()
+    return asyncio.run(run_worker(concurrency=args.concurrency, warm_up=not args.no_warm_up))
+
+if __name__ == "__main__":
+    sys.exit(main())
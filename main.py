@@ -20,6 +20,11 @@ from api.auth_endpoints import router as auth_router
 from monitoring.metrics import get_metrics
 from database.connection import init_database
 from etl.logging_config import setup_logging
+from etl.config import BACKGROUND_PROCESSING_CONFIG
+from etl.background_task_manager import BackgroundTaskManager
+from etl.progress_tracker import CoalescingJobTracker
+from etl.cpu_pool import CPUWorkPool
+from etl.job_events import JobEventListener
 
 # Setup logging
 setup_logging()
@@ -39,10 +44,24 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize database: {e}")
         raise
     
+    # ETL worker pool (claims queued jobs from chat_etl_jobs)
+    etl_workers = None
+    if BACKGROUND_PROCESSING_CONFIG['run_workers_in_api']:
+        etl_workers = BackgroundTaskManager.instance()
+        await etl_workers.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Aptitude Chatbot RAG System...")
+    await JobEventListener.instance().close()
+    if etl_workers is not None:
+        await etl_workers.stop()
+        try:
+            await CoalescingJobTracker.instance().close()
+        except Exception as e:
+            logger.error(f"Could not write pending job progress: {e}")
+        await CPUWorkPool.instance().close()
 
 # Create FastAPI application
 app = FastAPI(
@@ -2,11 +2,13 @@
 Lightweight in-process metrics registry for application monitoring.
 
 Provides simple counters and histograms with optional label support.
+Histograms may also keep cumulative bucket counts (Prometheus-style `le`
+bounds) when the caller passes `buckets`.
 Designed to be JSON-serializable for quick export via API.
 """
 
 import asyncio
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Optional, Sequence, Tuple
 
 
 class MetricsRegistry:
@@ -33,26 +35,40 @@ class MetricsRegistry:
         async with self._lock:
             self._counters[key] = self._counters.get(key, 0.0) + value
 
-    async def observe(self, name: str, observation: float, labels: Dict[str, Any] = None) -> None:
+    async def observe(
+        self,
+        name: str,
+        observation: float,
+        labels: Dict[str, Any] = None,
+        buckets: Optional[Sequence[float]] = None,
+    ) -> None:
         key = self._key(name, labels or {})
         async with self._lock:
             hist = self._histograms.get(key)
             if hist is None:
                 hist = {"count": 0.0, "sum": 0.0, "min": observation, "max": observation}
+                if buckets:
+                    hist["buckets"] = {float(le): 0.0 for le in sorted(buckets)}
                 self._histograms[key] = hist
+            for le in hist.get("buckets", {}):
+                if observation <= le:
+                    hist["buckets"][le] += 1
             hist["count"] += 1
             hist["sum"] += observation
             hist["min"] = observation if observation < hist["min"] else hist["min"]
             hist["max"] = observation if observation > hist["max"] else hist["max"]
 
-    async def export(self) -> Dict[str, Any]:
-        # Build serializable snapshot
+    async def export(self, prefix: str = "") -> Dict[str, Any]:
+        # Build serializable snapshot (only metrics whose name starts with prefix)
         async with self._lock:
             counters = []
             for (name, labels), value in self._counters.items():
-                counters.append({"name": name, "labels": dict(labels), "value": value})
+                if name.startswith(prefix):
+                    counters.append({"name": name, "labels": dict(labels), "value": value})
             histograms = []
             for (name, labels), hist in self._histograms.items():
+                if not name.startswith(prefix):
+                    continue
                 avg = hist["sum"] / hist["count"] if hist["count"] else 0.0
                 histograms.append({
                     "name": name,
@@ -63,6 +79,10 @@ class MetricsRegistry:
                     "max": hist["max"],
                     "avg": avg,
                 })
+                if "buckets" in hist:
+                    histograms[-1]["buckets"] = [
+                        {"le": le, "count": count} for le, count in hist["buckets"].items()
+                    ]
             return {"counters": counters, "histograms": histograms}
 
 
@@ -70,11 +90,13 @@ async def inc(name: str, value: float = 1.0, labels: Dict[str, Any] = None) -> N
     await MetricsRegistry.instance().inc(name, value, labels)
 
 
-async def observe(name: str, observation: float, labels: Dict[str, Any] = None) -> None:
-    await MetricsRegistry.instance().observe(name, observation, labels)
+async def observe(
+    name: str, observation: float, labels: Dict[str, Any] = None, buckets: Optional[Sequence[float]] = None
+) -> None:
+    await MetricsRegistry.instance().observe(name, observation, labels, buckets)
 
 
-async def get_metrics() -> Dict[str, Any]:
-    return await MetricsRegistry.instance().export()
+async def get_metrics(prefix: str = "") -> Dict[str, Any]:
+    return await MetricsRegistry.instance().export(prefix)
 
 
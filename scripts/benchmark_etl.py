@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+End-to-end ETL throughput benchmark
+
+Seeds the application database with synthetic mwd_* data (optional), runs
+N ETL jobs through ETLOrchestrator with a stubbed embedder and writes a JSON
+report (jobs/sec, per-stage p50/p95/p99, peak RSS, DB statement counts).
+
+The orchestrator reads the legacy tables through the application database,
+so DB_HOST / DB_NAME / ... must point at the same local database as
+--database-url, with the chat_* schema already migrated.
+
+    DB_NAME=etl_bench python scripts/benchmark_etl.py --database-url postgresql://localhost/etl_bench \
+        --seed-testers 1000 --jobs 500 --concurrency 8 --embed-latency-ms 150 --output etl_benchmark.json
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from database.connection import db_manager
+from etl.etl_benchmark import BenchmarkSettings, ETLBenchmark
+from etl.job_lanes import LANES
+from etl.query_profiler import save_report
+from etl.synthetic_legacy_db import SyntheticLegacyDatabase, SyntheticScale
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end ETL throughput on synthetic data")
+    parser.add_argument("--database-url", default=os.getenv("SYNTHETIC_LEGACY_DATABASE_URL"),
+                        help="local database for the synthetic data (never the production legacy DB)")
+    parser.add_argument("--seed-testers", type=int, default=0,
+                        help="(re)generate synthetic data for N testers before the run")
+    parser.add_argument("--jobs", type=int, default=100)
+    parser.add_argument("--first-anp-seq", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=4, help="jobs in flight, like ETL worker slots")
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0,
+                        help="simulated embedding API latency per request")
+    parser.add_argument("--lane", choices=LANES, default="interactive")
+    parser.add_argument("--dataflow", action="store_true", help="use the pipelined dataflow path")
+    parser.add_argument("--output", default="etl_benchmark.json")
+    return parser.parse_args()
+
+async def run(settings: BenchmarkSettings):
+    try:
+        return await ETLBenchmark(settings).run()
+    finally:
+        await db_manager.close()
+
+def main() -> int:
+    args = parse_args()
+    if args.seed_testers:
+        if not args.database_url:
+            logger.error("--database-url (or SYNTHETIC_LEGACY_DATABASE_URL) is required to seed data")
+            return 2
+        SyntheticLegacyDatabase(args.database_url).generate(SyntheticScale(testers=args.seed_testers))
+
+    settings = BenchmarkSettings(
+        jobs=args.jobs,
+        concurrency=args.concurrency,
+        first_anp_seq=args.first_anp_seq,
+        embed_latency_ms=args.embed_latency_ms,
+        lane=args.lane,
+        dataflow_mode=args.dataflow,
+    )
+    report = asyncio.run(run(settings))
+    save_report(report, args.output)
+    logger.info(f"Benchmark report written to {args.output}")
+    return 0 if report["jobs"]["failed"] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Legacy query profiling / plan-regression harness
+
+Seeds a local PostgreSQL database with synthetic mwd_* data (optional),
+profiles every AptitudeTestQueries query and compares the JSON report with a
+stored baseline. Exits with status 1 when a regression is found.
+
+    python scripts/profile_legacy_queries.py --database-url postgresql://localhost/legacy_bench \
+        --seed-testers 10000 --output profile.json --baseline legacy_query_baseline.json
+"""
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from etl.query_profiler import LegacyQueryProfiler, ProfileSettings, compare_reports, load_report, save_report
+from etl.synthetic_legacy_db import SyntheticLegacyDatabase, SyntheticScale
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Profile legacy mwd_* queries and detect plan regressions")
+    parser.add_argument("--database-url", default=os.getenv("SYNTHETIC_LEGACY_DATABASE_URL"),
+                        help="local database to profile (never the production legacy DB)")
+    parser.add_argument("--seed-testers", type=int, default=0,
+                        help="(re)generate synthetic data for N testers before profiling")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--sample-size", type=int, default=20)
+    parser.add_argument("--queries", nargs="*", help="subset of query names (default: all)")
+    parser.add_argument("--output", default="legacy_query_profile.json")
+    parser.add_argument("--baseline", help="baseline report to compare against")
+    parser.add_argument("--latency-ratio", type=float, default=1.5,
+                        help="p95 latency regression threshold relative to the baseline")
+    parser.add_argument("--min-latency-ms", type=float, default=5.0,
+                        help="ignore latency regressions below this p95")
+    return parser.parse_args()
+
+def main() -> int:
+    args = parse_args()
+    if not args.database_url:
+        logger.error("--database-url (or SYNTHETIC_LEGACY_DATABASE_URL) is required")
+        return 2
+
+    if args.seed_testers:
+        SyntheticLegacyDatabase(args.database_url).generate(SyntheticScale(testers=args.seed_testers))
+
+    profiler = LegacyQueryProfiler(
+        args.database_url,
+        settings=ProfileSettings(iterations=args.iterations, sample_size=args.sample_size),
+    )
+    report = profiler.run(args.queries)
+    save_report(report, args.output)
+    logger.info(f"Profile report written to {args.output}")
+
+    if not args.baseline:
+        return 0
+
+    findings = compare_reports(
+        load_report(args.baseline), report,
+        latency_regression_ratio=args.latency_ratio,
+        min_latency_ms=args.min_latency_ms,
+    )
+    for finding in findings:
+        log = logger.error if finding["severity"] == "error" else logger.warning
+        log(f"[{finding['kind']}] {finding['query']}: {finding['detail']}")
+
+    regressions = [f for f in findings if f["severity"] == "error"]
+    if regressions:
+        logger.error(f"✗ {len(regressions)} regression(s) against {args.baseline}")
+        return 1
+    logger.info(f"✓ No regressions against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
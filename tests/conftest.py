@@ -0,0 +1,30 @@
+import pytest
+
+
+class RecordingSession:
+    """
+    AsyncSession stand-in for the progress tracker: records every statement
+    as (sql, params). While `fail` holds an exception, execute() raises it
+    instead.
+    """
+
+    def __init__(self, fail=None):
+        self.fail = fail
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        if self.fail is not None:
+            raise self.fail
+        self.statements.append((str(statement), params))
+
+
+@pytest.fixture
+def recording_session():
+    """Factory for RecordingSession; pass `lambda: session` as a session_factory"""
+    return RecordingSession
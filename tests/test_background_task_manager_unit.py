@@ -0,0 +1,285 @@
+import asyncio
+
+import pytest
+
+from etl.background_task_manager import BackgroundTaskManager
+from etl.job_queue import ClaimedJob, ETLJobQueue
+
+
+class FakeQueue:
+    """In-memory stand-in for ETLJobQueue"""
+
+    def __init__(self, job_count, max_attempts=2):
+        self.worker_id = "test-worker"
+        self.max_attempts = max_attempts
+        self.pending = [ClaimedJob(f"job-{i}", f"user-{i}", i, 0) for i in range(job_count)]
+        self.leased = {}
+        self.released, self.requeued, self.failed, self.retried = [], [], [], []
+        self.held_override = None
+
+    async def claim(self, limit, running=None, capacity=None):
+        claimed = []
+        while self.pending and len(claimed) < limit:
+            job = self.pending.pop(0)
+            job = ClaimedJob(job.job_id, job.user_id, job.anp_seq, job.attempts + 1, job.priority, job.force)
+            self.leased[job.job_id] = job
+            claimed.append(job)
+        return claimed
+
+    async def heartbeat(self, job_ids):
+        if self.held_override is not None:
+            return self.held_override
+        return {j for j in job_ids if j in self.leased}
+
+    async def release(self, job_id):
+        self.leased.pop(job_id)
+        self.released.append(job_id)
+
+    async def requeue(self, job_id):
+        job = self.leased.pop(job_id)
+        self.requeued.append(job_id)
+        self.pending.append(ClaimedJob(job.job_id, job.user_id, job.anp_seq, job.attempts - 1))
+
+    async def retry_or_fail(self, job_id, error_message, delay_seconds):
+        job = self.leased.pop(job_id)
+        if job.attempts >= self.max_attempts:
+            self.failed.append((job_id, error_message))
+            return "failure"
+        self.retried.append(job_id)
+        self.pending.append(job)
+        return "pending"
+
+    async def reclaim_expired(self):
+        return 0
+
+
+async def wait_until(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+def make_manager(queue, process_job, **kwargs):
+    options = dict(concurrency=3, poll_interval=0.01, heartbeat_interval=0.02, job_timeout=5.0, retry_delay=0.0)
+    options.update(kwargs)
+    return BackgroundTaskManager(queue=queue, process_job=process_job, **options)
+
+
+@pytest.mark.asyncio
+async def test_pool_never_exceeds_concurrency():
+    queue = FakeQueue(job_count=10)
+    running, peak = 0, 0
+
+    async def process_job(user_id, anp_seq, job_id, force=False):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"status": "success"}
+
+    manager = make_manager(queue, process_job)
+    await manager.start()
+    try:
+        await wait_until(lambda: len(queue.released) == 10)
+    finally:
+        await manager.stop()
+
+    assert peak == 3
+    assert manager.get_stats()["jobs_succeeded"] == 10
+
+
+@pytest.mark.asyncio
+async def test_forced_reprocess_reaches_the_pipeline():
+    queue = FakeQueue(job_count=2)
+    queue.pending[1].force = True
+    forced = {}
+
+    async def process_job(user_id, anp_seq, job_id, force=False):
+        forced[job_id] = force
+        return {"status": "success"}
+
+    manager = make_manager(queue, process_job)
+    await manager.start()
+    try:
+        await wait_until(lambda: len(queue.released) == 2)
+    finally:
+        await manager.stop()
+
+    assert forced == {"job-0": False, "job-1": True}
+
+
+@pytest.mark.asyncio
+async def test_crashing_job_is_retried_then_failed():
+    queue = FakeQueue(job_count=1, max_attempts=2)
+
+    async def process_job(user_id, anp_seq, job_id, force=False):
+        raise RuntimeError("legacy db unreachable")
+
+    manager = make_manager(queue, process_job)
+    await manager.start()
+    try:
+        await wait_until(lambda: queue.failed)
+    finally:
+        await manager.stop()
+
+    assert queue.retried == ["job-0"]
+    assert queue.failed == [("job-0", "legacy db unreachable")]
+
+
+@pytest.mark.asyncio
+async def test_stop_hands_unfinished_jobs_back():
+    queue = FakeQueue(job_count=2)
+
+    async def process_job(user_id, anp_seq, job_id, force=False):
+        await asyncio.sleep(10)
+
+    manager = make_manager(queue, process_job, concurrency=2)
+    await manager.start()
+    await wait_until(lambda: manager.active_jobs == 2)
+    await manager.stop(drain_timeout=0.01)
+
+    assert sorted(queue.requeued) == ["job-0", "job-1"]
+    assert [job.attempts for job in queue.pending] == [0, 0]
+
+
+@pytest.mark.asyncio
+async def test_lost_lease_stops_local_processing_without_requeue():
+    queue = FakeQueue(job_count=1)
+    queue.held_override = set()
+    cancelled = asyncio.Event()
+
+    async def process_job(user_id, anp_seq, job_id, force=False):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    manager = make_manager(queue, process_job)
+    await manager.start()
+    try:
+        await asyncio.wait_for(cancelled.wait(), timeout=2.0)
+        await wait_until(lambda: manager.active_jobs == 0)
+    finally:
+        await manager.stop()
+
+    assert queue.requeued == [] and queue.released == []
+
+
+@pytest.mark.asyncio
+async def test_backfill_jobs_claimed_together_share_one_bulk_prefetch():
+    queue = FakeQueue(job_count=0)
+    queue.pending = [ClaimedJob(f"job-{i}", f"user-{i}", i, 0, "backfill") for i in range(3)]
+    queue.pending.append(ClaimedJob("job-9", "user-9", 9, 0, "interactive"))
+    prefetched, started = [], {}
+
+    async def prefetch_job_data(anp_seqs):
+        prefetched.append(list(anp_seqs))
+        await asyncio.sleep(0.02)
+
+    async def process_job(user_id, anp_seq, job_id, force=False):
+        started[job_id] = len(prefetched)
+        return {"status": "success"}
+
+    manager = make_manager(queue, process_job, concurrency=4, prefetch_job_data=prefetch_job_data)
+    await manager.start()
+    try:
+        await wait_until(lambda: len(queue.released) == 4)
+    finally:
+        await manager.stop()
+
+    # one bulk extraction for the backfill jobs only, finished before they start
+    assert prefetched == [[0, 1, 2]]
+    assert all(started[f"job-{i}"] == 1 for i in range(3))
+    assert manager.get_stats()["bulk_prefetches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_prefetch_does_not_fail_the_jobs():
+    queue = FakeQueue(job_count=0)
+    queue.pending = [ClaimedJob(f"job-{i}", f"user-{i}", i, 0, "reprocess") for i in range(2)]
+
+    async def prefetch_job_data(anp_seqs):
+        raise RuntimeError("legacy db unreachable")
+
+    async def process_job(user_id, anp_seq, job_id, force=False):
+        return {"status": "success"}
+
+    manager = make_manager(queue, process_job, prefetch_job_data=prefetch_job_data)
+    await manager.start()
+    try:
+        await wait_until(lambda: len(queue.released) == 2)
+    finally:
+        await manager.stop()
+
+    assert manager.get_stats()["jobs_succeeded"] == 2
+
+
+class RecordingSession:
+    def __init__(self, running):
+        self.running = running
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+        session = self
+
+        class Result:
+            def mappings(self):
+                class Rows:
+                    def all(self):
+                        if "GROUP BY priority" in str(statement):
+                            return [{"priority": "interactive", "queued": 9, "pending": 9, "running": session.running}]
+                        return [{"job_id": "j", "user_id": "u", "anp_seq": 1, "attempts": 1, "priority": "interactive", "force_reprocess": False}]
+                return Rows()
+        return Result()
+
+
+@pytest.mark.asyncio
+async def test_claim_respects_cluster_wide_bound():
+    session = RecordingSession(running=4)
+    queue = ETLJobQueue(worker_id="w", max_concurrent_jobs=5, session_factory=lambda: session)
+
+    jobs = await queue.claim(3)
+
+    assert [job.job_id for job in jobs] == ["j"]
+    claim_sql, params = session.statements[-1]
+    assert "FOR UPDATE SKIP LOCKED" in claim_sql
+    assert params == {"worker_id": "w", "limit": 1, "priority": "interactive"}
+
+    session.running = 5
+    assert await queue.claim(3) == []
+
+
+@pytest.mark.asyncio
+async def test_retryable_pipeline_failure_goes_back_to_pending():
+    queue = FakeQueue(job_count=2, max_attempts=3)
+    attempts = {}
+
+    async def process_job(user_id, anp_seq, job_id, force=False):
+        attempts[job_id] = attempts.get(job_id, 0) + 1
+        if job_id == "job-0" and attempts[job_id] == 1:
+            return {"status": "failure", "error_message": "legacy db connection reset", "retryable": True}
+        if job_id == "job-1":
+            return {"status": "failure", "error_message": "invalid test data", "retryable": False}
+        return {"status": "success"}
+
+    manager = make_manager(queue, process_job)
+    await manager.start()
+    try:
+        await wait_until(lambda: len(queue.released) == 2)
+    finally:
+        await manager.stop()
+
+    assert queue.retried == ["job-0"]
+    assert attempts == {"job-0": 2, "job-1": 1}
+    stats = manager.get_stats()
+    assert (stats["jobs_retried"], stats["jobs_succeeded"], stats["jobs_failed"]) == (1, 1, 1)
@@ -0,0 +1,249 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+import etl.test_completion_handler as handler_module
+from etl.job_queue import CLAIM_LOCK_KEY, CLAIM_SQL, ETLJobQueue
+
+QUEUED_AT = datetime(2024, 3, 1, 10, 0)
+
+
+def job(status, locked_by=None, started_at=QUEUED_AT, job_id="job-1", attempts=0, retry_count=0):
+    return SimpleNamespace(
+        job_id=job_id, status=status, locked_by=locked_by, started_at=started_at,
+        attempts=attempts, retry_count=retry_count,
+    )
+
+
+def test_unclaimed_job_absorbs_any_notification():
+    pending = job("pending")
+    assert handler_module.select_coalescing_job([pending], QUEUED_AT + timedelta(hours=1)) is pending
+
+
+def test_job_waiting_for_retry_does_not_absorb_newer_data():
+    # 재시도 대기 작업은 저장된 단계 결과에서 다시 시작하므로 새 데이터를 읽지 않는다
+    for retrying in (job("pending", attempts=1), job("pending", retry_count=1)):
+        assert handler_module.select_coalescing_job([retrying], QUEUED_AT + timedelta(minutes=5)) is None
+        assert handler_module.select_coalescing_job([retrying], QUEUED_AT - timedelta(minutes=5)) is retrying
+
+
+def test_running_job_absorbs_retried_webhook_but_not_newer_data():
+    running = job("processing_queries", locked_by="worker")
+    before = QUEUED_AT - timedelta(minutes=5)
+    after = QUEUED_AT + timedelta(minutes=5)
+
+    assert handler_module.select_coalescing_job([running], before) is running
+    assert handler_module.select_coalescing_job([running], after) is None
+    # 후속 작업이 이미 대기 중이면 그 작업으로 합친다
+    follow_up = job("pending", started_at=after, job_id="job-2")
+    assert handler_module.select_coalescing_job([running, follow_up], after) is follow_up
+
+
+def test_timezone_aware_completion_time_is_compared_in_local_time():
+    running = job("started", locked_by="worker", started_at=datetime.now())
+    completed_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    assert handler_module.select_coalescing_job([running], completed_at) is running
+
+
+def test_follow_up_job_waits_for_running_job_of_same_test():
+    assert "running.anp_seq = chat_etl_jobs.anp_seq AND running.locked_by IS NOT NULL" in CLAIM_SQL
+
+
+def test_only_the_oldest_pending_job_of_a_test_is_claimable():
+    assert "earlier.anp_seq = chat_etl_jobs.anp_seq AND earlier.status = 'pending'" in CLAIM_SQL
+    assert "(earlier.started_at, earlier.job_id) < (chat_etl_jobs.started_at, chat_etl_jobs.job_id)" in CLAIM_SQL
+
+
+class ClaimSession:
+    """Records the claim statements; every query finds no rows"""
+
+    def __init__(self):
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+        return SimpleNamespace(mappings=lambda: SimpleNamespace(all=lambda: []))
+
+
+@pytest.mark.asyncio
+async def test_unbounded_claims_are_still_serialized():
+    session = ClaimSession()
+    queue = ETLJobQueue(worker_id="w", max_concurrent_jobs=0, session_factory=lambda: session)
+
+    await queue.claim(2)
+
+    lock_sql, params = session.statements[0]
+    assert "pg_advisory_xact_lock" in lock_sql and params == {"key": CLAIM_LOCK_KEY}
+
+
+class CoalescingTracker:
+    def __init__(self, existing=None):
+        self.existing = existing
+        self.created = []
+
+    async def create_or_get_inflight_job(self, job_progress, data_as_of):
+        if self.existing is not None:
+            return self.existing, False
+        self.created.append(job_progress)
+        return job_progress, True
+
+
+def make_request():
+    return handler_module.TestCompletionRequest(
+        user_id="00000000-0000-0000-0000-000000000001", anp_seq=7, test_type="standard",
+        completed_at=QUEUED_AT, notification_source="test_system",
+    )
+
+
+@pytest.mark.asyncio
+async def test_duplicate_notification_returns_in_flight_job(monkeypatch):
+    notify = MagicMock()
+    monkeypatch.setattr(handler_module.BackgroundTaskManager, "notify_local", notify)
+    existing = handler_module.JobProgress(
+        job_id="existing-job", user_id="u", anp_seq=7, status=handler_module.JobStatus.PROCESSING_QUERIES,
+        progress_percentage=40.0, current_step="q", total_steps=7, completed_steps=2,
+        started_at=QUEUED_AT, updated_at=QUEUED_AT,
+    )
+    handler = handler_module.TestCompletionHandler()
+    handler.job_tracker = CoalescingTracker(existing)
+
+    result = await handler.handle_test_completion(make_request())
+
+    assert result["job_id"] == "existing-job"
+    assert result["status"] == "processing_queries"
+    notify.assert_not_called()
+
+    handler.job_tracker = CoalescingTracker()
+    result = await handler.handle_test_completion(make_request())
+    assert result["status"] == "pending"
+    assert handler.job_tracker.created[0].job_id == result["job_id"]
+    notify.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_forced_reprocess_request_is_recorded_on_the_job(monkeypatch):
+    monkeypatch.setattr(handler_module.BackgroundTaskManager, "notify_local", MagicMock())
+    handler = handler_module.TestCompletionHandler()
+    handler.job_tracker = CoalescingTracker()
+    request = make_request()
+    request.force = True
+
+    await handler.handle_test_completion(request)
+
+    assert handler.job_tracker.created[0].force
+
+
+class BulkSession:
+    """Answers the bulk ingest statements in order and records them."""
+
+    def __init__(self, users, inflight, fail_after_locks=False):
+        self.users = users
+        self.inflight = inflight
+        self.fail_after_locks = fail_after_locks
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append((sql, params))
+        if self.fail_after_locks and "pg_advisory_xact_lock" not in sql:
+            raise RuntimeError("stop after the locks")
+        session = self
+
+        class Result:
+            def mappings(self):
+                return SimpleNamespace(all=lambda: session.users)
+
+            def scalars(self):
+                return SimpleNamespace(all=lambda: session.inflight)
+        return Result()
+
+
+@pytest.mark.asyncio
+async def test_bulk_ingest_uses_set_based_statements(monkeypatch):
+    known_user = uuid.UUID("00000000-0000-0000-0000-0000000000aa")
+    session = BulkSession(
+        users=[{"user_id": known_user, "anp_seq": 1}, {"user_id": uuid.uuid4(), "anp_seq": 2}],
+        inflight=[SimpleNamespace(
+            job_id="running", user_id=known_user, anp_seq=3, status="pending", locked_by=None,
+            started_at=QUEUED_AT, progress_percentage=0, current_step="", total_steps=5, completed_steps=0,
+            updated_at=QUEUED_AT, completed_at=None, error_message=None, retry_count=0, attempts=0, priority="backfill",
+            force_reprocess=False,
+        )],
+    )
+    monkeypatch.setattr(handler_module.db_manager, "get_async_session", lambda: session)
+    requests = [
+        handler_module.TestCompletionRequest(str(known_user), 1, "standard", QUEUED_AT),
+        handler_module.TestCompletionRequest("not-a-uuid", 2, "standard", QUEUED_AT),
+        handler_module.TestCompletionRequest(str(known_user), 3, "standard", QUEUED_AT),
+        handler_module.TestCompletionRequest(str(known_user), 1, "standard", QUEUED_AT),
+    ]
+
+    results = await handler_module.JobTracker().create_jobs_bulk(requests)
+
+    assert [created for _job, created in results] == [True, True, False, True]
+    assert results[0][0].job_id == results[3][0].job_id
+    assert results[0][0].user_id == str(known_user)
+    assert results[2][0].job_id == "running"
+    assert len(session.statements) == 6
+    insert_sql, params = session.statements[-2]
+    assert "INSERT INTO chat_etl_jobs" in insert_sql and params["anp_seqs"] == [1, 2]
+    assert session.statements[0][1]["buckets"] == [1, 2, 3]
+    # 대기 중인 backfill 작업에 합쳐진 interactive 알림은 작업 레인을 올린다
+    promote_sql, params = session.statements[-1]
+    assert "SET priority" in promote_sql and params["priorities"] == ["interactive"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_ingest_locks_a_bounded_set_of_buckets(monkeypatch):
+    session = BulkSession(users=[], inflight=[], fail_after_locks=True)
+    monkeypatch.setattr(handler_module.db_manager, "get_async_session", lambda: session)
+    buckets = handler_module.INFLIGHT_LOCK_BUCKETS
+    anp_seqs = list(range(1, 5 * buckets)) + [buckets + 7]
+    requests = [handler_module.TestCompletionRequest("not-a-uuid", a, "standard", QUEUED_AT) for a in anp_seqs]
+
+    with pytest.raises(RuntimeError):
+        await handler_module.JobTracker().create_jobs_bulk(requests)
+
+    lock_sql, params = session.statements[0]
+    assert "pg_advisory_xact_lock(:namespace, b)" in lock_sql
+    assert params["buckets"] == list(range(buckets))
+    # 단건 경로도 같은 버킷을 잠가 두 경로가 서로 직렬화된다
+    assert handler_module.inflight_lock_bucket(buckets + 7) == 7
+
+
+@pytest.mark.asyncio
+async def test_bulk_handler_wakes_workers_once(monkeypatch):
+    notify = MagicMock()
+    monkeypatch.setattr(handler_module.BackgroundTaskManager, "notify_local", notify)
+    job = handler_module.JobProgress(
+        job_id="j1", user_id="u", anp_seq=1, status=handler_module.JobStatus.PENDING,
+        progress_percentage=0.0, current_step="", total_steps=5, completed_steps=0,
+        started_at=QUEUED_AT, updated_at=QUEUED_AT,
+    )
+
+    class Tracker:
+        async def create_jobs_bulk(self, requests):
+            return [(job, True), (job, True)]
+
+    handler = handler_module.TestCompletionHandler()
+    handler.job_tracker = Tracker()
+    result = await handler.handle_bulk_test_completion([make_request(), make_request()])
+
+    assert (result["jobs_created"], result["jobs_coalesced"]) == (1, 0)
+    assert len(result["jobs"]) == 2
+    notify.assert_called_once()
@@ -0,0 +1,68 @@
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+
+import pytest
+
+from etl.cpu_pool import CPUWorkPool
+from etl.etl_orchestrator import ETLOrchestrator, ValidationLevel, validate_embeddings_task
+from etl.job_lanes import current_lane
+from etl.legacy_query_executor import QueryResult
+
+QUERY_DATA = {
+    "personalInfoQuery": [{"user_name": "홍길동", "age": 17}],
+    "tendencyQuery": [{
+        "Tnd1": "창의형", "Tnd1_code": "t1", "Tnd1_explanation": "설명1", "Tnd1_percentage": 12.3,
+        "Tnd2": "분석형", "Tnd2_code": "t2", "Tnd2_explanation": "설명2", "Tnd2_percentage": 9.8
+    }],
+    "topTendencyQuery": [
+        {"rank": 1, "tendency_name": "창의형", "code": "t1", "score": 85, "percentage_in_total": 15.2, "description": ""},
+    ],
+}
+
+
+def make_orchestrator(pool):
+    return ETLOrchestrator(persist_stage_outputs=False, cpu_pool=pool)
+
+
+@pytest.mark.asyncio
+async def test_backfill_jobs_transform_and_validate_in_worker_processes():
+    pool = CPUWorkPool(max_workers=1, lanes={"backfill"})
+    orchestrator = make_orchestrator(pool)
+    context = SimpleNamespace(validation_level=ValidationLevel.BASIC)
+    query_results = {name: QueryResult(query_name=name, success=True, data=rows) for name, rows in QUERY_DATA.items()}
+    try:
+        inline_docs = await orchestrator._transform_documents(context, QUERY_DATA)
+        inline_data = await orchestrator._validate_query_data(context, query_results)
+        assert pool.tasks_offloaded == 0
+
+        current_lane.set("backfill")
+        pooled_docs = await orchestrator._transform_documents(context, QUERY_DATA)
+        pooled_data = await orchestrator._validate_query_data(context, query_results)
+    finally:
+        current_lane.set("interactive")
+        await pool.close()
+
+    assert pool.tasks_offloaded == 2
+    assert [(d.doc_type, d.content_hash) for d in pooled_docs] == [(d.doc_type, d.content_hash) for d in inline_docs]
+    assert pooled_data == inline_data
+
+
+class BrokenExecutor:
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("worker died")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_runs_task_inline():
+    pool = CPUWorkPool(max_workers=1, lanes={"backfill"})
+    pool._executor = BrokenExecutor()
+
+    result = await pool.run(validate_embeddings_task, [{"embedding_vector": [0.0, 0.0]}, {}], "standard")
+
+    assert result["valid_embeddings"] == 1
+    assert result["warnings"] == ["Document 0 has dummy embedding (all zeros)"]
+    assert result["validation_errors"] == ["Document 1 missing embedding_vector"]
+    assert pool.pool_failures == 1 and pool.get_stats()["started"] is False
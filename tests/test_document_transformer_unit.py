@@ -52,3 +52,40 @@ def test_thinking_skills_summary_and_levels():
     assert len(doc.summary_text) > 10
 
 
+
+
+def test_document_dependencies_match_data_sources():
+    dt = DocumentTransformer()
+    assert set(DocumentTransformer.DOCUMENT_DEPENDENCIES) == set(dt.transformation_methods)
+    doc = dt.transform_document(DocumentType.USER_PROFILE, {"personalInfoQuery": [{"user_name": "홍길동", "age": 17}]})
+    assert doc.metadata["data_sources"] == DocumentTransformer.DOCUMENT_DEPENDENCIES[DocumentType.USER_PROFILE]
+
+
+def test_transform_document_returns_none_without_inputs():
+    dt = DocumentTransformer()
+    assert dt.transform_document(DocumentType.USER_PROFILE, {}) is None
+
+
+def test_content_hash_is_stable_and_tracks_content():
+    first = TransformedDocument(
+        doc_type="USER_PROFILE", content={"a": 1, "b": [1, 2]}, summary_text="요약", metadata={}
+    )
+    reordered = TransformedDocument(
+        doc_type="USER_PROFILE", content={"b": [1, 2], "a": 1}, summary_text="요약", metadata={"x": 1}
+    )
+    changed = TransformedDocument(
+        doc_type="USER_PROFILE", content={"a": 2, "b": [1, 2]}, summary_text="요약", metadata={}
+    )
+
+    assert first.content_hash == reordered.content_hash
+    assert first.metadata["content_hash"] == first.content_hash
+    assert changed.content_hash != first.content_hash
+
+
+def test_content_hash_tracks_transform_version(monkeypatch):
+    import etl.document_transformer as transformer_module
+
+    before = transformer_module.compute_content_hash({"a": 1}, "요약")
+    monkeypatch.setattr(transformer_module, "TRANSFORM_VERSION", transformer_module.TRANSFORM_VERSION + 1)
+
+    assert transformer_module.compute_content_hash({"a": 1}, "요약") != before
@@ -0,0 +1,92 @@
+import math
+from types import SimpleNamespace
+
+import pytest
+
+import etl.etl_benchmark as benchmark_module
+from etl.etl_benchmark import BenchmarkSettings, ETLBenchmark, StubEmbedder, classify_statement, latency_summary
+
+
+@pytest.mark.asyncio
+async def test_stub_embedder_is_deterministic_and_normalised():
+    embedder = StubEmbedder(dimensions=32)
+    docs = [{"doc_type": "PERSONALITY_PROFILE", "summary_text": "외향형"}, {"summary_text": "내향형"}]
+
+    first = await embedder.generate_document_embeddings(docs)
+    second = await embedder.generate_document_embeddings(docs[:1])
+
+    assert first[0]["embedding_vector"] == second[0]["embedding_vector"]
+    assert first[0]["embedding_vector"] != first[1]["embedding_vector"]
+    assert math.isclose(sum(x * x for x in first[1]["embedding_vector"]), 1.0)
+    assert first[0]["doc_type"] == "PERSONALITY_PROFILE"
+    assert (embedder.calls, embedder.texts) == (2, 3)
+
+
+def test_statements_are_classified_by_target():
+    assert classify_statement("SELECT * FROM mwd_score1 WHERE anp_seq = 1") == "legacy"
+    assert classify_statement("  INSERT INTO chat_documents (doc_type) VALUES ($1)") == "app_insert"
+    assert classify_statement("WITH u AS (UPDATE chat_etl_jobs SET status = 'x') SELECT pg_notify('c', '')") == "app_update"
+    assert classify_statement("SET LOCAL statement_timeout = 100") == "app_other"
+
+
+def test_peak_rss_is_none_without_resource_module(monkeypatch):
+    assert benchmark_module._peak_rss_mb() > 0
+    monkeypatch.setattr(benchmark_module, "resource", None)
+    assert benchmark_module._peak_rss_mb() is None
+    assert benchmark_module._peak_rss_mb(children=True) is None
+
+
+def test_latency_summary_percentiles():
+    summary = latency_summary([float(i) for i in range(1, 101)])
+    assert summary["count"] == 100 and summary["max"] == 100.0
+    assert summary["p50"] <= summary["p95"] <= summary["p99"] <= 100.0
+    assert latency_summary([])["count"] == 0
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeOrchestrator:
+    async def process_test_completion(self, user_id, anp_seq, job_id, session, job_tracker):
+        if anp_seq == 3:
+            raise RuntimeError("legacy data missing")
+        return {"status": "success", "legacy_statements_issued": 2}
+
+
+class FakeTracker:
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_run_reports_throughput_and_failures(monkeypatch):
+    engine = object()
+    monkeypatch.setattr(benchmark_module.db_manager, "get_async_engine", lambda: SimpleNamespace(sync_engine=engine))
+    monkeypatch.setattr(benchmark_module.db_manager, "get_sync_engine", lambda: engine)
+    monkeypatch.setattr(benchmark_module.event, "listen", lambda *args: None)
+    monkeypatch.setattr(benchmark_module.event, "remove", lambda *args: None)
+    tracker = FakeTracker()
+    monkeypatch.setattr(benchmark_module.CoalescingJobTracker, "instance", classmethod(lambda cls: tracker))
+
+    bench = ETLBenchmark(BenchmarkSettings(jobs=4, concurrency=2), session_factory=FakeSession)
+
+    async def enqueue():
+        return [SimpleNamespace(user_id="u", anp_seq=seq, job_id=f"job-{seq}") for seq in range(1, 5)]
+
+    monkeypatch.setattr(bench, "_enqueue", enqueue)
+    monkeypatch.setattr(bench, "_create_orchestrator", lambda: FakeOrchestrator())
+
+    report = await bench.run()
+
+    assert report["jobs"]["total"] == 4
+    assert (report["jobs"]["succeeded"], report["jobs"]["failed"]) == (3, 1)
+    assert report["jobs"]["errors"] == {"RuntimeError: legacy data missing": 1}
+    assert report["job_latency_seconds"]["count"] == 4
+    assert report["jobs_per_second"] > 0
+    assert report["db_statements"]["legacy_issued_per_job"] == 2.0
+    assert tracker.closed
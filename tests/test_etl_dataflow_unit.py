@@ -0,0 +1,284 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import etl.etl_orchestrator as orchestrator_module
+from database.models import DocumentType
+from etl.document_transformer import DocumentTransformer, TransformedDocument, compute_content_hash
+from etl.etl_orchestrator import ETLOrchestrator, ETLStage, ValidationLevel
+from etl.legacy_query_executor import AptitudeTestQueries, QueryResult
+
+SLOW_QUERY = "preferenceDataQuery"
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+class FakeExecutor:
+    """Streams every query immediately except SLOW_QUERY, which arrives last."""
+
+    IMPLEMENTED_QUERIES = list(AptitudeTestQueries.QUERY_METHODS)
+
+    def __init__(self, events):
+        self.events = events
+
+    async def stream_queries_async(self, session, anp_seq, query_names=None):
+        for name in query_names:
+            if name != SLOW_QUERY:
+                yield QueryResult(query_name=name, success=True, data=[{"anp_seq": anp_seq}])
+        await asyncio.sleep(0.05)
+        self.events.append(("query", SLOW_QUERY))
+        yield QueryResult(query_name=SLOW_QUERY, success=True, data=[{"anp_seq": anp_seq}])
+
+    def get_statement_count(self, anp_seq):
+        return len(self.IMPLEMENTED_QUERIES)
+
+    async def close(self):
+        pass
+
+
+class FakeTransformer(DocumentTransformer):
+    def transform_document(self, doc_type, query_results):
+        assert sorted(query_results) == sorted(self.DOCUMENT_DEPENDENCIES[doc_type])
+        return TransformedDocument(
+            doc_type=doc_type, content={"sources": sorted(query_results)},
+            summary_text=f"{doc_type} summary text", metadata={},
+        )
+
+
+class FakeEmbedder:
+    def __init__(self, **kwargs):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def generate_document_embeddings(self, documents):
+        return [dict(doc, embedding_vector=[0.1] * 768) for doc in documents]
+
+
+class RecordingStageStore:
+    def __init__(self, events):
+        self.events = events
+        self.saved = {}
+
+    async def save(self, job_id, stage, output, state=None):
+        self.events.append(("save", stage))
+        self.saved[stage] = output
+        return 0
+
+
+@pytest.fixture
+def dataflow(monkeypatch):
+    events = []
+
+    class FakeRepository:
+        stored_hashes = {}
+
+        def __init__(self, session):
+            pass
+
+        async def get_content_hashes(self, user_id, embedding_model=None):
+            # DocumentRepository 처럼 현재 모델로 임베딩된 문서의 해시만 돌려준다
+            return {
+                doc_type: content_hash for doc_type, (content_hash, model) in self.stored_hashes.items()
+                if model == embedding_model
+            }
+
+        async def upsert(self, payload):
+            events.append(("upsert", payload["doc_type"]))
+
+    context_session = MagicMock(rollback=AsyncMock())
+    context_session.commit = AsyncMock(side_effect=lambda: events.append(("commit", None)))
+
+    monkeypatch.setattr(orchestrator_module, "DocumentTransformer", FakeTransformer)
+    monkeypatch.setattr(orchestrator_module, "VectorEmbedder", FakeEmbedder)
+    monkeypatch.setattr(orchestrator_module, "DocumentRepository", FakeRepository)
+    orchestrator = ETLOrchestrator(
+        validation_level=ValidationLevel.BASIC, dataflow_mode=True, stage_store=RecordingStageStore(events)
+    )
+    monkeypatch.setattr(orchestrator, "_create_query_executor", lambda: FakeExecutor(events))
+    context = orchestrator_module.ETLContext(
+        job_id="job", user_id=USER_ID, anp_seq=7, session=context_session,
+        job_tracker=MagicMock(update_job=AsyncMock()), started_at=orchestrator_module.datetime.now(),
+        checkpoints=[], rollback_data={}, validation_level=ValidationLevel.BASIC,
+    )
+    orchestrator.repository = FakeRepository
+    return orchestrator, context, events
+
+
+def fake_hash(doc_type):
+    sources = sorted(DocumentTransformer.DOCUMENT_DEPENDENCIES[doc_type])
+    return compute_content_hash({"sources": sources}, f"{doc_type} summary text")
+
+
+@pytest.mark.asyncio
+async def test_documents_are_stored_before_slowest_query_finishes(dataflow):
+    orchestrator, context, events = dataflow
+
+    stored = await orchestrator._run_document_dataflow(context)
+
+    assert len(stored) == len(DocumentTransformer.DOCUMENT_DEPENDENCIES)
+    slow_at = events.index(("query", SLOW_QUERY))
+    assert ("upsert", DocumentType.USER_PROFILE) in events[:slow_at]
+    assert events[-3] == ("upsert", DocumentType.PREFERENCE_ANALYSIS)
+    # 임베딩 결과는 커밋 전에 저장되어 커밋 실패 시 재시도가 저장 단계부터 시작한다
+    assert events[-2:] == [("save", "embedding_generation"), ("commit", None)]
+    saved = orchestrator.stage_store.saved["embedding_generation"]
+    assert {doc["doc_type"] for doc in saved} == set(DocumentTransformer.DOCUMENT_DEPENDENCIES)
+    context.session.commit.assert_awaited_once()
+    assert context.rollback_data["legacy_statements_issued"] == len(AptitudeTestQueries.QUERY_METHODS)
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_are_recorded_per_document(dataflow):
+    orchestrator, context, _events = dataflow
+
+    await orchestrator._run_document_dataflow(context)
+
+    storage = [c for c in context.checkpoints if c.stage == ETLStage.DOCUMENT_STORAGE]
+    assert {c.data_snapshot["doc_type"] for c in storage} == set(DocumentTransformer.DOCUMENT_DEPENDENCIES)
+    embedding = [c for c in context.checkpoints if c.stage == ETLStage.EMBEDDING_GENERATION]
+    assert all(c.success and c.validation_results["passed"] for c in embedding)
+    final = context.job_tracker.update_job.await_args_list[-1].kwargs
+    assert final["progress_percentage"] == pytest.approx(90.0)
+
+
+@pytest.mark.asyncio
+async def test_storage_failure_rolls_back_whole_job(dataflow, monkeypatch):
+    orchestrator, context, _events = dataflow
+
+    class FailingRepository:
+        def __init__(self, session):
+            pass
+
+        async def get_content_hashes(self, user_id, embedding_model=None):
+            return {}
+
+        async def upsert(self, payload):
+            raise RuntimeError("db down")
+
+    monkeypatch.setattr(orchestrator_module, "DocumentRepository", FailingRepository)
+    with pytest.raises(RuntimeError):
+        await orchestrator._run_document_dataflow(context)
+    context.session.commit.assert_not_awaited()
+    context.session.rollback.assert_awaited()
+
+
+@pytest.mark.asyncio
+async def test_unchanged_documents_skip_embedding_and_storage(dataflow):
+    orchestrator, context, events = dataflow
+    orchestrator.repository.stored_hashes = {
+        DocumentType.USER_PROFILE.value: (fake_hash(DocumentType.USER_PROFILE), orchestrator.embedding_model),
+        DocumentType.PREFERENCE_ANALYSIS.value: ("stale-hash", orchestrator.embedding_model),
+    }
+
+    stored = await orchestrator._run_document_dataflow(context)
+
+    upserted = [doc_type for kind, doc_type in events if kind == "upsert"]
+    assert DocumentType.USER_PROFILE not in upserted
+    assert DocumentType.PREFERENCE_ANALYSIS in upserted
+    assert context.rollback_data["documents_unchanged"] == [DocumentType.USER_PROFILE]
+    summary = await orchestrator._complete_processing(context, stored)
+    assert summary["documents_changed"] == len(DocumentTransformer.DOCUMENT_DEPENDENCIES) - 1
+    assert summary["documents_skipped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_embedding_skips_unchanged_documents(dataflow):
+    orchestrator, context, _events = dataflow
+    documents = [
+        FakeTransformer().transform_document(doc_type, dict.fromkeys(sources, []))
+        for doc_type, sources in DocumentTransformer.DOCUMENT_DEPENDENCIES.items()
+    ]
+    orchestrator.repository.stored_hashes = {
+        doc.doc_type.value: (doc.content_hash, orchestrator.embedding_model) for doc in documents
+    }
+
+    assert await orchestrator._generate_embeddings(context, documents) == []
+    assert len(context.rollback_data["documents_unchanged"]) == len(documents)
+
+    orchestrator.skip_unchanged_documents = False
+    embedded = await orchestrator._generate_embeddings(context, documents)
+    assert len(embedded) == len(documents)
+
+
+class ModelEmbedder(FakeEmbedder):
+    """Reports its model in embedding_metadata, like VectorEmbedder"""
+
+    async def generate_document_embeddings(self, documents):
+        return [
+            dict(doc, embedding_vector=[0.1] * 768, embedding_metadata={"model": "models/new-embedding"})
+            for doc in documents
+        ]
+
+
+@pytest.mark.asyncio
+async def test_embedding_model_change_re_embeds_unchanged_documents(dataflow, monkeypatch):
+    orchestrator, context, events = dataflow
+    payloads = {}
+    upsert = orchestrator.repository.upsert
+
+    async def capture(self, payload):
+        payloads[payload["doc_type"]] = payload["doc_metadata"]
+        await upsert(self, payload)
+
+    monkeypatch.setattr(orchestrator.repository, "upsert", capture)
+    monkeypatch.setattr(orchestrator_module, "VectorEmbedder", ModelEmbedder)
+    # 내용은 같지만 이전 모델로 임베딩된 문서
+    orchestrator.repository.stored_hashes = {
+        doc_type.value: (fake_hash(doc_type), "models/old-embedding")
+        for doc_type in DocumentTransformer.DOCUMENT_DEPENDENCIES
+    }
+    orchestrator.embedding_model = "models/new-embedding"
+
+    await orchestrator._run_document_dataflow(context)
+
+    assert context.rollback_data["documents_unchanged"] == []
+    assert set(payloads) == set(DocumentTransformer.DOCUMENT_DEPENDENCIES)
+    assert all(meta["embedding_model"] == "models/new-embedding" for meta in payloads.values())
+
+
+class PartlyFailingEmbedder(FakeEmbedder):
+    """Like VectorEmbedder when one text could not be embedded: a zero vector, metadata copied as-is"""
+
+    async def generate_document_embeddings(self, documents):
+        return [
+            dict(doc, embedding_vector=[0.0 if doc["doc_type"] == DocumentType.PREFERENCE_ANALYSIS else 0.1] * 768)
+            for doc in documents
+        ]
+
+
+@pytest.mark.asyncio
+async def test_document_with_failed_embedding_is_stored_without_content_hash(dataflow, monkeypatch):
+    orchestrator, context, _events = dataflow
+    payloads = {}
+
+    class CapturingRepository:
+        def __init__(self, session):
+            pass
+
+        async def get_content_hashes(self, user_id, embedding_model=None):
+            return {}
+
+        async def upsert(self, payload):
+            payloads[payload["doc_type"]] = payload["doc_metadata"]
+
+    monkeypatch.setattr(orchestrator_module, "VectorEmbedder", PartlyFailingEmbedder)
+    monkeypatch.setattr(orchestrator_module, "DocumentRepository", CapturingRepository)
+
+    await orchestrator._run_document_dataflow(context)
+
+    # 0 벡터 문서는 해시 없이 저장되어 다음 실행에서 다시 임베딩된다
+    assert "content_hash" not in payloads[DocumentType.PREFERENCE_ANALYSIS]
+    assert payloads[DocumentType.USER_PROFILE]["content_hash"] == fake_hash(DocumentType.USER_PROFILE)
+
+    documents = [
+        FakeTransformer().transform_document(doc_type, dict.fromkeys(sources, []))
+        for doc_type, sources in DocumentTransformer.DOCUMENT_DEPENDENCIES.items()
+    ]
+    embedded = {doc["doc_type"]: doc for doc in await orchestrator._generate_embeddings(context, documents)}
+    assert "content_hash" not in embedded[DocumentType.PREFERENCE_ANALYSIS]["metadata"]
+    assert "content_hash" in embedded[DocumentType.USER_PROFILE]["metadata"]
@@ -0,0 +1,122 @@
+from types import SimpleNamespace
+
+import pytest
+
+import api.etl_endpoints as endpoints
+from etl import telemetry
+from etl.legacy_query_executor import QueryResult
+from monitoring.metrics import MetricsRegistry
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(MetricsRegistry, "_instance", registry)
+    return registry
+
+
+@pytest.mark.asyncio
+async def test_stage_durations_are_exported_as_bucketed_histograms(fresh_registry):
+    await telemetry.record_stage("query_execution", 0.3, True, 120.0)
+    await telemetry.record_stage("query_execution", 7.0, False, 130.0)
+    await telemetry.record_stage("embedding_generation", 0.2, True, 0.0, doc_type="PERSONALITY_PROFILE")
+
+    snapshot = await fresh_registry.export("etl_stage_seconds")
+    success = next(h for h in snapshot["histograms"] if h["labels"] == {
+        "stage": "query_execution", "doc_type": "all", "status": "success"})
+    buckets = {b["le"]: b["count"] for b in success["buckets"]}
+    assert (buckets[0.25], buckets[0.5], buckets[300.0]) == (0, 1, 1)
+    assert {h["labels"]["doc_type"] for h in snapshot["histograms"]} == {"all", "PERSONALITY_PROFILE"}
+    assert snapshot["counters"] == []
+
+    stages = (await telemetry.summarize())["stages"]
+    assert stages["query_execution"]["count"] == 2 and stages["query_execution"]["failures"] == 1
+    assert stages["query_execution"]["max_seconds"] == 7.0
+
+
+@pytest.mark.asyncio
+async def test_queries_embeddings_and_jobs_are_summarized():
+    await telemetry.record_query_results([
+        QueryResult("tendencyQuery", True, data=[{}] * 3, execution_time=0.1, row_count=3),
+        QueryResult("tendencyQuery", True, data=[{}], execution_time=0.3, row_count=1),
+        QueryResult("imageQuery", False, error="timeout"),
+    ])
+    vector = [0.1, 0.2]
+    await telemetry.record_embeddings([
+        {"doc_type": "PERSONALITY_PROFILE", "embedding_vector": vector, "embedding_metadata": {"cached": True}},
+        {"doc_type": "PERSONALITY_PROFILE", "embedding_vector": vector, "embedding_metadata": {"cached": False}},
+        {"doc_type": "CAREER_RECOMMENDATIONS", "embedding_vector": vector, "embedding_metadata": {"cached": True}},
+        # 임베더 전체 실패 시의 대체 벡터
+        {"doc_type": "CAREER_RECOMMENDATIONS", "embedding_vector": [0.0, 0.0]},
+        # 배치 중 한 텍스트만 실패해도 0 벡터가 embedding_metadata 와 함께 온다
+        {"doc_type": "LEARNING_STYLE", "embedding_vector": [0.0, 0.0], "embedding_metadata": {"cached": False}},
+    ])
+    await telemetry.record_job("success", 12.0)
+    await telemetry.record_job("failure", 3.0, "query_execution", "database")
+
+    summary = await telemetry.summarize()
+
+    tendency = summary["queries"]["tendencyQuery"]
+    assert (tendency["count"], tendency["avg_seconds"], tendency["avg_rows"]) == (2, 0.2, 2.0)
+    assert summary["queries"]["imageQuery"]["failures"] == 1
+    cache = summary["embedding_cache"]
+    assert cache["by_doc_type"]["PERSONALITY_PROFILE"]["hit_ratio"] == 0.5
+    # 더미 임베딩은 적중률 계산에서 뺀다
+    assert cache["by_doc_type"]["CAREER_RECOMMENDATIONS"]["hit_ratio"] == 1.0
+    assert cache["overall"]["dummy"] == 2 and cache["overall"]["hit_ratio"] == round(2 / 3, 4)
+    assert (summary["jobs"]["succeeded"], summary["jobs"]["failed"]) == (1, 1)
+    assert summary["jobs"]["failed_by_stage"] == {"query_execution": 1}
+
+
+@pytest.mark.asyncio
+async def test_stats_endpoint_reports_live_numbers(monkeypatch):
+    class Queue:
+        async def get_stats(self):
+            raise ConnectionError("database unavailable")
+
+        async def get_job_outcomes(self):
+            return {"succeeded": 7, "failed": 1}
+
+    workers = SimpleNamespace(queue=Queue(), get_stats=lambda: {"active_jobs": 2})
+    monkeypatch.setattr(endpoints.BackgroundTaskManager, "instance", classmethod(lambda cls: workers))
+    await telemetry.record_job("success", 5.0)
+
+    stats = await endpoints.get_etl_stats()
+
+    assert stats["background_tasks"] == {"active_jobs": 2}
+    assert stats["queue"].startswith("unavailable")
+    # 작업 결과는 모든 워커 기준 (큐 테이블), telemetry 는 이 프로세스 기준
+    assert stats["jobs"] == {"succeeded": 7, "failed": 1}
+    assert stats["telemetry"]["jobs"]["succeeded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_job_outcomes_are_read_from_the_queue_table():
+    from etl.job_queue import ETLJobQueue
+
+    rows = [
+        {"status": "success", "failed_stage": None, "jobs": 3, "avg_seconds": 10.0},
+        {"status": "failure", "failed_stage": "query_execution", "jobs": 1, "avg_seconds": 40.0},
+        {"status": "failure", "failed_stage": None, "jobs": 1, "avg_seconds": 20.0},
+    ]
+    executed = []
+
+    class Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, statement, params=None):
+            executed.append(params)
+            return SimpleNamespace(mappings=lambda: SimpleNamespace(all=lambda: rows))
+
+    queue = ETLJobQueue(worker_id="w", session_factory=Session)
+
+    outcomes = await queue.get_job_outcomes(hours=6)
+
+    assert executed == [{"hours": 6}]
+    assert (outcomes["succeeded"], outcomes["failed"], outcomes["partial"]) == (3, 2, 0)
+    assert outcomes["failed_by_stage"] == {"query_execution": 1, "unknown": 1}
+    assert outcomes["avg_seconds"] == {"success": 10.0, "failure": 30.0}
@@ -0,0 +1,128 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import etl.worker as worker
+
+
+@pytest.mark.asyncio
+async def test_worker_warms_up_runs_periodic_tasks_and_stops(monkeypatch):
+    executor = MagicMock(warm_up=AsyncMock(), close=AsyncMock())
+    monkeypatch.setattr(worker, "LegacyQueryExecutor", lambda **kwargs: executor)
+    monkeypatch.setattr(worker.db_manager, "test_connection", AsyncMock(return_value=True))
+    monkeypatch.setattr(worker.db_manager, "close", AsyncMock())
+    pool = MagicMock(start=AsyncMock(), stop=AsyncMock(), queue=MagicMock(worker_id="w"), concurrency=4)
+    pool.get_stats.return_value = {}
+    monkeypatch.setattr(worker.BackgroundTaskManager, "instance", classmethod(lambda cls: pool))
+    cleanup = AsyncMock(return_value={"status": "success"})
+    monkeypatch.setattr(worker, "PERIODIC_TASKS", {"cleanup": {"function": cleanup, "schedule_seconds": 60, "args": (1,)}})
+
+    stop = asyncio.Event()
+    run = asyncio.create_task(worker.run_worker(concurrency=2, stop_event=stop))
+    while not cleanup.await_count:
+        await asyncio.sleep(0.01)
+    stop.set()
+
+    assert await run == 0
+    executor.warm_up.assert_awaited_once()
+    pool.start.assert_awaited_once()
+    pool.stop.assert_awaited_once()
+    assert pool.concurrency == 2
+    cleanup.assert_awaited_once_with(1)
+
+
+@pytest.mark.asyncio
+async def test_worker_exits_when_database_is_unreachable(monkeypatch):
+    monkeypatch.setattr(worker.db_manager, "test_connection", AsyncMock(return_value=False))
+    assert await worker.run_worker(warm_up=False, stop_event=asyncio.Event()) == 1
+
+
+@pytest.mark.asyncio
+async def test_worker_serves_its_own_metrics(monkeypatch):
+    from monitoring.metrics import MetricsRegistry
+
+    monkeypatch.setattr(MetricsRegistry, "_instance", MetricsRegistry())
+    await worker.telemetry.record_job("success", 2.0)
+    pool = MagicMock(queue=MagicMock(worker_id="w"))
+    pool.get_stats.return_value = {"active_jobs": 1}
+    server = await worker.serve_metrics(pool, 0, host="127.0.0.1")
+    port = server.sockets[0].getsockname()[1]
+
+    async def get(path):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        response = await reader.read()
+        writer.close()
+        head, _, body = response.partition(b"\r\n\r\n")
+        return head.split(b"\r\n")[0].decode(), json.loads(body)
+
+    try:
+        status, stats = await get("/stats")
+        assert status == "HTTP/1.1 200 OK"
+        assert stats["worker_id"] == "w" and stats["background_tasks"] == {"active_jobs": 1}
+        assert stats["telemetry"]["jobs"]["succeeded"] == 1
+        status, metrics = await get("/metrics")
+        assert status == "HTTP/1.1 200 OK" and metrics["histograms"]
+        assert (await get("/nope"))[0] == "HTTP/1.1 404 Not Found"
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+class CleanupSession:
+    """Records the statements of cleanup_failed_jobs"""
+
+    def __init__(self):
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        return MagicMock(scalar_one=lambda: 3, all=lambda: [("a",), ("b",)])
+
+
+@pytest.mark.asyncio
+async def test_cleanup_failed_jobs_only_reports_by_default(monkeypatch):
+    import etl.tasks as tasks
+
+    session = CleanupSession()
+    monkeypatch.setattr(tasks, "get_database_session", lambda: session)
+
+    result = await tasks.cleanup_failed_jobs(168)
+
+    assert result["failed_jobs"] == 3 and result["cleaned_jobs"] == 0
+    assert not any("DELETE" in sql for sql in session.statements)
+
+
+@pytest.mark.asyncio
+async def test_cleanup_failed_jobs_purges_when_opted_in(monkeypatch):
+    import etl.tasks as tasks
+
+    session = CleanupSession()
+    monkeypatch.setattr(tasks, "get_database_session", lambda: session)
+
+    result = await tasks.cleanup_failed_jobs(168, purge=True)
+
+    assert result["cleaned_jobs"] == 2
+    assert session.statements[0].startswith("DELETE FROM chat_etl_jobs")
+
+
+@pytest.mark.asyncio
+async def test_prune_embedding_cache_is_a_periodic_task(monkeypatch):
+    import etl.tasks as tasks
+
+    store = MagicMock(prune=AsyncMock(return_value=4))
+    monkeypatch.setattr(tasks.EmbeddingStore, "instance", classmethod(lambda cls: store))
+
+    result = await tasks.prune_embedding_cache(30)
+
+    assert result == {"status": "success", "pruned_embeddings": 4, "message": "Embedding cache pruned"}
+    store.prune.assert_awaited_once_with(30)
+    assert tasks.PERIODIC_TASKS["prune-embedding-cache"]["function"] is tasks.prune_embedding_cache
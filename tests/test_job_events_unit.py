@@ -0,0 +1,185 @@
+import asyncio
+import json
+
+import pytest
+
+import api.etl_endpoints as endpoints
+from etl.job_events import PROGRESS_CHANNEL, JobEventListener, publishing
+from etl.job_queue import ETLJobQueue
+
+JOB_A = "00000000-0000-0000-0000-00000000000a"
+JOB_B = "00000000-0000-0000-0000-00000000000b"
+
+
+class FakeConnection:
+    def __init__(self):
+        self.listeners = {}
+        self.closed = False
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    def add_termination_listener(self, callback):
+        self.on_terminated = callback
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+    def notify(self, channel, event):
+        self.listeners[channel](self, 1, channel, json.dumps(event))
+
+
+def make_listener(connections):
+    async def connect():
+        connection = FakeConnection()
+        connections.append(connection)
+        return connection
+    return JobEventListener(channel="progress", connect=connect)
+
+
+@pytest.mark.asyncio
+async def test_one_connection_fans_out_to_subscribers_of_the_job():
+    connections = []
+    listener = make_listener(connections)
+
+    async with listener.subscribe(JOB_A) as first, listener.subscribe(JOB_A) as second, \
+            listener.subscribe(JOB_B) as other:
+        connections[0].notify("progress", {"job_id": JOB_A, "status": "processing_queries"})
+
+        assert first.get_nowait()["status"] == "processing_queries"
+        assert second.get_nowait()["status"] == "processing_queries"
+        assert other.empty()
+        assert listener.subscriber_count == 3
+
+    assert len(connections) == 1
+    assert listener.subscriber_count == 0
+
+
+@pytest.mark.asyncio
+async def test_reconnects_after_connection_loss_and_survives_connect_failure():
+    connections = []
+    listener = make_listener(connections)
+    async with listener.subscribe(JOB_A):
+        connections[0].closed = True
+        connections[0].on_terminated(connections[0])
+    async with listener.subscribe(JOB_A):
+        assert listener.connected and len(connections) == 2
+
+    async def refuse():
+        raise OSError("connection refused")
+
+    offline = JobEventListener(channel="progress", connect=refuse)
+    async with offline.subscribe(JOB_A) as events:
+        assert not offline.connected and events.empty()
+
+
+def test_publishing_wraps_update_with_notify():
+    sql, params = publishing("UPDATE chat_etl_jobs AS j SET status = 'x' WHERE j.job_id = :job_id", {"job_id": JOB_A})
+    assert sql.startswith("WITH u AS (UPDATE chat_etl_jobs AS j")
+    assert "RETURNING j.*" in sql and "pg_notify(:progress_channel," in sql
+    assert params == {"job_id": JOB_A, "progress_channel": PROGRESS_CHANNEL}
+
+    sql, _params = publishing("UPDATE chat_etl_jobs AS j SET status = 'x'", {}, returning=("job_id", "status"))
+    assert "SELECT u.job_id, u.status, pg_notify(" in sql
+
+
+class QueueSession:
+    """Records the queue's statements; every statement returns one 'pending' row"""
+
+    def __init__(self):
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        row = {"job_id": JOB_A, "status": "pending"}
+
+        class Result:
+            def scalar(self):
+                return "pending"
+
+            def first(self):
+                return row
+
+            def mappings(self):
+                return type("Rows", (), {"all": lambda self: [row]})()
+        return Result()
+
+
+@pytest.mark.asyncio
+async def test_queue_status_transitions_are_published():
+    session = QueueSession()
+    queue = ETLJobQueue(worker_id="w", session_factory=lambda: session)
+
+    assert await queue.retry_or_fail(JOB_A, "boom", 0) == "pending"
+    assert await queue.retry_failed(JOB_A)
+    assert await queue.reclaim_expired() == 1
+    await queue.requeue(JOB_A)
+    await queue.release(JOB_A)
+
+    assert len(session.statements) == 5
+    assert all(sql.startswith("WITH u AS (") and "pg_notify(:progress_channel," in sql for sql in session.statements)
+
+
+class FakeHandler:
+    def __init__(self):
+        self.reads = 0
+
+    async def get_job_status(self, job_id):
+        self.reads += 1
+        return {"job_id": job_id, "status": "processing_queries", "progress_percentage": 10.0, "current_step": "q"}
+
+
+@pytest.mark.asyncio
+async def test_failure_of_a_leased_job_does_not_end_the_stream(monkeypatch):
+    connections = []
+    listener = make_listener(connections)
+    monkeypatch.setattr(JobEventListener, "instance", classmethod(lambda cls: listener))
+
+    response = await endpoints.get_job_progress_stream(JOB_A, handler=FakeHandler())
+    stream = response.body_iterator
+    await stream.__anext__()
+
+    # 파이프라인이 failure 를 쓴 뒤 큐가 재시도로 되돌린다
+    connections[0].notify("progress", {"job_id": JOB_A, "status": "failure", "progress_percentage": 40, "leased": True})
+    failed = json.loads((await asyncio.wait_for(stream.__anext__(), 1.0))[len("data: "):])
+    connections[0].notify("progress", {"job_id": JOB_A, "status": "pending", "progress_percentage": 40, "leased": False})
+    retrying = json.loads((await asyncio.wait_for(stream.__anext__(), 1.0))[len("data: "):])
+    connections[0].notify("progress", {"job_id": JOB_A, "status": "failure", "progress_percentage": 40, "leased": False})
+    final = json.loads((await asyncio.wait_for(stream.__anext__(), 1.0))[len("data: "):])
+
+    assert (failed["status"], retrying["status"], final["status"]) == ("failure", "pending", "failure")
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_progress_stream_is_pushed_without_polling(monkeypatch):
+    connections = []
+    listener = make_listener(connections)
+    monkeypatch.setattr(JobEventListener, "instance", classmethod(lambda cls: listener))
+    handler = FakeHandler()
+
+    response = await endpoints.get_job_progress_stream(JOB_A, handler=handler)
+    stream = response.body_iterator
+    first = json.loads((await stream.__anext__())[len("data: "):])
+    assert first["progress_percentage"] == 10.0
+
+    connections[0].notify("progress", {"job_id": JOB_A, "status": "processing_queries", "progress_percentage": 60})
+    second = json.loads((await asyncio.wait_for(stream.__anext__(), 1.0))[len("data: "):])
+    connections[0].notify("progress", {"job_id": JOB_A, "status": "success", "progress_percentage": 100})
+    last = json.loads((await asyncio.wait_for(stream.__anext__(), 1.0))[len("data: "):])
+
+    assert second["progress_percentage"] == 60.0 and second["current_step"] == "q"
+    assert last["status"] == "success"
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+    assert handler.reads == 1
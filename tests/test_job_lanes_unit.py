@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from etl.job_lanes import FairShareLimiter, allocate_lane_slots, current_lane, parse_lane_weights
+
+WEIGHTS = {"interactive": 6.0, "reprocess": 3.0, "backfill": 1.0}
+
+
+def test_backfill_cannot_take_reserved_slots():
+    busy = {"backfill": 100}
+    slots = allocate_lane_slots(4, capacity=4, running={}, pending=busy, weights=WEIGHTS, reserved_slots=1)
+    assert slots["backfill"] == 3
+
+    slots = allocate_lane_slots(1, capacity=4, running={"backfill": 3}, pending={**busy, "interactive": 1},
+                                weights=WEIGHTS, reserved_slots=1)
+    assert slots == {"interactive": 1, "reprocess": 0, "backfill": 0}
+
+
+def test_slots_follow_weights_and_idle_share_is_reused():
+    pending = {"interactive": 100, "reprocess": 100, "backfill": 100}
+    slots = allocate_lane_slots(10, capacity=10, running={}, pending=pending, weights=WEIGHTS, reserved_slots=0)
+    assert slots == {"interactive": 6, "reprocess": 3, "backfill": 1}
+
+    slots = allocate_lane_slots(10, capacity=10, running={}, pending={"interactive": 2, "reprocess": 100},
+                                weights=WEIGHTS, reserved_slots=0)
+    assert slots == {"interactive": 2, "reprocess": 8, "backfill": 0}
+
+
+def test_parse_lane_weights_rejects_unknown_lane():
+    assert parse_lane_weights("backfill:2")["backfill"] == 2.0
+    with pytest.raises(ValueError):
+        parse_lane_weights("nightly:1")
+
+
+@pytest.mark.asyncio
+async def test_limiter_admits_waiting_lanes_by_weight():
+    limiter = FairShareLimiter(capacity=1, weights={"interactive": 3.0, "reprocess": 1.0, "backfill": 1.0})
+    order = []
+    gate = asyncio.Event()
+
+    async def hold():
+        async with limiter.slot("backfill"):
+            await gate.wait()
+
+    async def use(lane):
+        current_lane.set(lane)
+        async with limiter.slot():
+            order.append(lane)
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiters = [asyncio.create_task(use(lane)) for lane in ["backfill"] * 4 + ["interactive"] * 6]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(holder, *waiters)
+
+    # 가중치 3:1 로 번갈아 들어가며 backfill 도 굶지 않는다
+    assert order[:5] == ["interactive"] * 4 + ["backfill"]
+    assert order[5:8].count("interactive") == 2
+    assert limiter.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_its_slot():
+    limiter = FairShareLimiter(capacity=1)
+    await limiter.acquire("backfill")
+    waiter = asyncio.create_task(limiter.acquire("interactive"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    limiter.release("backfill")
+
+    assert limiter.in_use == 0
+    async with limiter.slot("reprocess"):
+        assert limiter.in_use == 1
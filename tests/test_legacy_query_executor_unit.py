@@ -0,0 +1,382 @@
+import json
+import re
+
+import pytest
+
+from etl.legacy_query_executor import (
+    AptitudeTestQueries,
+    LegacyQueryExecutor,
+    LegacyStatement,
+    PrefetchedQueryResults,
+    QueryResult,
+    combine_statements,
+    split_batch_row,
+    to_bulk_statement,
+)
+
+# process-wide caches / latency history stay out of these tests
+NO_SHARED_STATE = dict(
+    use_population_stats=False, use_reference_data=False, adaptive_timeouts=False, use_prefetched_results=False
+)
+
+
+class FakeQueries(AptitudeTestQueries):
+    """AptitudeTestQueries without a DB session; every statement returns one row."""
+
+    fail_once = set()
+    executed = []
+
+    def __init__(self, _unused_session=None, population_stats=None, reference_data=None, statement_timeout=None):
+        self.statement_count = 0
+        self.population_stats = population_stats
+        self.reference_data = reference_data
+
+    def _run(self, sql, params, transform=None):
+        self.statement_count += 1
+        if "anp_seqs" in params:
+            # bulk statement: one row per anp_seq, the last one without rows
+            seqs = params["anp_seqs"]
+            return [
+                {"bulk_anp_seq": seq, "bulk_rows": json.dumps([{"anp_seq": seq}] if seq != seqs[-1] else [])}
+                for seq in seqs
+            ]
+        return [{"sql": sql.strip()[:20], "anp_seq": params["anp_seq"]}]
+
+    def execute_query(self, query_name, anp_seq):
+        FakeQueries.executed.append(query_name)
+        if query_name in FakeQueries.fail_once:
+            FakeQueries.fail_once.discard(query_name)
+            self.statement_count += 1
+            raise RuntimeError("transient failure")
+        return super().execute_query(query_name, anp_seq)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_queries(monkeypatch):
+    import etl.legacy_query_executor as module
+
+    FakeQueries.fail_once = set()
+    FakeQueries.executed = []
+    monkeypatch.setattr(module, "AptitudeTestQueries", FakeQueries)
+    return FakeQueries
+
+
+def test_registry_covers_every_query_method():
+    for query_name, method_name in AptitudeTestQueries.QUERY_METHODS.items():
+        assert callable(getattr(AptitudeTestQueries, method_name)), query_name
+
+
+@pytest.mark.asyncio
+async def test_one_statement_per_query(fake_queries, monkeypatch):
+    executor = LegacyQueryExecutor(max_retries=0, **NO_SHARED_STATE)
+    monkeypatch.setattr(executor, "_validate_query_result", lambda name, data: True)
+    try:
+        results = await executor.execute_all_queries_async(None, 42)
+    finally:
+        await executor.close()
+
+    assert len(results) == len(AptitudeTestQueries.QUERY_METHODS)
+    assert all(r.success for r in results.values())
+    assert executor.get_statement_count(42) == len(AptitudeTestQueries.QUERY_METHODS)
+    # finished jobs are no longer tracked as in flight
+    assert executor.statements_issued == {}
+    assert sorted(fake_queries.executed) == sorted(AptitudeTestQueries.QUERY_METHODS)
+
+    successful = await executor.get_successful_results(results)
+    assert set(successful) == set(AptitudeTestQueries.QUERY_METHODS) | set(AptitudeTestQueries.PLACEHOLDER_QUERY_KEYS)
+
+
+@pytest.mark.asyncio
+async def test_finished_statement_counts_are_bounded(fake_queries, monkeypatch):
+    executor = LegacyQueryExecutor(max_retries=0, **NO_SHARED_STATE)
+    monkeypatch.setattr(executor, "_validate_query_result", lambda name, data: True)
+    monkeypatch.setattr(executor, "FINISHED_STATEMENT_HISTORY", 2)
+    try:
+        for anp_seq in (1, 2, 3):
+            await executor.execute_all_queries_async(None, anp_seq)
+    finally:
+        await executor.close()
+
+    assert executor.statements_issued == {}
+    assert executor.get_statement_count(1) == 0
+    assert executor.get_statement_count(3) == len(AptitudeTestQueries.QUERY_METHODS)
+
+
+@pytest.mark.asyncio
+async def test_retry_reruns_only_failed_query(fake_queries, monkeypatch):
+    fake_queries.fail_once = {"dutiesQuery"}
+    executor = LegacyQueryExecutor(max_retries=1, retry_delay=0.0, **NO_SHARED_STATE)
+    monkeypatch.setattr(executor, "_validate_query_result", lambda name, data: True)
+    try:
+        results = await executor.execute_all_queries_async(None, 7)
+    finally:
+        await executor.close()
+
+    assert results["dutiesQuery"].success
+    assert fake_queries.executed.count("dutiesQuery") == 2
+    assert fake_queries.executed.count("tendencyQuery") == 1
+    assert executor.get_statement_count(7) == len(AptitudeTestQueries.QUERY_METHODS) + 1
+
+
+def batch_rows(sql, params):
+    """Answer a combine_statements() statement: one row, one JSON array per statement."""
+    count = len(re.findall(r"\) q\) AS r\d+", sql))
+    return [{f"r{i}": json.dumps([{"anp_seq": params[f"s{i}_anp_seq"]}]) for i in range(count)}]
+
+
+def test_combine_statements_prefixes_bind_params():
+    combined = combine_statements([
+        LegacyStatement(sql="select :anp_seq::int as a where x = any(:codes)", params={"anp_seq": 1, "codes": ["a"]}),
+        LegacyStatement(sql="select :anp_seq as b order by b", params={"anp_seq": 2}),
+    ])
+
+    assert ":s0_anp_seq::int" in combined.sql and ":s1_anp_seq as b" in combined.sql
+    assert ":anp_seq" not in combined.sql
+    assert combined.params == {"s0_anp_seq": 1, "s0_codes": ["a"], "s1_anp_seq": 2}
+    assert split_batch_row({"r0": "[]", "r1": [{"b": 2}]}, 2) == [[], [{"b": 2}]]
+
+
+@pytest.fixture
+def async_connections(monkeypatch):
+    import etl.legacy_query_executor as module
+
+    opened = []
+
+    class FakeConnection(module.AsyncLegacyConnection):
+        fail_batch = False
+
+        def __init__(self, engine=None):
+            super().__init__(engine)
+            self.statements = []
+            self.closed = False
+            opened.append(self)
+
+        async def run(self, sql, params, statement_timeout=None):
+            self.statement_count += 1
+            self.statements.append(sql)
+            if "json_agg" in sql:
+                if FakeConnection.fail_batch:
+                    raise RuntimeError("batch failed")
+                return batch_rows(sql, params)
+            return [{"anp_seq": params["anp_seq"]}]
+
+        async def close(self):
+            self.closed = True
+
+    monkeypatch.setattr(module, "AsyncLegacyConnection", FakeConnection)
+    FakeConnection.opened = opened
+    return FakeConnection
+
+
+@pytest.mark.asyncio
+async def test_async_backend_sends_all_queries_in_one_round_trip(async_connections, monkeypatch):
+    from etl.job_lanes import FairShareLimiter
+
+    limiter = FairShareLimiter(capacity=1)
+    monkeypatch.setitem(FairShareLimiter._instances, "legacy_db", limiter)
+    executor = LegacyQueryExecutor(
+        max_retries=0, backend=LegacyQueryExecutor.BACKEND_ASYNC, **NO_SHARED_STATE
+    )
+    monkeypatch.setattr(executor, "_validate_query_result", lambda name, data: True)
+    results = await executor.execute_all_queries_async(None, 99)
+    await executor.close()
+
+    opened = async_connections.opened
+    assert executor.executor is None
+    assert all(r.success for r in results.values())
+    assert results["dutiesQuery"].data == [{"anp_seq": 99}]
+    assert len(opened) == 1 and opened[0].closed
+    assert len(opened[0].statements) == 1
+    assert executor.get_statement_count(99) == 1
+    # one legacy_db slot for the whole job, not one per query
+    assert sum(limiter.admitted.values()) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_backend_falls_back_to_single_queries(async_connections, monkeypatch):
+    async_connections.fail_batch = True
+    executor = LegacyQueryExecutor(
+        max_retries=0, backend=LegacyQueryExecutor.BACKEND_ASYNC, **NO_SHARED_STATE
+    )
+    monkeypatch.setattr(executor, "_validate_query_result", lambda name, data: True)
+    results = await executor.execute_all_queries_async(None, 98)
+    await executor.close()
+
+    assert all(r.success for r in results.values())
+    assert executor.get_statement_count(98) == len(AptitudeTestQueries.QUERY_METHODS) + 1
+
+
+@pytest.mark.asyncio
+async def test_async_backend_opens_connection_only_after_lane_slot(async_connections, monkeypatch):
+    import asyncio
+    from etl.job_lanes import FairShareLimiter
+
+    limiter = FairShareLimiter(capacity=1)
+    monkeypatch.setitem(FairShareLimiter._instances, "legacy_db", limiter)
+    executor = LegacyQueryExecutor(
+        max_retries=0, backend=LegacyQueryExecutor.BACKEND_ASYNC, **NO_SHARED_STATE
+    )
+    monkeypatch.setattr(executor, "_validate_query_result", lambda name, data: True)
+
+    await limiter.acquire("interactive")
+    job = asyncio.ensure_future(executor.execute_all_queries_async(None, 97))
+    await asyncio.sleep(0.05)
+    # the queued job waits for the lane without holding a connection
+    assert async_connections.opened == []
+    limiter.release("interactive")
+    await job
+    await executor.close()
+
+    assert len(async_connections.opened) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_queries_execute_all_queries():
+    from etl.legacy_query_executor import AsyncAptitudeTestQueries
+
+    class FakeConnection:
+        statement_count = 0
+
+        async def run(self, sql, params, statement_timeout=None):
+            self.statement_count += 1
+            return batch_rows(sql, params)
+
+    queries = AsyncAptitudeTestQueries(FakeConnection())
+    results = await queries.execute_all_queries(5)
+
+    assert queries.statement_count == 1
+    assert results["tendencyQuery"] == [{"anp_seq": 5}]
+    assert set(AptitudeTestQueries.PLACEHOLDER_QUERY_KEYS) <= set(results)
+
+
+@pytest.mark.asyncio
+async def test_async_queries_fall_back_when_batch_fails():
+    from etl.legacy_query_executor import AsyncAptitudeTestQueries
+
+    class FakeConnection:
+        statement_count = 0
+
+        async def run(self, sql, params, statement_timeout=None):
+            self.statement_count += 1
+            if "mwd_duty" in sql:
+                raise RuntimeError("boom")
+            return [{"anp_seq": params["anp_seq"]}]
+
+    queries = AsyncAptitudeTestQueries(FakeConnection())
+    results = await queries.execute_all_queries(5)
+
+    # the failed combined statement, then one statement per query
+    assert queries.statement_count == len(AptitudeTestQueries.QUERY_METHODS) + 1
+    assert results["tendencyQuery"] == [{"anp_seq": 5}]
+    assert results["dutiesQuery"] == []
+
+
+def test_bulk_statement_numbers_users_and_keeps_per_user_sql():
+    statement = LegacyStatement(
+        sql="select * from mwd_score1 where anp_seq = :anp_seq and x > (select 1 where :anp_seq::int > 0) order by y",
+        params={"anp_seq": 0, "tnd_codes": ["a"]},
+    )
+    bulk = to_bulk_statement(statement, [3, 1, 2])
+
+    assert ":anp_seq" not in bulk.sql.replace(":anp_seqs", "")
+    assert bulk.sql.count("bulk_seqs.anp_seq") == 3
+    assert "WITH ORDINALITY" in bulk.sql and "ORDER BY bulk_seqs.seq_order" in bulk.sql
+    # per-user order comes from the per-user ORDER BY, not from an unordered row_number()
+    assert "order by y" in bulk.sql and "row_number() OVER ()" not in bulk.sql
+    assert bulk.params == {"tnd_codes": ["a"], "anp_seqs": [3, 1, 2]}
+
+
+@pytest.mark.asyncio
+async def test_bulk_extraction_partitions_rows_per_user(fake_queries, monkeypatch):
+    from etl.job_lanes import FairShareLimiter
+
+    limiter = FairShareLimiter(capacity=2)
+    monkeypatch.setitem(FairShareLimiter._instances, "legacy_db", limiter)
+    executor = LegacyQueryExecutor(max_retries=0, bulk_chunk_size=2, **NO_SHARED_STATE)
+    monkeypatch.setattr(executor, "_validate_query_result", lambda name, data: True)
+    try:
+        results = await executor.execute_bulk_queries_async(None, [10, 11, 12, 10])
+    finally:
+        await executor.close()
+
+    n = len(AptitudeTestQueries.QUERY_METHODS)
+    # two chunks ([10, 11], [12]) -> one statement per query per chunk
+    assert executor.bulk_statements_issued == 2 * n
+    # every bulk statement holds a legacy_db lane slot
+    assert sum(limiter.admitted.values()) == 2 * n
+    assert sorted(results) == [10, 11, 12]
+    assert all(len(per_query) == n for per_query in results.values())
+    assert results[10]["dutiesQuery"].data == [{"anp_seq": 10}]
+    # the last anp_seq of each chunk has no rows in the fake
+    assert results[11]["dutiesQuery"].data == []
+    assert results[12]["dutiesQuery"].data == []
+    successful = await executor.get_successful_results(results[10])
+    assert successful["tendencyQuery"] == [{"anp_seq": 10}]
+
+
+@pytest.mark.asyncio
+async def test_job_reuses_prefetched_results(fake_queries, monkeypatch):
+    store = PrefetchedQueryResults()
+    monkeypatch.setattr(PrefetchedQueryResults, "_singleton_instance", store)
+    executor = LegacyQueryExecutor(max_retries=0, **{**NO_SHARED_STATE, "use_prefetched_results": True})
+    monkeypatch.setattr(executor, "_validate_query_result", lambda name, data: True)
+    try:
+        assert await executor.prefetch_bulk_queries_async(None, [20, 21]) == 2
+        fake_queries.executed = []
+        prefetched = store._entries[20][1]
+        prefetched["dutiesQuery"] = QueryResult(query_name="dutiesQuery", success=False, error="bulk failed")
+        results = await executor.execute_all_queries_async(None, 20)
+    finally:
+        await executor.close()
+
+    # only the query that failed in the bulk pass runs again
+    assert fake_queries.executed == ["dutiesQuery"]
+    assert executor.get_statement_count(20) == 1
+    assert all(r.success for r in results.values())
+    assert results["tendencyQuery"].data == [{"anp_seq": 20}]
+    # taken once; the other user's entry is still waiting for its job
+    assert store.take(20) is None and len(store) == 1
+
+
+def test_prefetched_results_expire():
+    store = PrefetchedQueryResults(ttl_seconds=-1.0)
+    store.put(1, {})
+    assert store.take(1) is None
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        LegacyQueryExecutor(backend="bogus")
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_every_requested_query(fake_queries, monkeypatch):
+    executor = LegacyQueryExecutor(max_retries=0, **NO_SHARED_STATE)
+    monkeypatch.setattr(executor, "_validate_query_result", lambda name, data: True)
+    names = ["personalInfoQuery", "dutiesQuery", "tendencyQuery"]
+    try:
+        streamed = [r async for r in executor.stream_queries_async(None, 9, names)]
+    finally:
+        await executor.close()
+
+    assert sorted(r.query_name for r in streamed) == sorted(names)
+    assert all(r.success for r in streamed)
+    assert executor.get_statement_count(9) == len(names)
+    assert executor.statements_issued == {}
+
+
+@pytest.mark.asyncio
+async def test_stream_stopped_early_is_not_left_in_flight(fake_queries, monkeypatch):
+    executor = LegacyQueryExecutor(max_retries=0, **NO_SHARED_STATE)
+    monkeypatch.setattr(executor, "_validate_query_result", lambda name, data: True)
+    stream = executor.stream_queries_async(None, 11, ["personalInfoQuery", "dutiesQuery"])
+    try:
+        await stream.__anext__()
+        await stream.aclose()
+    finally:
+        await executor.close()
+
+    assert executor.statements_issued == {}
@@ -0,0 +1,81 @@
+from decimal import Decimal
+
+import pytest
+
+from etl.legacy_query_executor import AptitudeTestQueries, LegacyQueryExecutor
+from etl.population_stats import PopulationStats, PopulationStatsCache
+
+
+TENDENCY_ROWS = [
+    {"qua_code": "tnd11000", "tendency_count": 3, "total_count": 10},
+    {"qua_code": "tnd12000", "tendency_count": 5, "total_count": 10},
+    {"qua_code": None, "tendency_count": 2, "total_count": 10},
+]
+THINKING_ROWS = [{"qua_code": "thk01", "avg_score": Decimal("61.5")}]
+
+
+def test_from_rows_keeps_total_including_null_group():
+    stats = PopulationStats.from_rows(TENDENCY_ROWS, THINKING_ROWS)
+    assert stats.tendency_codes == ["tnd11000", "tnd12000"]
+    assert stats.tendency_counts == [3, 5]
+    assert stats.total_count == 10
+    assert stats.thinking_averages == [Decimal("61.5")]
+
+
+def test_cache_goes_stale_after_n_results():
+    cache = PopulationStatsCache(ttl_seconds=3600, refresh_after_results=2)
+    assert cache.is_stale()
+    cache.update(PopulationStats.from_rows(TENDENCY_ROWS, THINKING_ROWS))
+    assert not cache.is_stale()
+    cache.record_results(2)
+    assert cache.is_stale()
+
+
+def test_disabled_cache_is_never_used():
+    cache = PopulationStatsCache(enabled=False)
+    assert not cache.is_stale()
+    assert cache.get() is None
+
+
+@pytest.mark.asyncio
+async def test_stats_queries_join_cached_aggregates(monkeypatch):
+    import etl.legacy_query_executor as module
+
+    statements = []
+
+    class RecordingQueries(AptitudeTestQueries):
+        def __init__(self, _unused_session=None, population_stats=None, reference_data=None, statement_timeout=None):
+            self.statement_count = 0
+            self.population_stats = population_stats
+            self.reference_data = reference_data
+
+        def _run(self, sql, params):
+            self.statement_count += 1
+            statements.append(params)
+            if "SUM(COUNT(*)) OVER ()" in sql:
+                return TENDENCY_ROWS
+            if "AVG(sc1_rate * 100) AS avg_score" in sql:
+                return THINKING_ROWS
+            return [{"anp_seq": params["anp_seq"]}]
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(module, "AptitudeTestQueries", RecordingQueries)
+    executor = LegacyQueryExecutor(max_retries=0, use_reference_data=False, adaptive_timeouts=False)
+    executor.population_stats_cache = PopulationStatsCache(refresh_after_results=100)
+    monkeypatch.setattr(executor, "_validate_query_result", lambda name, data: True)
+    try:
+        await executor.execute_all_queries_async(None, 1)
+        await executor.execute_all_queries_async(None, 2)
+    finally:
+        await executor.close()
+
+    assert executor.population_stats_cache.refresh_count == 1
+    cached_params = [p for p in statements if "tnd_codes" in p or "thk_codes" in p]
+    assert len(cached_params) == 4
+    assert all(p.get("total_count", 10) == 10 for p in cached_params)
+    # refresh statements are charged to the first job only
+    n = len(AptitudeTestQueries.QUERY_METHODS)
+    assert executor.get_statement_count(1) == n + 2
+    assert executor.get_statement_count(2) == n
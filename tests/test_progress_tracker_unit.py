@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from etl.progress_tracker import CoalescingJobTracker, build_flush_statement
+from etl.test_completion_handler import JobStatus
+
+JOB_A = "00000000-0000-0000-0000-00000000000a"
+JOB_B = "00000000-0000-0000-0000-00000000000b"
+
+
+@pytest.fixture
+def make_tracker(recording_session):
+    def make(flush_interval=0.02):
+        session = recording_session()
+        tracker = CoalescingJobTracker(flush_interval=flush_interval, session_factory=lambda: session)
+        return tracker, session
+    return make
+
+
+@pytest.mark.asyncio
+async def test_progress_updates_are_coalesced_across_jobs(make_tracker):
+    tracker, session = make_tracker()
+    statements = session.statements
+    for job_id in (JOB_A, JOB_B):
+        await tracker.update_job(job_id, status=JobStatus.PROCESSING_QUERIES.value, progress_percentage=10.0)
+    statements.clear()
+
+    for percent in (20.0, 30.0, 40.0):
+        await tracker.update_job(JOB_A, status=JobStatus.PROCESSING_QUERIES.value, progress_percentage=percent)
+        await tracker.update_job(JOB_B, status=JobStatus.PROCESSING_QUERIES.value, current_step=f"{percent}")
+    assert statements == []
+
+    await asyncio.sleep(0.05)
+
+    assert len(statements) == 1
+    sql, params = statements[0]
+    assert "FROM (VALUES" in sql
+    assert params["progress_percentage_0"] == 40 and params["set_progress_percentage_1"] is False
+    assert params["current_step_1"] == "40.0" and params["set_current_step_0"] is False
+    assert tracker.get_stats()["pending_jobs"] == 0
+
+
+@pytest.mark.asyncio
+async def test_status_transition_flushes_immediately(make_tracker):
+    tracker, session = make_tracker(flush_interval=60)
+    statements = session.statements
+    await tracker.update_job(JOB_A, status=JobStatus.PROCESSING_QUERIES.value, progress_percentage=10.0)
+    await tracker.update_job(JOB_A, status=JobStatus.PROCESSING_QUERIES.value, progress_percentage=50.0)
+    await tracker.update_job(JOB_B, status=JobStatus.PROCESSING_QUERIES.value, progress_percentage=10.0)
+
+    assert len(statements) == 2
+    await tracker.update_job(JOB_A, status=JobStatus.SUCCESS, completed_at="2024-03-01T10:30:00")
+
+    assert len(statements) == 3
+    _sql, params = statements[-1]
+    assert params["status_0"] == "success"
+    assert params["completed_at_0"].year == 2024
+    await tracker.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_updates_and_newer_values_win(make_tracker):
+    tracker, session = make_tracker(flush_interval=60)
+    statements = session.statements
+    session.fail = RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        await tracker.update_job(JOB_A, status="processing_queries", current_step="first", progress_percentage=30.0)
+    session.fail = None
+    await tracker.update_job(JOB_A, status="processing_queries", current_step="second")
+
+    assert len(statements) == 1
+    _sql, params = statements[0]
+    assert params["current_step_0"] == "second"
+    assert params["progress_percentage_0"] == 30
+
+
+@pytest.mark.asyncio
+async def test_discarded_job_is_not_written(make_tracker):
+    tracker, session = make_tracker(flush_interval=60)
+    statements = session.statements
+    await tracker.update_job(JOB_A, status="processing_queries")
+    await tracker.update_job(JOB_A, status="processing_queries", progress_percentage=80.0)
+    tracker.discard(JOB_A)
+    await tracker.close()
+
+    assert len(statements) == 1
+
+
+def test_flush_statement_only_touches_set_columns():
+    sql, params = build_flush_statement({JOB_A: {"documents_created": ["USER_PROFILE"]}})
+
+    assert "documents_created = CASE WHEN v.set_documents_created" in sql
+    assert "status = CASE" not in sql
+    assert "pg_notify" in sql
+    assert params["documents_created_0"] == ["USER_PROFILE"]
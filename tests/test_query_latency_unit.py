@@ -0,0 +1,223 @@
+import threading
+import time
+
+import pytest
+
+from etl.legacy_query_executor import AptitudeTestQueries, LegacyQueryExecutor
+from etl.query_latency import QueryLatencyTracker
+
+
+def make_tracker(samples=(0.01,) * 5, **kwargs):
+    tracker = QueryLatencyTracker(min_samples=5, min_timeout=0.1, **kwargs)
+    for seconds in samples:
+        tracker.record("dutiesQuery", seconds)
+    return tracker
+
+
+def test_defaults_until_enough_samples():
+    tracker = make_tracker(samples=(0.01,) * 4)
+    assert tracker.timeout_for("dutiesQuery", 120.0) == 120.0
+    assert tracker.hedge_delay("dutiesQuery") is None
+
+
+def test_timeout_derives_from_p99_and_is_clamped():
+    tracker = make_tracker(samples=(0.5,) * 5, timeout_multiplier=3.0)
+    assert tracker.timeout_for("dutiesQuery", 120.0) == pytest.approx(1.5)
+    assert tracker.timeout_for("dutiesQuery", 1.0) == 1.0
+    assert make_tracker().timeout_for("dutiesQuery", 120.0) == 0.1
+
+
+def test_only_cheap_queries_are_hedged():
+    assert make_tracker(hedge_min_delay=0.0).hedge_delay("dutiesQuery") == pytest.approx(0.01)
+    assert make_tracker(samples=(1.0,) * 5, hedge_max_p50=0.2).hedge_delay("dutiesQuery") is None
+    assert make_tracker(hedging_enabled=False).hedge_delay("dutiesQuery") is None
+
+
+class SlowFirstQueries(AptitudeTestQueries):
+    """The first execution of each test blocks; later ones return immediately."""
+
+    calls = 0
+    lock = threading.Lock()
+    first_delay = 0.5
+
+    def __init__(self, _unused_session=None, population_stats=None, reference_data=None, statement_timeout=None):
+        self.statement_count = 0
+        self.population_stats = population_stats
+        self.reference_data = reference_data
+
+    def _run(self, sql, params, transform=None):
+        with SlowFirstQueries.lock:
+            SlowFirstQueries.calls += 1
+            call = SlowFirstQueries.calls
+        self.statement_count += 1
+        if call == 1:
+            time.sleep(SlowFirstQueries.first_delay)
+        return [{"anp_seq": params["anp_seq"], "call": call}]
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def slow_first(monkeypatch):
+    import etl.legacy_query_executor as module
+
+    SlowFirstQueries.calls = 0
+    monkeypatch.setattr(module, "AptitudeTestQueries", SlowFirstQueries)
+    return SlowFirstQueries
+
+
+def make_executor(tracker):
+    executor = LegacyQueryExecutor(
+        max_retries=0, use_population_stats=False, use_reference_data=False, adaptive_timeouts=False
+    )
+    executor.latency_tracker = tracker
+    return executor
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_wins_over_slow_first_attempt(slow_first, monkeypatch):
+    tracker = make_tracker(hedge_min_delay=0.02)
+    executor = make_executor(tracker)
+    monkeypatch.setattr(executor, "_validate_query_result", lambda name, data: True)
+    # statements are counted only for jobs in flight (execute_*_async start them)
+    executor.statements_issued[5] = 0
+    started = time.perf_counter()
+    try:
+        result = await executor._execute_single_query_with_retry(None, 5, "dutiesQuery")
+        elapsed = time.perf_counter() - started
+    finally:
+        await executor.close()
+
+    assert result.success
+    assert result.data[0]["call"] == 2
+    assert elapsed < 0.4
+    assert (tracker.hedged, tracker.hedge_wins) == (1, 1)
+    assert executor.get_statement_count(5) == 2
+
+
+@pytest.mark.asyncio
+async def test_adaptive_timeout_fails_stuck_query_fast(slow_first, monkeypatch):
+    tracker = make_tracker(hedging_enabled=False)
+    executor = make_executor(tracker)
+    monkeypatch.setattr(executor, "_validate_query_result", lambda name, data: True)
+    started = time.perf_counter()
+    try:
+        result = await executor._execute_single_query_with_retry(None, 6, "dutiesQuery")
+        elapsed = time.perf_counter() - started
+    finally:
+        await executor.close()
+
+    assert not result.success
+    assert result.error.startswith("timeout after 0.1")
+    assert elapsed < 0.4
+    assert tracker.timeouts == 1
+
+
+def test_statement_timeout_is_sent_once_per_pooled_connection(monkeypatch):
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from database.connection import db_manager
+    from etl.legacy_query_executor import LegacyStatement
+
+    # 실제 동기 세션과 풀 (연결 하나): 가짜 세션으로는 연결마다 다시 보내는 왕복이 보이지 않는다
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    event.listen(engine, "connect", lambda conn, record: conn.create_function("set_config", 3, lambda name, value, local: value))
+    executed = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, params, context, many: executed.append(sql))
+    monkeypatch.setattr(db_manager, "get_sync_session", sessionmaker(bind=engine))
+
+    def run(timeout):
+        # 실행기는 쿼리마다 새 AptitudeTestQueries 를 만든다
+        queries = AptitudeTestQueries(None, statement_timeout=timeout)
+        try:
+            assert queries.run_statement(LegacyStatement(sql="SELECT :x AS x", params={"x": 1})) == [{"x": 1}]
+            return queries.statement_count
+        finally:
+            queries.close()
+
+    assert [run(0.25) for _ in range(3)] == [2, 1, 1]
+    assert run(0.5) == 2
+    assert sum("set_config('statement_timeout'" in sql for sql in executed) == 2
+    assert len(executed) == 6
+
+
+@pytest.mark.asyncio
+async def test_async_statement_timeout_round_trips_are_counted():
+    from etl.legacy_query_executor import AsyncAptitudeTestQueries, AsyncLegacyConnection
+
+    executed = []
+
+    class Result:
+        def mappings(self):
+            return self
+
+        def all(self):
+            return []
+
+    class Connection:
+        async def execute(self, statement, params=None):
+            executed.append(str(statement))
+            return Result()
+
+        async def close(self):
+            pass
+
+    connection = AsyncLegacyConnection()
+    connection._conn = Connection()
+    queries = AsyncAptitudeTestQueries(connection, statement_timeout=0.25)
+    await queries.execute_query("dutiesQuery", 1)
+    await queries.execute_query("personalInfoQuery", 1)
+    await connection.close()
+
+    assert queries.statement_count == 3 == len(executed) - 1
+    assert executed[-1] == "RESET statement_timeout" and connection.statement_count == 4
+
+
+@pytest.mark.asyncio
+async def test_thread_pool_queue_time_is_not_recorded(slow_first, monkeypatch):
+    slow_first.calls = 1  # 모든 실행이 바로 반환된다
+    tracker = QueryLatencyTracker(min_samples=5, hedging_enabled=False)
+    executor = LegacyQueryExecutor(
+        max_retries=0, max_workers=1, use_population_stats=False, use_reference_data=False, adaptive_timeouts=False
+    )
+    executor.latency_tracker = tracker
+    monkeypatch.setattr(executor, "_validate_query_result", lambda name, data: True)
+    # 하나뿐인 워커 스레드를 잠시 점유해 쿼리가 대기열에서 기다리게 한다
+    executor.executor.submit(time.sleep, 0.3)
+    try:
+        result = await executor._execute_single_query_with_retry(None, 5, "dutiesQuery")
+    finally:
+        await executor.close()
+
+    assert result.success
+    assert tracker.get_stats()["queries"]["dutiesQuery"]["p99_ms"] < 100
+    assert result.execution_time < 0.1
+
+
+@pytest.mark.asyncio
+async def test_lane_limiter_wait_is_not_recorded(slow_first, monkeypatch):
+    import asyncio
+
+    from etl.job_lanes import FairShareLimiter
+
+    limiter = FairShareLimiter(capacity=1)
+    monkeypatch.setitem(FairShareLimiter._instances, "legacy_db", limiter)
+    slow_first.calls = 1
+    tracker = QueryLatencyTracker(min_samples=5, hedging_enabled=False)
+    executor = make_executor(tracker)
+    monkeypatch.setattr(executor, "_validate_query_result", lambda name, data: True)
+
+    await limiter.acquire("backfill")
+    query = asyncio.create_task(executor._execute_single_query_with_retry(None, 5, "dutiesQuery"))
+    await asyncio.sleep(0.2)
+    limiter.release("backfill")
+    try:
+        result = await query
+    finally:
+        await executor.close()
+
+    assert result.success and result.execution_time < 0.1
+    assert tracker.get_stats()["queries"]["dutiesQuery"]["p99_ms"] < 100
@@ -0,0 +1,78 @@
+from etl.query_profiler import compare_reports, percentile, summarize_plan
+
+
+EXPLAIN_OUTPUT = [{
+    "Plan": {
+        "Node Type": "Nested Loop",
+        "Total Cost": 42.0,
+        "Plan Rows": 10,
+        "Actual Rows": 8,
+        "Shared Hit Blocks": 30,
+        "Shared Read Blocks": 2,
+        "Plans": [
+            {"Node Type": "Index Scan", "Relation Name": "mwd_score1", "Index Name": "mwd_score1_pkey"},
+            {"Node Type": "Seq Scan", "Relation Name": "mwd_question_attr"},
+        ],
+    },
+    "Planning Time": 0.2,
+    "Execution Time": 1.5,
+}]
+
+
+def make_report(p95=10.0, seq_scans=("mwd_question_attr",), signature="A", rows=5):
+    return {
+        "testers": 1000,
+        "queries": {
+            "topTendencyQuery": {
+                "latency_ms": {"p50": 1.0, "p95": p95, "p99": p95, "max": p95, "mean": 1.0},
+                "rows": {"min": rows, "max": rows, "mean": rows},
+                "plan": {
+                    "signature": signature,
+                    "seq_scans": list(seq_scans),
+                    "shared_hit_blocks": 30,
+                    "shared_read_blocks": 2,
+                },
+            }
+        },
+    }
+
+
+def test_percentile_interpolates():
+    assert percentile([], 95) == 0.0
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    assert percentile([5], 99) == 5.0
+
+
+def test_summarize_plan_collects_seq_scans_and_buffers():
+    summary = summarize_plan(EXPLAIN_OUTPUT)
+    assert summary["seq_scans"] == ["mwd_question_attr"]
+    assert summary["signature"] == (
+        "Nested Loop(Index Scan[mwd_score1]<mwd_score1_pkey>,Seq Scan[mwd_question_attr])"
+    )
+    assert summary["execution_time_ms"] == 1.5
+    assert summary["shared_hit_blocks"] + summary["shared_read_blocks"] == 32
+
+
+def test_identical_reports_have_no_findings():
+    assert compare_reports(make_report(), make_report()) == []
+
+
+def test_new_seq_scan_and_latency_are_regressions():
+    current = make_report(p95=40.0, seq_scans=("mwd_question_attr", "mwd_answer"), signature="B")
+    findings = {f["kind"]: f for f in compare_reports(make_report(), current)}
+
+    assert findings["seq_scan"]["severity"] == "error"
+    assert "mwd_answer" in findings["seq_scan"]["detail"]
+    assert findings["latency"]["severity"] == "error"
+    assert findings["plan_changed"]["severity"] == "warning"
+
+
+def test_small_latency_changes_are_ignored():
+    findings = compare_reports(make_report(p95=1.0), make_report(p95=3.0))
+    assert not [f for f in findings if f["kind"] == "latency"]
+
+
+def test_missing_and_failed_queries_are_regressions():
+    assert compare_reports(make_report(), {"testers": 1000, "queries": {}})[0]["kind"] == "missing"
+    failed = {"testers": 1000, "queries": {"topTendencyQuery": {"error": "boom"}}}
+    assert compare_reports(make_report(), failed)[0]["kind"] == "failed"
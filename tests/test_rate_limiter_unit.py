@@ -0,0 +1,128 @@
+import pytest
+
+import etl.rate_limiter as limiter_module
+from etl.rate_limiter import AdaptiveRateLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def make_limiter(clock, **kwargs):
+    kwargs.setdefault("state_file", None)
+    return AdaptiveRateLimiter(max_rate=60, min_rate=6, burst=2, clock=clock, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_waits_for_refill_without_holding_the_lock(clock, monkeypatch):
+    limiter = make_limiter(clock)
+    sleeps = []
+
+    async def fake_sleep(delay):
+        # 기다리는 동안 다른 호출자가 잠금을 잡을 수 있어야 한다
+        assert not limiter._lock.locked()
+        sleeps.append(delay)
+        clock.now += delay
+
+    monkeypatch.setattr(limiter_module.asyncio, "sleep", fake_sleep)
+
+    await limiter.acquire()
+    await limiter.acquire()
+    assert sleeps == []
+    await limiter.acquire()
+
+    assert sleeps == [pytest.approx(1.0)]  # 60/min = 1 token per second
+    assert (limiter.acquired, limiter.waits) == (3, 1)
+
+
+@pytest.mark.asyncio
+async def test_rate_shrinks_on_429_and_grows_back(clock):
+    limiter = make_limiter(clock)
+
+    await limiter.on_throttled()
+    await limiter.on_throttled()  # 같은 429 파도는 한 번만 줄인다
+    assert limiter.rate == 30
+    assert limiter._state["tokens"] <= 0
+
+    for _ in range(4):
+        clock.now += 10
+        await limiter.on_throttled()
+    assert limiter.rate == 6  # min_rate 아래로는 내려가지 않는다
+
+    for _ in range(100):
+        await limiter.on_success()
+    assert limiter.rate == 60
+    assert limiter.get_stats()["throttled"] == 6
+
+
+@pytest.mark.asyncio
+async def test_state_file_shares_the_bucket_across_limiters(tmp_path):
+    state_file = str(tmp_path / "embedding_rate.json")
+    first = AdaptiveRateLimiter(max_rate=60, burst=2, state_file=state_file)
+    second = AdaptiveRateLimiter(max_rate=60, burst=2, state_file=state_file)
+
+    await first.acquire()
+    await second.acquire()
+    await first.on_throttled()
+
+    assert second.rate == 60  # 아직 파일을 다시 읽지 않았다
+    await first.on_success()
+    assert first.rate == 31
+    # 두 프로세스가 버스트 2개를 나눠 썼으므로 남은 토큰이 없다
+    assert first._state["tokens"] < 1
+
+
+@pytest.mark.asyncio
+async def test_state_file_is_locked_off_the_event_loop_and_written_only_on_change(tmp_path, monkeypatch):
+    import threading
+
+    state_file = tmp_path / "embedding_rate.json"
+    limiter = AdaptiveRateLimiter(max_rate=60, burst=2, state_file=str(state_file))
+    loop_thread = threading.get_ident()
+    lock_threads = []
+    real_flock = limiter_module.fcntl.flock
+
+    def flock(f, operation):
+        lock_threads.append(threading.get_ident())
+        return real_flock(f, operation)
+
+    monkeypatch.setattr(limiter_module.fcntl, "flock", flock)
+
+    await limiter.acquire()
+    await limiter.on_throttled()
+    assert lock_threads and loop_thread not in lock_threads
+
+    writes = []
+    real_dumps = limiter_module.json.dumps
+    monkeypatch.setattr(limiter_module.json, "dumps", lambda state: writes.append(state) or real_dumps(state))
+    await limiter.on_throttled()  # 쿨다운 중: 상태가 그대로라 파일을 쓰지 않는다
+    assert writes == [] and limiter.rate == 30
+
+    # 최대 속도에서는 on_success 가 파일을 열지도 않는다
+    limiter._state["rate"] = 60
+    locks = len(lock_threads)
+    await limiter.on_success()
+    assert len(lock_threads) == locks
+
+
+@pytest.mark.asyncio
+async def test_embedders_share_one_limiter(monkeypatch):
+    from etl.vector_embedder import VectorEmbedder
+
+    monkeypatch.setattr(AdaptiveRateLimiter, "_instances", {})
+    first = VectorEmbedder(api_key="k", persistent_cache=False)
+    second = VectorEmbedder(api_key="k", persistent_cache=False)
+    own = VectorEmbedder(api_key="k", persistent_cache=False, rate_limit_per_minute=10)
+
+    assert first.rate_limiter is second.rate_limiter
+    assert own.rate_limiter is not first.rate_limiter and own.rate_limiter.max_rate == 10
+    assert first.store is None
@@ -0,0 +1,134 @@
+import pytest
+
+from etl.legacy_query_executor import AptitudeTestQueries, LegacyQueryExecutor
+from etl.reference_data import ReferenceDataCache, ReferenceDataSnapshot
+
+
+QUESTION_ATTR_ROWS = [
+    {"qua_code": "tnd11000", "qua_name": "소통형"},
+    {"qua_code": "tnd12000", "qua_name": "창조형"},
+    {"qua_code": "thk01", "qua_name": "분석력"},
+    {"qua_code": "thk02", "qua_name": "기억력"},
+]
+TENDENCY_STUDY_ROWS = [
+    {"qua_code": "tnd11000", "tes_study_tendency": "OOO은 토론", "tes_study_way": "발표"},
+    {"qua_code": "tnd12000", "tes_study_tendency": "OOO은 상상", "tes_study_way": None},
+]
+STUDYWAY_RATE_ROWS = [
+    {"qua_code": "tnd11000", "item_name": "A", "item_rate": 50, "item_color": "#fff", "item_type": "S"},
+    {"qua_code": "tnd11000", "item_name": "B", "item_rate": 30, "item_color": "#000", "item_type": "W"},
+]
+SUBJECT_MAP_ROWS = [
+    {"tsm_subject_code": "S1", "subject_group": "G", "subject_choice": "C", "subject_name": "국어",
+     "subject_explain": "", "tsm_communication_type": None},
+    {"tsm_subject_code": "S2", "subject_group": "G", "subject_choice": "C", "subject_name": "수학",
+     "subject_explain": "", "tsm_communication_type": 2},
+    {"tsm_subject_code": "S3", "subject_group": "G", "subject_choice": "C", "subject_name": "영어",
+     "subject_explain": "", "tsm_communication_type": 1},
+]
+JOB_ROWS = [{"jo_code": "J1", "jo_name": "기자", "jo_outline": None, "jo_mainbusiness": "취재"}]
+
+
+def make_snapshot(version="v1"):
+    return ReferenceDataSnapshot.from_rows(
+        version, QUESTION_ATTR_ROWS, TENDENCY_STUDY_ROWS, STUDYWAY_RATE_ROWS, SUBJECT_MAP_ROWS, JOB_ROWS
+    )
+
+
+class CannedQueries(AptitudeTestQueries):
+    """Returns canned per-user rows keyed by the table in the FROM clause."""
+
+    checksum = "v1"
+    catalog_loads = 0
+
+    def __init__(self, _unused_session=None, population_stats=None, reference_data=None, statement_timeout=None):
+        self.statement_count = 0
+        self.population_stats = population_stats
+        self.reference_data = reference_data
+
+    def _run(self, sql, params, transform=None):
+        self.statement_count += 1
+        if "AS checksum" in sql:
+            rows = [{"checksum": CannedQueries.checksum}]
+        elif "FROM mwd_question_attr" in sql:
+            CannedQueries.catalog_loads += 1
+            rows = QUESTION_ATTR_ROWS
+        elif "FROM mwd_tendency_study" in sql:
+            rows = TENDENCY_STUDY_ROWS
+        elif "FROM mwd_studyway_rate" in sql:
+            rows = STUDYWAY_RATE_ROWS
+        elif "FROM mwd_tendency_subject_map" in sql:
+            rows = SUBJECT_MAP_ROWS
+        elif "FROM mwd_job" in sql:
+            rows = JOB_ROWS
+        elif "sc1_step='tnd'" in sql:
+            rows = [{"rank": 1, "code": "tnd11000", "score": 90}, {"rank": 2, "code": "tnd99000", "score": 80}]
+        elif "pe.pe_name" in sql:
+            rows = [{"rv_tnd1": "tnd11000", "rv_tnd2": "tnd12000", "pe_name": "홍길동"}]
+        elif "mwd_resjob" in sql:
+            rows = [{"rej_code": "J1", "rank": 1}, {"rej_code": "J404", "rank": 2}]
+        elif "mwd_resval" in sql:
+            rows = [{"rv_tnd1": "tnd11000", "rv_tnd2": "tnd12000"}]
+        else:
+            rows = [{"anp_seq": params.get("anp_seq")}]
+        rows = [dict(r) for r in rows]
+        return transform(rows) if transform is not None else rows
+
+    def close(self):
+        pass
+
+
+def test_snapshot_groups_chart_rows_by_tendency():
+    snapshot = make_snapshot()
+    assert snapshot.qua_name("tnd11000") == "소통형"
+    assert [r["item_name"] for r in snapshot.studyway_rate["tnd11000"]] == ["A", "B"]
+    assert "qua_code" not in snapshot.studyway_rate["tnd11000"][0]
+    assert snapshot.get_job("J1")["jo_name"] == "기자"
+
+
+def test_queries_resolve_names_from_snapshot():
+    queries = CannedQueries(reference_data=make_snapshot())
+
+    assert queries.execute_query("tendencyQuery", 1) == [{"Tnd1": "소통", "Tnd2": "창조"}]
+    # unknown codes are dropped, as with the original inner join
+    assert queries.execute_query("topTendencyQuery", 1) == [
+        {"tendency_name": "소통형", "rank": 1, "code": "tnd11000", "score": 90}
+    ]
+    assert queries.execute_query("careerRecommendationQuery", 1) == [
+        {"job_code": "J1", "job_name": "기자", "job_outline": "", "main_business": "취재", "match_score": 80}
+    ]
+    learning = queries.execute_query("learningStyleQuery", 1)[0]
+    assert learning["tnd1_study_tendency"] == "홍길동님은 토론"
+    assert learning["tnd2_study_way"] is None
+    assert (learning["tnd_row"], learning["tnd_col"]) == (1, 2)
+    # ORDER BY rank, tsm_subject_code with NULL ranks last
+    ranks = queries.execute_query("subjectRanksQuery", 1)
+    assert [r["subject_name"] for r in ranks] == ["영어", "수학", "국어"]
+    assert "_subject_code" not in ranks[0]
+
+
+@pytest.mark.asyncio
+async def test_executor_reloads_catalogs_only_when_checksum_changes(monkeypatch):
+    import etl.legacy_query_executor as module
+
+    CannedQueries.checksum = "v1"
+    CannedQueries.catalog_loads = 0
+    monkeypatch.setattr(module, "AptitudeTestQueries", CannedQueries)
+    executor = LegacyQueryExecutor(max_retries=0, use_population_stats=False, adaptive_timeouts=False)
+    executor.reference_data_cache = ReferenceDataCache(check_interval_seconds=0)
+    monkeypatch.setattr(executor, "_validate_query_result", lambda name, data: True)
+    try:
+        results = await executor.execute_all_queries_async(None, 1)
+        await executor.execute_all_queries_async(None, 2)
+        CannedQueries.checksum = "v2"
+        await executor.execute_all_queries_async(None, 3)
+    finally:
+        await executor.close()
+
+    assert results["topTendencyQuery"].data[0]["tendency_name"] == "소통형"
+    assert CannedQueries.catalog_loads == 2
+    assert executor.reference_data_cache.get().version == "v2"
+    n = len(AptitudeTestQueries.QUERY_METHODS)
+    # checksum + 5 catalog loads, then the checksum probe only
+    assert executor.get_statement_count(1) == n + 6
+    assert executor.get_statement_count(2) == n + 1
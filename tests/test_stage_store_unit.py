@@ -0,0 +1,112 @@
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from database.models import DocumentType
+from etl.document_transformer import TransformedDocument
+from etl.etl_orchestrator import ETLOrchestrator, ETLStage, ValidationLevel
+from etl.legacy_query_executor import QueryResult
+from etl.stage_store import StageOutput, decode_stage_output, encode_stage_output
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def test_query_results_round_trip_with_legacy_types():
+    rows = [{"anp_seq": 7, "score": Decimal("81.50"), "test_date": date(2024, 3, 1),
+             "completed_at": datetime(2024, 3, 1, 10, 30), "name": "홍길동"}]
+    output = {"tendencyQuery": QueryResult("tendencyQuery", True, rows, row_count=1)}
+
+    restored = decode_stage_output("query_execution", encode_stage_output("query_execution", output, {"legacy_statements_issued": 3}))
+
+    assert restored.output == output
+    assert restored.state == {"legacy_statements_issued": 3}
+
+
+def test_documents_and_embeddings_round_trip_compactly():
+    document = TransformedDocument(DocumentType.USER_PROFILE, {"a": [1, 2]}, "요약", {})
+    restored = decode_stage_output("document_transformation", encode_stage_output("document_transformation", [document]))
+    assert restored.output == [document]
+    assert restored.output[0].doc_type is DocumentType.USER_PROFILE
+
+    embedded = [{"doc_type": DocumentType.USER_PROFILE, "content": {"a": 1}, "summary_text": "요약",
+                 "metadata": {}, "embedding_vector": [0.25, -0.5] * 384}]
+    payload = encode_stage_output("embedding_generation", embedded, {"documents_unchanged": ["THINKING_SKILLS"]})
+    restored = decode_stage_output("embedding_generation", payload)
+
+    assert restored.output == embedded
+    assert restored.state["documents_unchanged"] == [DocumentType.THINKING_SKILLS]
+    assert len(payload) < 768 * 4
+
+
+class FakeStageStore:
+    def __init__(self, resume=None):
+        self.resume = resume
+        self.saved = []
+        self.deleted = []
+
+    async def load(self, job_id):
+        return self.resume
+
+    async def save(self, job_id, stage, output, state=None):
+        self.saved.append(stage)
+        return 0
+
+    async def delete(self, job_id):
+        self.deleted.append(job_id)
+
+
+def make_orchestrator(store, monkeypatch):
+    orchestrator = ETLOrchestrator(validation_level=ValidationLevel.BASIC, stage_store=store)
+    monkeypatch.setattr(orchestrator, "_initialize_processing", AsyncMock(return_value=None))
+    return orchestrator
+
+
+async def run_job(orchestrator):
+    return await orchestrator.process_test_completion(
+        user_id=USER_ID, anp_seq=7, job_id="00000000-0000-0000-0000-0000000000aa",
+        session=MagicMock(commit=AsyncMock(), rollback=AsyncMock()),
+        job_tracker=MagicMock(update_job=AsyncMock()),
+    )
+
+
+@pytest.mark.asyncio
+async def test_retry_resumes_after_last_finished_stage(monkeypatch):
+    embedded = [{"doc_type": DocumentType.USER_PROFILE, "content": {}, "summary_text": "s",
+                 "metadata": {}, "embedding_vector": [0.1] * 768}]
+    store = FakeStageStore(StageOutput("embedding_generation", embedded, {"legacy_statements_issued": 5}))
+    orchestrator = make_orchestrator(store, monkeypatch)
+    for name in ("_execute_queries", "_validate_query_data", "_transform_documents", "_generate_embeddings"):
+        monkeypatch.setattr(orchestrator, name, AsyncMock(side_effect=AssertionError(f"{name} re-ran")))
+    store_documents = AsyncMock(return_value=[{"doc_type": DocumentType.USER_PROFILE, "user_id": USER_ID}])
+    monkeypatch.setattr(orchestrator, "_store_documents", store_documents)
+
+    summary = await run_job(orchestrator)
+
+    assert store_documents.await_args.args[1] == embedded
+    assert summary["legacy_statements_issued"] == 5
+    assert store.saved == ["document_storage"]
+    assert store.deleted == ["00000000-0000-0000-0000-0000000000aa"]
+
+
+@pytest.mark.asyncio
+async def test_each_finished_stage_is_persisted(monkeypatch):
+    store = FakeStageStore()
+    orchestrator = make_orchestrator(store, monkeypatch)
+    monkeypatch.setattr(orchestrator, "_execute_queries", AsyncMock(return_value={}))
+    monkeypatch.setattr(orchestrator, "_validate_query_data", AsyncMock(return_value={}))
+    monkeypatch.setattr(orchestrator, "_transform_documents", AsyncMock(return_value=[]))
+    monkeypatch.setattr(orchestrator, "_generate_embeddings", AsyncMock(return_value=[]))
+    monkeypatch.setattr(orchestrator, "_store_documents", AsyncMock(side_effect=RuntimeError("db down")))
+    monkeypatch.setattr(orchestrator, "_handle_processing_failure", AsyncMock())
+    orchestrator.max_retries_per_stage = 0
+
+    with pytest.raises(RuntimeError):
+        await run_job(orchestrator)
+
+    assert store.saved == [
+        ETLStage.QUERY_EXECUTION.value, ETLStage.DATA_VALIDATION.value,
+        ETLStage.DOCUMENT_TRANSFORMATION.value, ETLStage.EMBEDDING_GENERATION.value,
+    ]
+    assert store.deleted == []
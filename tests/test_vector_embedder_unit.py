@@ -0,0 +1,347 @@
+import asyncio
+
+import pytest
+
+from etl.embedding_store import EmbeddingStore, decode_vector, encode_vector, text_hash
+from etl.vector_embedder import EmbeddingCache, EmbeddingError, VectorEmbedder
+
+
+class FakeResponse:
+    def __init__(self, status, data):
+        self.status = status
+        self.data = data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self):
+        return self.data
+
+    async def text(self):
+        return str(self.data)
+
+
+class FakeSession:
+    """Answers embedContent / batchEmbedContents; texts containing 'bad' get no vector in a batch"""
+
+    closed = False
+
+    def __init__(self, fail_batches=False):
+        self.fail_batches = fail_batches
+        self.calls = []
+
+    def post(self, url, json):
+        method = url.rsplit(":", 1)[1]
+        self.calls.append((method, json))
+        if method == "embedContent":
+            text = json["content"]["parts"][0]["text"]
+            return FakeResponse(200, {"embedding": {"values": [float(len(text)), 1.0]}})
+        if self.fail_batches:
+            return FakeResponse(500, {"error": "unavailable"})
+        texts = [request["content"]["parts"][0]["text"] for request in json["requests"]]
+        return FakeResponse(200, {"embeddings": [
+            {"values": []} if "bad" in text else {"values": [float(len(text)), 0.0]} for text in texts
+        ]})
+
+    async def close(self):
+        self.closed = True
+
+
+def make_embedder(session, **kwargs):
+    kwargs.setdefault("persistent_cache", kwargs.get("store") is not None)
+    embedder = VectorEmbedder(api_key="test-key", retry_delay=0.0, **kwargs)
+    embedder.session = session
+
+    async def no_wait():
+        return None
+    embedder._wait_for_rate_limit = no_wait
+    return embedder
+
+
+@pytest.mark.asyncio
+async def test_documents_of_a_user_cost_one_batched_request():
+    session = FakeSession()
+    embedder = make_embedder(session, batch_size=10)
+    documents = [{"doc_type": f"DOC_{i}", "summary_text": f"summary {i}"} for i in range(7)]
+
+    embedded = await embedder.generate_document_embeddings(documents)
+
+    assert [method for method, _ in session.calls] == ["batchEmbedContents"]
+    assert len(session.calls[0][1]["requests"]) == 7
+    assert all(doc["embedding_vector"][1] == 0.0 for doc in embedded)
+
+    # 두 번째 호출은 캐시에서 나온다
+    again = await embedder.generate_document_embeddings(documents[:2])
+    assert len(session.calls) == 1 and all(doc["embedding_metadata"]["cached"] for doc in again)
+
+
+@pytest.mark.asyncio
+async def test_only_items_missing_from_the_batch_fall_back_to_single_requests():
+    session = FakeSession()
+    embedder = make_embedder(session, batch_size=10)
+
+    results = await embedder.generate_embeddings_batch(["good one", "bad one", "good one", "good two"])
+
+    methods = [method for method, _ in session.calls]
+    assert methods == ["batchEmbedContents", "embedContent"]
+    # 같은 텍스트는 한 번만 요청한다
+    assert len(session.calls[0][1]["requests"]) == 3
+    assert session.calls[1][1]["content"]["parts"][0]["text"] == "bad one"
+    assert results[1].embedding == [7.0, 1.0]
+    assert results[0].embedding == results[2].embedding == [8.0, 0.0]
+    assert embedder.batch_fallbacks == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_request_falls_back_per_text():
+    session = FakeSession(fail_batches=True)
+    embedder = make_embedder(session, batch_size=2, max_retries=0, enable_cache=False)
+
+    results = await embedder.generate_embeddings_batch(["a", "bb", "ccc"])
+
+    methods = [method for method, _ in session.calls]
+    assert methods.count("batchEmbedContents") == 2 and methods.count("embedContent") == 3
+    assert [r.embedding[0] for r in results] == [1.0, 2.0, 3.0]
+
+
+class StoreSession:
+    """In-memory chat_embedding_cache answering the store's two statements"""
+
+    def __init__(self, rows=None):
+        self.rows = rows if rows is not None else {}
+        self.statements = 0
+        self.writes = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params):
+        self.statements += 1
+        sql = str(statement)
+        rows = self.rows
+        if sql.lstrip().startswith("INSERT"):
+            self.writes.append(params["hashes"])
+            for text_key, blob in zip(params["hashes"], params["embeddings"]):
+                rows.setdefault((params["model"], text_key), blob)
+            return None
+
+        class Result:
+            def mappings(self):
+                found = [
+                    {"text_hash": h, "embedding": rows[(params["model"], h)]}
+                    for h in params["hashes"] if (params["model"], h) in rows
+                ]
+                return type("Rows", (), {"all": lambda self: found})()
+        return Result()
+
+
+def test_vectors_round_trip_as_float32():
+    assert decode_vector(encode_vector([0.5, -1.25, 3.0])) == [0.5, -1.25, 3.0]
+    assert len(text_hash("질문")) == 64
+
+
+@pytest.mark.asyncio
+async def test_store_survives_restart_and_is_shared_across_embedders():
+    table = StoreSession()
+    store = EmbeddingStore(session_factory=lambda: table)
+    first = make_embedder(FakeSession(), store=store)
+    await first.generate_embeddings_batch(["summary one", "summary two"])
+    await first.generate_embedding("what is my type?")
+
+    # 새 프로세스: 메모리 캐시는 비어 있고 영구 저장소만 남아 있다
+    session = FakeSession()
+    restarted = make_embedder(session, store=EmbeddingStore(session_factory=lambda: table), cache=EmbeddingCache())
+    results = await restarted.generate_embeddings_batch(["summary one", "summary two", "summary three"])
+    question = await restarted.generate_embedding("what is my type?")
+
+    assert [r.cached for r in results] == [True, True, False]
+    assert question.cached and question.embedding == [16.0, 1.0]
+    assert [method for method, _ in session.calls] == ["batchEmbedContents"]
+    assert len(session.calls[0][1]["requests"]) == 1
+    # 저장소에서 읽은 값은 메모리 캐시에도 올라간다
+    assert restarted.cache.get("summary one", restarted.model) == [11.0, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_store_failures_are_cache_misses():
+    class Broken:
+        async def __aenter__(self):
+            raise ConnectionError("database unavailable")
+
+        async def __aexit__(self, *exc):
+            return False
+
+    store = EmbeddingStore(session_factory=Broken)
+    embedder = make_embedder(FakeSession(), store=store)
+
+    results = await embedder.generate_embeddings_batch(["text"])
+
+    assert results[0].embedding == [4.0, 0.0]
+    assert store.get_stats()["errors"] == 2
+
+
+@pytest.mark.asyncio
+async def test_fallback_embeddings_are_stored_with_the_batch_in_one_write():
+    table = StoreSession()
+    embedder = make_embedder(FakeSession(), store=EmbeddingStore(session_factory=lambda: table))
+
+    await embedder.generate_embeddings_batch(["good one", "bad one", "bad two"])
+
+    assert len(table.writes) == 1 and len(table.writes[0]) == 3
+    assert len(table.rows) == 3
+
+
+@pytest.mark.asyncio
+async def test_store_lookups_refresh_last_use_and_idle_rows_are_pruned():
+    class PruneSession(StoreSession):
+        async def execute(self, statement, params):
+            self.sql = str(statement)
+            if self.sql.lstrip().startswith("DELETE"):
+                self.params = params
+                return type("Result", (), {"rowcount": 7})()
+            return await super().execute(statement, params)
+
+    table = PruneSession()
+    store = EmbeddingStore(session_factory=lambda: table)
+
+    await store.get_many("m", ["summary one"])
+    assert "SET last_used_at = CURRENT_TIMESTAMP" in table.sql
+
+    assert await store.prune(30) == 7
+    assert "last_used_at" in table.sql and table.params == {"max_idle_days": 30}
+
+
+def test_persistent_store_can_be_turned_off(monkeypatch):
+    opened = []
+    monkeypatch.setattr(EmbeddingStore, "instance", classmethod(lambda cls: opened.append(cls) or "shared-store"))
+
+    assert VectorEmbedder(api_key="k", persistent_cache=False).store is None
+    assert VectorEmbedder(api_key="k", enable_cache=False).store is None
+    assert opened == []
+    assert VectorEmbedder(api_key="k", persistent_cache=True).store == "shared-store"
+
+
+def test_cache_evicts_least_recently_used_entry():
+    cache = EmbeddingCache(max_size=2)
+    cache.set("a", "m", [1.0, 0.0])
+    cache.set("b", "m", [0.0, 1.0])
+    assert cache.get("a", "m") == [1.0, 0.0]  # b 가 가장 오래 안 쓰인 항목이 된다
+
+    cache.set("c", "m", [0.5, 0.5])
+
+    assert cache.get("b", "m") is None
+    assert cache.get("a", "m") == [1.0, 0.0] and cache.get("c", "m") == [0.5, 0.5]
+    assert cache.size() == 2
+    assert cache._slab.dtype.name == "float32" and cache._slab.shape == (2, 2)
+
+
+def test_cache_expires_entries_in_bulk(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("etl.vector_embedder.time.time", lambda: now[0])
+    cache = EmbeddingCache(max_size=4, ttl_hours=1)
+    cache.set("old", "m", [1.0])
+    now[0] += 1800
+    cache.set("new", "m", [2.0])
+    cache.set("other-dimensions", "m", [1.0, 2.0])
+    now[0] += 2400
+
+    assert cache.cleanup_expired() == 1
+    assert cache.get("old", "m") is None and cache.get("new", "m") == [2.0]
+    assert cache.get("other-dimensions", "m") is None
+    # 비워진 행은 다시 쓰인다
+    for key in ("x", "y", "z"):
+        cache.set(key, "m", [3.0])
+    assert cache.size() == 4
+
+
+class GatedSession(FakeSession):
+    """Holds every response until `release` is set"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.release = asyncio.Event()
+
+    def post(self, url, json):
+        response = super().post(url, json)
+        gate = self.release
+
+        class Gated:
+            async def __aenter__(self):
+                await gate.wait()
+                return response
+
+            async def __aexit__(self, *exc):
+                return False
+        return Gated()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_of_the_same_text_share_one_request():
+    session = GatedSession()
+    embedder = make_embedder(session, batch_size=10)
+
+    callers = [asyncio.create_task(embedder.generate_embedding("추천 질문: 나에게 맞는 직업은?")) for _ in range(5)]
+    batch = asyncio.create_task(embedder.generate_embeddings_batch(["추천 질문: 나에게 맞는 직업은?", "other"]))
+    await asyncio.sleep(0)
+    session.release.set()
+    results = await asyncio.gather(*callers)
+    batch_results = await batch
+
+    assert [method for method, _ in session.calls] == ["embedContent", "batchEmbedContents"]
+    assert len(session.calls[1][1]["requests"]) == 1  # 진행 중인 텍스트는 배치에서 빠진다
+    assert {tuple(r.embedding) for r in results} == {tuple(batch_results[0].embedding)}
+    assert [r.cached for r in results].count(False) == 1
+    assert embedder.requests_deduplicated == 5
+    assert embedder._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_fail_the_callers_sharing_its_request():
+    session = GatedSession()
+    embedder = make_embedder(session, batch_size=10)
+
+    owner = asyncio.create_task(embedder.generate_embedding("question"))
+    batch_owner = asyncio.create_task(embedder.generate_embeddings_batch(["summary"]))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(embedder.generate_embedding("question"))
+    batch_waiter = asyncio.create_task(embedder.generate_embeddings_batch(["summary", "question"]))
+    await asyncio.sleep(0)
+    # 요청을 시작한 호출자들이 취소된다 (클라이언트 연결 끊김, 작업 타임아웃 등)
+    owner.cancel()
+    batch_owner.cancel()
+    session.release.set()
+
+    result = await waiter
+    batch_results = await batch_waiter
+
+    assert owner.cancelled() and batch_owner.cancelled()
+    assert result.embedding == [8.0, 1.0]
+    assert [r.embedding for r in batch_results] == [[7.0, 0.0], [8.0, 1.0]]
+    assert [method for method, _ in session.calls] == ["embedContent", "batchEmbedContents"]
+    assert embedder._inflight == {} and embedder._flights == set()
+
+
+@pytest.mark.asyncio
+async def test_failed_shared_request_fails_every_waiter():
+    session = GatedSession(fail_batches=True)
+    embedder = make_embedder(session, max_retries=0)
+
+    async def fail(*args):
+        raise EmbeddingError("question", "API error 500")
+    embedder._request_single_embedding = fail
+
+    owner = asyncio.create_task(embedder.generate_embedding("question"))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(embedder.generate_embedding("question"))
+
+    with pytest.raises(EmbeddingError):
+        await owner
+    with pytest.raises(EmbeddingError):
+        await waiter
+    assert embedder._inflight == {}